@@ -41,6 +41,21 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 target_metadata = Base.metadata
 
+# Database-managed objects that are intentionally not mapped on the models
+# (e.g. generated full-text search columns); autogenerate must not drop them
+UNMAPPED_DB_OBJECTS = {
+    ("column", "search_vector"),
+    ("index", "ix_forum_posts_search_vector"),
+}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Skip reflected objects that only exist in the database"""
+    if reflected and compare_to is None and (type_, name) in UNMAPPED_DB_OBJECTS:
+        return False
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -63,6 +78,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -86,7 +102,9 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,38 @@
+"""add forum search vector
+
+Revision ID: 3f1d9a7c2e41
+Revises: 56c6121306fc
+Create Date: 2026-10-17 10:00:00.000000
+
+Adds a generated tsvector column (title weighted A, content weighted B)
+with a GIN index to forum_posts for full-text search. PostgreSQL 12+.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1d9a7c2e41'
+down_revision = '56c6121306fc'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE forum_posts ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(content, '')), 'B')"
+        ") STORED"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_forum_posts_search_vector "
+        "ON forum_posts USING GIN (search_vector)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_forum_posts_search_vector")
+    op.drop_column('forum_posts', 'search_vector')
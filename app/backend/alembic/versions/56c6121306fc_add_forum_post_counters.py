@@ -0,0 +1,54 @@
+"""add forum post counters
+
+Revision ID: 56c6121306fc
+Revises: b6682b59c3a1
+Create Date: 2026-10-17 09:00:00.000000
+
+Adds denormalized reply_count / last_reply_at / score columns to
+forum_posts plus composite indexes for the recent, popular and unsolved
+listing sorts. Run scripts/backfill_forum_counters.py once afterwards to
+populate counters for existing posts.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '56c6121306fc'
+down_revision = 'b6682b59c3a1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('forum_posts', sa.Column('reply_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('forum_posts', sa.Column('last_reply_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('forum_posts', sa.Column('score', sa.Integer(), server_default='0', nullable=False))
+    
+    # Column order and directions follow the listing's ORDER BY (including the id tiebreaker)
+    op.create_index(
+        'ix_forum_posts_module_recent', 'forum_posts',
+        ['module_id', 'parent_post_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False
+    )
+    op.create_index(
+        'ix_forum_posts_module_popular', 'forum_posts',
+        ['module_id', 'parent_post_id', sa.text('score DESC'), sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False
+    )
+    op.create_index(
+        'ix_forum_posts_module_unsolved', 'forum_posts',
+        ['module_id', 'parent_post_id', 'is_solved', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_forum_posts_module_unsolved', table_name='forum_posts')
+    op.drop_index('ix_forum_posts_module_popular', table_name='forum_posts')
+    op.drop_index('ix_forum_posts_module_recent', table_name='forum_posts')
+    
+    op.drop_column('forum_posts', 'score')
+    op.drop_column('forum_posts', 'last_reply_at')
+    op.drop_column('forum_posts', 'reply_count')
@@ -0,0 +1,46 @@
+"""add student stats table
+
+Revision ID: 7c4e2b9d1a85
+Revises: 3f1d9a7c2e41
+Create Date: 2026-10-17 11:00:00.000000
+
+Per-student analytics rollup maintained on assessment submission, grading,
+progress changes and achievement unlocks. Rows are seeded lazily from the
+source tables the first time a student is touched, so no backfill is needed.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c4e2b9d1a85'
+down_revision = '3f1d9a7c2e41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'student_stats',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('total_attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('scored_attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('score_sum', sa.Float(), server_default='0', nullable=False),
+        sa.Column('modules_completed', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('modules_in_progress', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('modules_not_started', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('total_achievements', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('total_points', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('current_streak_days', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('longest_streak_days', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('last_activity_date', sa.Date(), nullable=True),
+        sa.Column('last_activity_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('student_stats')
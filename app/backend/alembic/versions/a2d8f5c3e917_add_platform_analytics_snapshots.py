@@ -0,0 +1,38 @@
+"""add platform analytics snapshots
+
+Revision ID: a2d8f5c3e917
+Revises: 7c4e2b9d1a85
+Create Date: 2026-10-17 12:00:00.000000
+
+Stores precomputed platform-wide analytics. The API process refreshes the
+snapshot every PLATFORM_ANALYTICS_REFRESH_SECONDS and the admin endpoint
+serves the latest row.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a2d8f5c3e917'
+down_revision = '7c4e2b9d1a85'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'platform_analytics_snapshots',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('metrics', sa.JSON(), nullable=False),
+        sa.Column('computed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_platform_analytics_snapshots_id'), 'platform_analytics_snapshots', ['id'], unique=False)
+    op.create_index(op.f('ix_platform_analytics_snapshots_computed_at'), 'platform_analytics_snapshots', ['computed_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_platform_analytics_snapshots_computed_at'), table_name='platform_analytics_snapshots')
+    op.drop_index(op.f('ix_platform_analytics_snapshots_id'), table_name='platform_analytics_snapshots')
+    op.drop_table('platform_analytics_snapshots')
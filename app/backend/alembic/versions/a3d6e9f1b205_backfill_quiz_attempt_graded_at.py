@@ -0,0 +1,31 @@
+"""backfill graded_at for auto-graded quiz attempts
+
+Revision ID: a3d6e9f1b205
+Revises: f2c7b5e8a4d6
+Create Date: 2026-10-17 21:00:00.000000
+
+Auto-graded attempts were stored as graded without a graded_at, which broke
+keyset pagination of the grading history (sorted by graded_at). They are
+graded on submission, so graded_at is their attempted_at.
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3d6e9f1b205'
+down_revision = 'f2c7b5e8a4d6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "UPDATE quiz_attempts SET graded_at = attempted_at "
+        "WHERE review_status = 'GRADED' AND graded_at IS NULL"
+    )
+
+
+def downgrade() -> None:
+    # Backfilled values cannot be told apart from real ones; keeping them is harmless
+    pass
@@ -0,0 +1,63 @@
+"""add student activity days
+
+Revision ID: b7e2c4a9d318
+Revises: a3d6e9f1b205
+Create Date: 2026-10-17 21:30:00.000000
+
+Per-day module activity ledger that both the incremental student_stats
+updates and rebuild_student_stats derive streaks from. Seeded with each
+module's last access and with the days of every student's current streak,
+so a rebuild does not shorten streaks counted before the ledger existed.
+
+"""
+from datetime import timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2c4a9d318'
+down_revision = 'a3d6e9f1b205'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'student_activity_days',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('activity_date', sa.Date(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'activity_date')
+    )
+
+    bind = op.get_bind()
+    days = set(
+        bind.execute(sa.text(
+            "SELECT DISTINCT user_id, CAST(last_accessed_at AS DATE) FROM user_progress "
+            "WHERE last_accessed_at IS NOT NULL"
+        )).all()
+    )
+    streaks = bind.execute(sa.text(
+        "SELECT user_id, last_activity_date, current_streak_days FROM student_stats "
+        "WHERE last_activity_date IS NOT NULL"
+    )).all()
+    for user_id, last_day, streak_days in streaks:
+        for offset in range(max(streak_days, 1)):
+            days.add((user_id, last_day - timedelta(days=offset)))
+
+    if days:
+        activity_days = sa.table(
+            'student_activity_days',
+            sa.column('user_id', sa.Integer()),
+            sa.column('activity_date', sa.Date()),
+        )
+        op.bulk_insert(
+            activity_days,
+            [{'user_id': user_id, 'activity_date': day} for user_id, day in sorted(days)]
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('student_activity_days')
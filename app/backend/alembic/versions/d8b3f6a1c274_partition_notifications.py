@@ -0,0 +1,116 @@
+"""partition notifications
+
+Revision ID: d8b3f6a1c274
+Revises: c5e1a7f42b90
+Create Date: 2026-10-17 15:00:00.000000
+
+Adds notifications.group_count for digest rows. On PostgreSQL the table is
+rebuilt as a monthly range partition on created_at (primary key becomes
+(id, created_at)) with partitions named notifications_pYYYY_MM plus a
+default partition; services/notification_retention.py creates upcoming
+partitions and drops expired empty ones.
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8b3f6a1c274'
+down_revision = 'c5e1a7f42b90'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 2
+
+COLUMNS = "id, user_id, type, title, message, link, is_read, group_count, created_at, read_at"
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_indexes() -> None:
+    op.create_index(op.f('ix_notifications_id'), 'notifications', ['id'], unique=False)
+    op.create_index(op.f('ix_notifications_user_id'), 'notifications', ['user_id'], unique=False)
+    op.create_index(op.f('ix_notifications_is_read'), 'notifications', ['is_read'], unique=False)
+    op.create_index(op.f('ix_notifications_created_at'), 'notifications', ['created_at'], unique=False)
+
+
+def upgrade() -> None:
+    op.add_column('notifications', sa.Column('group_count', sa.Integer(), server_default='1', nullable=False))
+
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute("ALTER TABLE notifications RENAME TO notifications_unpartitioned")
+    op.execute("ALTER INDEX notifications_pkey RENAME TO notifications_unpartitioned_pkey")
+    op.execute(
+        "CREATE TABLE notifications ("
+        "id INTEGER NOT NULL DEFAULT nextval('notifications_id_seq'), "
+        "user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE, "
+        "type VARCHAR(50) NOT NULL, "
+        "title VARCHAR(200) NOT NULL, "
+        "message TEXT NOT NULL, "
+        "link VARCHAR(500), "
+        "is_read BOOLEAN NOT NULL DEFAULT false, "
+        "group_count INTEGER NOT NULL DEFAULT 1, "
+        "created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(), "
+        "read_at TIMESTAMP WITH TIME ZONE, "
+        "PRIMARY KEY (id, created_at)"
+        ") PARTITION BY RANGE (created_at)"
+    )
+
+    # One partition per month from the oldest row through MONTHS_AHEAD months from now
+    oldest = bind.execute(sa.text("SELECT min(created_at) FROM notifications_unpartitioned")).scalar()
+    this_month = date.today().replace(day=1)
+    month = oldest.date().replace(day=1) if oldest else this_month
+    while month <= _add_months(this_month, MONTHS_AHEAD):
+        op.execute(
+            f"CREATE TABLE notifications_p{month.year:04d}_{month.month:02d} PARTITION OF notifications "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+    op.execute("CREATE TABLE notifications_default PARTITION OF notifications DEFAULT")
+
+    op.execute(f"INSERT INTO notifications ({COLUMNS}) SELECT {COLUMNS} FROM notifications_unpartitioned")
+    op.execute("ALTER SEQUENCE notifications_id_seq OWNED BY notifications.id")
+    op.execute("DROP TABLE notifications_unpartitioned")
+    _create_indexes()
+    # Serves unread counts and digest compaction
+    op.create_index(
+        'ix_notifications_user_unread', 'notifications', ['user_id'],
+        unique=False, postgresql_where=sa.text('is_read = false')
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute("ALTER TABLE notifications RENAME TO notifications_partitioned")
+        op.execute("ALTER INDEX notifications_pkey RENAME TO notifications_partitioned_pkey")
+        op.execute(
+            "CREATE TABLE notifications ("
+            "id INTEGER NOT NULL DEFAULT nextval('notifications_id_seq') PRIMARY KEY, "
+            "user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE, "
+            "type VARCHAR(50) NOT NULL, "
+            "title VARCHAR(200) NOT NULL, "
+            "message TEXT NOT NULL, "
+            "link VARCHAR(500), "
+            "is_read BOOLEAN NOT NULL DEFAULT false, "
+            "group_count INTEGER NOT NULL DEFAULT 1, "
+            "created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(), "
+            "read_at TIMESTAMP WITH TIME ZONE"
+            ")"
+        )
+        op.execute(f"INSERT INTO notifications ({COLUMNS}) SELECT {COLUMNS} FROM notifications_partitioned")
+        op.execute("ALTER SEQUENCE notifications_id_seq OWNED BY notifications.id")
+        # Dropping the parent drops its partitions and partitioned indexes
+        op.execute("DROP TABLE notifications_partitioned")
+        _create_indexes()
+
+    op.drop_column('notifications', 'group_count')
@@ -0,0 +1,38 @@
+"""add lesson renditions table
+
+Revision ID: e4a9c2d7f813
+Revises: d8b3f6a1c274
+Create Date: 2026-10-17 17:00:00.000000
+
+Pre-rendered lesson HTML, table of contents and compressed response bodies
+built by prerender_lessons.py (services/lesson_render.py).
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4a9c2d7f813'
+down_revision = 'd8b3f6a1c274'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'lesson_renditions',
+        sa.Column('lesson_id', sa.Integer(), nullable=False),
+        sa.Column('source_hash', sa.String(length=64), nullable=False),
+        sa.Column('content_html', sa.Text(), nullable=False),
+        sa.Column('toc', sa.JSON(), nullable=False),
+        sa.Column('body_gzip', sa.LargeBinary(), nullable=False),
+        sa.Column('body_br', sa.LargeBinary(), nullable=True),
+        sa.Column('rendered_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['lesson_id'], ['lessons.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('lesson_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('lesson_renditions')
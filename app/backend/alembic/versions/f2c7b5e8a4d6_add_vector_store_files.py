@@ -0,0 +1,49 @@
+"""add vector store files sync ledger
+
+Revision ID: f2c7b5e8a4d6
+Revises: e4a9c2d7f813
+Create Date: 2026-10-17 19:00:00.000000
+
+Records which content hash of each document is attached to each user's
+vector store (services/vector_store_sync.py).
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c7b5e8a4d6'
+down_revision = 'e4a9c2d7f813'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'vector_store_files',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('vector_store_id', sa.String(length=255), nullable=False),
+        sa.Column('document_id', sa.Integer(), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('openai_file_id', sa.String(length=255), nullable=True),
+        sa.Column('status', sa.Enum('SYNCED', 'FAILED', name='vectorsyncstatus'), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('synced_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('vector_store_id', 'document_id', name='uq_vector_store_document')
+    )
+    op.create_index(op.f('ix_vector_store_files_id'), 'vector_store_files', ['id'], unique=False)
+    op.create_index(op.f('ix_vector_store_files_user_id'), 'vector_store_files', ['user_id'], unique=False)
+    op.create_index(op.f('ix_vector_store_files_document_id'), 'vector_store_files', ['document_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_vector_store_files_document_id'), table_name='vector_store_files')
+    op.drop_index(op.f('ix_vector_store_files_user_id'), table_name='vector_store_files')
+    op.drop_index(op.f('ix_vector_store_files_id'), table_name='vector_store_files')
+    op.drop_table('vector_store_files')
+    sa.Enum(name='vectorsyncstatus').drop(op.get_bind(), checkfirst=True)
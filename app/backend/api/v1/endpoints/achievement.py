@@ -4,7 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict
 from pydantic import BaseModel
 
-from app.backend.core.database import get_db
+from app.backend.core.database import get_db, get_read_db
 from app.backend.core.security import get_current_user
 from app.backend.api.v1.endpoints.auth import require_role
 from app.backend.models.user import User, UserRole
@@ -45,7 +45,7 @@ class AchievementStatsResponse(BaseModel):
 @router.get("/achievements", response_model=List[AchievementResponse])
 async def list_achievements(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all achievements with user's earned status"""
     achievements = await get_user_achievements(db, current_user.id)
@@ -55,7 +55,7 @@ async def list_achievements(
 @router.get("/achievements/stats", response_model=AchievementStatsResponse)
 async def get_stats(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get achievement statistics for current user"""
     stats = await get_achievement_stats(db, current_user.id)
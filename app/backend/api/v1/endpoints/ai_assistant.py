@@ -1,5 +1,5 @@
 """AI Learning Assistant endpoints"""
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, desc, and_, delete
@@ -10,6 +10,7 @@ from datetime import datetime, timedelta, timezone
 
 from app.backend.core.database import get_db
 from app.backend.core.security import get_current_user
+from app.backend.core.pagination import apply_keyset, split_page, should_count
 from app.backend.models.user import User
 from app.backend.models.notification import ChatMessage
 from app.backend.models.thread_map import ThreadMap
@@ -29,6 +30,9 @@ from app.backend.schemas.notification import (
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Newest first; id is the unique tiebreaker for keyset pagination
+CHAT_HISTORY_SORT_KEYS = [(ChatMessage.created_at, True), (ChatMessage.id, True)]
+
 
 def generate_conversation_id() -> int:
     """Generate a new conversation ID (simple timestamp-based)"""
@@ -451,6 +455,8 @@ async def update_conversation_title(
 async def get_chat_history(
     limit: int = 50,
     conversation_id: Optional[int] = None,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    include_total: Optional[bool] = Query(None, description="Run the total count (default: first page only)"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -461,16 +467,18 @@ async def get_chat_history(
         query = query.where(ChatMessage.conversation_id == conversation_id)
     
     result = await db.execute(
-        query.order_by(desc(ChatMessage.created_at)).limit(limit)
+        apply_keyset(query, CHAT_HISTORY_SORT_KEYS, cursor).limit(limit + 1)
     )
-    messages = result.scalars().all()
+    messages, next_cursor = split_page(result.scalars().all(), limit, CHAT_HISTORY_SORT_KEYS)
     
-    # Get total count
-    count_query = select(func.count()).where(ChatMessage.user_id == current_user.id)
-    if conversation_id:
-        count_query = count_query.where(ChatMessage.conversation_id == conversation_id)
-    count_result = await db.execute(count_query)
-    total = count_result.scalar() or 0
+    # Get total count (opt-in for cursor pages)
+    total = None
+    if should_count(include_total, cursor):
+        count_query = select(func.count()).where(ChatMessage.user_id == current_user.id)
+        if conversation_id:
+            count_query = count_query.where(ChatMessage.conversation_id == conversation_id)
+        count_result = await db.execute(count_query)
+        total = count_result.scalar() or 0
     
     message_responses = [
         ChatMessageResponse(
@@ -489,5 +497,6 @@ async def get_chat_history(
     
     return ChatHistoryResponse(
         messages=message_responses,
-        total=total
+        total=total,
+        next_cursor=next_cursor
     )
@@ -1,12 +1,12 @@
 """Analytics and reporting endpoints"""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, or_, case
 from typing import Dict, List, Optional
 from pydantic import BaseModel
 from datetime import datetime, timedelta
 
-from app.backend.core.database import get_db
+from app.backend.core.database import get_db, get_read_db
 from app.backend.core.security import get_current_user
 from app.backend.api.v1.endpoints.auth import require_role
 from app.backend.models.user import User, UserRole
@@ -15,6 +15,14 @@ from app.backend.models.assessment import Assessment
 from app.backend.models.module import Module
 from app.backend.models.cohort import Cohort, CohortMember
 from app.backend.models.achievement import UserAchievement, Achievement
+from app.backend.services.analytics_service import (
+    compute_cohort_analytics,
+    attempt_score_percentage,
+    get_latest_platform_snapshot,
+    platform_snapshot_is_stale,
+    refresh_platform_snapshot,
+)
+from app.backend.services.student_stats_service import get_student_stats, current_streak, average_score
 
 router = APIRouter()
 
@@ -62,6 +70,7 @@ class PlatformAnalyticsResponse(BaseModel):
     new_users_last_30_days: int
     modules_by_track: Dict[str, int]
     completion_by_track: Dict[str, float]
+    computed_at: datetime
 
 
 @router.get("/analytics/student/{user_id}", response_model=StudentAnalyticsResponse)
@@ -78,43 +87,18 @@ async def get_student_analytics(
             detail="Not authorized to view this student's analytics"
         )
     
-    # Get user progress
-    result = await db.execute(
-        select(UserProgress).where(UserProgress.user_id == user_id)
-    )
-    all_progress = result.scalars().all()
-    
-    # Calculate statistics
-    total_modules_completed = sum(1 for p in all_progress if p.status == ProgressStatus.COMPLETED)
-    total_modules_started = sum(1 for p in all_progress if p.status != ProgressStatus.NOT_STARTED)
-    
-    modules_by_status = {
-        "completed": sum(1 for p in all_progress if p.status == ProgressStatus.COMPLETED),
-        "in_progress": sum(1 for p in all_progress if p.status == ProgressStatus.IN_PROGRESS),
-        "not_started": sum(1 for p in all_progress if p.status == ProgressStatus.NOT_STARTED),
-    }
-    
-    # Get quiz attempts
-    result = await db.execute(
-        select(QuizAttempt).where(QuizAttempt.user_id == user_id)
-    )
-    all_attempts = result.scalars().all()
-    total_attempts = len(all_attempts)
-    
-    # Calculate average score
-    scores = [a.score_percentage for a in all_attempts if a.score_percentage is not None]
-    average_score = sum(scores) / len(scores) if scores else 0.0
+    # Scalar statistics come from the incrementally maintained rollup row
+    stats = await get_student_stats(db, user_id)
     
-    # Get scores by module
+    # Get best score by module
     result = await db.execute(
         select(
             Module.id,
             Module.title,
-            func.max(QuizAttempt.score_percentage).label("best_score")
+            func.max(attempt_score_percentage).label("best_score")
         )
-        .join(QuizAttempt, QuizAttempt.assessment_id.in_(
-            select(Assessment.id).where(Assessment.module_id == Module.id)
-        ))
+        .join(Assessment, Assessment.module_id == Module.id)
+        .join(QuizAttempt, QuizAttempt.assessment_id == Assessment.id)
         .where(QuizAttempt.user_id == user_id)
         .group_by(Module.id, Module.title)
     )
@@ -123,57 +107,38 @@ async def get_student_analytics(
         for row in result.all()
     ]
     
-    # Calculate streak (simplified - based on recent activity)
-    recent_progress = [p for p in all_progress if p.last_accessed_at]
-    if recent_progress:
-        recent_dates = sorted([p.last_accessed_at.date() for p in recent_progress], reverse=True)
-        current_streak = 0
-        check_date = datetime.now().date()
-        for date in recent_dates:
-            if date == check_date or date == check_date - timedelta(days=1):
-                current_streak += 1
-                check_date = date - timedelta(days=1)
-            else:
-                break
-    else:
-        current_streak = 0
-    
-    # Get achievements
-    result = await db.execute(
-        select(func.count(UserAchievement.achievement_id)).where(
-            UserAchievement.user_id == user_id
-        )
-    )
-    total_achievements = result.scalar() or 0
-    
+    # Recent activity (last 10 progress updates)
     result = await db.execute(
-        select(func.sum(Achievement.points))
-        .join(UserAchievement)
-        .where(UserAchievement.user_id == user_id)
+        select(UserProgress, Module.title)
+        .outerjoin(Module, Module.id == UserProgress.module_id)
+        .where(UserProgress.user_id == user_id)
+        .order_by(UserProgress.last_accessed_at.desc())
+        .limit(10)
     )
-    total_points = result.scalar() or 0
-    
-    # Recent activity (last 10 progress updates)
     recent_activity = [
         {
             "module_id": p.module_id,
-            "module_title": "Module",  # Would need to join with Module
+            "module_title": module_title or "Module",
             "status": p.status.value,
             "updated_at": p.last_accessed_at.isoformat() if p.last_accessed_at else None
         }
-        for p in sorted(all_progress, key=lambda x: x.last_accessed_at or datetime.min, reverse=True)[:10]
+        for p, module_title in result.all()
     ]
     
     return StudentAnalyticsResponse(
         user_id=user_id,
-        total_modules_completed=total_modules_completed,
-        total_modules_started=total_modules_started,
-        average_score=round(average_score, 2),
-        total_attempts=total_attempts,
-        current_streak_days=current_streak,
-        total_achievements=total_achievements,
-        total_points=total_points,
-        modules_by_status=modules_by_status,
+        total_modules_completed=stats.modules_completed,
+        total_modules_started=stats.modules_completed + stats.modules_in_progress,
+        average_score=round(average_score(stats), 2),
+        total_attempts=stats.total_attempts,
+        current_streak_days=current_streak(stats),
+        total_achievements=stats.total_achievements,
+        total_points=stats.total_points,
+        modules_by_status={
+            "completed": stats.modules_completed,
+            "in_progress": stats.modules_in_progress,
+            "not_started": stats.modules_not_started,
+        },
         scores_by_module=scores_by_module,
         recent_activity=recent_activity
     )
@@ -183,7 +148,7 @@ async def get_student_analytics(
 async def get_cohort_analytics(
     cohort_id: int,
     current_user: User = Depends(require_role([UserRole.INSTRUCTOR, UserRole.ADMIN])),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get analytics for a cohort (instructor/admin only)"""
     # Verify cohort exists
@@ -195,200 +160,33 @@ async def get_cohort_analytics(
             detail="Cohort not found"
         )
     
-    # Get cohort members
-    result = await db.execute(
-        select(CohortMember).where(CohortMember.cohort_id == cohort_id)
-    )
-    members = result.scalars().all()
-    total_students = len(members)
-    student_ids = [m.user_id for m in members]
-    
-    if not student_ids:
-        return CohortAnalyticsResponse(
-            cohort_id=cohort_id,
-            cohort_name=cohort.name,
-            total_students=0,
-            active_students=0,
-            average_progress=0.0,
-            average_score=0.0,
-            completion_rate=0.0,
-            students_by_progress={},
-            top_performers=[],
-            at_risk_students=[]
-        )
-    
-    # Get progress for all students
-    result = await db.execute(
-        select(UserProgress).where(UserProgress.user_id.in_(student_ids))
-    )
-    all_progress = result.scalars().all()
-    
-    # Calculate statistics
-    total_modules = 17  # Total modules in curriculum
-    completed_count = sum(1 for p in all_progress if p.status == ProgressStatus.COMPLETED)
-    total_progress_records = len(all_progress)
-    average_progress = (completed_count / (total_students * total_modules) * 100) if total_students > 0 else 0.0
-    
-    # Get quiz attempts
-    result = await db.execute(
-        select(QuizAttempt).where(QuizAttempt.user_id.in_(student_ids))
-    )
-    all_attempts = result.scalars().all()
-    
-    scores = [a.score_percentage for a in all_attempts if a.score_percentage is not None]
-    average_score = sum(scores) / len(scores) if scores else 0.0
-    
-    # Active students (progress in last 7 days)
-    seven_days_ago = datetime.now() - timedelta(days=7)
-    active_students = len(set(
-        p.user_id for p in all_progress
-        if p.last_accessed_at and p.last_accessed_at >= seven_days_ago
-    ))
-    
-    # Completion rate
-    total_modules_completed = sum(1 for p in all_progress if p.status == ProgressStatus.COMPLETED)
-    completion_rate = (total_modules_completed / (total_students * total_modules) * 100) if total_students > 0 else 0.0
-    
-    # Students by progress status
-    students_by_progress = {
-        "completed": len(set(p.user_id for p in all_progress if p.status == ProgressStatus.COMPLETED)),
-        "in_progress": len(set(p.user_id for p in all_progress if p.status == ProgressStatus.IN_PROGRESS)),
-        "not_started": total_students - len(set(p.user_id for p in all_progress)),
-    }
-    
-    # Top performers (students with most completed modules)
-    from collections import defaultdict
-    completed_by_student = defaultdict(int)
-    for p in all_progress:
-        if p.status == ProgressStatus.COMPLETED:
-            completed_by_student[p.user_id] += 1
-    
-    top_performers = sorted(
-        [{"user_id": uid, "modules_completed": count} for uid, count in completed_by_student.items()],
-        key=lambda x: x["modules_completed"],
-        reverse=True
-    )[:5]
-    
-    # At-risk students (no activity in 7 days or failing)
-    at_risk = []
-    for member in members:
-        user_progress = [p for p in all_progress if p.user_id == member.user_id]
-        if not user_progress:
-            at_risk.append({"user_id": member.user_id, "reason": "No activity"})
-        else:
-            last_activity = max((p.last_accessed_at for p in user_progress if p.last_accessed_at), default=None)
-            if last_activity and (datetime.now() - last_activity).days > 7:
-                at_risk.append({"user_id": member.user_id, "reason": "Inactive >7 days"})
+    stats = await compute_cohort_analytics(db, cohort_id)
     
     return CohortAnalyticsResponse(
         cohort_id=cohort_id,
         cohort_name=cohort.name,
-        total_students=total_students,
-        active_students=active_students,
-        average_progress=round(average_progress, 2),
-        average_score=round(average_score, 2),
-        completion_rate=round(completion_rate, 2),
-        students_by_progress=students_by_progress,
-        top_performers=top_performers,
-        at_risk_students=at_risk
+        **stats
     )
 
 
 @router.get("/analytics/platform", response_model=PlatformAnalyticsResponse)
 async def get_platform_analytics(
+    fresh: bool = Query(False, description="Recompute instead of serving the latest snapshot"),
     current_user: User = Depends(require_role([UserRole.ADMIN])),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get platform-wide analytics (admin only)"""
-    # Total users
-    result = await db.execute(select(func.count(User.id)))
-    total_users = result.scalar()
-    
-    result = await db.execute(select(func.count(User.id)).where(User.role == UserRole.STUDENT))
-    total_students = result.scalar()
-    
-    result = await db.execute(select(func.count(User.id)).where(User.role == UserRole.INSTRUCTOR))
-    total_instructors = result.scalar()
-    
-    # Total modules and assessments
-    result = await db.execute(select(func.count(Module.id)))
-    total_modules = result.scalar()
-    
-    result = await db.execute(select(func.count(Assessment.id)))
-    total_assessments = result.scalar()
-    
-    result = await db.execute(select(func.count(QuizAttempt.id)))
-    total_attempts = result.scalar()
-    
-    # Average completion rate
-    result = await db.execute(
-        select(func.count(UserProgress.id)).where(
-            UserProgress.status == ProgressStatus.COMPLETED
-        )
-    )
-    completed_modules = result.scalar()
-    
-    result = await db.execute(select(func.count(UserProgress.id)))
-    total_progress_records = result.scalar()
-    average_completion_rate = (completed_modules / total_progress_records * 100) if total_progress_records > 0 else 0.0
-    
-    # Average score
-    result = await db.execute(
-        select(func.avg(QuizAttempt.score_percentage)).where(
-            QuizAttempt.score_percentage.isnot(None)
-        )
-    )
-    average_score = result.scalar() or 0.0
-    
-    # Active users (last 30 days)
-    thirty_days_ago = datetime.now() - timedelta(days=30)
-    result = await db.execute(
-        select(func.count(func.distinct(UserProgress.user_id))).where(
-            UserProgress.last_accessed_at >= thirty_days_ago
-        )
-    )
-    active_users_last_30_days = result.scalar() or 0
-    
-    # New users (last 30 days)
-    result = await db.execute(
-        select(func.count(User.id)).where(User.created_at >= thirty_days_ago)
-    )
-    new_users_last_30_days = result.scalar() or 0
+    """
+    Get platform-wide analytics (admin only).
     
-    # Modules by track
-    result = await db.execute(
-        select(Module.track, func.count(Module.id))
-        .group_by(Module.track)
-    )
-    modules_by_track = {row[0]: row[1] for row in result.all() if row[0]}
-    
-    # Completion by track
-    result = await db.execute(
-        select(
-            Module.track,
-            func.count(case((UserProgress.status == ProgressStatus.COMPLETED, 1))).label("completed"),
-            func.count(UserProgress.id).label("total")
-        )
-        .join(UserProgress, UserProgress.module_id == Module.id)
-        .group_by(Module.track)
-    )
-    completion_by_track = {
-        row[0]: round((row[1] / row[2] * 100) if row[2] > 0 else 0.0, 2)
-        for row in result.all() if row[0]
-    }
+    Served from the latest precomputed snapshot, which a background job
+    refreshes every PLATFORM_ANALYTICS_REFRESH_SECONDS. Pass fresh=true to
+    recompute immediately.
+    """
+    snapshot = await get_latest_platform_snapshot(db)
+    if fresh or platform_snapshot_is_stale(snapshot):
+        snapshot = await refresh_platform_snapshot(db)
     
     return PlatformAnalyticsResponse(
-        total_users=total_users,
-        total_students=total_students,
-        total_instructors=total_instructors,
-        total_modules=total_modules,
-        total_assessments=total_assessments,
-        total_attempts=total_attempts,
-        average_completion_rate=round(average_completion_rate, 2),
-        average_score=round(average_score, 2),
-        active_users_last_30_days=active_users_last_30_days,
-        new_users_last_30_days=new_users_last_30_days,
-        modules_by_track=modules_by_track,
-        completion_by_track=completion_by_track
+        **snapshot.metrics,
+        computed_at=snapshot.computed_at
     )
-
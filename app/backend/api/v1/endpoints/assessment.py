@@ -11,7 +11,7 @@ from app.backend.models.user import User
 from app.backend.models.assessment import Assessment, QuestionType
 from app.backend.models.progress import QuizAttempt, ReviewStatus, UserProgress, ProgressStatus
 from app.backend.models.module import Module
-from datetime import datetime
+from datetime import datetime, timezone
 from app.backend.schemas.assessment import (
     AssessmentResponse,
     AssessmentSubmit,
@@ -20,7 +20,12 @@ from app.backend.schemas.assessment import (
     QuizAttemptResponse,
     AssessmentListResponse,
 )
-from app.backend.services.achievement_service import check_achievements
+from app.backend.services.event_queue import enqueue_event, event_worker_pool
+from app.backend.services.student_stats_service import (
+    record_attempt_submitted,
+    record_progress_change,
+    score_percentage,
+)
 
 router = APIRouter()
 
@@ -110,6 +115,7 @@ async def submit_assessment_answer(
     # Auto-grade if possible
     is_correct = None
     points_earned = None
+    graded_at = None
     review_status = ReviewStatus.PENDING
     
     if is_auto_gradable:
@@ -120,6 +126,7 @@ async def submit_assessment_answer(
         is_correct = user_answer_normalized == correct_answer_normalized
         points_earned = assessment.points if is_correct else 0
         review_status = ReviewStatus.GRADED
+        graded_at = datetime.now(timezone.utc)
     else:
         # Short answer or coding task - needs manual grading
         review_status = ReviewStatus.NEEDS_REVIEW
@@ -133,26 +140,31 @@ async def submit_assessment_answer(
         is_correct=is_correct,
         points_earned=points_earned,
         review_status=review_status,
+        graded_at=graded_at,
         time_spent_seconds=submission.time_spent_seconds
     )
     
     db.add(quiz_attempt)
-    await db.commit()
-    await db.refresh(quiz_attempt)
-    
-    # Check for achievements (perfect score, assessment completion, etc.)
-    event_data = {
-        "assessment_id": assessment_id,
-        "module_id": assessment.module_id,
-        "is_correct": is_correct,
-        "score_percentage": (points_earned / assessment.points * 100) if points_earned else 0
-    }
-    await check_achievements(
-        db=db,
+    await record_attempt_submitted(
+        db,
+        current_user.id,
+        score_percentage(points_earned, assessment.points)
+    )
+    # Achievements (perfect score, assessment completion, etc.) are checked in the background
+    enqueue_event(
+        db,
+        "assessment_submitted",
         user_id=current_user.id,
-        event_type="assessment_submitted",
-        event_data=event_data
+        payload={
+            "assessment_id": assessment_id,
+            "module_id": assessment.module_id,
+            "is_correct": is_correct,
+            "score_percentage": (points_earned / assessment.points * 100) if points_earned else 0
+        }
     )
+    await db.commit()
+    event_worker_pool.wake()
+    await db.refresh(quiz_attempt)
     
     # Prepare response
     response = AssessmentSubmitResponse(
@@ -327,6 +339,7 @@ async def get_module_results(
         )
     )
     user_progress = result.scalar_one_or_none()
+    previous_status = user_progress.status if user_progress else None
 
     completion_percentage = 100.0 if progress_status == ProgressStatus.COMPLETED else (
         (attempted / total_questions) * 100 if total_questions > 0 else 0.0
@@ -339,6 +352,9 @@ async def get_module_results(
             user_progress.started_at = None
             user_progress.completed_at = None
             user_progress.last_accessed_at = datetime.now()
+            await record_progress_change(
+                db, current_user.id, previous_status, progress_status, user_progress.last_accessed_at
+            )
             await db.commit()
     elif progress_status == ProgressStatus.IN_PROGRESS:
         if user_progress:
@@ -359,9 +375,12 @@ async def get_module_results(
                 last_accessed_at=datetime.now()
             )
             db.add(user_progress)
+        await record_progress_change(
+            db, current_user.id, previous_status, progress_status, user_progress.last_accessed_at
+        )
         await db.commit()
     else:  # progress_status == COMPLETED
-        was_completed = user_progress.status == ProgressStatus.COMPLETED if user_progress else False
+        was_completed = previous_status == ProgressStatus.COMPLETED
         if user_progress:
             user_progress.status = ProgressStatus.COMPLETED
             user_progress.completion_percentage = 100.0
@@ -380,16 +399,19 @@ async def get_module_results(
                 last_accessed_at=datetime.now()
             )
             db.add(user_progress)
-        await db.commit()
-        
-        # Check for achievements if module was just completed
+        await record_progress_change(
+            db, current_user.id, previous_status, progress_status, user_progress.last_accessed_at
+        )
+        # Check for achievements in the background if module was just completed
         if not was_completed:
-            await check_achievements(
-                db=db,
+            enqueue_event(
+                db,
+                "module_completed",
                 user_id=current_user.id,
-                event_type="module_completed",
-                event_data={"module_id": module_id, "module_title": module.title}
+                payload={"module_id": module_id, "module_title": module.title}
             )
+        await db.commit()
+        event_worker_pool.wake()
     
     return ModuleResultsResponse(
         module_id=module_id,
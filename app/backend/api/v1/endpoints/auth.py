@@ -7,9 +7,11 @@ from datetime import datetime
 from typing import Optional
 import logging
 
+from app.backend.core.auth_cache import user_principal_cache
 from app.backend.core.database import get_db
 from app.backend.core.security import (
     verify_password,
+    verify_and_update_password,
     get_password_hash,
     create_access_token,
     get_current_user
@@ -70,7 +72,7 @@ async def register(
             )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash(user_data.password)
     new_user = User(
         email=user_data.email,
         hashed_password=hashed_password,
@@ -107,7 +109,10 @@ async def login(
     result = await db.execute(select(User).where(User.email == form_data.username))
     user = result.scalar_one_or_none()
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await verify_and_update_password(form_data.password, user.hashed_password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -120,8 +125,10 @@ async def login(
             detail="User account is inactive"
         )
     
-    # Update last login
+    # Update last login, upgrading the stored hash if it is below the current cost
     user.last_login = datetime.utcnow()
+    if new_hash:
+        user.hashed_password = new_hash
     await db.commit()
     
     # Create access token (sub must be a string)
@@ -141,7 +148,10 @@ async def login_json(
     result = await db.execute(select(User).where(User.email == credentials.email))
     user = result.scalar_one_or_none()
     
-    if not user or not verify_password(credentials.password, user.hashed_password):
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await verify_and_update_password(credentials.password, user.hashed_password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -154,8 +164,10 @@ async def login_json(
             detail="User account is inactive"
         )
     
-    # Update last login
+    # Update last login, upgrading the stored hash if it is below the current cost
     user.last_login = datetime.utcnow()
+    if new_hash:
+        user.hashed_password = new_hash
     await db.commit()
     
     # Create access token (sub must be a string)
@@ -225,6 +237,7 @@ async def update_current_user(
     
     await db.commit()
     await db.refresh(current_user)
+    user_principal_cache.invalidate(current_user.id)
     
     return current_user
 
@@ -237,15 +250,16 @@ async def change_password(
 ):
     """Change user password"""
     # Verify current password
-    if not verify_password(password_data.current_password, current_user.hashed_password):
+    if not await verify_password(password_data.current_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
         )
     
     # Update password
-    current_user.hashed_password = get_password_hash(password_data.new_password)
+    current_user.hashed_password = await get_password_hash(password_data.new_password)
     await db.commit()
+    user_principal_cache.invalidate(current_user.id)
     
     return {"message": "Password changed successfully"}
 
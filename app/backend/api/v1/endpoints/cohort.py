@@ -21,6 +21,12 @@ from app.backend.schemas.cohort import (
     CohortMemberResponse
 )
 from app.backend.api.v1.endpoints.auth import require_role
+from app.backend.services.cohort_service import (
+    calculate_is_active,
+    calculate_cohort_status,
+    hydrate_cohort,
+    hydrate_cohorts
+)
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -29,55 +35,6 @@ logger = logging.getLogger(__name__)
 MAX_COHORT_STUDENTS = 25
 
 
-def calculate_is_active(start_date: Optional[date], end_date: Optional[date]) -> bool:
-    """Calculate if cohort is active based on dates"""
-    if start_date is None and end_date is None:
-        return True  # No dates set, default to active
-    
-    today = date.today()
-    
-    # If only start_date is set, check if today >= start_date
-    if start_date is not None and end_date is None:
-        return today >= start_date
-    
-    # If only end_date is set, check if today <= end_date
-    if start_date is None and end_date is not None:
-        return today <= end_date
-    
-    # Both dates set, check if today is between them
-    return start_date <= today <= end_date
-
-
-def calculate_cohort_status(start_date: Optional[date], end_date: Optional[date]) -> str:
-    """Calculate cohort status: 'active', 'upcoming', or 'inactive'"""
-    if start_date is None and end_date is None:
-        return "active"  # No dates set, default to active
-    
-    today = date.today()
-    
-    # If only start_date is set
-    if start_date is not None and end_date is None:
-        if today < start_date:
-            return "upcoming"
-        elif today >= start_date:
-            return "active"
-    
-    # If only end_date is set
-    if start_date is None and end_date is not None:
-        if today <= end_date:
-            return "active"
-        else:
-            return "inactive"
-    
-    # Both dates set
-    if today < start_date:
-        return "upcoming"
-    elif start_date <= today <= end_date:
-        return "active"
-    else:
-        return "inactive"
-
-
 @router.post("/cohorts", response_model=CohortResponse, status_code=status.HTTP_201_CREATED)
 async def create_cohort(
     cohort_data: CohortCreate,
@@ -175,67 +132,14 @@ async def create_cohort(
         # If member addition fails, we can still return the cohort (it's created)
         # Just log the error and continue
     
-    # Fetch cohort with members
+    # Fetch cohort and hydrate members/users in a constant number of queries
     result = await db.execute(
         select(Cohort)
         .where(Cohort.id == new_cohort.id)
     )
     cohort = result.scalar_one()
     
-    # Get members
-    members_result = await db.execute(
-        select(CohortMember)
-        .where(CohortMember.cohort_id == cohort.id)
-    )
-    members = members_result.scalars().all()
-    
-    # Get user details for members
-    member_responses = []
-    for member in members:
-        user_result = await db.execute(select(User).where(User.id == member.user_id))
-        user = user_result.scalar_one_or_none()
-        member_data = {
-            "id": member.id,
-            "cohort_id": member.cohort_id,
-            "user_id": member.user_id,
-            "role": member.role,
-            "joined_at": member.joined_at,
-            "user": {
-                "id": user.id if user else None,
-                "email": user.email if user else None,
-                "full_name": user.full_name if user else None,
-                "username": user.username if user else None
-            } if user else None
-        }
-        member_responses.append(CohortMemberResponse(**member_data))
-    
-    # Recalculate is_active and status based on dates
-    calculated_is_active = calculate_is_active(cohort.start_date, cohort.end_date)
-    calculated_status = calculate_cohort_status(cohort.start_date, cohort.end_date)
-    
-    # Update database if status changed
-    if calculated_is_active != cohort.is_active:
-        cohort.is_active = calculated_is_active
-        await db.commit()
-        await db.refresh(cohort)
-    
-    return CohortResponse(
-        id=cohort.id,
-        name=cohort.name,
-        description=cohort.description,
-        start_date=cohort.start_date,
-        end_date=cohort.end_date,
-        is_active=calculated_is_active,
-        status=calculated_status,
-        cancelled_at=cohort.cancelled_at,
-        created_by=cohort.created_by,
-        created_at=cohort.created_at,
-        updated_at=cohort.updated_at,
-        members=member_responses,
-        member_count=len(member_responses),
-        student_count=sum(1 for m in member_responses if m.role == CohortRole.STUDENT.value),
-        instructor_count=sum(1 for m in member_responses if m.role == CohortRole.INSTRUCTOR.value)
-    )
+    return await hydrate_cohort(db, cohort)
 
 
 @router.put("/cohorts/{cohort_id}", response_model=CohortResponse)
@@ -286,60 +190,8 @@ async def update_cohort(
             detail=f"Error updating cohort: {str(e)}"
         )
     
-    # Get members
-    members_result = await db.execute(
-        select(CohortMember)
-        .where(CohortMember.cohort_id == cohort.id)
-    )
-    members = members_result.scalars().all()
-    
-    # Get user details for members
-    member_responses = []
-    for member in members:
-        user_result = await db.execute(select(User).where(User.id == member.user_id))
-        user = user_result.scalar_one_or_none()
-        member_data = {
-            "id": member.id,
-            "cohort_id": member.cohort_id,
-            "user_id": member.user_id,
-            "role": member.role,
-            "joined_at": member.joined_at,
-            "user": {
-                "id": user.id if user else None,
-                "email": user.email if user else None,
-                "full_name": user.full_name if user else None,
-                "username": user.username if user else None
-            } if user else None
-        }
-        member_responses.append(CohortMemberResponse(**member_data))
-    
-    # Recalculate is_active and status based on dates
-    calculated_is_active = calculate_is_active(cohort.start_date, cohort.end_date)
-    calculated_status = calculate_cohort_status(cohort.start_date, cohort.end_date)
-    
-    # Update database if status changed (unless explicitly set to False)
-    if cohort_data.is_active is not False and calculated_is_active != cohort.is_active:
-        cohort.is_active = calculated_is_active
-        await db.commit()
-        await db.refresh(cohort)
-    
-    return CohortResponse(
-        id=cohort.id,
-        name=cohort.name,
-        description=cohort.description,
-        start_date=cohort.start_date,
-        end_date=cohort.end_date,
-        is_active=cohort.is_active,
-        status=calculated_status,
-        cancelled_at=cohort.cancelled_at,
-        created_by=cohort.created_by,
-        created_at=cohort.created_at,
-        updated_at=cohort.updated_at,
-        members=member_responses,
-        member_count=len(member_responses),
-        student_count=sum(1 for m in member_responses if m.role == CohortRole.STUDENT.value),
-        instructor_count=sum(1 for m in member_responses if m.role == CohortRole.INSTRUCTOR.value)
-    )
+    # Keep an explicit cancel (is_active=False) instead of recalculating from dates
+    return await hydrate_cohort(db, cohort, sync_active=cohort_data.is_active is not False)
 
 
 @router.patch("/cohorts/{cohort_id}/cancel", response_model=CohortResponse)
@@ -383,53 +235,7 @@ async def cancel_cohort(
             detail=f"Error canceling cohort: {str(e)}"
         )
     
-    # Get members
-    members_result = await db.execute(
-        select(CohortMember)
-        .where(CohortMember.cohort_id == cohort.id)
-    )
-    members = members_result.scalars().all()
-    
-    # Get user details for members
-    member_responses = []
-    for member in members:
-        user_result = await db.execute(select(User).where(User.id == member.user_id))
-        user = user_result.scalar_one_or_none()
-        member_data = {
-            "id": member.id,
-            "cohort_id": member.cohort_id,
-            "user_id": member.user_id,
-            "role": member.role,
-            "joined_at": member.joined_at,
-            "user": {
-                "id": user.id if user else None,
-                "email": user.email if user else None,
-                "full_name": user.full_name if user else None,
-                "username": user.username if user else None
-            } if user else None
-        }
-        member_responses.append(CohortMemberResponse(**member_data))
-    
-    # Calculate status for cancelled cohort
-    calculated_status = calculate_cohort_status(cohort.start_date, cohort.end_date)
-    
-    return CohortResponse(
-        id=cohort.id,
-        name=cohort.name,
-        description=cohort.description,
-        start_date=cohort.start_date,
-        end_date=cohort.end_date,
-        is_active=False,
-        status=calculated_status,
-        cancelled_at=cohort.cancelled_at,
-        created_by=cohort.created_by,
-        created_at=cohort.created_at,
-        updated_at=cohort.updated_at,
-        members=member_responses,
-        member_count=len(member_responses),
-        student_count=sum(1 for m in member_responses if m.role == CohortRole.STUDENT.value),
-        instructor_count=sum(1 for m in member_responses if m.role == CohortRole.INSTRUCTOR.value)
-    )
+    return await hydrate_cohort(db, cohort, sync_active=False)
 
 
 @router.delete("/cohorts/{cohort_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -577,69 +383,14 @@ async def list_cohorts(
     result = await db.execute(query.order_by(Cohort.created_at.desc()))
     cohorts = result.scalars().all()
     
-    cohort_responses = []
-    for cohort in cohorts:
-        # Get members
-        members_result = await db.execute(
-            select(CohortMember)
-            .where(CohortMember.cohort_id == cohort.id)
-        )
-        members = members_result.scalars().all()
-        
-        # Get user details for members
-        member_responses = []
-        for member in members:
-            user_result = await db.execute(select(User).where(User.id == member.user_id))
-            user = user_result.scalar_one_or_none()
-            member_data = {
-                "id": member.id,
-                "cohort_id": member.cohort_id,
-                "user_id": member.user_id,
-                "role": member.role,
-                "joined_at": member.joined_at,
-                "user": {
-                    "id": user.id if user else None,
-                    "email": user.email if user else None,
-                    "full_name": user.full_name if user else None,
-                    "username": user.username if user else None
-                } if user else None
-            }
-            member_responses.append(CohortMemberResponse(**member_data))
-        
-        # Recalculate is_active and status based on dates
-        calculated_is_active = calculate_is_active(cohort.start_date, cohort.end_date)
-        calculated_status = calculate_cohort_status(cohort.start_date, cohort.end_date)
-        
-        # Update database if status changed
-        if calculated_is_active != cohort.is_active:
-            cohort.is_active = calculated_is_active
-            await db.commit()
-            await db.refresh(cohort)
-        
-        # Filter out full cohorts for students when available=True
-        # Only count students toward the limit
-        if current_user.role == UserRole.STUDENT and available:
-            student_count_in_cohort = sum(1 for m in member_responses if m.role == CohortRole.STUDENT.value)
-            if student_count_in_cohort >= MAX_COHORT_STUDENTS:
-                continue  # Skip full cohorts (25 students)
-        
-        cohort_responses.append(CohortResponse(
-            id=cohort.id,
-            name=cohort.name,
-            description=cohort.description,
-            start_date=cohort.start_date,
-            end_date=cohort.end_date,
-            is_active=calculated_is_active,
-            status=calculated_status,
-            cancelled_at=cohort.cancelled_at,
-            created_by=cohort.created_by,
-            created_at=cohort.created_at,
-            updated_at=cohort.updated_at,
-            members=member_responses,
-            member_count=len(member_responses),
-            student_count=sum(1 for m in member_responses if m.role == CohortRole.STUDENT.value),
-            instructor_count=sum(1 for m in member_responses if m.role == CohortRole.INSTRUCTOR.value)
-        ))
+    cohort_responses = await hydrate_cohorts(db, cohorts)
+    
+    # Filter out full cohorts for students when available=True
+    # Only count students toward the limit
+    if current_user.role == UserRole.STUDENT and available:
+        cohort_responses = [
+            c for c in cohort_responses if c.student_count < MAX_COHORT_STUDENTS
+        ]
     
     return CohortListResponse(cohorts=cohort_responses, total=len(cohort_responses))
 
@@ -678,60 +429,7 @@ async def get_cohort(
                 detail="Access denied. You are not a member of this cohort."
             )
     
-    # Get members
-    members_result = await db.execute(
-        select(CohortMember)
-        .where(CohortMember.cohort_id == cohort_id)
-    )
-    members = members_result.scalars().all()
-    
-    # Get user details for members
-    member_responses = []
-    for member in members:
-        user_result = await db.execute(select(User).where(User.id == member.user_id))
-        user = user_result.scalar_one_or_none()
-        member_data = {
-            "id": member.id,
-            "cohort_id": member.cohort_id,
-            "user_id": member.user_id,
-            "role": member.role,
-            "joined_at": member.joined_at,
-            "user": {
-                "id": user.id if user else None,
-                "email": user.email if user else None,
-                "full_name": user.full_name if user else None,
-                "username": user.username if user else None
-            } if user else None
-        }
-        member_responses.append(CohortMemberResponse(**member_data))
-    
-    # Recalculate is_active and status based on dates
-    calculated_is_active = calculate_is_active(cohort.start_date, cohort.end_date)
-    calculated_status = calculate_cohort_status(cohort.start_date, cohort.end_date)
-    
-    # Update database if status changed
-    if calculated_is_active != cohort.is_active:
-        cohort.is_active = calculated_is_active
-        await db.commit()
-        await db.refresh(cohort)
-    
-    return CohortResponse(
-        id=cohort.id,
-        name=cohort.name,
-        description=cohort.description,
-        start_date=cohort.start_date,
-        end_date=cohort.end_date,
-        is_active=calculated_is_active,
-        status=calculated_status,
-        cancelled_at=cohort.cancelled_at,
-        created_by=cohort.created_by,
-        created_at=cohort.created_at,
-        updated_at=cohort.updated_at,
-        members=member_responses,
-        member_count=len(member_responses),
-        student_count=sum(1 for m in member_responses if m.role == CohortRole.STUDENT.value),
-        instructor_count=sum(1 for m in member_responses if m.role == CohortRole.INSTRUCTOR.value)
-    )
+    return await hydrate_cohort(db, cohort)
 
 
 @router.post("/cohorts/{cohort_id}/members", response_model=CohortMemberResponse, status_code=status.HTTP_201_CREATED)
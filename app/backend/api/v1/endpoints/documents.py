@@ -12,6 +12,8 @@ from app.backend.core.database import get_db
 from app.backend.core.security import get_current_user
 from app.backend.models.user import User
 from app.backend.models.document import Document
+from app.backend.services.event_queue import event_worker_pool
+from app.backend.services.vector_store_sync import enqueue_vector_store_sync, enqueue_vector_store_sync_for_all
 from app.backend.schemas.document import (
     DocumentListResponse,
     DocumentResponse,
@@ -126,7 +128,11 @@ async def upload_document(
     )
 
     db.add(document)
+    await db.flush()
+    # Attach to the uploader's vector store in the background
+    await enqueue_vector_store_sync(db, current_user.id)
     await db.commit()
+    event_worker_pool.wake()
     await db.refresh(document)
     logger.info("Stored document %s uploaded by user %s", document.id, current_user.id)
 
@@ -164,3 +170,34 @@ async def download_document(
         media_type=document.mime_type or "application/octet-stream",
         filename=document.filename or file_path.name,
     )
+
+
+@router.delete("/documents/{document_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_document(
+    document_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Delete one of the current user's uploaded documents"""
+    result = await db.execute(
+        select(Document)
+        .where(Document.id == document_id)
+        .where(Document.is_deleted == False)  # noqa: E712
+    )
+    document = result.scalar_one_or_none()
+
+    if not document:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found.")
+
+    if document.uploader_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You can only delete your own documents.")
+
+    document.is_deleted = True
+    # Detach from the vector stores it was visible in, in the background
+    if document.category == "standard":
+        await enqueue_vector_store_sync_for_all(db)
+    else:
+        await enqueue_vector_store_sync(db, current_user.id)
+    await db.commit()
+    event_worker_pool.wake()
+    logger.info("Deleted document %s by user %s", document.id, current_user.id)
@@ -1,14 +1,15 @@
 """Forum endpoints"""
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, desc, case
+from sqlalchemy import select, func, and_, or_, desc, case, delete
 from sqlalchemy.orm import selectinload
 from typing import Optional, List
 from datetime import datetime
 import logging
 
-from app.backend.core.database import get_db
+from app.backend.core.database import get_db, get_read_db
 from app.backend.core.security import get_current_user
+from app.backend.core.pagination import apply_keyset, split_page, should_count
 from app.backend.models.user import User, UserRole
 from app.backend.models.forum import ForumPost, ForumVote
 from app.backend.models.module import Module
@@ -21,25 +22,27 @@ from app.backend.schemas.forum import (
     ForumVoteResponse
 )
 from app.backend.api.v1.endpoints.auth import require_role
-from app.backend.services.notification_service import notify_forum_reply
-from app.backend.services.achievement_service import check_achievements
+from app.backend.services.event_queue import enqueue_event, event_worker_pool
+from app.backend.services.forum_service import (
+    fetch_post_rows,
+    fetch_post_page,
+    build_post_response,
+    build_search_query,
+    search_post_page,
+    record_reply_added,
+    record_reply_removed,
+    apply_vote_delta
+)
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-
-async def get_author_info(user_id: int, db: AsyncSession) -> dict:
-    """Get author information for a user"""
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-    if not user:
-        return {"id": user_id, "username": None, "full_name": None, "role": "student"}
-    return {
-        "id": user.id,
-        "username": user.username,
-        "full_name": user.full_name,
-        "role": user.role.value if user.role else "student"
-    }
+# Keyset sort keys per listing mode; id is the unique tiebreaker
+FORUM_SORT_KEYS = {
+    "recent": [(ForumPost.created_at, True), (ForumPost.id, True)],
+    "popular": [(ForumPost.score, True), (ForumPost.created_at, True), (ForumPost.id, True)],
+    "unsolved": [(ForumPost.is_solved, False), (ForumPost.created_at, True), (ForumPost.id, True)],
+}
 
 
 @router.get("/forums/modules/{module_id}/posts", response_model=ForumPostListResponse)
@@ -47,7 +50,9 @@ async def get_module_posts(
     module_id: int,
     sort: str = Query("recent", regex="^(recent|popular|unsolved)$"),
     limit: int = Query(20, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    offset: int = Query(0, ge=0, description="Deprecated: use cursor instead"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    include_total: Optional[bool] = Query(None, description="Run the total count (default: first page only)"),
     current_user: Optional[User] = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -66,81 +71,32 @@ async def get_module_posts(
         )
     )
     
-    # Apply sorting
-    if sort == "popular":
-        query = query.order_by(desc(ForumPost.upvotes), desc(ForumPost.created_at))
-    elif sort == "unsolved":
-        query = query.order_by(ForumPost.is_solved, desc(ForumPost.created_at))
-    else:  # recent
-        query = query.order_by(desc(ForumPost.created_at))
-    
-    # Get total count
-    count_query = select(func.count()).select_from(
-        select(ForumPost).where(
-            and_(
-                ForumPost.module_id == module_id,
-                ForumPost.parent_post_id.is_(None)
-            )
-        ).subquery()
+    # Get total count (opt-in for cursor pages)
+    total = None
+    if should_count(include_total, cursor):
+        count_query = select(func.count()).select_from(query.subquery())
+        total_result = await db.execute(count_query)
+        total = total_result.scalar() or 0
+    
+    # Apply sorting and keyset/offset pagination
+    query = apply_keyset(query, FORUM_SORT_KEYS[sort], cursor)
+    if not cursor:
+        query = query.offset(offset)
+    
+    # Fetch the page with author info and viewer votes in one statement
+    rows = await fetch_post_rows(
+        db,
+        query.limit(limit + 1),
+        viewer_id=current_user.id if current_user else None
     )
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
-    
-    # Apply pagination
-    query = query.limit(limit).offset(offset)
-    
-    # Execute query
-    result = await db.execute(query)
-    posts = result.scalars().all()
-    
-    # Build response with author info and reply counts
-    post_responses = []
-    for post in posts:
-        # Get reply count
-        reply_count_result = await db.execute(
-            select(func.count(ForumPost.id)).where(ForumPost.parent_post_id == post.id)
-        )
-        reply_count = reply_count_result.scalar() or 0
-        
-        # Get user vote if authenticated
-        user_vote = None
-        if current_user:
-            vote_result = await db.execute(
-                select(ForumVote).where(
-                    and_(
-                        ForumVote.post_id == post.id,
-                        ForumVote.user_id == current_user.id
-                    )
-                )
-            )
-            vote = vote_result.scalar_one_or_none()
-            if vote:
-                user_vote = vote.vote_type
-        
-        author_info = await get_author_info(post.user_id, db)
-        
-        post_responses.append(ForumPostResponse(
-            id=post.id,
-            module_id=post.module_id,
-            user_id=post.user_id,
-            parent_post_id=post.parent_post_id,
-            title=post.title,
-            content=post.content,
-            is_pinned=post.is_pinned,
-            is_solved=post.is_solved,
-            upvotes=post.upvotes,
-            created_at=post.created_at,
-            updated_at=post.updated_at,
-            author=author_info,
-            reply_count=reply_count,
-            user_vote=user_vote
-        ))
+    rows, next_cursor = split_page(rows, limit, FORUM_SORT_KEYS[sort], get_item=lambda row: row[0])
     
     return ForumPostListResponse(
-        posts=post_responses,
+        posts=[response for _, response in rows],
         total=total,
         limit=limit,
-        offset=offset
+        offset=offset,
+        next_cursor=next_cursor
     )
 
 
@@ -157,44 +113,10 @@ async def get_post(
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
-    # Get reply count
-    reply_count_result = await db.execute(
-        select(func.count(ForumPost.id)).where(ForumPost.parent_post_id == post.id)
-    )
-    reply_count = reply_count_result.scalar() or 0
-    
-    # Get user vote if authenticated
-    user_vote = None
-    if current_user:
-        vote_result = await db.execute(
-            select(ForumVote).where(
-                and_(
-                    ForumVote.post_id == post.id,
-                    ForumVote.user_id == current_user.id
-                )
-            )
-        )
-        vote = vote_result.scalar_one_or_none()
-        if vote:
-            user_vote = vote.vote_type
-    
-    author_info = await get_author_info(post.user_id, db)
-    
-    return ForumPostResponse(
-        id=post.id,
-        module_id=post.module_id,
-        user_id=post.user_id,
-        parent_post_id=post.parent_post_id,
-        title=post.title,
-        content=post.content,
-        is_pinned=post.is_pinned,
-        is_solved=post.is_solved,
-        upvotes=post.upvotes,
-        created_at=post.created_at,
-        updated_at=post.updated_at,
-        author=author_info,
-        reply_count=reply_count,
-        user_vote=user_vote
+    return await build_post_response(
+        db,
+        post,
+        viewer_id=current_user.id if current_user else None
     )
 
 
@@ -211,52 +133,14 @@ async def get_post_replies(
     if not parent:
         raise HTTPException(status_code=404, detail="Post not found")
     
-    # Get replies
-    result = await db.execute(
+    # Get replies with authors and viewer votes in one statement
+    return await fetch_post_page(
+        db,
         select(ForumPost)
         .where(ForumPost.parent_post_id == post_id)
-        .order_by(ForumPost.created_at)
+        .order_by(ForumPost.created_at),
+        viewer_id=current_user.id if current_user else None
     )
-    replies = result.scalars().all()
-    
-    # Build response
-    reply_responses = []
-    for reply in replies:
-        # Get user vote if authenticated
-        user_vote = None
-        if current_user:
-            vote_result = await db.execute(
-                select(ForumVote).where(
-                    and_(
-                        ForumVote.post_id == reply.id,
-                        ForumVote.user_id == current_user.id
-                    )
-                )
-            )
-            vote = vote_result.scalar_one_or_none()
-            if vote:
-                user_vote = vote.vote_type
-        
-        author_info = await get_author_info(reply.user_id, db)
-        
-        reply_responses.append(ForumPostResponse(
-            id=reply.id,
-            module_id=reply.module_id,
-            user_id=reply.user_id,
-            parent_post_id=reply.parent_post_id,
-            title=reply.title,
-            content=reply.content,
-            is_pinned=reply.is_pinned,
-            is_solved=reply.is_solved,
-            upvotes=reply.upvotes,
-            created_at=reply.created_at,
-            updated_at=reply.updated_at,
-            author=author_info,
-            reply_count=0,
-            user_vote=user_vote
-        ))
-    
-    return reply_responses
 
 
 @router.post("/forums/posts", response_model=ForumPostResponse, status_code=status.HTTP_201_CREATED)
@@ -306,50 +190,35 @@ async def create_post(
     )
     
     db.add(new_post)
-    await db.commit()
-    await db.refresh(new_post)
-    
-    # Check for achievements (forum engagement)
-    await check_achievements(
-        db=db,
+    # Keep the parent's denormalized counters in the same transaction
+    if new_post.parent_post_id:
+        await record_reply_added(db, new_post.parent_post_id)
+    await db.flush()
+    
+    # Achievements (forum engagement) and reply notifications are handled in the background
+    enqueue_event(
+        db,
+        "forum_post",
         user_id=current_user.id,
-        event_type="forum_post",
-        event_data={"post_id": new_post.id, "module_id": new_post.module_id}
+        payload={"post_id": new_post.id, "module_id": new_post.module_id}
     )
-    
-    # Send notification if this is a reply (and not replying to own post)
+    # Notify the parent's author (not when replying to own post)
     if new_post.parent_post_id and parent.user_id != current_user.id:
-        try:
-            author_username = current_user.username or current_user.full_name or "Someone"
-            await notify_forum_reply(
-                db=db,
-                post_author_id=parent.user_id,
-                reply_author_username=author_username,
-                post_id=parent.id,
-                module_id=parent.module_id
-            )
-        except Exception as e:
-            logger.error(f"Failed to send forum reply notification: {str(e)}")
-            # Don't fail the request if notification fails
-    
-    author_info = await get_author_info(new_post.user_id, db)
-    
-    return ForumPostResponse(
-        id=new_post.id,
-        module_id=new_post.module_id,
-        user_id=new_post.user_id,
-        parent_post_id=new_post.parent_post_id,
-        title=new_post.title,
-        content=new_post.content,
-        is_pinned=new_post.is_pinned,
-        is_solved=new_post.is_solved,
-        upvotes=new_post.upvotes,
-        created_at=new_post.created_at,
-        updated_at=new_post.updated_at,
-        author=author_info,
-        reply_count=0,
-        user_vote=None
-    )
+        enqueue_event(
+            db,
+            "forum_reply",
+            user_id=parent.user_id,
+            payload={
+                "reply_author_username": current_user.username or current_user.full_name or "Someone",
+                "post_id": parent.id,
+                "module_id": parent.module_id
+            }
+        )
+    await db.commit()
+    event_worker_pool.wake()
+    await db.refresh(new_post)
+    
+    return await build_post_response(db, new_post)
 
 
 @router.patch("/forums/posts/{post_id}", response_model=ForumPostResponse)
@@ -381,30 +250,49 @@ async def update_post(
     await db.commit()
     await db.refresh(post)
     
-    # Get reply count
-    reply_count_result = await db.execute(
-        select(func.count(ForumPost.id)).where(ForumPost.parent_post_id == post.id)
-    )
-    reply_count = reply_count_result.scalar() or 0
-    
-    author_info = await get_author_info(post.user_id, db)
-    
-    return ForumPostResponse(
-        id=post.id,
-        module_id=post.module_id,
-        user_id=post.user_id,
-        parent_post_id=post.parent_post_id,
-        title=post.title,
-        content=post.content,
-        is_pinned=post.is_pinned,
-        is_solved=post.is_solved,
-        upvotes=post.upvotes,
-        created_at=post.created_at,
-        updated_at=post.updated_at,
-        author=author_info,
-        reply_count=reply_count,
-        user_vote=None
-    )
+    return await build_post_response(db, post)
+
+
+@router.delete("/forums/posts/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_post(
+    post_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Delete a forum post and its replies (author, instructor or admin)"""
+    result = await db.execute(select(ForumPost).where(ForumPost.id == post_id))
+    post = result.scalar_one_or_none()
+    
+    if not post:
+        raise HTTPException(status_code=404, detail="Post not found")
+    
+    if post.user_id != current_user.id and current_user.role not in [UserRole.INSTRUCTOR, UserRole.ADMIN]:
+        raise HTTPException(status_code=403, detail="You can only delete your own posts")
+    
+    parent_post_id = post.parent_post_id
+    
+    try:
+        await db.execute(
+            delete(ForumPost).where(
+                or_(
+                    ForumPost.id == post_id,
+                    ForumPost.parent_post_id == post_id
+                )
+            )
+        )
+        # Keep the parent's denormalized counters in the same transaction
+        if parent_post_id:
+            await record_reply_removed(db, parent_post_id)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Error deleting forum post: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error deleting forum post: {str(e)}"
+        )
+    
+    return None
 
 
 @router.post("/forums/posts/{post_id}/vote", response_model=ForumVoteResponse)
@@ -432,6 +320,7 @@ async def vote_post(
         )
     )
     existing_vote = existing_vote_result.scalar_one_or_none()
+    upvotes = post.upvotes
     
     if existing_vote:
         # Update existing vote
@@ -440,18 +329,18 @@ async def vote_post(
             await db.delete(existing_vote)
             # Update post upvotes
             if vote_data.vote_type == "upvote":
-                post.upvotes = max(0, post.upvotes - 1)
+                upvotes = max(0, upvotes - 1)
             else:
-                post.upvotes = max(0, post.upvotes + 1)
+                upvotes = max(0, upvotes + 1)
         else:
             # Different vote type - change vote
             old_type = existing_vote.vote_type
             existing_vote.vote_type = vote_data.vote_type
             # Update post upvotes
             if old_type == "upvote" and vote_data.vote_type == "downvote":
-                post.upvotes = max(0, post.upvotes - 2)
+                upvotes = max(0, upvotes - 2)
             elif old_type == "downvote" and vote_data.vote_type == "upvote":
-                post.upvotes = post.upvotes + 2
+                upvotes = upvotes + 2
     else:
         # Create new vote
         new_vote = ForumVote(
@@ -462,10 +351,11 @@ async def vote_post(
         db.add(new_vote)
         # Update post upvotes
         if vote_data.vote_type == "upvote":
-            post.upvotes = post.upvotes + 1
+            upvotes = upvotes + 1
         else:
-            post.upvotes = max(0, post.upvotes - 1)
+            upvotes = max(0, upvotes - 1)
     
+    await apply_vote_delta(db, post_id, upvotes - post.upvotes)
     await db.commit()
     
     # Get the vote that was created/updated
@@ -516,30 +406,7 @@ async def mark_solved(
     await db.commit()
     await db.refresh(post)
     
-    # Get reply count
-    reply_count_result = await db.execute(
-        select(func.count(ForumPost.id)).where(ForumPost.parent_post_id == post.id)
-    )
-    reply_count = reply_count_result.scalar() or 0
-    
-    author_info = await get_author_info(post.user_id, db)
-    
-    return ForumPostResponse(
-        id=post.id,
-        module_id=post.module_id,
-        user_id=post.user_id,
-        parent_post_id=post.parent_post_id,
-        title=post.title,
-        content=post.content,
-        is_pinned=post.is_pinned,
-        is_solved=post.is_solved,
-        upvotes=post.upvotes,
-        created_at=post.created_at,
-        updated_at=post.updated_at,
-        author=author_info,
-        reply_count=reply_count,
-        user_vote=None
-    )
+    return await build_post_response(db, post)
 
 
 @router.patch("/forums/posts/{post_id}/pin", response_model=ForumPostResponse)
@@ -563,30 +430,7 @@ async def pin_post(
     await db.commit()
     await db.refresh(post)
     
-    # Get reply count
-    reply_count_result = await db.execute(
-        select(func.count(ForumPost.id)).where(ForumPost.parent_post_id == post.id)
-    )
-    reply_count = reply_count_result.scalar() or 0
-    
-    author_info = await get_author_info(post.user_id, db)
-    
-    return ForumPostResponse(
-        id=post.id,
-        module_id=post.module_id,
-        user_id=post.user_id,
-        parent_post_id=post.parent_post_id,
-        title=post.title,
-        content=post.content,
-        is_pinned=post.is_pinned,
-        is_solved=post.is_solved,
-        upvotes=post.upvotes,
-        created_at=post.created_at,
-        updated_at=post.updated_at,
-        author=author_info,
-        reply_count=reply_count,
-        user_vote=None
-    )
+    return await build_post_response(db, post)
 
 
 @router.get("/forums/search", response_model=ForumPostListResponse)
@@ -596,78 +440,24 @@ async def search_posts(
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
     current_user: Optional[User] = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Search forum posts"""
-    # Build search query
-    search_term = f"%{q.lower()}%"
-    query = select(ForumPost).where(
-        and_(
-            or_(
-                ForumPost.title.ilike(search_term),
-                ForumPost.content.ilike(search_term)
-            ),
-            ForumPost.parent_post_id.is_(None)  # Only top-level posts
-        )
-    )
-    
-    if module_id:
-        query = query.where(ForumPost.module_id == module_id)
+    """Search forum posts (full-text ranked on PostgreSQL)"""
+    query, snippet = build_search_query(db, q, module_id)
     
     # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
+    count_query = select(func.count()).select_from(query.order_by(None).subquery())
     total_result = await db.execute(count_query)
     total = total_result.scalar() or 0
     
-    # Apply sorting and pagination
-    query = query.order_by(desc(ForumPost.created_at)).limit(limit).offset(offset)
-    
-    # Execute query
-    result = await db.execute(query)
-    posts = result.scalars().all()
-    
-    # Build response
-    post_responses = []
-    for post in posts:
-        # Get reply count
-        reply_count_result = await db.execute(
-            select(func.count(ForumPost.id)).where(ForumPost.parent_post_id == post.id)
-        )
-        reply_count = reply_count_result.scalar() or 0
-        
-        # Get user vote if authenticated
-        user_vote = None
-        if current_user:
-            vote_result = await db.execute(
-                select(ForumVote).where(
-                    and_(
-                        ForumVote.post_id == post.id,
-                        ForumVote.user_id == current_user.id
-                    )
-                )
-            )
-            vote = vote_result.scalar_one_or_none()
-            if vote:
-                user_vote = vote.vote_type
-        
-        author_info = await get_author_info(post.user_id, db)
-        
-        post_responses.append(ForumPostResponse(
-            id=post.id,
-            module_id=post.module_id,
-            user_id=post.user_id,
-            parent_post_id=post.parent_post_id,
-            title=post.title,
-            content=post.content,
-            is_pinned=post.is_pinned,
-            is_solved=post.is_solved,
-            upvotes=post.upvotes,
-            created_at=post.created_at,
-            updated_at=post.updated_at,
-            author=author_info,
-            reply_count=reply_count,
-            user_vote=user_vote
-        ))
+    # Fetch the page with author info, viewer votes and snippets in one statement
+    post_responses = await search_post_page(
+        db,
+        query.limit(limit).offset(offset),
+        snippet,
+        q,
+        viewer_id=current_user.id if current_user else None
+    )
     
     return ForumPostListResponse(
         posts=post_responses,
@@ -675,4 +465,3 @@ async def search_posts(
         limit=limit,
         offset=offset
     )
-
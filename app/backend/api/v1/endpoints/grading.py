@@ -1,12 +1,13 @@
 """Grading endpoints for instructors"""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, or_
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
-from app.backend.core.database import get_db
+from app.backend.core.database import get_db, get_read_db
 from app.backend.core.security import get_current_user
+from app.backend.core.pagination import apply_keyset, split_page, should_count
 from app.backend.models.user import User, UserRole
 from app.backend.models.assessment import Assessment, QuestionType
 from app.backend.models.progress import QuizAttempt, ReviewStatus
@@ -19,22 +20,31 @@ from app.backend.schemas.grading import (
     GradingHistoryResponse
 )
 from app.backend.api.v1.endpoints.auth import require_role
+from app.backend.services.student_stats_service import record_attempt_graded, score_percentage
 
 router = APIRouter()
 
+# Keyset sort keys; id is the unique tiebreaker. Sort keys must be non-null in the
+# queried rows: graded history only lists attempts with graded_at set (auto-graded
+# attempts get it on submission, older rows were backfilled)
+GRADING_QUEUE_SORT_KEYS = [(QuizAttempt.attempted_at, False), (QuizAttempt.id, False)]
+GRADING_HISTORY_SORT_KEYS = [(QuizAttempt.graded_at, True), (QuizAttempt.id, True)]
+
 
 @router.get("/grading/queue", response_model=GradingQueueResponse)
 async def get_grading_queue(
     current_user: User = Depends(require_role([UserRole.INSTRUCTOR, UserRole.ADMIN])),
     db: AsyncSession = Depends(get_db),
     limit: int = 50,
-    offset: int = 0
+    offset: int = Query(0, description="Deprecated: use cursor instead"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    include_total: Optional[bool] = Query(None, description="Run the total count (default: first page only)")
 ):
     """Get queue of assessments needing manual grading (instructor/admin only)"""
     # Get all attempts that need review
     # Note: Currently all questions are multiple-choice (auto-gradable),
     # but this endpoint is ready for when short-answer questions are added
-    result = await db.execute(
+    query = apply_keyset(
         select(QuizAttempt)
         .join(Assessment)
         .join(Module)
@@ -44,25 +54,29 @@ async def get_grading_queue(
                 QuizAttempt.review_status == ReviewStatus.NEEDS_REVIEW,
                 Assessment.question_type.in_([QuestionType.SHORT_ANSWER, QuestionType.CODING_TASK])
             )
-        )
-        .order_by(QuizAttempt.attempted_at.asc())
-        .limit(limit)
-        .offset(offset)
+        ),
+        GRADING_QUEUE_SORT_KEYS,
+        cursor
     )
-    attempts = result.scalars().all()
+    if not cursor:
+        query = query.offset(offset)
+    result = await db.execute(query.limit(limit + 1))
+    attempts, next_cursor = split_page(result.scalars().all(), limit, GRADING_QUEUE_SORT_KEYS)
     
-    # Get total count
-    count_result = await db.execute(
-        select(func.count(QuizAttempt.id))
-        .join(Assessment)
-        .where(
-            and_(
-                QuizAttempt.review_status == ReviewStatus.NEEDS_REVIEW,
-                Assessment.question_type.in_([QuestionType.SHORT_ANSWER, QuestionType.CODING_TASK])
+    # Get total count (opt-in for cursor pages)
+    total = None
+    if should_count(include_total, cursor):
+        count_result = await db.execute(
+            select(func.count(QuizAttempt.id))
+            .join(Assessment)
+            .where(
+                and_(
+                    QuizAttempt.review_status == ReviewStatus.NEEDS_REVIEW,
+                    Assessment.question_type.in_([QuestionType.SHORT_ANSWER, QuestionType.CODING_TASK])
+                )
             )
         )
-    )
-    total = count_result.scalar() or 0
+        total = count_result.scalar() or 0
     
     # Build response items
     items = []
@@ -110,7 +124,7 @@ async def get_grading_queue(
             time_spent_seconds=attempt.time_spent_seconds
         ))
     
-    return GradingQueueResponse(items=items, total=total)
+    return GradingQueueResponse(items=items, total=total, next_cursor=next_cursor)
 
 
 @router.post("/grading/{attempt_id}", response_model=GradedAttemptResponse)
@@ -169,6 +183,10 @@ async def grade_attempt(
     attempt.partial_credit = grade_data.partial_credit
     attempt.graded_at = datetime.now()
     
+    graded_score = score_percentage(attempt.points_earned, assessment.points)
+    if graded_score is not None:
+        await record_attempt_graded(db, attempt.user_id, graded_score)
+    
     await db.commit()
     await db.refresh(attempt)
     
@@ -191,16 +209,19 @@ async def grade_attempt(
 @router.get("/grading/history", response_model=GradingHistoryResponse)
 async def get_grading_history(
     current_user: User = Depends(require_role([UserRole.INSTRUCTOR, UserRole.ADMIN])),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     user_id: int = None,
     module_id: int = None,
     limit: int = 50,
-    offset: int = 0
+    offset: int = Query(0, description="Deprecated: use cursor instead"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    include_total: Optional[bool] = Query(None, description="Run the total count (default: first page only)")
 ):
     """Get grading history (instructor/admin only)"""
     # Build query
     query = select(QuizAttempt).where(
-        QuizAttempt.review_status == ReviewStatus.GRADED
+        QuizAttempt.review_status == ReviewStatus.GRADED,
+        QuizAttempt.graded_at.isnot(None)
     )
     
     # Filter by user if provided
@@ -211,26 +232,27 @@ async def get_grading_history(
     if module_id:
         query = query.join(Assessment).where(Assessment.module_id == module_id)
     
-    # Order by graded_at descending (most recent first)
-    query = query.order_by(QuizAttempt.graded_at.desc())
-    
-    # Get total count
-    count_query = select(func.count(QuizAttempt.id)).where(
-        QuizAttempt.review_status == ReviewStatus.GRADED
-    )
-    if user_id:
-        count_query = count_query.where(QuizAttempt.user_id == user_id)
-    if module_id:
-        count_query = count_query.join(Assessment).where(Assessment.module_id == module_id)
-    
-    count_result = await db.execute(count_query)
-    total = count_result.scalar() or 0
+    # Get total count (opt-in for cursor pages)
+    total = None
+    if should_count(include_total, cursor):
+        count_query = select(func.count(QuizAttempt.id)).where(
+            QuizAttempt.review_status == ReviewStatus.GRADED,
+            QuizAttempt.graded_at.isnot(None)
+        )
+        if user_id:
+            count_query = count_query.where(QuizAttempt.user_id == user_id)
+        if module_id:
+            count_query = count_query.join(Assessment).where(Assessment.module_id == module_id)
+        
+        count_result = await db.execute(count_query)
+        total = count_result.scalar() or 0
     
-    # Get paginated results
-    result = await db.execute(
-        query.limit(limit).offset(offset)
-    )
-    attempts = result.scalars().all()
+    # Order by graded_at descending (most recent first) and paginate
+    query = apply_keyset(query, GRADING_HISTORY_SORT_KEYS, cursor)
+    if not cursor:
+        query = query.offset(offset)
+    result = await db.execute(query.limit(limit + 1))
+    attempts, next_cursor = split_page(result.scalars().all(), limit, GRADING_HISTORY_SORT_KEYS)
     
     items = [
         GradedAttemptResponse(
@@ -250,5 +272,5 @@ async def get_grading_history(
         for attempt in attempts
     ]
     
-    return GradingHistoryResponse(items=items, total=total)
+    return GradingHistoryResponse(items=items, total=total, next_cursor=next_cursor)
 
@@ -5,7 +5,7 @@ from sqlalchemy import select, and_
 from typing import List, Optional
 from pydantic import BaseModel, HttpUrl
 
-from app.backend.core.database import get_db
+from app.backend.core.database import get_db, get_read_db
 from app.backend.core.security import get_current_user
 from app.backend.api.v1.endpoints.auth import require_role
 from app.backend.models.user import User, UserRole
@@ -55,7 +55,7 @@ async def list_learning_resources(
     resource_type: Optional[str] = None,
     difficulty: Optional[str] = None,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """List learning resources with optional filters"""
     query = select(LearningResource)
@@ -158,7 +158,7 @@ async def create_learning_resource(
 async def get_learning_resource(
     resource_id: int,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get a specific learning resource"""
     result = await db.execute(select(LearningResource).where(LearningResource.id == resource_id))
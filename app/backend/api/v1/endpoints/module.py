@@ -1,11 +1,13 @@
 """Module and lesson endpoints"""
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from sqlalchemy.orm import selectinload
 
-from app.backend.core.database import get_db
+from app.backend.core.compression import negotiate_encoding
+from app.backend.core.database import get_read_db
 from app.backend.core.security import get_current_user
 from app.backend.models.user import User
 from app.backend.models.module import Module, Lesson
@@ -15,17 +17,46 @@ from app.backend.schemas.module import (
     ModuleDetailResponse,
     ModuleListResponse,
     LessonResponse,
+    LessonHtmlResponse,
 )
+from app.backend.services.catalog_cache import CatalogEntry, catalog_cache, etag_matches
+from app.backend.services.lesson_render import get_lesson_html_variants
 
 router = APIRouter()
 
+_lesson_list_adapter = TypeAdapter(List[LessonResponse])
+
+
+def _catalog_response(request: Request, entry: CatalogEntry) -> Response:
+    """Serve a cached catalog body, or 304 if the client already has it"""
+    # Responses require authentication, so only the browser may store them;
+    # no-cache makes it revalidate with If-None-Match on every use
+    headers = {"Cache-Control": "private, no-cache"}
+    encoding = None
+    if entry.encoded:
+        headers["Vary"] = "Accept-Encoding"
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"), entry.encoded)
+    headers["ETag"] = entry.etag_for(encoding)
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        return Response(content=entry.encoded[encoding], media_type="application/json", headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
 
 @router.get("/modules", response_model=ModuleListResponse)
 async def get_modules(
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all published modules"""
+    entry = await catalog_cache.get_or_build("modules", lambda: _build_module_list(db))
+    return _catalog_response(request, entry)
+
+
+async def _build_module_list(db: AsyncSession) -> bytes:
     result = await db.execute(
         select(Module)
         .where(
@@ -54,16 +85,24 @@ async def get_modules(
     return ModuleListResponse(
         modules=module_responses,
         total=len(module_responses)
-    )
+    ).model_dump_json().encode()
 
 
 @router.get("/modules/{module_id}", response_model=ModuleDetailResponse)
 async def get_module_detail(
     module_id: int,
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get module details with lessons"""
+    entry = await catalog_cache.get_or_build(
+        ("module", module_id), lambda: _build_module_detail(db, module_id)
+    )
+    return _catalog_response(request, entry)
+
+
+async def _build_module_detail(db: AsyncSession, module_id: int) -> bytes:
     result = await db.execute(
         select(Module)
         .options(selectinload(Module.lessons))
@@ -121,16 +160,24 @@ async def get_module_detail(
         learning_objectives=module.learning_objectives,
         lessons=lesson_responses,
         has_assessment=has_assessment,
-    )
+    ).model_dump_json().encode()
 
 
 @router.get("/modules/{module_id}/lessons", response_model=List[LessonResponse])
 async def get_module_lessons(
     module_id: int,
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all lessons for a module"""
+    entry = await catalog_cache.get_or_build(
+        ("module_lessons", module_id), lambda: _build_module_lessons(db, module_id)
+    )
+    return _catalog_response(request, entry)
+
+
+async def _build_module_lessons(db: AsyncSession, module_id: int) -> bytes:
     # Verify module exists and is published
     result = await db.execute(select(Module).where(Module.id == module_id))
     module = result.scalar_one_or_none()
@@ -157,7 +204,7 @@ async def get_module_lessons(
     )
     lessons = result.scalars().all()
     
-    return [
+    return _lesson_list_adapter.dump_json([
         LessonResponse(
             id=lesson.id,
             module_id=lesson.module_id,
@@ -168,16 +215,37 @@ async def get_module_lessons(
             lesson_type=lesson.lesson_type,
         )
         for lesson in lessons
-    ]
+    ])
 
 
-@router.get("/lessons/{lesson_id}", response_model=LessonResponse)
+@router.get(
+    "/lessons/{lesson_id}",
+    response_model=LessonResponse,
+    responses={200: {"model": LessonHtmlResponse, "description": "Lesson, rendered to HTML with format=html"}},
+)
 async def get_lesson(
     lesson_id: int,
+    request: Request,
+    format: str = Query("markdown", pattern="^(markdown|html)$"),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get a specific lesson"""
+    """
+    Get a specific lesson.
+
+    With format=html the content is returned as sanitized HTML with a table
+    of contents, pre-compressed per Accept-Encoding (br or gzip).
+    """
+    if format == "html":
+        entry = await catalog_cache.get_or_build(
+            ("lesson_html", lesson_id), lambda: _build_lesson_html(db, lesson_id)
+        )
+    else:
+        entry = await catalog_cache.get_or_build(("lesson", lesson_id), lambda: _build_lesson(db, lesson_id))
+    return _catalog_response(request, entry)
+
+
+async def _get_active_lesson(db: AsyncSession, lesson_id: int) -> Lesson:
     result = await db.execute(
         select(Lesson)
         .where(Lesson.id == lesson_id)
@@ -196,6 +264,11 @@ async def get_lesson(
             detail="Lesson is not active"
         )
     
+    return lesson
+
+
+async def _build_lesson(db: AsyncSession, lesson_id: int) -> bytes:
+    lesson = await _get_active_lesson(db, lesson_id)
     return LessonResponse(
         id=lesson.id,
         module_id=lesson.module_id,
@@ -204,6 +277,9 @@ async def get_lesson(
         order_index=lesson.order_index,
         estimated_minutes=lesson.estimated_minutes,
         lesson_type=lesson.lesson_type,
-    )
+    ).model_dump_json().encode()
 
 
+async def _build_lesson_html(db: AsyncSession, lesson_id: int):
+    lesson = await _get_active_lesson(db, lesson_id)
+    return await get_lesson_html_variants(db, lesson)
@@ -1,30 +1,46 @@
 """Notification endpoints"""
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, desc
+from sqlalchemy import select, func, and_, desc, update
 from typing import Optional, List
 from datetime import datetime
+import asyncio
+import json
 import logging
 
+from app.backend.core.config import settings
 from app.backend.core.database import get_db
 from app.backend.core.security import get_current_user
-from app.backend.models.user import User
+from app.backend.core.pagination import apply_keyset, split_page, should_count
+from app.backend.models.user import User, UserRole
+from app.backend.models.cohort import Cohort, CohortMember, CohortRole
 from app.backend.models.notification import Notification
 from app.backend.schemas.notification import (
     NotificationResponse,
     NotificationListResponse,
-    NotificationUpdate
+    NotificationUpdate,
+    NotificationBroadcastRequest,
+    NotificationBroadcastResponse
 )
+from app.backend.services.notification_service import notify_announcement
+from app.backend.services.notification_hub import notification_hub, get_unread_count
+from app.backend.api.v1.endpoints.auth import require_role
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Newest first; id is the unique tiebreaker for keyset pagination
+NOTIFICATION_SORT_KEYS = [(Notification.created_at, True), (Notification.id, True)]
+
 
 @router.get("/notifications", response_model=NotificationListResponse)
 async def get_notifications(
     unread_only: bool = Query(False, description="Filter to unread only"),
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    offset: int = Query(0, ge=0, description="Deprecated: use cursor instead"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    include_total: Optional[bool] = Query(None, description="Run the total count (default: first page only)"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -35,30 +51,26 @@ async def get_notifications(
     if unread_only:
         query = query.where(Notification.is_read == False)
     
-    # Get total count
-    count_query = select(func.count()).select_from(
-        select(Notification).where(Notification.user_id == current_user.id).subquery()
-    )
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
-    
-    # Get unread count
-    unread_count_result = await db.execute(
-        select(func.count()).where(
-            and_(
-                Notification.user_id == current_user.id,
-                Notification.is_read == False
-            )
+    # Get total count (opt-in for cursor pages)
+    total = None
+    if should_count(include_total, cursor):
+        count_query = select(func.count()).select_from(
+            select(Notification).where(Notification.user_id == current_user.id).subquery()
         )
-    )
-    unread_count = unread_count_result.scalar() or 0
+        total_result = await db.execute(count_query)
+        total = total_result.scalar() or 0
+    
+    # Get unread count (cached per user)
+    unread_count = await get_unread_count(db, current_user.id)
     
-    # Apply sorting and pagination
-    query = query.order_by(desc(Notification.created_at)).limit(limit).offset(offset)
+    # Apply sorting and keyset/offset pagination
+    query = apply_keyset(query, NOTIFICATION_SORT_KEYS, cursor)
+    if not cursor:
+        query = query.offset(offset)
     
     # Execute query
-    result = await db.execute(query)
-    notifications = result.scalars().all()
+    result = await db.execute(query.limit(limit + 1))
+    notifications, next_cursor = split_page(result.scalars().all(), limit, NOTIFICATION_SORT_KEYS)
     
     # Build response
     notification_responses = [
@@ -70,6 +82,7 @@ async def get_notifications(
             message=n.message,
             link=n.link,
             is_read=n.is_read,
+            group_count=n.group_count,
             created_at=n.created_at,
             read_at=n.read_at
         )
@@ -79,8 +92,137 @@ async def get_notifications(
     return NotificationListResponse(
         notifications=notification_responses,
         total=total,
-        unread_count=unread_count
+        unread_count=unread_count,
+        next_cursor=next_cursor
+    )
+
+
+@router.get("/notifications/stream")
+async def stream_notifications(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Push new notifications and unread-count changes as Server-Sent Events.
+    
+    Sends the current unread count first, then `notification` and
+    `unread_count` events as they happen, with a keep-alive comment every
+    NOTIFICATION_STREAM_HEARTBEAT_SECONDS. No database work is done while
+    the connection is idle.
+    """
+    user_id = current_user.id
+    unread_count = await get_unread_count(db, user_id)
+    queue = notification_hub.subscribe(user_id)
+    
+    async def generate():
+        try:
+            yield f"data: {json.dumps({'type': 'unread_count', 'unread_count': unread_count})}\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), timeout=settings.NOTIFICATION_STREAM_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"data: {json.dumps(event)}\n\n"
+        finally:
+            notification_hub.unsubscribe(user_id, queue)
+    
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        }
+    )
+
+
+@router.post("/notifications/broadcast", response_model=NotificationBroadcastResponse, status_code=status.HTTP_201_CREATED)
+async def broadcast_notification(
+    broadcast: NotificationBroadcastRequest,
+    current_user: User = Depends(require_role([UserRole.INSTRUCTOR, UserRole.ADMIN])),
+    db: AsyncSession = Depends(get_db)
+):
+    """Send an announcement notification to a cohort, role or list of users (instructor/admin only)"""
+    if broadcast.cohort_id is None and broadcast.role is None and not broadcast.user_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Specify at least one of cohort_id, role or user_ids"
+        )
+    
+    if broadcast.cohort_id is not None:
+        result = await db.execute(select(Cohort.id).where(Cohort.id == broadcast.cohort_id))
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(status_code=404, detail="Cohort not found")
+    
+    # Instructors may only announce to cohorts they teach
+    if current_user.role != UserRole.ADMIN:
+        if broadcast.role is not None or broadcast.user_ids or broadcast.cohort_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Instructors can only broadcast to their own cohorts"
+            )
+        result = await db.execute(
+            select(CohortMember.id).where(
+                and_(
+                    CohortMember.cohort_id == broadcast.cohort_id,
+                    CohortMember.user_id == current_user.id,
+                    CohortMember.role == CohortRole.INSTRUCTOR.value
+                )
+            )
+        )
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Instructors can only broadcast to their own cohorts"
+            )
+    
+    metrics = await notify_announcement(
+        db,
+        title=broadcast.title,
+        message=broadcast.message,
+        link=broadcast.link,
+        cohort_id=broadcast.cohort_id,
+        role=broadcast.role,
+        user_ids=broadcast.user_ids
+    )
+    
+    return NotificationBroadcastResponse(
+        recipients=metrics["recipients"],
+        chunks=metrics["chunks"],
+        elapsed_ms=metrics["elapsed_ms"],
+        rows_per_second=metrics["rows_per_second"]
+    )
+
+
+@router.patch("/notifications/mark-all-read", status_code=status.HTTP_204_NO_CONTENT)
+async def mark_all_read(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Mark all notifications as read"""
+    await db.execute(
+        update(Notification)
+        .where(
+            and_(
+                Notification.user_id == current_user.id,
+                Notification.is_read == False
+            )
+        )
+        .values(is_read=True, read_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
     )
+    
+    await db.commit()
+    notification_hub.set_unread(current_user.id, 0)
+    
+    return None
 
 
 @router.patch("/notifications/{notification_id}", response_model=NotificationResponse)
@@ -104,6 +246,7 @@ async def update_notification(
         raise HTTPException(status_code=403, detail="You can only update your own notifications")
     
     # Update read status
+    was_read = notification.is_read
     notification.is_read = notification_data.is_read
     if notification_data.is_read:
         notification.read_at = datetime.utcnow()
@@ -112,6 +255,8 @@ async def update_notification(
     
     await db.commit()
     await db.refresh(notification)
+    if was_read != notification.is_read:
+        notification_hub.adjust_unread(current_user.id, 1 if was_read else -1)
     
     return NotificationResponse(
         id=notification.id,
@@ -121,36 +266,12 @@ async def update_notification(
         message=notification.message,
         link=notification.link,
         is_read=notification.is_read,
+        group_count=notification.group_count,
         created_at=notification.created_at,
         read_at=notification.read_at
     )
 
 
-@router.patch("/notifications/mark-all-read", status_code=status.HTTP_204_NO_CONTENT)
-async def mark_all_read(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
-):
-    """Mark all notifications as read"""
-    result = await db.execute(
-        select(Notification).where(
-            and_(
-                Notification.user_id == current_user.id,
-                Notification.is_read == False
-            )
-        )
-    )
-    notifications = result.scalars().all()
-    
-    for notification in notifications:
-        notification.is_read = True
-        notification.read_at = datetime.utcnow()
-    
-    await db.commit()
-    
-    return None
-
-
 @router.delete("/notifications/{notification_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_notification(
     notification_id: int,
@@ -170,8 +291,11 @@ async def delete_notification(
     if notification.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="You can only delete your own notifications")
     
+    was_unread = not notification.is_read
     await db.delete(notification)
     await db.commit()
+    if was_unread:
+        notification_hub.adjust_unread(current_user.id, -1)
     
     return None
 
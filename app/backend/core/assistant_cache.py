@@ -0,0 +1,73 @@
+"""TTL cache of verified OpenAI assistant and vector store ids"""
+from typing import Any, AsyncContextManager, Dict, Optional, Tuple
+import time
+
+from app.backend.core.cache_hooks import KeyedLocks
+from app.backend.core.config import settings
+
+# (kind, user id): kind is "assistant", "vector_store" or "global_assistant" (user id None)
+HandleKey = Tuple[str, Optional[int]]
+
+
+class AssistantHandleCache:
+    """
+    OpenAI object ids known to exist, keyed by kind and user.
+
+    get_assistant_for_user and get_or_create_user_vector_store retrieve (and
+    possibly update) the remote object only on a miss, so a hit costs no API
+    call. Entries expire after OPENAI_HANDLE_CACHE_TTL_SECONDS and are
+    dropped when a run reports the assistant missing (404). Concurrent misses
+    for the same key share one verification or creation through lock(), so a
+    burst of first messages creates one assistant, not several.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[HandleKey, Tuple[Any, float]] = {}
+        self._locks = KeyedLocks()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def get(self, kind: str, user_id: Optional[int]) -> Optional[Any]:
+        key = (kind, user_id)
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() >= entry[1]:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def put(self, kind: str, user_id: Optional[int], value: Any) -> None:
+        if self.enabled:
+            self._entries[(kind, user_id)] = (value, time.monotonic() + self.ttl_seconds)
+
+    def invalidate(self, kind: str, user_id: Optional[int]) -> None:
+        if self._entries.pop((kind, user_id), None) is not None:
+            self.invalidations += 1
+
+    def lock(self, kind: str, user_id: Optional[int]) -> AsyncContextManager[None]:
+        """Hold the lock serializing verification/creation for one key"""
+        return self._locks.hold((kind, user_id))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._locks.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "locks": len(self._locks),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+assistant_handle_cache = AssistantHandleCache(settings.OPENAI_HANDLE_CACHE_TTL_SECONDS)
@@ -0,0 +1,124 @@
+"""Bounded TTL/LRU cache of authenticated user principals"""
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+import logging
+import threading
+import time
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.backend.core.config import settings
+from app.backend.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# (user id, token iat); tokens issued before iat was added use None
+PrincipalKey = Tuple[int, Optional[int]]
+
+
+class UserPrincipalCache:
+    """
+    Detached User snapshots keyed by user id and token issue time.
+
+    get_current_user merges a cached snapshot into the request session with
+    load=False, so authenticated requests skip the users lookup while
+    endpoints still receive a session-bound User they can modify. Entries are
+    dropped whenever a User row is updated or deleted in this process (see the
+    mapper listeners below); AUTH_USER_CACHE_TTL_SECONDS bounds how long a
+    change made by another process (e.g. a deactivation) can go unnoticed.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[PrincipalKey, Tuple[User, float]]" = OrderedDict()
+        self._keys_by_user: Dict[int, Set[PrincipalKey]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl_seconds > 0
+
+    def get(self, user_id: int, issued_at: Optional[int]) -> Optional[User]:
+        key = (user_id, issued_at)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() >= entry[1]:
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, user_id: int, issued_at: Optional[int], user: User) -> None:
+        """Cache a detached copy of a fully loaded User"""
+        if not self.enabled:
+            return
+        state = inspect(user)
+        if state.unloaded:
+            return
+        snapshot = User(**{attr.key: state.dict[attr.key] for attr in state.mapper.column_attrs})
+        make_transient_to_detached(snapshot)
+
+        key = (user_id, issued_at)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (snapshot, time.monotonic() + self.ttl_seconds)
+            self._keys_by_user.setdefault(user_id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop every cached principal for the user"""
+        with self._lock:
+            keys = self._keys_by_user.pop(user_id, set())
+            for key in keys:
+                self._entries.pop(key, None)
+            if keys:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, key: PrincipalKey) -> None:
+        if self._entries.pop(key, None) is None:
+            return
+        keys = self._keys_by_user.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[key[0]]
+
+
+user_principal_cache = UserPrincipalCache(
+    settings.AUTH_USER_CACHE_SIZE,
+    settings.AUTH_USER_CACHE_TTL_SECONDS
+)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _on_user_changed(mapper, connection, target):
+    # Profile edits, password changes, role changes and deactivation
+    user_principal_cache.invalidate(target.id)
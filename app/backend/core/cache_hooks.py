@@ -0,0 +1,77 @@
+"""Helpers shared by the in-process caches: per-key build locks and commit-time invalidation"""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, Hashable, Tuple
+import asyncio
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+# Session.info key for invalidations waiting for the transaction to end
+_PENDING = "cache_invalidations"
+
+
+class KeyedLocks:
+    """
+    asyncio locks by key, created on first use and dropped once no task
+    holds or waits for them, so keys that are never requested again (e.g.
+    ids that don't exist) don't accumulate.
+    """
+
+    def __init__(self):
+        self._locks: Dict[Hashable, Tuple[asyncio.Lock, int]] = {}
+
+    @asynccontextmanager
+    async def hold(self, key: Hashable) -> AsyncIterator[None]:
+        lock, users = self._locks.get(key, (None, 0))
+        if lock is None:
+            lock = asyncio.Lock()
+        self._locks[key] = (lock, users + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            current = self._locks.get(key)
+            if current is not None and current[0] is lock:
+                if current[1] <= 1:
+                    del self._locks[key]
+                else:
+                    self._locks[key] = (lock, current[1] - 1)
+
+    def clear(self) -> None:
+        self._locks.clear()
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+
+def invalidate_after_transaction(target: object, key: Hashable, invalidate: Callable[[], None]) -> None:
+    """
+    Run `invalidate` once the transaction that flushed `target` ends.
+
+    For mapper after_insert/update/delete listeners: those fire at flush
+    time, before the commit, and a cache rebuilt in between would read the
+    old committed rows and keep them under the new version. Invalidations
+    are deduplicated by `key` and also run after a rollback, where an extra
+    invalidation only costs a cache miss. Runs immediately if `target` is
+    not attached to a session.
+    """
+    session = object_session(target)
+    if session is None:
+        invalidate()
+        return
+    session.info.setdefault(_PENDING, {})[key] = invalidate
+
+
+def _run_pending(session: Session) -> None:
+    for invalidate in session.info.pop(_PENDING, {}).values():
+        invalidate()
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    _run_pending(session)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    _run_pending(session)
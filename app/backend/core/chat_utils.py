@@ -85,22 +85,33 @@ def format_system_prompt_with_context(context: Optional[Dict[str, Any]] = None)
     """
     Format the system prompt with current date/time and optional context.
     """
-    now = datetime.now()
-    current_date = now.strftime("%Y-%m-%d")
-    current_time = now.strftime("%H:%M:%S %Z")
-    
-    base_prompt = generate_system_prompt().format(
-        current_date=current_date,
-        current_time=current_time
-    )
+    return stamp_system_prompt(build_system_prompt_template(context))
+
+
+def build_system_prompt_template(context: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Build the system prompt with the student context but without the date/time,
+    so it can be cached and stamped per message with stamp_system_prompt.
+    """
+    prompt = generate_system_prompt()
     
     if context:
         from app.backend.services.context_service import format_context_for_instructions
         context_str = format_context_for_instructions(context)
         if context_str:
-            base_prompt += f"\n\n## Student Context\n\n{context_str}"
+            prompt += f"\n\n## Student Context\n\n{context_str}"
     
-    return base_prompt
+    return prompt
+
+
+def stamp_system_prompt(template: str, now: Optional[datetime] = None) -> str:
+    """Fill in the current date and time of a prompt template"""
+    now = now or datetime.now()
+    return template.replace(
+        "{current_date}", now.strftime("%Y-%m-%d"), 1
+    ).replace(
+        "{current_time}", now.strftime("%H:%M:%S %Z"), 1
+    )
 
 
 def format_chat_history(messages: List[Dict[str, Any]], max_messages: int = 20) -> List[Dict[str, str]]:
@@ -288,3 +299,42 @@ async def format_citations_in_response(
     
     return formatted_text
 
+
+
+class CitationStreamBuffer:
+    """
+    Formats citations in a streamed response as the deltas arrive.
+
+    A citation (【8:0+file.txt】) can be split across deltas, so text from an
+    unclosed 【 onwards is held back until the closing 】 arrives. Anything held
+    longer than `max_pending` characters is released unformatted.
+    """
+
+    def __init__(self, db: Optional[Any] = None, max_pending: int = 200):
+        self.db = db
+        self.max_pending = max_pending
+        self._pending = ""
+
+    async def feed(self, text: str) -> str:
+        """Add a delta and return the text that is ready to send"""
+        self._pending += text
+        start = self._pending.rfind("【")
+        if start == -1 or "】" in self._pending[start:] or len(self._pending) - start > self.max_pending:
+            ready, self._pending = self._pending, ""
+        else:
+            ready, self._pending = self._pending[:start], self._pending[start:]
+        return await self._format(ready)
+
+    async def flush(self) -> str:
+        """Return whatever is still held back at the end of the stream"""
+        ready, self._pending = self._pending, ""
+        return await self._format(ready)
+
+    async def _format(self, text: str) -> str:
+        if "【" not in text:
+            return text
+        try:
+            return await format_citations_in_response(text, self.db)
+        except Exception as e:
+            logger.error(f"Error formatting citations in stream: {e}", exc_info=True)
+            return text
@@ -1,26 +1,99 @@
 """Database configuration and session management"""
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncEngine, create_async_engine, async_sessionmaker
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import declarative_base
-from app.backend.core.config import settings
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from typing import Dict, Optional
 import logging
+import threading
+import time
+
+from app.backend.core.config import settings
 
 logger = logging.getLogger(__name__)
 
-# Create async engine
-# Convert postgresql:// to postgresql+asyncpg:// for async support
-database_url = settings.DATABASE_URL.replace(
-    "postgresql://", "postgresql+asyncpg://"
-).replace(
-    "postgresql+psycopg://", "postgresql+asyncpg://"
-)
 
-engine = create_async_engine(
-    database_url,
-    echo=settings.DATABASE_ECHO,
-    future=True,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
+class PoolTelemetry:
+    """Checkout counts and wait times for one connection pool"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._lock = threading.Lock()
+
+    def record_checkout(self, waited: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that records how long each checkout waited"""
+
+    telemetry: Optional[PoolTelemetry] = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            if self.telemetry is not None:
+                self.telemetry.record_checkout(time.perf_counter() - started, timed_out=True)
+            raise
+        if self.telemetry is not None:
+            self.telemetry.record_checkout(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a new pool; keep counting into the same telemetry
+        pool = super().recreate()
+        pool.telemetry = self.telemetry
+        return pool
+
+
+def _async_url(url: str) -> str:
+    # Convert postgresql:// to postgresql+asyncpg:// for async support
+    return url.replace(
+        "postgresql://", "postgresql+asyncpg://"
+    ).replace(
+        "postgresql+psycopg://", "postgresql+asyncpg://"
+    )
+
+
+def _create_engine(url: str, name: str) -> AsyncEngine:
+    url = _async_url(url)
+    if url.startswith("sqlite"):
+        # SQLite (local development) doesn't use a queue pool
+        return create_async_engine(url, echo=settings.DATABASE_ECHO, future=True)
+    db_engine = create_async_engine(
+        url,
+        echo=settings.DATABASE_ECHO,
+        future=True,
+        poolclass=InstrumentedQueuePool,
+        pool_pre_ping=True,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+    )
+    db_engine.sync_engine.pool.telemetry = PoolTelemetry(name)
+    return db_engine
+
+
+# Primary engine (all writes)
+engine = _create_engine(settings.DATABASE_URL, "primary")
+
+# Read replica for read-only endpoints; falls back to the primary
+read_engine = (
+    _create_engine(settings.DATABASE_READ_REPLICA_URL, "replica")
+    if settings.DATABASE_READ_REPLICA_URL else engine
 )
 
 # Create session factory
@@ -32,6 +105,14 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+ReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
 # Base class for models
 Base = declarative_base()
 
@@ -45,6 +126,43 @@ async def get_db() -> AsyncSession:
             await session.close()
 
 
+async def _get_replica_db() -> AsyncSession:
+    """Dependency for a read-only session on the replica"""
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+# Use for catalog, search and analytics-style reads only. Replicas lag the
+# primary slightly, so never use it where a user must immediately see their
+# own write (their chats, a post they just replied to). Endpoints that also
+# depend on get_current_user hold a primary session anyway. Without a replica
+# this is get_db itself, so dependency overrides of get_db apply.
+get_read_db = _get_replica_db if settings.DATABASE_READ_REPLICA_URL else get_db
+
+
+def pool_stats(db_engine: AsyncEngine) -> Dict[str, float]:
+    """Pool size, saturation and checkout wait statistics for an engine"""
+    pool = db_engine.sync_engine.pool
+    telemetry = getattr(pool, "telemetry", None)
+    if telemetry is None:
+        return {}
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    checked_out = pool.checkedout()
+    return {
+        "size": pool.size(),
+        "checked_out": checked_out,
+        "overflow": max(pool.overflow(), 0),
+        "saturation": round(checked_out / capacity, 4) if capacity else 0.0,
+        "checkouts_total": telemetry.checkouts,
+        "timeouts_total": telemetry.timeouts,
+        "wait_seconds_total": round(telemetry.wait_seconds_total, 6),
+        "wait_seconds_max": round(telemetry.wait_seconds_max, 6),
+    }
+
+
 async def init_db():
     """Initialize database (create tables)"""
     async with engine.begin() as conn:
@@ -55,5 +173,6 @@ async def init_db():
 async def close_db():
     """Close database connections"""
     await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
     logger.info("Database connections closed")
-
@@ -0,0 +1,239 @@
+"""In-process stand-in for the parts of the OpenAI Assistants API the backend uses"""
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+import itertools
+import re
+
+
+class FakeOpenAIError(Exception):
+    """Raised where the real client would raise an API error"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _ns(**kwargs) -> SimpleNamespace:
+    return SimpleNamespace(**kwargs)
+
+
+def _page(data: List[Any]) -> SimpleNamespace:
+    return _ns(data=data, has_more=False, last_id=data[-1].id if data else None)
+
+
+def _echo_reply(message: str) -> str:
+    return f"You asked: {message}"
+
+
+class FakeAsyncOpenAI:
+    """
+    Deterministic fake of AsyncOpenAI's beta Assistants surface.
+
+    Runs complete immediately with `reply(user_message)`. Streaming runs emit
+    the reply as `thread.message.delta` events of `chunk_size` words. Set
+    `streaming=False` to make `runs.create(stream=True)` fail like an API
+    without streaming support. Calls are counted in `calls` so tests can
+    assert how many requests a code path makes.
+
+    Enabled for the whole app with OPENAI_FAKE_CLIENT=true, or per test by
+    replacing `core.openai_utils._client`.
+    """
+
+    def __init__(
+        self,
+        reply: Callable[[str], str] = _echo_reply,
+        chunk_size: int = 2,
+        streaming: bool = True,
+        fail_runs: bool = False,
+    ):
+        self.reply = reply
+        self.chunk_size = chunk_size
+        self.streaming = streaming
+        self.fail_runs = fail_runs
+        self.calls: Dict[str, int] = {}
+        self._ids = itertools.count(1)
+        self.assistants_by_id: Dict[str, SimpleNamespace] = {}
+        self.threads: Dict[str, List[SimpleNamespace]] = {}
+        self.runs: Dict[str, SimpleNamespace] = {}
+        self.vector_store_files: Dict[str, Dict[str, SimpleNamespace]] = {}
+
+        self.beta = _ns(
+            assistants=_ns(
+                create=self._assistant_create,
+                retrieve=self._assistant_retrieve,
+                update=self._assistant_update,
+                delete=self._assistant_delete,
+            ),
+            threads=_ns(
+                create=self._thread_create,
+                messages=_ns(create=self._message_create, list=self._message_list),
+                runs=_ns(
+                    create=self._run_create,
+                    retrieve=self._run_retrieve,
+                    list=self._run_list,
+                    cancel=self._run_cancel,
+                ),
+            ),
+            vector_stores=_ns(
+                create=self._vector_store_create,
+                retrieve=self._vector_store_retrieve,
+                files=_ns(
+                    list=self._vector_store_file_list,
+                    create=self._vector_store_file_create,
+                    delete=self._vector_store_file_delete,
+                ),
+            ),
+        )
+        self.files = _ns(create=self._file_create)
+
+    def _count(self, name: str) -> None:
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def _new_id(self, prefix: str) -> str:
+        return f"{prefix}_fake{next(self._ids)}"
+
+    # Assistants
+
+    async def _assistant_create(self, **config) -> SimpleNamespace:
+        self._count("assistants.create")
+        assistant = _ns(id=self._new_id("asst"), tool_resources=config.get("tool_resources"), **{
+            key: value for key, value in config.items() if key != "tool_resources"
+        })
+        self.assistants_by_id[assistant.id] = assistant
+        return assistant
+
+    async def _assistant_retrieve(self, assistant_id: str) -> SimpleNamespace:
+        self._count("assistants.retrieve")
+        if assistant_id not in self.assistants_by_id:
+            raise FakeOpenAIError(f"No assistant found with id '{assistant_id}'", status_code=404)
+        return self.assistants_by_id[assistant_id]
+
+    async def _assistant_update(self, assistant_id: str, **changes) -> SimpleNamespace:
+        self._count("assistants.update")
+        assistant = await self._assistant_retrieve(assistant_id)
+        for key, value in changes.items():
+            setattr(assistant, key, value)
+        return assistant
+
+    async def _assistant_delete(self, assistant_id: str) -> SimpleNamespace:
+        self._count("assistants.delete")
+        self.assistants_by_id.pop(assistant_id, None)
+        return _ns(id=assistant_id, deleted=True)
+
+    # Threads and messages
+
+    async def _thread_create(self, **kwargs) -> SimpleNamespace:
+        self._count("threads.create")
+        thread = _ns(id=self._new_id("thread"))
+        self.threads[thread.id] = []
+        return thread
+
+    def _thread(self, thread_id: str) -> List[SimpleNamespace]:
+        if thread_id not in self.threads:
+            raise FakeOpenAIError(f"No thread found with id '{thread_id}'", status_code=404)
+        return self.threads[thread_id]
+
+    def _add_message(self, thread_id: str, role: str, text: str) -> SimpleNamespace:
+        message = _ns(
+            id=self._new_id("msg"),
+            role=role,
+            content=[_ns(type="text", text=_ns(value=text, annotations=[]))],
+        )
+        self._thread(thread_id).append(message)
+        return message
+
+    async def _message_create(self, thread_id: str, role: str, content: Any) -> SimpleNamespace:
+        self._count("messages.create")
+        if isinstance(content, list):
+            content = " ".join(part["text"] for part in content if part.get("type") == "text")
+        return self._add_message(thread_id, role, content)
+
+    async def _message_list(self, thread_id: str, limit: int = 20, **kwargs) -> SimpleNamespace:
+        self._count("messages.list")
+        return _page(list(reversed(self._thread(thread_id)))[:limit])
+
+    # Runs
+
+    def _finish_run(self, thread_id: str) -> SimpleNamespace:
+        user_messages = [m for m in self._thread(thread_id) if m.role == "user"]
+        question = user_messages[-1].content[0].text.value if user_messages else ""
+        run = _ns(id=self._new_id("run"), thread_id=thread_id, status="completed", last_error=None)
+        if self.fail_runs:
+            run.status = "failed"
+            run.last_error = _ns(code="server_error", message="Fake run failure")
+            self.runs[run.id] = run
+            return run
+        run.reply = self.reply(question)
+        self._add_message(thread_id, "assistant", run.reply)
+        self.runs[run.id] = run
+        return run
+
+    async def _run_create(self, thread_id: str, assistant_id: str, stream: bool = False, **kwargs):
+        self._count("runs.create")
+        if assistant_id not in self.assistants_by_id:
+            raise FakeOpenAIError(f"No assistant found with id '{assistant_id}'", status_code=404)
+        if stream and not self.streaming:
+            raise FakeOpenAIError("Streaming is not supported")
+        run = self._finish_run(thread_id)
+        if not stream:
+            return run
+        return self._run_events(run)
+
+    async def _run_events(self, run: SimpleNamespace):
+        yield _ns(event="thread.run.created", data=run)
+        if run.status == "failed":
+            yield _ns(event="thread.run.failed", data=run)
+            return
+        words = re.findall(r"\S+\s*", run.reply)
+        for start in range(0, len(words), self.chunk_size):
+            text = "".join(words[start:start + self.chunk_size])
+            delta = _ns(content=[_ns(index=0, type="text", text=_ns(value=text, annotations=None))])
+            yield _ns(event="thread.message.delta", data=_ns(id="msg_delta", delta=delta))
+        yield _ns(event="thread.run.completed", data=run)
+
+    async def _run_retrieve(self, thread_id: str, run_id: str) -> SimpleNamespace:
+        self._count("runs.retrieve")
+        return self.runs[run_id]
+
+    async def _run_list(self, thread_id: str, limit: int = 20, **kwargs) -> SimpleNamespace:
+        self._count("runs.list")
+        return _page([run for run in self.runs.values() if run.thread_id == thread_id][:limit])
+
+    async def _run_cancel(self, thread_id: str, run_id: str) -> SimpleNamespace:
+        self._count("runs.cancel")
+        run = self.runs[run_id]
+        run.status = "cancelled"
+        return run
+
+    # Vector stores and files
+
+    async def _vector_store_create(self, **kwargs) -> SimpleNamespace:
+        self._count("vector_stores.create")
+        store = _ns(id=self._new_id("vs"), **kwargs)
+        self.vector_store_files[store.id] = {}
+        return store
+
+    async def _vector_store_retrieve(self, vector_store_id: str) -> SimpleNamespace:
+        self._count("vector_stores.retrieve")
+        if vector_store_id not in self.vector_store_files:
+            raise FakeOpenAIError(f"No vector store found with id '{vector_store_id}'", status_code=404)
+        return _ns(id=vector_store_id)
+
+    async def _vector_store_file_list(self, vector_store_id: str, limit: int = 100, after: Optional[str] = None):
+        self._count("vector_stores.files.list")
+        return _page(list(self.vector_store_files[vector_store_id].values())[:limit])
+
+    async def _vector_store_file_create(self, vector_store_id: str, file_id: str) -> SimpleNamespace:
+        self._count("vector_stores.files.create")
+        entry = _ns(id=file_id, vector_store_id=vector_store_id)
+        self.vector_store_files[vector_store_id][file_id] = entry
+        return entry
+
+    async def _vector_store_file_delete(self, vector_store_id: str, file_id: str) -> SimpleNamespace:
+        self._count("vector_stores.files.delete")
+        self.vector_store_files[vector_store_id].pop(file_id, None)
+        return _ns(id=file_id, deleted=True)
+
+    async def _file_create(self, file, purpose: str) -> SimpleNamespace:
+        self._count("files.create")
+        return _ns(id=self._new_id("file"), purpose=purpose)
@@ -0,0 +1,239 @@
+"""Per-route request metrics, SQL statement accounting and slow-request logging"""
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Statements kept per request for the slow-request log
+SLOW_LOG_MAX_STATEMENTS = 50
+SLOW_LOG_STATEMENT_CHARS = 500
+
+# Label used for requests that matched no route (keeps label cardinality bounded)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class RequestStats:
+    """SQL activity of the request currently being handled"""
+
+    def __init__(self):
+        self.statement_count = 0
+        self.db_seconds = 0.0
+        self.statements: List[Tuple[float, str]] = []
+
+    def record_statement(self, statement: str, seconds: float) -> None:
+        self.statement_count += 1
+        self.db_seconds += seconds
+        if len(self.statements) < SLOW_LOG_MAX_STATEMENTS:
+            self.statements.append((seconds, statement[:SLOW_LOG_STATEMENT_CHARS]))
+
+
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+class RouteMetrics:
+    """Accumulated metrics for one (method, route template)"""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.latency_sum = 0.0
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # last bucket is +Inf
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.response_bytes = 0
+
+
+class MetricsRegistry:
+    """Process-wide request metrics rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._routes: Dict[Tuple[str, str], RouteMetrics] = {}
+        self._lock = threading.Lock()
+        # Extra gauge/counter sources: name -> callable returning {metric: value}
+        self._collectors: Dict[str, Callable[[], Dict[str, float]]] = {}
+
+    def observe(
+        self,
+        method: str,
+        route: str,
+        status_code: int,
+        seconds: float,
+        stats: RequestStats,
+        response_bytes: int
+    ) -> None:
+        with self._lock:
+            metrics = self._routes.setdefault((method, route), RouteMetrics())
+            metrics.count += 1
+            if status_code >= 500:
+                metrics.errors += 1
+            metrics.latency_sum += seconds
+            metrics.latency_buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            metrics.statements += stats.statement_count
+            metrics.db_seconds += stats.db_seconds
+            metrics.response_bytes += response_bytes
+
+    def register_collector(self, prefix: str, collect: Callable[[], Dict[str, float]]) -> None:
+        """Export values from another component as `<prefix>_<name>`"""
+        self._collectors[prefix] = collect
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+    def snapshot(self) -> Dict[Tuple[str, str], RouteMetrics]:
+        with self._lock:
+            copies = {}
+            for key, metrics in self._routes.items():
+                copy = RouteMetrics()
+                copy.__dict__.update(metrics.__dict__)
+                copy.latency_buckets = list(metrics.latency_buckets)
+                copies[key] = copy
+            return copies
+
+    def render(self) -> str:
+        routes = self.snapshot()
+        lines = [
+            "# HELP http_request_duration_seconds Request latency by route",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), metrics in sorted(routes.items()):
+            labels = f'method="{method}",route="{_escape(route)}"'
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, metrics.latency_buckets):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {metrics.count}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {metrics.latency_sum:.6f}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {metrics.count}")
+
+        for name, help_text, attr in (
+            ("http_request_errors_total", "Requests that returned a 5xx status", "errors"),
+            ("http_request_db_statements_total", "SQL statements executed while handling requests", "statements"),
+            ("http_request_db_seconds_total", "Time spent executing SQL while handling requests", "db_seconds"),
+            ("http_response_bytes_total", "Response body bytes sent", "response_bytes"),
+        ):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for (method, route), metrics in sorted(routes.items()):
+                value = getattr(metrics, attr)
+                value = f"{value:.6f}" if isinstance(value, float) else value
+                lines.append(f'{name}{{method="{method}",route="{_escape(route)}"}} {value}')
+
+        for prefix, collect in sorted(self._collectors.items()):
+            try:
+                values = collect()
+            except Exception as e:
+                logger.warning(f"Metrics collector '{prefix}' failed: {e}")
+                continue
+            for name, value in sorted(values.items()):
+                lines.append(f"{prefix}_{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+metrics_registry = MetricsRegistry()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context, which is discarded with the statement even
+    # when it fails (after_cursor_execute only fires on success)
+    if context is not None:
+        context._metrics_query_start = time.perf_counter()
+
+
+def _record(context, statement) -> None:
+    started = getattr(context, "_metrics_query_start", None)
+    stats = _current_request.get()
+    if started is not None and stats is not None:
+        stats.record_statement(statement, time.perf_counter() - started)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _record(context, statement)
+
+
+def _handle_error(exception_context):
+    # Failed statements still took database time
+    if exception_context.execution_context is not None and exception_context.statement:
+        _record(exception_context.execution_context, exception_context.statement)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attribute statements and their execution time to the current request (idempotent)"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, SQL statements, DB time and response
+    bytes per route template, and logging requests slower than
+    SLOW_REQUEST_THRESHOLD_MS together with the statements they ran.
+    """
+
+    def __init__(self, app, slow_request_threshold_ms: Optional[float] = None):
+        self.app = app
+        self.slow_request_threshold_ms = (
+            slow_request_threshold_ms if slow_request_threshold_ms is not None
+            else settings.SLOW_REQUEST_THRESHOLD_MS
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        status_code = 500
+        response_bytes = 0
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code, response_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current_request.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or UNMATCHED_ROUTE
+            metrics_registry.observe(scope["method"], route_path, status_code, elapsed, stats, response_bytes)
+            if self.slow_request_threshold_ms and elapsed * 1000 >= self.slow_request_threshold_ms:
+                _log_slow_request(scope["method"], route_path, scope.get("path", ""), status_code, elapsed, stats)
+
+
+def _log_slow_request(method: str, route: str, path: str, status_code: int, elapsed: float, stats: RequestStats) -> None:
+    statements = "\n".join(
+        f"  [{seconds * 1000:.1f}ms] {statement}" for seconds, statement in stats.statements
+    )
+    logger.warning(
+        f"Slow request {method} {route} ({path}) -> {status_code} in {elapsed * 1000:.1f}ms; "
+        f"{stats.statement_count} statements, {stats.db_seconds * 1000:.1f}ms in DB"
+        + (f"\n{statements}" if statements else "")
+    )
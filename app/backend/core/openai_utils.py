@@ -3,13 +3,13 @@ from typing import Optional, Dict, Any
 import logging
 from openai import AsyncOpenAI
 from pathlib import Path
-from sqlalchemy import update, inspect, select, or_
+from sqlalchemy import update, inspect
 from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.backend.core.assistant_cache import assistant_handle_cache
 from app.backend.core.config import settings
 from app.backend.models.user import User
-from app.backend.models.document import Document
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +20,10 @@ _client: Optional[AsyncOpenAI] = None
 def get_openai_client() -> AsyncOpenAI:
     """Get or create OpenAI client instance"""
     global _client
+    if _client is None and settings.OPENAI_FAKE_CLIENT:
+        from app.backend.core.fake_openai import FakeAsyncOpenAI
+        _client = FakeAsyncOpenAI()
+        logger.warning("OPENAI_FAKE_CLIENT is set: AI responses come from the local fake client")
     if _client is None:
         api_key = settings.OPENAI_API_KEY
         if not api_key or api_key.strip() == "":
@@ -28,10 +32,42 @@ def get_openai_client() -> AsyncOpenAI:
     return _client
 
 
+def is_not_found_error(error: Exception) -> bool:
+    """Whether an OpenAI API error means the referenced object does not exist"""
+    return getattr(error, "status_code", None) == 404
+
+
+def _cached_handle(kind: str, user_id: Optional[int], known_id: Optional[str]) -> Optional[Any]:
+    """
+    Cached handle for a user unless their row points at a different object.
+
+    A row without an id yet is trusted to be stale: the handle was created in
+    this process and the caller's User was loaded before that.
+    """
+    handle = assistant_handle_cache.get(kind, user_id)
+    if handle is None:
+        return None
+    handle_id = handle[0] if isinstance(handle, tuple) else handle
+    return handle if known_id in (None, handle_id) else None
+
+
+def _cached_assistant(user: User, vector_store_id: Optional[str]) -> Optional[str]:
+    handle = _cached_handle("assistant", user.id, user.openai_assistant_id)
+    if handle is None:
+        return None
+    assistant_id, vector_store_ids = handle
+    if vector_store_id and vector_store_id not in vector_store_ids:
+        return None  # The vector store still has to be attached
+    return assistant_id
+
+
 async def get_or_create_user_assistant(user: User, db=None, vector_store_id: Optional[str] = None) -> str:
     """
     Get or create a user-specific OpenAI assistant.
     
+    The verified assistant id is cached (assistant_handle_cache), so the
+    assistant is only retrieved, updated or created on a cache miss.
+    
     Args:
         user: User object
         db: Optional database session to save assistant_id
@@ -40,6 +76,18 @@ async def get_or_create_user_assistant(user: User, db=None, vector_store_id: Opt
     Returns:
         Assistant ID
     """
+    assistant_id = _cached_assistant(user, vector_store_id)
+    if assistant_id:
+        return assistant_id
+    async with assistant_handle_cache.lock("assistant", user.id):
+        # Another request may have verified or created it while we waited
+        assistant_id = _cached_assistant(user, vector_store_id)
+        if assistant_id:
+            return assistant_id
+        return await _verify_or_create_user_assistant(user, db, vector_store_id)
+
+
+async def _verify_or_create_user_assistant(user: User, db=None, vector_store_id: Optional[str] = None) -> str:
     client = get_openai_client()
     
     # Check if user already has an assistant
@@ -49,12 +97,14 @@ async def get_or_create_user_assistant(user: User, db=None, vector_store_id: Opt
             assistant = await client.beta.assistants.retrieve(user.openai_assistant_id)
             
             # Update assistant with vector store if provided and different
+            current_tool_resources = getattr(assistant, 'tool_resources', None)
+            if current_tool_resources is not None and not isinstance(current_tool_resources, dict):
+                current_tool_resources = current_tool_resources.model_dump()
+            file_search = (current_tool_resources or {}).get("file_search") or {}
+            current_vs_ids = list(file_search.get("vector_store_ids") or [])
+            
             if vector_store_id:
                 tool_resources = {"file_search": {"vector_store_ids": [vector_store_id]}}
-                # Check if assistant needs update
-                current_tool_resources = getattr(assistant, 'tool_resources', None)
-                current_vs_ids = current_tool_resources.get("file_search", {}).get("vector_store_ids", []) if current_tool_resources else []
-                
                 if vector_store_id not in current_vs_ids:
                     # Update assistant with file_search tool and vector store
                     await client.beta.assistants.update(
@@ -63,7 +113,9 @@ async def get_or_create_user_assistant(user: User, db=None, vector_store_id: Opt
                         tool_resources=tool_resources
                     )
                     logger.info(f"Updated assistant {assistant.id} with vector store {vector_store_id}")
+                    current_vs_ids = [vector_store_id]
             
+            assistant_handle_cache.put("assistant", user.id, (assistant.id, tuple(current_vs_ids)))
             return assistant.id
         except Exception as e:
             logger.warning(f"User assistant {user.openai_assistant_id} not found, creating new one: {e}")
@@ -83,6 +135,7 @@ async def get_or_create_user_assistant(user: User, db=None, vector_store_id: Opt
     
     # Create new assistant
     assistant = await client.beta.assistants.create(**assistant_config)
+    assistant_handle_cache.put("assistant", user.id, (assistant.id, (vector_store_id,) if vector_store_id else ()))
     
     # Store assistant ID in user model
     user.openai_assistant_id = assistant.id
@@ -115,6 +168,8 @@ async def get_or_create_user_vector_store(user: User, db: AsyncSession | None =
     """
     Get or create a user-specific vector store for RAG.
     
+    The verified id is cached like the assistant's (assistant_handle_cache).
+    
     Returns:
         Vector store ID or None if OpenAI is not configured
     """
@@ -124,9 +179,21 @@ async def get_or_create_user_vector_store(user: User, db: AsyncSession | None =
         logger.warning(f"Vector store unavailable: {e}")
         return None
 
+    vector_store_id = _cached_handle("vector_store", user.id, user.openai_vector_store_id)
+    if vector_store_id:
+        return vector_store_id
+    async with assistant_handle_cache.lock("vector_store", user.id):
+        vector_store_id = _cached_handle("vector_store", user.id, user.openai_vector_store_id)
+        if vector_store_id:
+            return vector_store_id
+        return await _verify_or_create_user_vector_store(client, user, db)
+
+
+async def _verify_or_create_user_vector_store(client: AsyncOpenAI, user: User, db: AsyncSession | None) -> str:
     if user.openai_vector_store_id:
         try:
             store = await client.beta.vector_stores.retrieve(user.openai_vector_store_id)
+            assistant_handle_cache.put("vector_store", user.id, store.id)
             return store.id
         except Exception as e:
             logger.warning(f"Vector store {user.openai_vector_store_id} missing, recreating: {e}")
@@ -135,6 +202,7 @@ async def get_or_create_user_vector_store(user: User, db: AsyncSession | None =
         name=f"{user.username or 'user'} reference library",
         metadata={"user_id": str(user.id)},
     )
+    assistant_handle_cache.put("vector_store", user.id, vector_store.id)
 
     user.openai_vector_store_id = vector_store.id
     if db:
@@ -186,7 +254,9 @@ async def update_user_assistant_instructions(
 async def get_global_assistant_id() -> Optional[str]:
     """
     Get the global fallback assistant ID from config.
-    Validates that the assistant exists before returning it.
+    Validates that the assistant exists before returning it. The result is
+    cached (assistant_handle_cache), including "not found" but not transient
+    failures such as timeouts or rate limits, which are retried next call.
     
     Returns:
         Assistant ID or None if not configured or doesn't exist
@@ -196,14 +266,22 @@ async def get_global_assistant_id() -> Optional[str]:
         return None
     
     assistant_id = assistant_id.strip()
+    cached = assistant_handle_cache.get("global_assistant", None)
+    if cached is not None:
+        return cached or None
     
     # Validate that the assistant exists
     try:
         client = get_openai_client()
         await client.beta.assistants.retrieve(assistant_id)
+        assistant_handle_cache.put("global_assistant", None, assistant_id)
         return assistant_id
     except Exception as e:
-        logger.warning(f"Global assistant {assistant_id} not found or invalid: {e}")
+        if is_not_found_error(e):
+            logger.warning(f"Global assistant {assistant_id} not found: {e}")
+            assistant_handle_cache.put("global_assistant", None, "")
+        else:
+            logger.warning(f"Could not verify global assistant {assistant_id}: {e}")
         return None
 
 
@@ -265,124 +343,6 @@ async def _upload_file_to_openai(client: AsyncOpenAI, file_path: Path) -> Option
         return None
 
 
-async def update_vector_store(db: AsyncSession, user: User) -> Optional[str]:
-    """
-    Ensure the user's vector store is synchronized with stored documents.
-    
-    Returns:
-        The vector store ID if available, otherwise None.
-    """
-    vector_store_id = await get_or_create_user_vector_store(user, db)
-    if not vector_store_id:
-        return None
-
-    client = get_openai_client()
-
-    # Fetch documents visible to the user (their uploads + shared/standard)
-    try:
-        result = await db.execute(
-            select(Document)
-            .where(Document.is_deleted == False)  # noqa: E712
-            .where(or_(Document.uploader_id == user.id, Document.category == "standard"))
-        )
-        documents = result.scalars().all()
-    except Exception as e:
-        logger.warning("Unable to load documents for vector sync: %s", e)
-        return vector_store_id
-
-    # Check currently attached files (OpenAI max limit is 100 per request)
-    attached_file_ids = set()
-    try:
-        # List files with max limit of 100
-        vector_files = await client.beta.vector_stores.files.list(
-            vector_store_id=vector_store_id,
-            limit=100
-        )
-        attached_file_ids = {item.id for item in vector_files.data}
-        
-        # If there are more files, paginate (though unlikely for most users)
-        # Note: OpenAI API uses cursor-based pagination with 'after' parameter
-        while vector_files.has_more and vector_files.last_id:
-            vector_files = await client.beta.vector_stores.files.list(
-                vector_store_id=vector_store_id,
-                limit=100,
-                after=vector_files.last_id
-            )
-            attached_file_ids.update({item.id for item in vector_files.data})
-    except Exception as e:
-        logger.warning("Unable to list files for vector store %s: %s", vector_store_id, e)
-
-    desired_file_ids: set[str] = set()
-    dirty = False
-
-    for document in documents:
-        file_path = Path(document.storage_path)
-        if not file_path.exists():
-            logger.warning("Document %s missing on disk at %s", document.id, document.storage_path)
-            continue
-
-        # Skip image files - they are not suitable for vector store file_search
-        # Images will be attached directly to messages when needed
-        if _is_image_file(file_path):
-            logger.debug("Skipping image file %s from vector store (images attached directly to messages)", file_path.name)
-            continue
-
-        # Only process text-based documents for vector store
-        if not _is_text_document(file_path):
-            logger.debug("Skipping non-text document %s from vector store", file_path.name)
-            continue
-
-        file_id = document.openai_file_id
-
-        # If file already attached, mark as desired and continue
-        if file_id and file_id in attached_file_ids:
-            desired_file_ids.add(file_id)
-            continue
-
-        # If file exists in DB but not attached, try to reattach
-        if file_id:
-            try:
-                await client.beta.vector_stores.files.create(vector_store_id=vector_store_id, file_id=file_id)
-                desired_file_ids.add(file_id)
-                attached_file_ids.add(file_id)
-                continue
-            except Exception as e:
-                logger.warning("Reattaching OpenAI file %s failed: %s", file_id, e)
-
-        # Upload a fresh copy
-        uploaded_id = await _upload_file_to_openai(client, file_path)
-        if not uploaded_id:
-            continue
-
-        document.openai_file_id = uploaded_id
-        desired_file_ids.add(uploaded_id)
-        dirty = True
-
-        try:
-            await client.beta.vector_stores.files.create(vector_store_id=vector_store_id, file_id=uploaded_id)
-            attached_file_ids.add(uploaded_id)
-        except Exception as e:
-            logger.error(
-                "Unable to attach uploaded file %s to vector store %s: %s",
-                uploaded_id,
-                vector_store_id,
-                e,
-            )
-
-    # Remove stale files no longer tied to documents
-    stale_files = attached_file_ids - desired_file_ids
-    for file_id in stale_files:
-        try:
-            await client.beta.vector_stores.files.delete(vector_store_id=vector_store_id, file_id=file_id)
-        except Exception as e:
-            logger.warning("Failed to remove stale file %s from vector store %s: %s", file_id, vector_store_id, e)
-
-    if dirty:
-        await db.commit()
-
-    return vector_store_id
-
-
 async def cancel_active_run(thread_id: str, run_id: str) -> None:
     """
     Cancel an active OpenAI run.
@@ -0,0 +1,115 @@
+"""Keyset (cursor) pagination helpers for list endpoints"""
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_, DateTime
+from sqlalchemy.sql import Select
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+from datetime import datetime
+import base64
+import json
+
+# A sort key is (column, descending). The last key must be unique (usually the primary key),
+# and no key may be NULL in the rows being paged: SQL comparisons with NULL match
+# nothing, so a NULL in a cursor would end the listing. Filter NULLs out of the query
+# (or sort on a non-null column).
+SortKey = Tuple[Any, bool]
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort-key values of the last row on a page as an opaque token"""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_keys: Sequence[SortKey]) -> List[Any]:
+    """Decode a cursor token back into typed sort-key values"""
+    invalid_cursor = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid pagination cursor"
+    )
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError):
+        raise invalid_cursor
+
+    if not isinstance(values, list) or len(values) != len(sort_keys):
+        raise invalid_cursor
+
+    typed_values = []
+    for (column, _), value in zip(sort_keys, values):
+        if value is None:
+            raise invalid_cursor
+        if isinstance(column.type, DateTime):
+            try:
+                value = datetime.fromisoformat(value)
+            except (ValueError, TypeError):
+                raise invalid_cursor
+        typed_values.append(value)
+    return typed_values
+
+
+def apply_keyset(query: Select, sort_keys: Sequence[SortKey], cursor: Optional[str]) -> Select:
+    """
+    Order a query by the sort keys and, if a cursor is given, seek past it.
+
+    The seek predicate is the lexicographic "comes after" condition over all
+    keys, so the database can walk an index instead of skipping OFFSET rows.
+    """
+    query = query.order_by(
+        *[column.desc() if descending else column.asc() for column, descending in sort_keys]
+    )
+    if not cursor:
+        return query
+
+    values = decode_cursor(cursor, sort_keys)
+    conditions = []
+    for index, (column, descending) in enumerate(sort_keys):
+        equal_prefix = [
+            prior_column == values[prior_index]
+            for prior_index, (prior_column, _) in enumerate(sort_keys[:index])
+        ]
+        after = column < values[index] if descending else column > values[index]
+        conditions.append(and_(*equal_prefix, after))
+    return query.where(or_(*conditions))
+
+
+def split_page(
+    rows: Sequence[Any],
+    limit: int,
+    sort_keys: Sequence[SortKey],
+    get_item: Optional[Callable[[Any], Any]] = None
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Trim a result fetched with limit + 1 rows and build the next cursor.
+
+    Args:
+        rows: Rows fetched with LIMIT limit + 1
+        limit: Requested page size
+        sort_keys: Sort keys the query was ordered by
+        get_item: Maps a row to the ORM object holding the sort-key attributes
+
+    Raises:
+        ValueError: If a sort key of the last row is NULL (the query must exclude such rows)
+    """
+    page = list(rows[:limit])
+    if len(rows) <= limit or not page:
+        return page, None
+    last = get_item(page[-1]) if get_item else page[-1]
+    values = [getattr(last, column.key) for column, _ in sort_keys]
+    if any(value is None for value in values):
+        raise ValueError(f"NULL keyset sort key in {last!r}; exclude NULLs from the paged query")
+    return page, encode_cursor(values)
+
+
+def should_count(include_total: Optional[bool], cursor: Optional[str]) -> bool:
+    """
+    Decide whether to run the COUNT(*) query for a list endpoint.
+
+    Counting is on by default for the first page (no cursor) so existing
+    offset clients keep receiving totals; follow-up cursor pages skip it
+    unless the client opts in.
+    """
+    if include_total is not None:
+        return include_total
+    return cursor is None
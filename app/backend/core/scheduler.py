@@ -0,0 +1,66 @@
+"""Lightweight in-process scheduler for periodic background jobs"""
+from typing import Awaitable, Callable, Optional
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJob:
+    """
+    Run an async callable every `interval_seconds` on the event loop.
+
+    Jobs are started from the application lifespan and run inside the API
+    process; failures are logged and the job keeps its schedule. With several
+    API workers each process runs its own copy, so jobs must be idempotent.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        interval_seconds: float,
+        func: Callable[[], Awaitable[None]],
+        run_on_start: bool = True
+    ):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.func = func
+        self.run_on_start = run_on_start
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Schedule the job on the running event loop (no-op if disabled)"""
+        if self.interval_seconds <= 0 or self.running:
+            return
+        self._task = asyncio.create_task(self._run(), name=f"periodic-job:{self.name}")
+        logger.info(f"Started periodic job '{self.name}' every {self.interval_seconds}s")
+
+    async def stop(self) -> None:
+        """Cancel the job and wait for it to finish"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info(f"Stopped periodic job '{self.name}'")
+
+    async def run_once(self) -> None:
+        """Run the job body once, logging instead of raising on failure"""
+        try:
+            await self.func()
+        except Exception as e:
+            logger.error(f"Periodic job '{self.name}' failed: {e}", exc_info=True)
+
+    async def _run(self) -> None:
+        if not self.run_on_start:
+            await asyncio.sleep(self.interval_seconds)
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval_seconds)
@@ -1,6 +1,8 @@
 """Security utilities for authentication"""
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
+import asyncio
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status, Request
@@ -8,26 +10,53 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from app.backend.core.auth_cache import user_principal_cache
 from app.backend.core.config import settings
 from app.backend.core.database import get_db
 from app.backend.models.user import User
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context; hashes below BCRYPT_ROUNDS are flagged for upgrade
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event
+# loop and caps how many hashes run at once
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
 
 # HTTP Bearer scheme for token extraction
 # auto_error=False allows us to handle errors manually
 security = HTTPBearer(auto_error=False)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+async def _run_in_password_pool(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(_password_executor, func, *args)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash (runs on the password pool)"""
+    return await _run_in_password_pool(pwd_context.verify, plain_password, hashed_password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and rehash it if its hash is below the target cost.
+
+    Returns:
+        (valid, new_hash) where new_hash is None unless the stored hash should be replaced
+    """
+    return await _run_in_password_pool(pwd_context.verify_and_update, plain_password, hashed_password)
 
 
-def get_password_hash(password: str) -> str:
-    """Hash a password"""
-    return pwd_context.hash(password)
+async def get_password_hash(password: str) -> str:
+    """Hash a password (runs on the password pool)"""
+    return await _run_in_password_pool(pwd_context.hash, password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -37,7 +66,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    # iat keys the principal cache (see core/auth_cache.py)
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
     
     # Ensure SECRET_KEY is a string
     secret_key = str(settings.SECRET_KEY)
@@ -123,11 +153,20 @@ async def get_current_user(
     except (ValueError, TypeError):
         raise credentials_exception
     
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-    
-    if user is None:
-        raise credentials_exception
+    issued_at = payload.get("iat")
+    cached = user_principal_cache.get(user_id, issued_at)
+    if cached is not None:
+        # Attach a copy to this session without a SELECT
+        user = await db.merge(cached, load=False)
+    else:
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+        
+        if user is None:
+            raise credentials_exception
+        
+        if user.is_active:
+            user_principal_cache.put(user_id, issued_at, user)
     
     if not user.is_active:
         raise HTTPException(
@@ -9,14 +9,27 @@ _project_root = os.path.dirname(os.path.dirname(_backend_dir))
 if _project_root not in sys.path:
     sys.path.insert(0, _project_root)
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
 import logging
+import secrets
 
 from app.backend.core.config import settings
-from app.backend.core.database import init_db, close_db
+from app.backend.core.assistant_cache import assistant_handle_cache
+from app.backend.core.auth_cache import user_principal_cache
+from app.backend.core.compression import CompressionMiddleware, DefaultJSONResponse
+from app.backend.core.database import init_db, close_db, engine, read_engine, pool_stats
+from app.backend.core.metrics import MetricsMiddleware, instrument_engine, metrics_registry
+from app.backend.services.analytics_service import platform_snapshot_job
+from app.backend.services.catalog_cache import catalog_cache
+from app.backend.services.context_cache import user_context_cache
+from app.backend.services.event_queue import event_worker_pool
+from app.backend.services.llm_providers import close_chat_providers, provider_stats
+from app.backend.services.notification_retention import notification_maintenance_job
+from app.backend.services.vector_store_sync import vector_store_reconcile_job
+from app.backend.services.notification_hub import notification_hub
 
 # Configure logging
 logging.basicConfig(
@@ -33,9 +46,18 @@ async def lifespan(app: FastAPI):
     logger.info("Starting up Crypto Curriculum Platform...")
     # Note: Database tables should be created via Alembic migrations
     # await init_db()  # Only use if not using Alembic
+    platform_snapshot_job.start()
+    event_worker_pool.start()
+    notification_maintenance_job.start()
+    vector_store_reconcile_job.start()
     yield
     # Shutdown
     logger.info("Shutting down...")
+    await vector_store_reconcile_job.stop()
+    await notification_maintenance_job.stop()
+    await event_worker_pool.stop()
+    await platform_snapshot_job.stop()
+    await close_chat_providers()
     await close_db()
 
 
@@ -45,6 +67,22 @@ app = FastAPI(
     description="Learning Management System for cryptocurrency and blockchain education",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=DefaultJSONResponse,
+)
+
+# Request metrics: attribute SQL to requests and export component stats
+instrument_engine(engine.sync_engine)
+metrics_registry.register_collector("db_pool", lambda: pool_stats(engine))
+if read_engine is not engine:
+    instrument_engine(read_engine.sync_engine)
+    metrics_registry.register_collector("db_replica_pool", lambda: pool_stats(read_engine))
+metrics_registry.register_collector("auth_user_cache", user_principal_cache.stats)
+metrics_registry.register_collector("openai_handle_cache", assistant_handle_cache.stats)
+metrics_registry.register_collector("catalog_cache", catalog_cache.stats)
+metrics_registry.register_collector("user_context_cache", user_context_cache.stats)
+metrics_registry.register_collector("llm_provider", provider_stats)
+metrics_registry.register_collector(
+    "notification_stream", lambda: {"subscribers": notification_hub.subscriber_count()}
 )
 
 # CORS middleware
@@ -57,6 +95,12 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# Compress large responses (inside the metrics middleware so it records wire bytes)
+app.add_middleware(CompressionMiddleware)
+
+# Added last so it is outermost and its latency includes CORS handling
+app.add_middleware(MetricsMiddleware)
+
 
 @app.get("/")
 async def root():
@@ -76,11 +120,36 @@ async def health_check():
     return JSONResponse(
         content={
             "status": "healthy",
-            "environment": settings.ENVIRONMENT
+            "environment": settings.ENVIRONMENT,
+            "auth_cache": user_principal_cache.stats()
         }
     )
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics(authorization: str | None = Header(None)):
+    """
+    Prometheus metrics endpoint.
+
+    Off unless METRICS_ENABLED; with METRICS_TOKEN set, scrapes must send it
+    as a bearer token.
+    """
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if settings.METRICS_TOKEN and not secrets.compare_digest(
+        authorization or "", f"Bearer {settings.METRICS_TOKEN}"
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return PlainTextResponse(
+        metrics_registry.render(),
+        media_type="text/plain; version=0.0.4"
+    )
+
+
 # Import and include routers
 from app.backend.api.v1.endpoints import (
     auth,
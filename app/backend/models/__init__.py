@@ -1,6 +1,6 @@
 """Import all models for Alembic to detect"""
 from app.backend.models.user import User, UserRole
-from app.backend.models.module import Module, Lesson, Track
+from app.backend.models.module import Module, Lesson, LessonRendition, Track
 from app.backend.models.assessment import Assessment, QuestionType
 from app.backend.models.progress import UserProgress, QuizAttempt, ProgressStatus, ReviewStatus
 from app.backend.models.cohort import Cohort, CohortMember, CohortDeadline, Announcement, CohortRole
@@ -9,7 +9,9 @@ from app.backend.models.achievement import Achievement, UserAchievement, Leaderb
 from app.backend.models.notification import Notification, ChatMessage, LearningResource
 from app.backend.models.query_log import QueryLog
 from app.backend.models.thread_map import ThreadMap
-from app.backend.models.document import Document
+from app.backend.models.document import Document, VectorStoreFile, VectorSyncStatus
+from app.backend.models.analytics import StudentStats, StudentActivityDay, PlatformAnalyticsSnapshot
+from app.backend.models.outbox import OutboxEvent, OutboxStatus
 
 __all__ = [
     # User
@@ -18,6 +20,7 @@ __all__ = [
     # Module
     "Module",
     "Lesson",
+    "LessonRendition",
     "Track",
     # Assessment
     "Assessment",
@@ -49,5 +52,14 @@ __all__ = [
     "ThreadMap",
     # Documents
     "Document",
+    "VectorStoreFile",
+    "VectorSyncStatus",
+    # Analytics
+    "StudentStats",
+    "StudentActivityDay",
+    "PlatformAnalyticsSnapshot",
+    # Background events
+    "OutboxEvent",
+    "OutboxStatus",
 ]
 
@@ -0,0 +1,60 @@
+"""Analytics rollup models"""
+from sqlalchemy import Column, Integer, Float, Date, DateTime, ForeignKey, JSON
+from sqlalchemy.sql import func
+from app.backend.core.database import Base
+
+
+class StudentStats(Base):
+    """Per-student rollup maintained on write (see services/student_stats_service.py)"""
+    __tablename__ = "student_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+
+    # Assessments
+    total_attempts = Column(Integer, default=0, server_default="0", nullable=False)
+    scored_attempts = Column(Integer, default=0, server_default="0", nullable=False)  # attempts with points_earned
+    score_sum = Column(Float, default=0.0, server_default="0", nullable=False)  # sum of score percentages
+
+    # Modules
+    modules_completed = Column(Integer, default=0, server_default="0", nullable=False)
+    modules_in_progress = Column(Integer, default=0, server_default="0", nullable=False)
+    modules_not_started = Column(Integer, default=0, server_default="0", nullable=False)
+
+    # Achievements
+    total_achievements = Column(Integer, default=0, server_default="0", nullable=False)
+    total_points = Column(Integer, default=0, server_default="0", nullable=False)
+
+    # Activity
+    current_streak_days = Column(Integer, default=0, server_default="0", nullable=False)
+    longest_streak_days = Column(Integer, default=0, server_default="0", nullable=False)
+    last_activity_date = Column(Date, nullable=True)
+    last_activity_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Timestamps
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<StudentStats(user_id={self.user_id}, attempts={self.total_attempts}, completed={self.modules_completed})>"
+
+
+class StudentActivityDay(Base):
+    """Days a student had module activity; the source of StudentStats streaks"""
+    __tablename__ = "student_activity_days"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    activity_date = Column(Date, primary_key=True)
+
+    def __repr__(self):
+        return f"<StudentActivityDay(user_id={self.user_id}, activity_date={self.activity_date})>"
+
+
+class PlatformAnalyticsSnapshot(Base):
+    """Precomputed platform-wide analytics, refreshed on a schedule"""
+    __tablename__ = "platform_analytics_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    metrics = Column(JSON, nullable=False)  # PlatformAnalyticsResponse fields
+    computed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<PlatformAnalyticsSnapshot(id={self.id}, computed_at={self.computed_at})>"
@@ -7,9 +7,12 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     Text,
+    Enum as SQLEnum,
+    UniqueConstraint,
 )
 from sqlalchemy.sql import func
 from app.backend.core.database import Base
+import enum
 
 
 class Document(Base):
@@ -33,3 +36,36 @@ class Document(Base):
 
     def __repr__(self):
         return f"<Document(id={self.id}, title='{self.title}', category='{self.category}', uploader_id={self.uploader_id})>"
+
+
+class VectorSyncStatus(str, enum.Enum):
+    """Vector store sync state of a document"""
+    SYNCED = "synced"
+    FAILED = "failed"  # Retried on the next sync
+
+
+class VectorStoreFile(Base):
+    """
+    Sync ledger: which content of a document is attached to a vector store.
+
+    services/vector_store_sync.py compares content hashes against this table,
+    so only new, changed or removed documents touch the OpenAI API.
+    """
+    __tablename__ = "vector_store_files"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    vector_store_id = Column(String(255), nullable=False)
+    document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), nullable=False, index=True)
+    content_hash = Column(String(64), nullable=False)  # sha256 of the file on disk
+    openai_file_id = Column(String(255), nullable=True)
+    status = Column(SQLEnum(VectorSyncStatus), nullable=False)
+    last_error = Column(Text, nullable=True)
+    synced_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("vector_store_id", "document_id", name="uq_vector_store_document"),
+    )
+
+    def __repr__(self):
+        return f"<VectorStoreFile(vector_store_id='{self.vector_store_id}', document_id={self.document_id}, status={self.status})>"
@@ -1,5 +1,5 @@
 """Forum and discussion models"""
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index, DDL, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.backend.core.database import Base
@@ -21,10 +21,23 @@ class ForumPost(Base):
     is_solved = Column(Boolean, default=False, nullable=False)
     upvotes = Column(Integer, default=0, nullable=False)
     
+    # Denormalized counters (maintained on write, see forum endpoints)
+    reply_count = Column(Integer, default=0, server_default="0", nullable=False)
+    last_reply_at = Column(DateTime(timezone=True), nullable=True)
+    score = Column(Integer, default=0, server_default="0", nullable=False)  # upvotes + reply_count
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Composite indexes matching the module listing sort modes column for column
+    # and direction for direction (FORUM_SORT_KEYS), so pages are read in index order
+    __table_args__ = (
+        Index('ix_forum_posts_module_recent', 'module_id', 'parent_post_id', created_at.desc(), id.desc()),
+        Index('ix_forum_posts_module_popular', 'module_id', 'parent_post_id', score.desc(), created_at.desc(), id.desc()),
+        Index('ix_forum_posts_module_unsolved', 'module_id', 'parent_post_id', 'is_solved', created_at.desc(), id.desc()),
+    )
+    
     # Relationships
     # module = relationship("Module")
     # user = relationship("User")
@@ -35,6 +48,32 @@ class ForumPost(Base):
         return f"<ForumPost(id={self.id}, title='{self.title}', module_id={self.module_id})>"
 
 
+# Full-text search (PostgreSQL only). The tsvector column is generated by the
+# database and is not mapped on the model so the SQLite test engine can still
+# create the table; search falls back to ILIKE there.
+FORUM_SEARCH_CONFIG = "english"
+
+FORUM_SEARCH_VECTOR_DDL = (
+    "ALTER TABLE forum_posts ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS ("
+    f"setweight(to_tsvector('{FORUM_SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{FORUM_SEARCH_CONFIG}', coalesce(content, '')), 'B')"
+    ") STORED"
+)
+
+FORUM_SEARCH_INDEX_DDL = (
+    "CREATE INDEX IF NOT EXISTS ix_forum_posts_search_vector "
+    "ON forum_posts USING GIN (search_vector)"
+)
+
+for _statement in (FORUM_SEARCH_VECTOR_DDL, FORUM_SEARCH_INDEX_DDL):
+    event.listen(
+        ForumPost.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="postgresql")
+    )
+
+
 class ForumVote(Base):
     """Track upvotes/downvotes on forum posts"""
     __tablename__ = "forum_votes"
@@ -1,5 +1,5 @@
 """Module and Lesson models for curriculum content"""
-from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, Enum as SQLEnum, JSON
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, Enum as SQLEnum, JSON, LargeBinary
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.backend.core.database import Base
@@ -79,3 +79,22 @@ class Lesson(Base):
         return f"<Lesson(id={self.id}, title='{self.title}', module_id={self.module_id})>"
 
 
+class LessonRendition(Base):
+    """Pre-rendered HTML of a lesson (see services/lesson_render.py)"""
+    __tablename__ = "lesson_renditions"
+    
+    lesson_id = Column(Integer, ForeignKey("lessons.id", ondelete="CASCADE"), primary_key=True)
+    source_hash = Column(String(64), nullable=False)  # Lesson fields + renderer version it was built from
+    
+    # Rendered content
+    content_html = Column(Text, nullable=False)  # Sanitized HTML
+    toc = Column(JSON, nullable=False)  # [{"level", "id", "title"}] in document order
+    
+    # Pre-compressed JSON response bodies (GET /lessons/{id}?format=html)
+    body_gzip = Column(LargeBinary, nullable=False)
+    body_br = Column(LargeBinary, nullable=True)  # Null when brotli isn't installed
+    
+    rendered_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<LessonRendition(lesson_id={self.lesson_id}, source_hash='{self.source_hash[:8]}')>"
@@ -1,5 +1,5 @@
 """Notification and chat models"""
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.backend.core.database import Base
@@ -20,14 +20,20 @@ class Notification(Base):
     
     # Status
     is_read = Column(Boolean, default=False, nullable=False, index=True)
+    group_count = Column(Integer, default=1, server_default="1", nullable=False)  # >1 for digest rows
     
     # Timestamps
+    # On PostgreSQL the table is range-partitioned by month on created_at (primary key (id, created_at))
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
     read_at = Column(DateTime(timezone=True), nullable=True)
     
     # Relationships
     # user = relationship("User")
     
+    __table_args__ = (
+        Index("ix_notifications_user_unread", "user_id", postgresql_where=text("is_read = false")),
+    )
+    
     def __repr__(self):
         return f"<Notification(id={self.id}, user_id={self.user_id}, type='{self.type}', is_read={self.is_read})>"
 
@@ -0,0 +1,44 @@
+"""Transactional outbox for background event processing"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Enum as SQLEnum, Index
+from sqlalchemy.sql import func
+from app.backend.core.database import Base
+import enum
+
+
+class OutboxStatus(str, enum.Enum):
+    """Outbox event status enumeration"""
+    PENDING = "pending"
+    PROCESSING = "processing"
+    FAILED = "failed"  # Gave up after max attempts; kept for inspection
+
+
+class OutboxEvent(Base):
+    """
+    Domain event written in the same transaction as the change that caused it.
+
+    Workers in services/event_queue.py claim pending rows, run the handler for
+    the event type and delete the row once it has been processed.
+    """
+    __tablename__ = "outbox_events"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    event_type = Column(String(50), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True, index=True)
+    payload = Column(JSON, nullable=True)
+    
+    # Delivery
+    status = Column(SQLEnum(OutboxStatus), default=OutboxStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, server_default="0", nullable=False)
+    last_error = Column(Text, nullable=True)
+    available_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    __table_args__ = (
+        Index('ix_outbox_events_status_available', 'status', 'available_at'),
+    )
+    
+    def __repr__(self):
+        return f"<OutboxEvent(id={self.id}, event_type='{self.event_type}', status='{self.status}')>"
@@ -0,0 +1,19 @@
+"""Pre-render lesson markdown to sanitized HTML with compressed variants (run after seeding)"""
+import argparse
+import asyncio
+
+from app.backend.core.database import AsyncSessionLocal
+from app.backend.services.lesson_render import prerender_lessons
+
+
+async def main(force: bool) -> None:
+    """Render every lesson whose stored rendition is missing or out of date"""
+    async with AsyncSessionLocal() as session:
+        written = await prerender_lessons(session, force=force)
+        print(f"✓ Pre-rendered {written} lessons")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--force", action="store_true", help="Re-render lessons that are already up to date")
+    asyncio.run(main(parser.parse_args().force))
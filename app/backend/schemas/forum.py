@@ -45,6 +45,7 @@ class ForumPostResponse(BaseModel):
     author: AuthorInfo
     reply_count: int = 0
     user_vote: Optional[str] = None  # 'upvote' or 'downvote' or None
+    snippet: Optional[str] = None  # Search results only: escaped HTML with <mark> highlights
 
     class Config:
         from_attributes = True
@@ -53,9 +54,10 @@ class ForumPostResponse(BaseModel):
 class ForumPostListResponse(BaseModel):
     """Schema for paginated forum post list"""
     posts: List[ForumPostResponse]
-    total: int
+    total: Optional[int] = None  # Omitted on cursor pages unless include_total=true
     limit: int
     offset: int
+    next_cursor: Optional[str] = None
 
 
 class ForumVoteCreate(BaseModel):
@@ -28,7 +28,8 @@ class GradingQueueItem(BaseModel):
 class GradingQueueResponse(BaseModel):
     """Schema for grading queue response"""
     items: List[GradingQueueItem]
-    total: int
+    total: Optional[int] = None  # Omitted on cursor pages unless include_total=true
+    next_cursor: Optional[str] = None
 
 
 class GradeSubmission(BaseModel):
@@ -61,5 +62,6 @@ class GradedAttemptResponse(BaseModel):
 class GradingHistoryResponse(BaseModel):
     """Schema for grading history response"""
     items: List[GradedAttemptResponse]
-    total: int
+    total: Optional[int] = None  # Omitted on cursor pages unless include_total=true
+    next_cursor: Optional[str] = None
 
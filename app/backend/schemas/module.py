@@ -19,6 +19,25 @@ class LessonResponse(BaseModel):
         from_attributes = True
 
 
+class LessonTocEntry(BaseModel):
+    """Heading in a lesson's table of contents"""
+    level: int
+    id: str  # Anchor of the heading in content_html
+    title: str
+
+
+class LessonHtmlResponse(BaseModel):
+    """Lesson with content pre-rendered to sanitized HTML"""
+    id: int
+    module_id: int
+    title: str
+    content_html: str
+    toc: List[LessonTocEntry]
+    order_index: int
+    estimated_minutes: Optional[int]
+    lesson_type: str
+
+
 class ModuleResponse(BaseModel):
     """Module response schema"""
     id: int
@@ -3,6 +3,8 @@ from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 
+from app.backend.models.user import UserRole
+
 
 class NotificationResponse(BaseModel):
     """Schema for notification response"""
@@ -13,6 +15,7 @@ class NotificationResponse(BaseModel):
     message: str
     link: Optional[str]
     is_read: bool
+    group_count: int = 1  # Number of notifications collapsed into this digest
     created_at: datetime
     read_at: Optional[datetime]
 
@@ -23,8 +26,9 @@ class NotificationResponse(BaseModel):
 class NotificationListResponse(BaseModel):
     """Schema for paginated notification list"""
     notifications: List[NotificationResponse]
-    total: int
+    total: Optional[int] = None  # Omitted on cursor pages unless include_total=true
     unread_count: int
+    next_cursor: Optional[str] = None
 
 
 class NotificationUpdate(BaseModel):
@@ -32,6 +36,27 @@ class NotificationUpdate(BaseModel):
     is_read: bool = True
 
 
+class NotificationBroadcastRequest(BaseModel):
+    """Schema for sending a notification to many users
+
+    The audience is the union of cohort_id, role and user_ids; at least one is required.
+    """
+    title: str = Field(..., min_length=1, max_length=200)
+    message: str = Field(..., min_length=1)
+    link: Optional[str] = Field(None, max_length=500)
+    cohort_id: Optional[int] = None
+    role: Optional[UserRole] = None
+    user_ids: Optional[List[int]] = Field(None, max_length=10000)
+
+
+class NotificationBroadcastResponse(BaseModel):
+    """Schema for broadcast fan-out results"""
+    recipients: int
+    chunks: int
+    elapsed_ms: float
+    rows_per_second: float
+
+
 class ChatMessageCreate(BaseModel):
     """Schema for creating a chat message"""
     message: str = Field(..., min_length=1, description="User message")
@@ -59,7 +84,8 @@ class ChatMessageResponse(BaseModel):
 class ChatHistoryResponse(BaseModel):
     """Schema for chat history response"""
     messages: List[ChatMessageResponse]
-    total: int
+    total: Optional[int] = None  # Omitted on cursor pages unless include_total=true
+    next_cursor: Optional[str] = None
 
 
 class ConversationResponse(BaseModel):
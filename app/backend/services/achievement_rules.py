@@ -0,0 +1,319 @@
+"""Compiled achievement criteria indexed by event type"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, event, or_
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Set
+import asyncio
+import json
+import logging
+import time
+
+from app.backend.core.cache_hooks import invalidate_after_transaction
+from app.backend.models.achievement import Achievement
+from app.backend.models.analytics import StudentStats
+from app.backend.models.assessment import Assessment
+from app.backend.models.forum import ForumPost
+from app.backend.models.module import Module, Track
+from app.backend.models.progress import UserProgress, QuizAttempt, ProgressStatus
+from app.backend.services.analytics_service import attempt_score_percentage
+from app.backend.services.student_stats_service import current_streak
+
+logger = logging.getLogger(__name__)
+
+# Criteria keys that make an achievement relevant to each event type
+EVENT_CRITERIA = {
+    "module_completed": ("module_completion", "track_completion"),
+    "assessment_submitted": ("perfect_score", "score_threshold"),
+    "forum_post": ("forum_help", "forum_engagement"),
+    "streak": ("streak",),
+    "track_completed": ("track_completion",),
+}
+
+# When criteria name several kinds, the first one in this order is evaluated
+CRITERIA_PRIORITY = (
+    "module_completion",
+    "perfect_score",
+    "score_threshold",
+    "forum_help",
+    "track_completion",
+    "streak",
+)
+
+# Track names used in seeded criteria, mapped to Track values
+TRACK_ALIASES = {
+    "beginner": Track.USER,
+    "power_user": Track.ANALYST,
+    "analyst": Track.ANALYST,
+    "developer": Track.DEVELOPER,
+    "architect": Track.ARCHITECT,
+}
+
+# Backstop for achievements changed outside this process (e.g. seed scripts)
+ACHIEVEMENT_INDEX_TTL_SECONDS = 300
+
+
+class CompiledAchievement:
+    """An active achievement with its criteria compiled to a predicate over user facts"""
+
+    def __init__(
+        self,
+        achievement: Achievement,
+        facts: Iterable[str],
+        predicate: Callable[[Dict[str, Any]], bool]
+    ):
+        self.id = achievement.id
+        self.name = achievement.name
+        self.description = achievement.description
+        self.icon = achievement.icon
+        self.points = achievement.points or 0
+        self.facts: FrozenSet[str] = frozenset(facts)
+        self.predicate = predicate
+
+    def matches(self, facts: Dict[str, Any]) -> bool:
+        return self.predicate(facts)
+
+    def __repr__(self):
+        return f"<CompiledAchievement(id={self.id}, facts={sorted(self.facts)})>"
+
+
+def _resolve_track(name: str) -> Optional[Track]:
+    """Map a criteria track name to a Track (accepts aliases and enum values)"""
+    if name in TRACK_ALIASES:
+        return TRACK_ALIASES[name]
+    try:
+        return Track(str(name).upper())
+    except ValueError:
+        return None
+
+
+def _track_completed(facts: Dict[str, Any], track: Track) -> bool:
+    module_ids = facts["track_module_ids"].get(track, set())
+    return bool(module_ids) and module_ids <= facts["completed_module_ids"]
+
+
+def parse_criteria(achievement: Achievement) -> Optional[Dict]:
+    """Parse an achievement's criteria (stored as a dict or a JSON string)"""
+    if not achievement.criteria:
+        return None
+    try:
+        criteria = achievement.criteria if isinstance(achievement.criteria, dict) else json.loads(achievement.criteria)
+    except (json.JSONDecodeError, TypeError):
+        logger.warning(f"Achievement {achievement.id} has invalid criteria JSON")
+        return None
+    return criteria if isinstance(criteria, dict) else None
+
+
+def compile_achievement(achievement: Achievement, criteria: Dict) -> Optional[CompiledAchievement]:
+    """
+    Compile parsed criteria into a predicate over user facts.
+
+    Returns None for unsupported criteria (such achievements can never be
+    unlocked automatically).
+    """
+    kind = next((key for key in CRITERIA_PRIORITY if key in criteria), None)
+    if kind is None:
+        return None
+    params = criteria[kind] or {}
+
+    if kind == "module_completion":
+        if "module_id" in params:
+            module_id = params["module_id"]
+            return CompiledAchievement(
+                achievement, ["completed_module_ids"],
+                lambda facts: module_id in facts["completed_module_ids"]
+            )
+        if "any_module" in params:
+            return CompiledAchievement(
+                achievement, ["completed_module_ids"],
+                lambda facts: bool(facts["completed_module_ids"])
+            )
+
+    elif kind == "perfect_score":
+        if "any_assessment" in params:
+            return CompiledAchievement(
+                achievement, ["perfect_module_ids"],
+                lambda facts: bool(facts["perfect_module_ids"])
+            )
+        if "module_id" in params:
+            module_id = params["module_id"]
+            return CompiledAchievement(
+                achievement, ["perfect_module_ids"],
+                lambda facts: module_id in facts["perfect_module_ids"]
+            )
+
+    elif kind == "score_threshold":
+        threshold = params.get("min_score", 70)
+        return CompiledAchievement(
+            achievement, ["best_score"],
+            lambda facts: facts["best_score"] is not None and facts["best_score"] >= threshold
+        )
+
+    elif kind == "forum_help":
+        target_posts = params.get("posts", 10)
+        return CompiledAchievement(
+            achievement, ["helpful_post_count"],
+            lambda facts: facts["helpful_post_count"] >= target_posts
+        )
+
+    elif kind == "track_completion":
+        if "track_name" in params:
+            track = _resolve_track(params["track_name"])
+            if track is None:
+                logger.warning(f"Achievement {achievement.id} references unknown track {params['track_name']!r}")
+                return None
+            return CompiledAchievement(
+                achievement, ["completed_module_ids", "track_module_ids"],
+                lambda facts: _track_completed(facts, track)
+            )
+        if "all_tracks" in params:
+            return CompiledAchievement(
+                achievement, ["completed_module_ids", "track_module_ids"],
+                lambda facts: bool(facts["track_module_ids"]) and all(
+                    _track_completed(facts, track) for track in facts["track_module_ids"]
+                )
+            )
+
+    elif kind == "streak":
+        target_days = params.get("days", 7)
+        return CompiledAchievement(
+            achievement, ["current_streak_days"],
+            lambda facts: facts["current_streak_days"] >= target_days
+        )
+
+    return None
+
+
+class AchievementIndex:
+    """Compiled achievements grouped by the event types they respond to"""
+
+    def __init__(self, achievements: Iterable[Achievement]):
+        self.by_event: Dict[str, List[CompiledAchievement]] = {event_type: [] for event_type in EVENT_CRITERIA}
+        self.built_at = time.monotonic()
+        for achievement in achievements:
+            criteria = parse_criteria(achievement)
+            compiled = compile_achievement(achievement, criteria) if criteria else None
+            if compiled is None:
+                continue
+            for event_type, keys in EVENT_CRITERIA.items():
+                if any(key in criteria for key in keys):
+                    self.by_event[event_type].append(compiled)
+
+    def for_event(self, event_type: str) -> List[CompiledAchievement]:
+        return self.by_event.get(event_type, [])
+
+    def is_expired(self) -> bool:
+        return time.monotonic() - self.built_at > ACHIEVEMENT_INDEX_TTL_SECONDS
+
+
+_index: Optional[AchievementIndex] = None
+_index_generation = 0
+_index_lock = asyncio.Lock()
+
+
+def invalidate_achievement_index() -> None:
+    """Drop the compiled index; the next event rebuilds it"""
+    global _index, _index_generation
+    _index = None
+    _index_generation += 1
+
+
+@event.listens_for(Achievement, "after_insert")
+@event.listens_for(Achievement, "after_update")
+@event.listens_for(Achievement, "after_delete")
+def _on_achievement_changed(mapper, connection, target):
+    # After commit: an index rebuilt before then would read the old rows under the new generation
+    invalidate_after_transaction(target, "achievement_index", invalidate_achievement_index)
+
+
+async def get_achievement_index(db: AsyncSession) -> AchievementIndex:
+    """Return the compiled index, building it from active achievements if needed"""
+    global _index
+    index = _index
+    if index is not None and not index.is_expired():
+        return index
+
+    async with _index_lock:
+        if _index is not None and not _index.is_expired():
+            return _index
+        generation = _index_generation
+        result = await db.execute(select(Achievement).where(Achievement.is_active == True))
+        index = AchievementIndex(result.scalars().all())
+        # Don't install an index that was invalidated while it was being built
+        if generation == _index_generation:
+            _index = index
+        return index
+
+
+async def _completed_module_ids(db: AsyncSession, user_id: int) -> Set[int]:
+    result = await db.execute(
+        select(UserProgress.module_id).where(
+            UserProgress.user_id == user_id,
+            UserProgress.status == ProgressStatus.COMPLETED
+        )
+    )
+    return set(result.scalars().all())
+
+
+async def _perfect_module_ids(db: AsyncSession, user_id: int) -> Set[int]:
+    result = await db.execute(
+        select(Assessment.module_id)
+        .join(QuizAttempt, QuizAttempt.assessment_id == Assessment.id)
+        .where(
+            QuizAttempt.user_id == user_id,
+            Assessment.points > 0,
+            QuizAttempt.points_earned >= Assessment.points
+        )
+        .distinct()
+    )
+    return set(result.scalars().all())
+
+
+async def _best_score(db: AsyncSession, user_id: int) -> Optional[float]:
+    result = await db.execute(
+        select(func.max(attempt_score_percentage))
+        .select_from(QuizAttempt)
+        .join(Assessment, Assessment.id == QuizAttempt.assessment_id)
+        .where(QuizAttempt.user_id == user_id)
+    )
+    return result.scalar()
+
+
+async def _helpful_post_count(db: AsyncSession, user_id: int) -> int:
+    # Helpful = marked solved or upvoted at least once
+    result = await db.execute(
+        select(func.count(ForumPost.id)).where(
+            ForumPost.user_id == user_id,
+            or_(ForumPost.is_solved == True, ForumPost.upvotes > 0)
+        )
+    )
+    return result.scalar() or 0
+
+
+async def _track_module_ids(db: AsyncSession, user_id: int) -> Dict[Track, Set[int]]:
+    result = await db.execute(select(Module.track, Module.id))
+    modules_by_track: Dict[Track, Set[int]] = {}
+    for track, module_id in result.all():
+        modules_by_track.setdefault(track, set()).add(module_id)
+    return modules_by_track
+
+
+async def _current_streak_days(db: AsyncSession, user_id: int) -> int:
+    stats = await db.get(StudentStats, user_id)
+    return current_streak(stats) if stats else 0
+
+
+FACT_LOADERS: Dict[str, Callable[[AsyncSession, int], Any]] = {
+    "completed_module_ids": _completed_module_ids,
+    "perfect_module_ids": _perfect_module_ids,
+    "best_score": _best_score,
+    "helpful_post_count": _helpful_post_count,
+    "track_module_ids": _track_module_ids,
+    "current_streak_days": _current_streak_days,
+}
+
+
+async def load_facts(db: AsyncSession, user_id: int, fact_names: Iterable[str]) -> Dict[str, Any]:
+    """Fetch each requested fact once, however many rules depend on it"""
+    facts = {}
+    for name in sorted(set(fact_names)):
+        facts[name] = await FACT_LOADERS[name](db, user_id)
+    return facts
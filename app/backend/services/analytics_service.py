@@ -0,0 +1,325 @@
+"""Analytics aggregation service backed by grouped SQL queries"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func, case, literal
+from typing import Any, Dict, Optional
+from datetime import datetime, timedelta
+import logging
+
+from app.backend.core.config import settings
+from app.backend.core.database import AsyncSessionLocal
+from app.backend.core.scheduler import PeriodicJob
+from app.backend.models.user import User, UserRole
+from app.backend.models.module import Module
+from app.backend.models.progress import UserProgress, QuizAttempt, ProgressStatus
+from app.backend.models.assessment import Assessment
+from app.backend.models.cohort import CohortMember
+from app.backend.models.analytics import PlatformAnalyticsSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Total modules in the curriculum, used as the denominator for progress rates
+CURRICULUM_MODULE_COUNT = 17
+# Members with no progress activity for this long are flagged as at risk
+INACTIVITY_THRESHOLD = timedelta(days=7)
+TOP_PERFORMER_LIMIT = 5
+
+# Score of a graded attempt as a percentage of the assessment's points.
+# Must be selected from QuizAttempt joined to Assessment.
+attempt_score_percentage = QuizAttempt.points_earned * 100.0 / func.nullif(Assessment.points, 0)
+
+
+def _cohort_student_stats(cohort_id: int, active_since: datetime):
+    """
+    Build a subquery with one aggregated row per cohort member.
+
+    Progress and attempt rows are grouped per user inside the database, so the
+    result size depends on the number of members rather than on how much
+    history they have accumulated.
+    """
+    member_ids = select(CohortMember.user_id).where(CohortMember.cohort_id == cohort_id)
+
+    progress = (
+        select(
+            UserProgress.user_id.label("user_id"),
+            func.count(UserProgress.id).label("progress_records"),
+            func.count(case((UserProgress.status == ProgressStatus.COMPLETED, 1))).label("completed"),
+            func.count(case((UserProgress.status == ProgressStatus.IN_PROGRESS, 1))).label("in_progress"),
+            func.max(UserProgress.last_accessed_at).label("last_activity"),
+        )
+        .where(UserProgress.user_id.in_(member_ids))
+        .group_by(UserProgress.user_id)
+        .subquery()
+    )
+
+    scores = (
+        select(
+            QuizAttempt.user_id.label("user_id"),
+            func.sum(attempt_score_percentage).label("score_sum"),
+            func.count(attempt_score_percentage).label("scored_attempts"),
+        )
+        .join(Assessment, Assessment.id == QuizAttempt.assessment_id)
+        .where(QuizAttempt.user_id.in_(member_ids))
+        .group_by(QuizAttempt.user_id)
+        .subquery()
+    )
+
+    risk_reason = case(
+        (progress.c.user_id.is_(None), literal("No activity")),
+        (progress.c.last_activity < active_since, literal("Inactive >7 days")),
+        else_=None
+    )
+
+    return (
+        select(
+            CohortMember.user_id.label("user_id"),
+            func.coalesce(progress.c.completed, 0).label("completed"),
+            func.coalesce(progress.c.in_progress, 0).label("in_progress"),
+            progress.c.user_id.isnot(None).label("has_progress"),
+            (progress.c.last_activity >= active_since).label("is_active"),
+            risk_reason.label("risk_reason"),
+            func.coalesce(scores.c.score_sum, 0.0).label("score_sum"),
+            func.coalesce(scores.c.scored_attempts, 0).label("scored_attempts"),
+        )
+        .outerjoin(progress, progress.c.user_id == CohortMember.user_id)
+        .outerjoin(scores, scores.c.user_id == CohortMember.user_id)
+        .where(CohortMember.cohort_id == cohort_id)
+        .subquery()
+    )
+
+
+async def compute_cohort_analytics(db: AsyncSession, cohort_id: int) -> Dict[str, Any]:
+    """
+    Compute cohort analytics with grouped SQL.
+
+    Runs three queries regardless of cohort size: one summary row over the
+    per-student aggregates, the top performers and the at-risk members.
+
+    Returns:
+        Keyword arguments for CohortAnalyticsResponse (without cohort id/name)
+    """
+    active_since = datetime.now() - INACTIVITY_THRESHOLD
+    stats = _cohort_student_stats(cohort_id, active_since)
+
+    result = await db.execute(
+        select(
+            func.count(stats.c.user_id),
+            func.count(case((stats.c.is_active, 1))),
+            func.coalesce(func.sum(stats.c.completed), 0),
+            func.count(case((stats.c.completed > 0, 1))),
+            func.count(case((stats.c.in_progress > 0, 1))),
+            func.count(case((stats.c.has_progress, 1))),
+            func.coalesce(func.sum(stats.c.score_sum), 0.0),
+            func.coalesce(func.sum(stats.c.scored_attempts), 0),
+        )
+    )
+    (
+        total_students,
+        active_students,
+        completed_modules,
+        students_completed,
+        students_in_progress,
+        students_with_progress,
+        score_sum,
+        scored_attempts,
+    ) = result.one()
+
+    if not total_students:
+        return {
+            "total_students": 0,
+            "active_students": 0,
+            "average_progress": 0.0,
+            "average_score": 0.0,
+            "completion_rate": 0.0,
+            "students_by_progress": {},
+            "top_performers": [],
+            "at_risk_students": [],
+        }
+
+    result = await db.execute(
+        select(stats.c.user_id, stats.c.completed)
+        .where(stats.c.completed > 0)
+        .order_by(stats.c.completed.desc(), stats.c.user_id)
+        .limit(TOP_PERFORMER_LIMIT)
+    )
+    top_performers = [
+        {"user_id": user_id, "modules_completed": completed}
+        for user_id, completed in result.all()
+    ]
+
+    result = await db.execute(
+        select(stats.c.user_id, stats.c.risk_reason)
+        .where(stats.c.risk_reason.isnot(None))
+        .order_by(stats.c.user_id)
+    )
+    at_risk_students = [
+        {"user_id": user_id, "reason": reason}
+        for user_id, reason in result.all()
+    ]
+
+    completion_rate = completed_modules / (total_students * CURRICULUM_MODULE_COUNT) * 100
+    average_score = score_sum / scored_attempts if scored_attempts else 0.0
+
+    return {
+        "total_students": total_students,
+        "active_students": active_students,
+        "average_progress": round(completion_rate, 2),
+        "average_score": round(average_score, 2),
+        "completion_rate": round(completion_rate, 2),
+        "students_by_progress": {
+            "completed": students_completed,
+            "in_progress": students_in_progress,
+            "not_started": total_students - students_with_progress,
+        },
+        "top_performers": top_performers,
+        "at_risk_students": at_risk_students,
+    }
+
+
+async def compute_platform_metrics(db: AsyncSession) -> Dict[str, Any]:
+    """
+    Compute platform-wide analytics in two round trips.
+
+    All scalar metrics are scalar subqueries of a single SELECT; per-track
+    module counts and completion rates come from one grouped query.
+
+    Returns:
+        Keyword arguments for PlatformAnalyticsResponse (without computed_at)
+    """
+    thirty_days_ago = datetime.now() - timedelta(days=30)
+
+    result = await db.execute(
+        select(
+            select(func.count(User.id)).scalar_subquery(),
+            select(func.count(User.id)).where(User.role == UserRole.STUDENT).scalar_subquery(),
+            select(func.count(User.id)).where(User.role == UserRole.INSTRUCTOR).scalar_subquery(),
+            select(func.count(User.id)).where(User.created_at >= thirty_days_ago).scalar_subquery(),
+            select(func.count(Module.id)).scalar_subquery(),
+            select(func.count(Assessment.id)).scalar_subquery(),
+            select(func.count(QuizAttempt.id)).scalar_subquery(),
+            select(func.avg(attempt_score_percentage))
+            .select_from(QuizAttempt)
+            .join(Assessment, Assessment.id == QuizAttempt.assessment_id)
+            .scalar_subquery(),
+            select(func.count(case((UserProgress.status == ProgressStatus.COMPLETED, 1)))).scalar_subquery(),
+            select(func.count(UserProgress.id)).scalar_subquery(),
+            select(func.count(func.distinct(UserProgress.user_id)))
+            .where(UserProgress.last_accessed_at >= thirty_days_ago)
+            .scalar_subquery(),
+        )
+    )
+    (
+        total_users,
+        total_students,
+        total_instructors,
+        new_users_last_30_days,
+        total_modules,
+        total_assessments,
+        total_attempts,
+        average_score,
+        completed_modules,
+        total_progress_records,
+        active_users_last_30_days,
+    ) = result.one()
+
+    result = await db.execute(
+        select(
+            Module.track,
+            func.count(func.distinct(Module.id)),
+            func.count(case((UserProgress.status == ProgressStatus.COMPLETED, 1))),
+            func.count(UserProgress.id),
+        )
+        .outerjoin(UserProgress, UserProgress.module_id == Module.id)
+        .group_by(Module.track)
+    )
+    modules_by_track = {}
+    completion_by_track = {}
+    for track, module_count, completed, total in result.all():
+        if not track:
+            continue
+        track_name = track.value if hasattr(track, "value") else track
+        modules_by_track[track_name] = module_count
+        if total > 0:
+            completion_by_track[track_name] = round(completed / total * 100, 2)
+
+    average_completion_rate = (
+        completed_modules / total_progress_records * 100 if total_progress_records else 0.0
+    )
+
+    return {
+        "total_users": total_users,
+        "total_students": total_students,
+        "total_instructors": total_instructors,
+        "total_modules": total_modules,
+        "total_assessments": total_assessments,
+        "total_attempts": total_attempts,
+        "average_completion_rate": round(average_completion_rate, 2),
+        "average_score": round(float(average_score or 0.0), 2),
+        "active_users_last_30_days": active_users_last_30_days,
+        "new_users_last_30_days": new_users_last_30_days,
+        "modules_by_track": modules_by_track,
+        "completion_by_track": completion_by_track,
+    }
+
+
+async def refresh_platform_snapshot(db: AsyncSession) -> PlatformAnalyticsSnapshot:
+    """
+    Recompute platform analytics and store them as the latest snapshot.
+
+    Snapshots older than PLATFORM_ANALYTICS_RETENTION_DAYS are pruned in the
+    same transaction. Commits.
+    """
+    snapshot = PlatformAnalyticsSnapshot(metrics=await compute_platform_metrics(db))
+    db.add(snapshot)
+    await db.flush()
+
+    cutoff = datetime.now() - timedelta(days=settings.PLATFORM_ANALYTICS_RETENTION_DAYS)
+    await db.execute(
+        delete(PlatformAnalyticsSnapshot).where(
+            PlatformAnalyticsSnapshot.id != snapshot.id,
+            PlatformAnalyticsSnapshot.computed_at < cutoff
+        )
+    )
+    await db.commit()
+    await db.refresh(snapshot)
+    return snapshot
+
+
+async def get_latest_platform_snapshot(db: AsyncSession) -> Optional[PlatformAnalyticsSnapshot]:
+    """Return the most recent platform analytics snapshot, if any"""
+    result = await db.execute(
+        select(PlatformAnalyticsSnapshot)
+        .order_by(PlatformAnalyticsSnapshot.computed_at.desc(), PlatformAnalyticsSnapshot.id.desc())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+def platform_snapshot_is_stale(snapshot: Optional[PlatformAnalyticsSnapshot]) -> bool:
+    """
+    Whether a snapshot should be recomputed on read.
+
+    Missing snapshots are always stale. With the background refresh disabled
+    every read recomputes; otherwise a snapshot is stale once two refresh
+    intervals have passed (e.g. the job stopped running).
+    """
+    if snapshot is None:
+        return True
+    interval = settings.PLATFORM_ANALYTICS_REFRESH_SECONDS
+    if interval <= 0:
+        return True
+    computed_at = snapshot.computed_at
+    now = datetime.now(computed_at.tzinfo) if computed_at.tzinfo else datetime.now()
+    return now - computed_at > timedelta(seconds=interval * 2)
+
+
+async def _refresh_platform_snapshot_job() -> None:
+    async with AsyncSessionLocal() as db:
+        snapshot = await refresh_platform_snapshot(db)
+        logger.info(f"Refreshed platform analytics snapshot {snapshot.id}")
+
+
+platform_snapshot_job = PeriodicJob(
+    "platform-analytics-snapshot",
+    settings.PLATFORM_ANALYTICS_REFRESH_SECONDS,
+    _refresh_platform_snapshot_job
+)
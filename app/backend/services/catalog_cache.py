@@ -0,0 +1,138 @@
+"""Versioned in-process cache of serialized curriculum catalog responses"""
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Tuple, Union
+import hashlib
+import logging
+import time
+
+from sqlalchemy import event
+
+from app.backend.core.cache_hooks import KeyedLocks, invalidate_after_transaction
+from app.backend.core.config import settings
+from app.backend.models.assessment import Assessment
+from app.backend.models.module import Module, Lesson
+
+logger = logging.getLogger(__name__)
+
+
+# What a builder returns: a body, or a body plus pre-compressed variants by content-coding
+CatalogBody = Union[bytes, Tuple[bytes, Dict[str, bytes]]]
+
+
+class CatalogEntry:
+    """A serialized JSON response body, its pre-compressed variants and strong ETags"""
+
+    def __init__(self, body: CatalogBody, version: int, expires_at: float):
+        self.body, self.encoded = body if isinstance(body, tuple) else (body, {})
+        self._digest = hashlib.sha256(self.body).hexdigest()[:32]
+        self.etag = f'"{self._digest}"'
+        self.version = version
+        self.expires_at = expires_at
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        """Strong ETag of the representation in `encoding` (None = identity)"""
+        return f'"{self._digest}-{encoding}"' if encoding else self.etag
+
+
+class CatalogCache:
+    """
+    Serialized module/lesson responses keyed by endpoint and id.
+
+    Catalog content is the same for every user and changes only when the
+    curriculum is (re)seeded, so each response is built once and reused until
+    the content version is bumped. Any Module, Lesson or Assessment write in
+    this process bumps the version once its transaction commits (see the
+    mapper listeners below);
+    CATALOG_CACHE_TTL_SECONDS bounds how long a change made by another
+    process, e.g. a seeding script, can go unnoticed.
+
+    ETags are a hash of the body rather than of the version, so every API
+    process hands out the same ETag for the same content.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.version = 0
+        self._entries: Dict[Hashable, CatalogEntry] = {}
+        self._locks = KeyedLocks()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def bump(self) -> None:
+        """Invalidate every cached response"""
+        self.version += 1
+        self._entries.clear()
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._locks.clear()
+
+    def _fresh(self, key: Hashable) -> Optional[CatalogEntry]:
+        entry = self._entries.get(key)
+        if entry is None or entry.version != self.version or time.monotonic() >= entry.expires_at:
+            return None
+        return entry
+
+    async def get_or_build(self, key: Hashable, build: Callable[[], Awaitable[CatalogBody]]) -> CatalogEntry:
+        """
+        Return the cached entry for `key`, building it with `build()` on a miss.
+
+        Concurrent misses for the same key wait for a single build. Exceptions
+        raised by `build` (e.g. a 404) propagate and are not cached.
+        """
+        entry = self._fresh(key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        async with self._locks.hold(key):
+            entry = self._fresh(key)
+            if entry is not None:
+                self.hits += 1
+                return entry
+            self.misses += 1
+            version = self.version
+            entry = CatalogEntry(await build(), version, time.monotonic() + self.ttl_seconds)
+            # Don't install a response that was invalidated while it was being built
+            if self.enabled and version == self.version:
+                self._entries[key] = entry
+            return entry
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "version": self.version,
+            "locks": len(self._locks),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag (RFC 9110 13.1.2)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+catalog_cache = CatalogCache(settings.CATALOG_CACHE_TTL_SECONDS)
+
+
+@event.listens_for(Module, "after_insert")
+@event.listens_for(Module, "after_update")
+@event.listens_for(Module, "after_delete")
+@event.listens_for(Lesson, "after_insert")
+@event.listens_for(Lesson, "after_update")
+@event.listens_for(Lesson, "after_delete")
+@event.listens_for(Assessment, "after_insert")
+@event.listens_for(Assessment, "after_update")
+@event.listens_for(Assessment, "after_delete")
+def _on_catalog_changed(mapper, connection, target):
+    # Module detail includes has_assessment, so assessments count as catalog content
+    invalidate_after_transaction(target, "catalog", catalog_cache.bump)
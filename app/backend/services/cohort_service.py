@@ -0,0 +1,198 @@
+"""Cohort hydration service for building cohort responses in batches"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import Dict, List, Optional, Sequence
+from datetime import date
+import logging
+
+from app.backend.models.user import User
+from app.backend.models.cohort import Cohort, CohortMember, CohortRole
+from app.backend.schemas.cohort import CohortResponse, CohortMemberResponse
+
+logger = logging.getLogger(__name__)
+
+
+def calculate_is_active(start_date: Optional[date], end_date: Optional[date]) -> bool:
+    """Calculate if cohort is active based on dates"""
+    if start_date is None and end_date is None:
+        return True  # No dates set, default to active
+
+    today = date.today()
+
+    # If only start_date is set, check if today >= start_date
+    if start_date is not None and end_date is None:
+        return today >= start_date
+
+    # If only end_date is set, check if today <= end_date
+    if start_date is None and end_date is not None:
+        return today <= end_date
+
+    # Both dates set, check if today is between them
+    return start_date <= today <= end_date
+
+
+def calculate_cohort_status(start_date: Optional[date], end_date: Optional[date]) -> str:
+    """Calculate cohort status: 'active', 'upcoming', or 'inactive'"""
+    if start_date is None and end_date is None:
+        return "active"  # No dates set, default to active
+
+    today = date.today()
+
+    # If only start_date is set
+    if start_date is not None and end_date is None:
+        if today < start_date:
+            return "upcoming"
+        elif today >= start_date:
+            return "active"
+
+    # If only end_date is set
+    if start_date is None and end_date is not None:
+        if today <= end_date:
+            return "active"
+        else:
+            return "inactive"
+
+    # Both dates set
+    if today < start_date:
+        return "upcoming"
+    elif start_date <= today <= end_date:
+        return "active"
+    else:
+        return "inactive"
+
+
+async def load_cohort_members(
+    db: AsyncSession,
+    cohort_ids: Sequence[int]
+) -> Dict[int, List[CohortMemberResponse]]:
+    """
+    Load members and their user summaries for many cohorts in one query.
+
+    Returns a mapping of cohort id to member responses; cohorts without
+    members map to an empty list.
+    """
+    members_by_cohort: Dict[int, List[CohortMemberResponse]] = {
+        cohort_id: [] for cohort_id in cohort_ids
+    }
+    if not cohort_ids:
+        return members_by_cohort
+
+    result = await db.execute(
+        select(
+            CohortMember,
+            User.id,
+            User.email,
+            User.full_name,
+            User.username,
+        )
+        .outerjoin(User, User.id == CohortMember.user_id)
+        .where(CohortMember.cohort_id.in_(list(cohort_ids)))
+        .order_by(CohortMember.cohort_id, CohortMember.id)
+    )
+
+    for member, user_id, email, full_name, username in result.all():
+        members_by_cohort.setdefault(member.cohort_id, []).append(
+            CohortMemberResponse(
+                id=member.id,
+                cohort_id=member.cohort_id,
+                user_id=member.user_id,
+                role=member.role,
+                joined_at=member.joined_at,
+                user={
+                    "id": user_id,
+                    "email": email,
+                    "full_name": full_name,
+                    "username": username
+                } if user_id is not None else None
+            )
+        )
+
+    return members_by_cohort
+
+
+async def sync_cohort_active_flags(db: AsyncSession, cohorts: Sequence[Cohort]) -> None:
+    """
+    Bring stored is_active flags in line with cohort dates.
+
+    All stale cohorts are written in a single commit and reloaded with a
+    single query (instead of one commit and refresh per cohort).
+    """
+    stale_ids = []
+    for cohort in cohorts:
+        calculated_is_active = calculate_is_active(cohort.start_date, cohort.end_date)
+        if calculated_is_active != cohort.is_active:
+            cohort.is_active = calculated_is_active
+            stale_ids.append(cohort.id)
+
+    if not stale_ids:
+        return
+
+    await db.commit()
+    # Reload server-generated columns (updated_at) for the touched rows
+    await db.execute(
+        select(Cohort)
+        .where(Cohort.id.in_(stale_ids))
+        .execution_options(populate_existing=True)
+    )
+
+
+def build_cohort_response(
+    cohort: Cohort,
+    members: List[CohortMemberResponse]
+) -> CohortResponse:
+    """Build a CohortResponse from a cohort and its already-loaded members"""
+    return CohortResponse(
+        id=cohort.id,
+        name=cohort.name,
+        description=cohort.description,
+        start_date=cohort.start_date,
+        end_date=cohort.end_date,
+        is_active=cohort.is_active,
+        status=calculate_cohort_status(cohort.start_date, cohort.end_date),
+        cancelled_at=cohort.cancelled_at,
+        created_by=cohort.created_by,
+        created_at=cohort.created_at,
+        updated_at=cohort.updated_at,
+        members=members,
+        member_count=len(members),
+        student_count=sum(1 for m in members if m.role == CohortRole.STUDENT.value),
+        instructor_count=sum(1 for m in members if m.role == CohortRole.INSTRUCTOR.value)
+    )
+
+
+async def hydrate_cohorts(
+    db: AsyncSession,
+    cohorts: Sequence[Cohort],
+    sync_active: bool = True
+) -> List[CohortResponse]:
+    """
+    Build CohortResponse objects for a list of cohorts.
+
+    Uses a constant number of queries regardless of how many cohorts or
+    members are involved: at most one commit plus one reload for stale
+    is_active flags, and one joined query for members and user summaries.
+
+    Args:
+        db: Database session
+        cohorts: Cohorts to hydrate, in the order they should be returned
+        sync_active: Recalculate is_active from dates and persist changes
+    """
+    if sync_active:
+        await sync_cohort_active_flags(db, cohorts)
+
+    members_by_cohort = await load_cohort_members(db, [cohort.id for cohort in cohorts])
+
+    return [
+        build_cohort_response(cohort, members_by_cohort.get(cohort.id, []))
+        for cohort in cohorts
+    ]
+
+
+async def hydrate_cohort(
+    db: AsyncSession,
+    cohort: Cohort,
+    sync_active: bool = True
+) -> CohortResponse:
+    """Build a CohortResponse for a single cohort"""
+    responses = await hydrate_cohorts(db, [cohort], sync_active=sync_active)
+    return responses[0]
@@ -0,0 +1,191 @@
+"""Versioned in-process cache of AI assistant context snapshots and system prompts"""
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+import logging
+import time
+
+from sqlalchemy import event
+
+from app.backend.core.cache_hooks import KeyedLocks, invalidate_after_transaction
+from app.backend.core.config import settings
+from app.backend.models.achievement import Achievement, UserAchievement
+from app.backend.models.assessment import Assessment
+from app.backend.models.forum import ForumPost
+from app.backend.models.progress import QuizAttempt, UserProgress
+from app.backend.services.catalog_cache import catalog_cache
+
+logger = logging.getLogger(__name__)
+
+# (user id, conversation id)
+PromptKey = Tuple[int, int]
+
+
+class UserContextCache:
+    """
+    Per-user learning context snapshots, the shared curriculum summary and
+    formatted system prompts for the AI assistant.
+
+    A user's snapshot (progress, recent attempts, achievements, forum posts)
+    is versioned by that user's writes: any UserProgress, QuizAttempt,
+    UserAchievement or ForumPost write in this process bumps the owner's
+    version once its transaction commits (see the mapper listeners below). The curriculum summary is the
+    same for every user and follows the catalog content version. Formatted
+    prompts are kept per conversation and reused while the versions and the
+    request's own context are unchanged. USER_CONTEXT_CACHE_TTL_SECONDS
+    bounds how long a change made by another process can go unnoticed.
+    """
+
+    def __init__(self, ttl_seconds: float, max_prompts: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_prompts = max_prompts
+        self.generation = 0
+        self._versions: Dict[int, int] = {}
+        self._snapshots: Dict[int, Tuple[Tuple[int, int], float, Dict[str, Any]]] = {}
+        self._curriculum: Optional[Tuple[int, float, List[Dict[str, Any]]]] = None
+        self._prompts: "OrderedDict[PromptKey, Tuple[Hashable, float, str]]" = OrderedDict()
+        self._locks = KeyedLocks()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def version(self, user_id: int) -> Tuple[int, int]:
+        """Current snapshot version for a user"""
+        return (self.generation, self._versions.get(user_id, 0))
+
+    def bump(self, user_id: int) -> None:
+        """Invalidate one user's snapshot and prompts"""
+        self._versions[user_id] = self._versions.get(user_id, 0) + 1
+        self._snapshots.pop(user_id, None)
+
+    def bump_all(self) -> None:
+        """Invalidate every user's snapshot, e.g. after shared achievement or assessment edits"""
+        self.generation += 1
+        self._snapshots.clear()
+
+    def clear(self) -> None:
+        self._versions.clear()
+        self._snapshots.clear()
+        self._curriculum = None
+        self._prompts.clear()
+        self._locks.clear()
+
+    async def _coalesced(self, key: Hashable, lookup: Callable[[], Any], build: Callable[[], Awaitable[Any]]) -> Any:
+        value = lookup()
+        if value is not None:
+            self.hits += 1
+            return value
+        async with self._locks.hold(key):
+            value = lookup()
+            if value is not None:
+                self.hits += 1
+                return value
+            self.misses += 1
+            return await build()
+
+    async def snapshot(self, user_id: int, build: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Return the user's cached snapshot, building it with `build()` on a miss.
+
+        Concurrent misses for the same user wait for a single build. A
+        snapshot invalidated while it was being built is returned but not
+        cached; exceptions propagate and are not cached.
+        """
+        def lookup():
+            entry = self._snapshots.get(user_id)
+            if entry and entry[0] == self.version(user_id) and time.monotonic() < entry[1]:
+                return entry[2]
+            return None
+
+        async def load():
+            version = self.version(user_id)
+            snapshot = await build()
+            if self.enabled and version == self.version(user_id):
+                self._snapshots[user_id] = (version, time.monotonic() + self.ttl_seconds, snapshot)
+            return snapshot
+
+        return await self._coalesced(("snapshot", user_id), lookup, load)
+
+    async def curriculum(self, build: Callable[[], Awaitable[List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+        """Return the published-module summary shared by all users"""
+        def lookup():
+            entry = self._curriculum
+            if entry and entry[0] == catalog_cache.version and time.monotonic() < entry[1]:
+                return entry[2]
+            return None
+
+        async def load():
+            version = catalog_cache.version
+            modules = await build()
+            if self.enabled and version == catalog_cache.version:
+                self._curriculum = (version, time.monotonic() + self.ttl_seconds, modules)
+            return modules
+
+        return await self._coalesced("curriculum", lookup, load)
+
+    def prompt_fingerprint(self, user_id: int, request_context: Hashable) -> Hashable:
+        """What a cached prompt depends on besides the conversation"""
+        return (self.version(user_id), catalog_cache.version, request_context)
+
+    def get_prompt(self, user_id: int, conversation_id: int, fingerprint: Hashable) -> Optional[str]:
+        key = (user_id, conversation_id)
+        entry = self._prompts.get(key)
+        if entry is None or entry[0] != fingerprint or time.monotonic() >= entry[1]:
+            self.misses += 1
+            return None
+        self._prompts.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+
+    def put_prompt(self, user_id: int, conversation_id: int, fingerprint: Hashable, prompt: str) -> None:
+        if not self.enabled or self.max_prompts <= 0:
+            return
+        key = (user_id, conversation_id)
+        self._prompts[key] = (fingerprint, time.monotonic() + self.ttl_seconds, prompt)
+        self._prompts.move_to_end(key)
+        while len(self._prompts) > self.max_prompts:
+            self._prompts.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "snapshots": len(self._snapshots),
+            "prompts": len(self._prompts),
+            "locks": len(self._locks),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+user_context_cache = UserContextCache(
+    settings.USER_CONTEXT_CACHE_TTL_SECONDS,
+    settings.USER_CONTEXT_CACHE_MAX_PROMPTS,
+)
+
+
+@event.listens_for(UserProgress, "after_insert")
+@event.listens_for(UserProgress, "after_update")
+@event.listens_for(UserProgress, "after_delete")
+@event.listens_for(QuizAttempt, "after_insert")
+@event.listens_for(QuizAttempt, "after_update")
+@event.listens_for(QuizAttempt, "after_delete")
+@event.listens_for(UserAchievement, "after_insert")
+@event.listens_for(UserAchievement, "after_update")
+@event.listens_for(UserAchievement, "after_delete")
+@event.listens_for(ForumPost, "after_insert")
+@event.listens_for(ForumPost, "after_update")
+@event.listens_for(ForumPost, "after_delete")
+def _on_user_activity(mapper, connection, target):
+    user_id = target.user_id
+    if user_id is not None:
+        invalidate_after_transaction(target, ("user", user_id), lambda: user_context_cache.bump(user_id))
+
+
+@event.listens_for(Achievement, "after_update")
+@event.listens_for(Achievement, "after_delete")
+@event.listens_for(Assessment, "after_update")
+@event.listens_for(Assessment, "after_delete")
+def _on_shared_definition_changed(mapper, connection, target):
+    # Snapshots embed achievement names and assessment details
+    invalidate_after_transaction(target, "all_users", user_context_cache.bump_all)
@@ -1,8 +1,9 @@
 """Context service for gathering user-specific learning data for AI assistant"""
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, desc
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
+import json
 import logging
 
 from app.backend.models.user import User
@@ -11,23 +12,164 @@ from app.backend.models.module import Module
 from app.backend.models.assessment import Assessment
 from app.backend.models.achievement import UserAchievement, Achievement
 from app.backend.models.forum import ForumPost
+from app.backend.core.chat_utils import (
+    build_system_prompt_template,
+    format_system_prompt_with_context,
+    stamp_system_prompt,
+)
+from app.backend.services.context_cache import user_context_cache
 
 logger = logging.getLogger(__name__)
 
 
-async def gather_user_context(
+async def _load_user_snapshot(user_id: int, db: AsyncSession) -> Dict[str, Any]:
+    """Load the parts of the context that change only when the user does something"""
+    # Get user's progress across all modules
+    progress_result = await db.execute(
+        select(UserProgress)
+        .where(UserProgress.user_id == user_id)
+        .order_by(UserProgress.last_accessed_at.desc())
+    )
+    user_progress = progress_result.scalars().all()
+    
+    progress = [
+        {
+            "module_id": p.module_id,
+            "status": p.status.value if p.status else "not_started",
+            "completion_percentage": p.completion_percentage,
+            "last_accessed": p.last_accessed_at.isoformat() if p.last_accessed_at else None,
+            "started_at": p.started_at.isoformat() if p.started_at else None,
+            "completed_at": p.completed_at.isoformat() if p.completed_at else None,
+        }
+        for p in user_progress
+    ]
+    
+    # Get recent assessment attempts (last 20)
+    recent_attempts_result = await db.execute(
+        select(QuizAttempt, Assessment)
+        .join(Assessment, QuizAttempt.assessment_id == Assessment.id)
+        .where(QuizAttempt.user_id == user_id)
+        .order_by(desc(QuizAttempt.attempted_at))
+        .limit(20)
+    )
+    recent_attempts = recent_attempts_result.all()
+    
+    recent_assessments = [
+        {
+            "assessment_id": attempt.assessment_id,
+            "module_id": assessment.module_id,
+            "question_type": assessment.question_type.value if assessment.question_type else None,
+            "is_correct": attempt.is_correct,
+            "points_earned": attempt.points_earned,
+            "review_status": attempt.review_status.value if attempt.review_status else None,
+            "feedback": attempt.feedback,
+            "attempted_at": attempt.attempted_at.isoformat() if attempt.attempted_at else None,
+        }
+        for attempt, assessment in recent_attempts
+    ]
+    
+    # Get earned achievements
+    achievements_result = await db.execute(
+        select(UserAchievement, Achievement)
+        .join(Achievement, UserAchievement.achievement_id == Achievement.id)
+        .where(UserAchievement.user_id == user_id)
+        .order_by(desc(UserAchievement.earned_at))
+    )
+    user_achievements = achievements_result.all()
+    
+    achievements = [
+        {
+            "id": achievement.id,
+            "name": achievement.name,
+            "description": achievement.description,
+            "category": achievement.category,
+            "points": achievement.points,
+            "earned_at": user_achievement.earned_at.isoformat() if user_achievement.earned_at else None,
+        }
+        for user_achievement, achievement in user_achievements
+    ]
+    
+    # Get recent forum activity (last 10 posts user created or participated in)
+    forum_posts_result = await db.execute(
+        select(ForumPost)
+        .where(ForumPost.user_id == user_id)
+        .order_by(desc(ForumPost.created_at))
+        .limit(10)
+    )
+    recent_posts = forum_posts_result.scalars().all()
+    
+    recent_forum_activity = [
+        {
+            "post_id": post.id,
+            "module_id": post.module_id,
+            "title": post.title,
+            "content_preview": post.content[:200] if post.content else None,  # First 200 chars
+            "is_solved": post.is_solved,
+            "upvotes": post.upvotes,
+            "created_at": post.created_at.isoformat() if post.created_at else None,
+        }
+        for post in recent_posts
+    ]
+    
+    return {
+        "progress": progress,
+        "recent_assessments": recent_assessments,
+        "achievements": achievements,
+        "recent_forum_activity": recent_forum_activity,
+    }
+
+
+async def _load_curriculum(db: AsyncSession) -> List[Dict[str, Any]]:
+    """Load the published-module summary (the same for every user)"""
+    modules_result = await db.execute(
+        select(Module)
+        .where(Module.is_published == True)
+        .order_by(Module.order_index)
+    )
+    all_modules = modules_result.scalars().all()
+    
+    return [
+        {
+            "id": m.id,
+            "title": m.title,
+            "track": m.track.value if m.track else None,
+            "order_index": m.order_index,
+            "description": m.description,
+            "duration_hours": m.duration_hours,
+            "learning_objectives": m.learning_objectives,
+        }
+        for m in all_modules
+    ]
+
+
+async def _fill_context(
+    context: Dict[str, Any],
     user: User,
     db: AsyncSession,
-    current_module_id: Optional[int] = None,
-    current_lesson_id: Optional[int] = None,
-    extra_context: Optional[Dict[str, Any]] = None,
-) -> Dict[str, Any]:
-    """
-    Gather user-specific learning context for AI assistant.
+    current_module_id: Optional[int],
+    current_lesson_id: Optional[int],
+    extra_context: Optional[Dict[str, Any]],
+) -> None:
+    # Current module/lesson context
+    if current_module_id:
+        context["current_context"]["module_id"] = current_module_id
+    if current_lesson_id:
+        context["current_context"]["lesson_id"] = current_lesson_id
     
-    Only includes information specific to this user for privacy and security.
-    """
-    context = {
+    # Merge any additional context provided by the caller (e.g., LMS calendar/notes)
+    if extra_context:
+        context["calendar_events"] = extra_context.get("calendar_events", []) or extra_context.get("calendar", [])
+        context["notes"] = extra_context.get("notes", [])
+        context["assignments"] = extra_context.get("assignments", []) or extra_context.get("tasks", [])
+        if extra_context.get("additional_instructions"):
+            context["additional_instructions"] = extra_context["additional_instructions"]
+    
+    context["available_modules"] = await user_context_cache.curriculum(lambda: _load_curriculum(db))
+    context.update(await user_context_cache.snapshot(user.id, lambda: _load_user_snapshot(user.id, db)))
+
+
+def _empty_context(user: User) -> Dict[str, Any]:
+    return {
         "user": {
             "id": user.id,
             "username": user.username,
@@ -43,130 +185,25 @@ async def gather_user_context(
         "notes": [],
         "assignments": [],
     }
+
+
+async def gather_user_context(
+    user: User,
+    db: AsyncSession,
+    current_module_id: Optional[int] = None,
+    current_lesson_id: Optional[int] = None,
+    extra_context: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Gather user-specific learning context for AI assistant.
     
+    Only includes information specific to this user for privacy and security.
+    The user's activity and the curriculum summary come from
+    user_context_cache, so consecutive messages do not re-run the queries.
+    """
+    context = _empty_context(user)
     try:
-        # Current module/lesson context
-        if current_module_id:
-            context["current_context"]["module_id"] = current_module_id
-        if current_lesson_id:
-            context["current_context"]["lesson_id"] = current_lesson_id
-        
-        # Get user's progress across all modules
-        progress_result = await db.execute(
-            select(UserProgress)
-            .where(UserProgress.user_id == user.id)
-            .order_by(UserProgress.last_accessed_at.desc())
-        )
-        user_progress = progress_result.scalars().all()
-        
-        context["progress"] = [
-            {
-                "module_id": p.module_id,
-                "status": p.status.value if p.status else "not_started",
-                "completion_percentage": p.completion_percentage,
-                "last_accessed": p.last_accessed_at.isoformat() if p.last_accessed_at else None,
-                "started_at": p.started_at.isoformat() if p.started_at else None,
-                "completed_at": p.completed_at.isoformat() if p.completed_at else None,
-            }
-            for p in user_progress
-        ]
-        
-        # Get all available modules for context
-        modules_result = await db.execute(
-            select(Module)
-            .where(Module.is_published == True)
-            .order_by(Module.order_index)
-        )
-        all_modules = modules_result.scalars().all()
-        
-        context["available_modules"] = [
-            {
-                "id": m.id,
-                "title": m.title,
-                "track": m.track.value if m.track else None,
-                "order_index": m.order_index,
-                "description": m.description,
-                "duration_hours": m.duration_hours,
-                "learning_objectives": m.learning_objectives,
-            }
-            for m in all_modules
-        ]
-        
-        # Get recent assessment attempts (last 20)
-        recent_attempts_result = await db.execute(
-            select(QuizAttempt, Assessment)
-            .join(Assessment, QuizAttempt.assessment_id == Assessment.id)
-            .where(QuizAttempt.user_id == user.id)
-            .order_by(desc(QuizAttempt.attempted_at))
-            .limit(20)
-        )
-        recent_attempts = recent_attempts_result.all()
-        
-        context["recent_assessments"] = [
-            {
-                "assessment_id": attempt.assessment_id,
-                "module_id": assessment.module_id,
-                "question_type": assessment.question_type.value if assessment.question_type else None,
-                "is_correct": attempt.is_correct,
-                "points_earned": attempt.points_earned,
-                "review_status": attempt.review_status.value if attempt.review_status else None,
-                "feedback": attempt.feedback,
-                "attempted_at": attempt.attempted_at.isoformat() if attempt.attempted_at else None,
-            }
-            for attempt, assessment in recent_attempts
-        ]
-        
-        # Get earned achievements
-        achievements_result = await db.execute(
-            select(UserAchievement, Achievement)
-            .join(Achievement, UserAchievement.achievement_id == Achievement.id)
-            .where(UserAchievement.user_id == user.id)
-            .order_by(desc(UserAchievement.earned_at))
-        )
-        user_achievements = achievements_result.all()
-        
-        context["achievements"] = [
-            {
-                "id": achievement.id,
-                "name": achievement.name,
-                "description": achievement.description,
-                "category": achievement.category,
-                "points": achievement.points,
-                "earned_at": user_achievement.earned_at.isoformat() if user_achievement.earned_at else None,
-            }
-            for user_achievement, achievement in user_achievements
-        ]
-        
-        # Get recent forum activity (last 10 posts user created or participated in)
-        forum_posts_result = await db.execute(
-            select(ForumPost)
-            .where(ForumPost.user_id == user.id)
-            .order_by(desc(ForumPost.created_at))
-            .limit(10)
-        )
-        recent_posts = forum_posts_result.scalars().all()
-        
-        context["recent_forum_activity"] = [
-            {
-                "post_id": post.id,
-                "module_id": post.module_id,
-                "title": post.title,
-                "content_preview": post.content[:200] if post.content else None,  # First 200 chars
-                "is_solved": post.is_solved,
-                "upvotes": post.upvotes,
-                "created_at": post.created_at.isoformat() if post.created_at else None,
-            }
-            for post in recent_posts
-        ]
-
-        # Merge any additional context provided by the caller (e.g., LMS calendar/notes)
-        if extra_context:
-            context["calendar_events"] = extra_context.get("calendar_events", []) or extra_context.get("calendar", [])
-            context["notes"] = extra_context.get("notes", [])
-            context["assignments"] = extra_context.get("assignments", []) or extra_context.get("tasks", [])
-            if extra_context.get("additional_instructions"):
-                context["additional_instructions"] = extra_context["additional_instructions"]
-        
+        await _fill_context(context, user, db, current_module_id, current_lesson_id, extra_context)
     except Exception as e:
         logger.error(f"Error gathering user context for user {user.id}: {str(e)}")
         # Continue with partial context rather than failing completely
@@ -174,6 +211,45 @@ async def gather_user_context(
     return context
 
 
+async def build_system_instructions(
+    user: User,
+    db: AsyncSession,
+    conversation_id: int,
+    current_module_id: Optional[int] = None,
+    current_lesson_id: Optional[int] = None,
+    extra_context: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    System prompt with the student's context for the next message in a conversation.
+    
+    The formatted prompt is cached per conversation and reused until the
+    user's snapshot version, the curriculum version or the request's own
+    context (current module/lesson, extra context) changes. Only the date and
+    time are filled in per message.
+    """
+    request_context = json.dumps(
+        [_empty_context(user)["user"], current_module_id, current_lesson_id, extra_context],
+        sort_keys=True,
+        default=str,
+    )
+    fingerprint = user_context_cache.prompt_fingerprint(user.id, request_context)
+    template = user_context_cache.get_prompt(user.id, conversation_id, fingerprint)
+    if template is not None:
+        return stamp_system_prompt(template)
+    
+    context = _empty_context(user)
+    try:
+        await _fill_context(context, user, db, current_module_id, current_lesson_id, extra_context)
+    except Exception as e:
+        # Use the partial context for this message only
+        logger.error(f"Error gathering user context for user {user.id}: {str(e)}")
+        return format_system_prompt_with_context(context)
+    
+    template = build_system_prompt_template(context)
+    user_context_cache.put_prompt(user.id, conversation_id, fingerprint, template)
+    return stamp_system_prompt(template)
+
+
 def format_context_for_instructions(context: Dict[str, Any]) -> str:
     """
     Format user context into a string for OpenAI assistant instructions.
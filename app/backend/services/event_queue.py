@@ -0,0 +1,271 @@
+"""Background event queue backed by a transactional outbox table"""
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy import select, update, delete, and_, or_
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from datetime import datetime, timedelta
+import asyncio
+import logging
+
+from app.backend.core.config import settings
+from app.backend.core.database import AsyncSessionLocal
+from app.backend.models.outbox import OutboxEvent, OutboxStatus
+from app.backend.models.user import User
+from app.backend.services.achievement_service import check_achievements
+from app.backend.services.notification_service import (
+    discard_pending_notifications,
+    notify_forum_reply,
+    publish_pending_notifications,
+)
+from app.backend.services.vector_store_sync import sync_vector_store
+
+logger = logging.getLogger(__name__)
+
+# Handlers must not commit: _process_event commits their writes together with
+# the outbox row's deletion, so an event's effects are applied exactly once.
+# (vector_store_sync commits per document and is idempotent instead.)
+EventHandler = Callable[[AsyncSession, OutboxEvent], Awaitable[None]]
+
+
+def enqueue_event(
+    db: AsyncSession,
+    event_type: str,
+    user_id: Optional[int] = None,
+    payload: Optional[Dict[str, Any]] = None
+) -> OutboxEvent:
+    """
+    Add an event to the outbox in the caller's transaction.
+
+    The event is persisted only if the caller commits, so it can never be
+    lost or delivered for a change that was rolled back. Call
+    event_worker_pool.wake() after the commit for prompt processing.
+    """
+    event = OutboxEvent(
+        event_type=event_type,
+        user_id=user_id,
+        payload=payload or {},
+        status=OutboxStatus.PENDING,
+        available_at=datetime.utcnow()
+    )
+    db.add(event)
+    return event
+
+
+async def _check_achievements_handler(db: AsyncSession, event: OutboxEvent) -> None:
+    await check_achievements(
+        db=db,
+        user_id=event.user_id,
+        event_type=event.event_type,
+        event_data=event.payload,
+        commit=False
+    )
+
+
+async def _forum_reply_handler(db: AsyncSession, event: OutboxEvent) -> None:
+    payload = event.payload or {}
+    await notify_forum_reply(
+        db=db,
+        post_author_id=event.user_id,
+        reply_author_username=payload.get("reply_author_username", "Someone"),
+        post_id=payload["post_id"],
+        module_id=payload.get("module_id"),
+        commit=False
+    )
+
+
+async def _vector_store_sync_handler(db: AsyncSession, event: OutboxEvent) -> None:
+    user = await db.get(User, event.user_id)
+    if user is not None:
+        await sync_vector_store(db, user)
+
+
+EVENT_HANDLERS: Dict[str, EventHandler] = {
+    "assessment_submitted": _check_achievements_handler,
+    "module_completed": _check_achievements_handler,
+    "forum_post": _check_achievements_handler,
+    "forum_reply": _forum_reply_handler,
+    "vector_store_sync": _vector_store_sync_handler,
+}
+
+
+async def _claim_events(db: AsyncSession, limit: int) -> List[OutboxEvent]:
+    """
+    Claim up to `limit` due events and mark them as processing.
+
+    On PostgreSQL, FOR UPDATE SKIP LOCKED lets concurrent workers (in this or
+    other processes) claim disjoint batches. Events left in processing by a
+    crashed worker are reclaimed once their lease expires.
+    """
+    now = datetime.utcnow()
+    lease_expired = now - timedelta(seconds=settings.EVENT_LEASE_SECONDS)
+    result = await db.execute(
+        select(OutboxEvent)
+        .where(
+            or_(
+                and_(
+                    OutboxEvent.status == OutboxStatus.PENDING,
+                    OutboxEvent.available_at <= now
+                ),
+                and_(
+                    OutboxEvent.status == OutboxStatus.PROCESSING,
+                    OutboxEvent.locked_at < lease_expired
+                )
+            )
+        )
+        .order_by(OutboxEvent.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    events = result.scalars().all()
+    if events:
+        await db.execute(
+            update(OutboxEvent)
+            .where(OutboxEvent.id.in_([e.id for e in events]))
+            .values(status=OutboxStatus.PROCESSING, locked_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        # locked_at identifies this claim; _process_event only finishes events it still holds
+        for event in events:
+            set_committed_value(event, "status", OutboxStatus.PROCESSING)
+            set_committed_value(event, "locked_at", now)
+    await db.commit()
+    return events
+
+
+async def _process_event(session_factory: async_sessionmaker, event: OutboxEvent) -> bool:
+    """
+    Run the handler for one claimed event; returns True if it succeeded.
+
+    The handler's writes and the outbox row's deletion commit together. If
+    the lease expired and another worker reclaimed the event meanwhile, the
+    deletion matches nothing and this worker's writes are rolled back.
+    """
+    handler = EVENT_HANDLERS.get(event.event_type)
+    async with session_factory() as db:
+        try:
+            if handler is None:
+                raise ValueError(f"No handler for event type '{event.event_type}'")
+            await handler(db, event)
+            result = await db.execute(
+                delete(OutboxEvent)
+                .where(OutboxEvent.id == event.id)
+                .where(OutboxEvent.locked_at == event.locked_at)
+            )
+            if result.rowcount != 1:
+                await db.rollback()
+                discard_pending_notifications(db)
+                logger.warning(f"Event {event.id} ({event.event_type}) was reclaimed by another worker; discarded")
+                return False
+            await db.commit()
+            publish_pending_notifications(db)
+            return True
+        except Exception as e:
+            await db.rollback()
+            discard_pending_notifications(db)
+            attempts = (event.attempts or 0) + 1
+            gave_up = attempts >= settings.EVENT_MAX_ATTEMPTS
+            # Exponential backoff: 2, 4, 8, ... seconds
+            retry_at = datetime.utcnow() + timedelta(seconds=2 ** attempts)
+            result = await db.execute(
+                update(OutboxEvent)
+                .where(OutboxEvent.id == event.id)
+                .where(OutboxEvent.locked_at == event.locked_at)
+                .values(
+                    status=OutboxStatus.FAILED if gave_up else OutboxStatus.PENDING,
+                    attempts=attempts,
+                    last_error=str(e)[:2000],
+                    available_at=retry_at,
+                    locked_at=None
+                )
+            )
+            await db.commit()
+            if result.rowcount != 1:
+                logger.warning(f"Event {event.id} ({event.event_type}) failed after it was reclaimed by another worker: {e}")
+                return False
+            log = logger.error if gave_up else logger.warning
+            log(f"Event {event.id} ({event.event_type}) failed on attempt {attempts}: {e}")
+            return False
+
+
+async def process_pending_events(
+    session_factory: async_sessionmaker = AsyncSessionLocal,
+    limit: Optional[int] = None
+) -> int:
+    """
+    Claim and process one batch of due events.
+
+    Returns:
+        Number of events claimed (processed or rescheduled)
+    """
+    async with session_factory() as db:
+        events = await _claim_events(db, limit or settings.EVENT_BATCH_SIZE)
+    for event in events:
+        await _process_event(session_factory, event)
+    return len(events)
+
+
+class EventWorkerPool:
+    """
+    In-process asyncio workers that drain the outbox.
+
+    Workers poll every EVENT_POLL_INTERVAL_SECONDS and are woken early by
+    wake() after a request commits new events. Because the outbox is durable,
+    events written while no worker is running are picked up on the next start.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        worker_count: int,
+        poll_interval: float
+    ):
+        self.session_factory = session_factory
+        self.worker_count = worker_count
+        self.poll_interval = poll_interval
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def start(self) -> None:
+        if self._tasks or self.worker_count <= 0:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"event-worker-{n}")
+            for n in range(self.worker_count)
+        ]
+        logger.info(f"Started {self.worker_count} event workers")
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if tasks:
+            logger.info("Stopped event workers")
+
+    def wake(self) -> None:
+        """Signal workers that new events were committed"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                claimed = await process_pending_events(self.session_factory)
+            except Exception as e:
+                logger.error(f"Event worker error: {e}", exc_info=True)
+                claimed = 0
+            if claimed:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+
+event_worker_pool = EventWorkerPool(
+    AsyncSessionLocal,
+    settings.EVENT_WORKER_COUNT,
+    settings.EVENT_POLL_INTERVAL_SECONDS
+)
@@ -0,0 +1,339 @@
+"""Forum read pipeline for building post responses with set-based queries"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func, and_, or_, desc, literal_column
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql import Select
+from typing import List, Optional, Sequence, Tuple
+import html
+import logging
+
+from app.backend.models.user import User
+from app.backend.models.forum import ForumPost, ForumVote, FORUM_SEARCH_CONFIG
+from app.backend.schemas.forum import ForumPostResponse
+
+logger = logging.getLogger(__name__)
+
+
+def _author_info(
+    user_id: int,
+    author_id: Optional[int],
+    username: Optional[str],
+    full_name: Optional[str],
+    role
+) -> dict:
+    """Build the author payload for a post (tolerates deleted users)"""
+    if author_id is None:
+        return {"id": user_id, "username": None, "full_name": None, "role": "student"}
+    return {
+        "id": author_id,
+        "username": username,
+        "full_name": full_name,
+        "role": role.value if role else "student"
+    }
+
+
+def _post_response(
+    post: ForumPost,
+    author: dict,
+    reply_count: int = 0,
+    user_vote: Optional[str] = None,
+    snippet: Optional[str] = None
+) -> ForumPostResponse:
+    """Build a ForumPostResponse from a post and its precomputed extras"""
+    return ForumPostResponse(
+        id=post.id,
+        module_id=post.module_id,
+        user_id=post.user_id,
+        parent_post_id=post.parent_post_id,
+        title=post.title,
+        content=post.content,
+        is_pinned=post.is_pinned,
+        is_solved=post.is_solved,
+        upvotes=post.upvotes,
+        created_at=post.created_at,
+        updated_at=post.updated_at,
+        author=author,
+        reply_count=reply_count,
+        user_vote=user_vote,
+        snippet=snippet
+    )
+
+
+async def fetch_post_rows(
+    db: AsyncSession,
+    query: Select,
+    viewer_id: Optional[int] = None,
+    snippet=None
+) -> List[Tuple[ForumPost, ForumPostResponse]]:
+    """
+    Execute a page query for forum posts and build responses.
+
+    Returns (post, response) pairs so callers can derive pagination cursors
+    from the ORM rows.
+
+    `query` must select ForumPost and may carry filters, ordering and
+    limit/offset. Author info and the viewer's vote are joined onto the
+    same statement and reply counts come from the denormalized
+    ForumPost.reply_count column, so a page costs one round trip.
+
+    Args:
+        db: Database session
+        query: select(ForumPost) with filters, ordering and pagination applied
+        viewer_id: Current user id, used to resolve user_vote
+        snippet: Optional SQL expression for a highlighted search snippet
+    """
+    query = query.add_columns(
+        User.id,
+        User.username,
+        User.full_name,
+        User.role
+    ).outerjoin(User, User.id == ForumPost.user_id)
+
+    if viewer_id is not None:
+        query = query.add_columns(ForumVote.vote_type).outerjoin(
+            ForumVote,
+            and_(
+                ForumVote.post_id == ForumPost.id,
+                ForumVote.user_id == viewer_id
+            )
+        )
+
+    if snippet is not None:
+        query = query.add_columns(snippet)
+
+    result = await db.execute(query)
+
+    rows = []
+    for row in result.all():
+        post, author_id, username, full_name, role = row[:5]
+        user_vote = row[5] if viewer_id is not None else None
+        rows.append((post, _post_response(
+            post,
+            _author_info(post.user_id, author_id, username, full_name, role),
+            reply_count=post.reply_count or 0,
+            user_vote=user_vote,
+            snippet=row[-1] if snippet is not None else None
+        )))
+
+    return rows
+
+
+async def fetch_post_page(
+    db: AsyncSession,
+    query: Select,
+    viewer_id: Optional[int] = None
+) -> List[ForumPostResponse]:
+    """Execute a page query for forum posts and return only the responses"""
+    rows = await fetch_post_rows(db, query, viewer_id=viewer_id)
+    return [response for _, response in rows]
+
+
+async def build_post_responses(
+    db: AsyncSession,
+    posts: Sequence[ForumPost],
+    viewer_id: Optional[int] = None
+) -> List[ForumPostResponse]:
+    """Build responses for posts that are already loaded (e.g. after a write)"""
+    if not posts:
+        return []
+
+    post_ids = [post.id for post in posts]
+    query = select(ForumPost).where(ForumPost.id.in_(post_ids))
+    responses = await fetch_post_page(db, query, viewer_id=viewer_id)
+
+    # Preserve the caller's ordering
+    by_id = {response.id: response for response in responses}
+    return [by_id[post_id] for post_id in post_ids if post_id in by_id]
+
+
+async def build_post_response(
+    db: AsyncSession,
+    post: ForumPost,
+    viewer_id: Optional[int] = None
+) -> ForumPostResponse:
+    """Build a response for a single post"""
+    responses = await build_post_responses(db, [post], viewer_id=viewer_id)
+    return responses[0]
+
+
+def _fallback_snippet(content: str, q: str, radius: int = 80) -> str:
+    """Build an escaped snippet around the first match (non-PostgreSQL engines)"""
+    position = content.lower().find(q.lower())
+    if position < 0:
+        return html.escape(content[:radius * 2])
+    start = max(0, position - radius)
+    end = min(len(content), position + len(q) + radius)
+    return "".join([
+        "..." if start > 0 else "",
+        html.escape(content[start:position]),
+        "<mark>",
+        html.escape(content[position:position + len(q)]),
+        "</mark>",
+        html.escape(content[position + len(q):end]),
+        "..." if end < len(content) else "",
+    ])
+
+
+def build_search_query(db: AsyncSession, q: str, module_id: Optional[int] = None):
+    """
+    Build the forum search query for the session's database dialect.
+
+    On PostgreSQL this matches against the GIN-indexed search_vector column,
+    orders by ts_rank and highlights matches with ts_headline. Other engines
+    (the SQLite test engine) fall back to ILIKE and a Python-side snippet.
+
+    Returns:
+        (query, snippet) where snippet is a SQL expression or None
+    """
+    query = select(ForumPost).where(ForumPost.parent_post_id.is_(None))  # Only top-level posts
+    if module_id:
+        query = query.where(ForumPost.module_id == module_id)
+
+    if db.get_bind().dialect.name != "postgresql":
+        search_term = f"%{q.lower()}%"
+        query = query.where(
+            or_(
+                ForumPost.title.ilike(search_term),
+                ForumPost.content.ilike(search_term)
+            )
+        ).order_by(desc(ForumPost.created_at))
+        return query, None
+
+    search_config = literal_column(f"'{FORUM_SEARCH_CONFIG}'::regconfig")
+    ts_query = func.websearch_to_tsquery(search_config, q)
+    search_vector = literal_column("forum_posts.search_vector")
+    # Escape before highlighting so the snippet is safe to render as HTML
+    escaped_content = func.replace(
+        func.replace(func.replace(ForumPost.content, "&", "&amp;"), "<", "&lt;"),
+        ">", "&gt;"
+    )
+    snippet = func.ts_headline(
+        search_config,
+        escaped_content,
+        ts_query,
+        "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2"
+    )
+    query = query.where(search_vector.op("@@")(ts_query)).order_by(
+        desc(func.ts_rank(search_vector, ts_query)),
+        desc(ForumPost.created_at)
+    )
+    return query, snippet
+
+
+async def search_post_page(
+    db: AsyncSession,
+    query: Select,
+    snippet,
+    q: str,
+    viewer_id: Optional[int] = None
+) -> List[ForumPostResponse]:
+    """Execute a search page built by build_search_query"""
+    rows = await fetch_post_rows(db, query, viewer_id=viewer_id, snippet=snippet)
+    responses = [response for _, response in rows]
+    if snippet is None:
+        for (post, _), response in zip(rows, responses):
+            response.snippet = _fallback_snippet(post.content, q)
+    return responses
+
+
+async def record_reply_added(db: AsyncSession, parent_post_id: int) -> None:
+    """
+    Bump the parent's reply counters for a new reply.
+
+    Runs as a single UPDATE in the caller's transaction so concurrent
+    replies cannot lose increments; the caller commits.
+    """
+    await db.execute(
+        update(ForumPost)
+        .where(ForumPost.id == parent_post_id)
+        .values(
+            reply_count=ForumPost.reply_count + 1,
+            score=ForumPost.score + 1,
+            last_reply_at=func.now()
+        )
+        .execution_options(synchronize_session="fetch")
+    )
+
+
+async def record_reply_removed(db: AsyncSession, parent_post_id: int) -> None:
+    """
+    Recompute the parent's reply counters after a reply was deleted.
+
+    Must run after the reply's DELETE in the same transaction; the caller
+    commits.
+    """
+    reply = aliased(ForumPost)
+    reply_count = (
+        select(func.count(reply.id))
+        .where(reply.parent_post_id == parent_post_id)
+        .scalar_subquery()
+    )
+    await db.execute(
+        update(ForumPost)
+        .where(ForumPost.id == parent_post_id)
+        .values(
+            reply_count=reply_count,
+            score=ForumPost.upvotes + reply_count,
+            last_reply_at=(
+                select(func.max(reply.created_at))
+                .where(reply.parent_post_id == parent_post_id)
+                .scalar_subquery()
+            )
+        )
+        .execution_options(synchronize_session="fetch")
+    )
+
+
+async def apply_vote_delta(db: AsyncSession, post_id: int, delta: int) -> None:
+    """
+    Add an upvote change to the post's upvotes and score.
+
+    Runs as a single UPDATE in the caller's transaction so concurrent votes
+    cannot overwrite each other; the caller commits.
+    """
+    if not delta:
+        return
+    await db.execute(
+        update(ForumPost)
+        .where(ForumPost.id == post_id)
+        .values(
+            upvotes=ForumPost.upvotes + delta,
+            score=ForumPost.score + delta
+        )
+        .execution_options(synchronize_session="fetch")
+    )
+
+
+async def backfill_post_counters(db: AsyncSession) -> int:
+    """
+    Recompute reply_count, last_reply_at and score for every post.
+
+    Used once after adding the counter columns, or to repair drift. Runs as
+    two set-based UPDATE statements; the caller commits.
+
+    Returns:
+        Number of posts updated
+    """
+    reply = aliased(ForumPost)
+    result = await db.execute(
+        update(ForumPost)
+        .values(
+            reply_count=(
+                select(func.count(reply.id))
+                .where(reply.parent_post_id == ForumPost.id)
+                .scalar_subquery()
+            ),
+            last_reply_at=(
+                select(func.max(reply.created_at))
+                .where(reply.parent_post_id == ForumPost.id)
+                .scalar_subquery()
+            )
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        update(ForumPost)
+        .values(score=ForumPost.upvotes + ForumPost.reply_count)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
@@ -0,0 +1,173 @@
+"""Lesson content build stage: markdown -> sanitized HTML, table of contents and compressed bodies"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import Dict, List, Tuple
+from datetime import datetime
+from html import unescape
+import gzip
+import hashlib
+import json
+import logging
+
+import markdown
+import nh3
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; lessons are then served gzip-only
+    brotli = None
+
+from app.backend.models.module import Lesson, LessonRendition
+from app.backend.schemas.module import LessonHtmlResponse, LessonTocEntry
+
+logger = logging.getLogger(__name__)
+
+# Bump when the markdown extensions, sanitizer rules or response shape change
+# so that every stored rendition is rebuilt
+RENDERER_VERSION = 1
+
+MARKDOWN_EXTENSIONS = ["extra", "sane_lists", "toc"]
+
+ALLOWED_TAGS = {
+    "a", "abbr", "blockquote", "br", "code", "dd", "del", "div", "dl", "dt", "em",
+    "h1", "h2", "h3", "h4", "h5", "h6", "hr", "img", "li", "ol", "p", "pre",
+    "strong", "sub", "sup", "table", "tbody", "td", "th", "thead", "tr", "ul",
+}
+
+ALLOWED_ATTRIBUTES = {
+    "a": {"href", "title"},
+    "abbr": {"title"},
+    "code": {"class"},  # language-* from fenced code blocks
+    "img": {"src", "alt", "title"},
+    "td": {"align"},
+    "th": {"align"},
+    **{f"h{level}": {"id"} for level in range(1, 7)},  # TOC anchors
+}
+
+
+def render_markdown(content: str) -> Tuple[str, List[Dict]]:
+    """
+    Render lesson markdown to sanitized HTML.
+
+    Returns:
+        (html, toc) where toc is a flat list of {"level", "id", "title"}
+        headings in document order
+    """
+    md = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+    html = nh3.clean(md.convert(content), tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES)
+
+    toc: List[Dict] = []
+
+    def walk(tokens):
+        for token in tokens:
+            toc.append({"level": token["level"], "id": token["id"], "title": unescape(token["name"])})
+            walk(token["children"])
+
+    walk(md.toc_tokens)
+    return html, toc
+
+
+def lesson_source_hash(lesson: Lesson) -> str:
+    """Hash of everything a rendition is built from"""
+    source = json.dumps([
+        RENDERER_VERSION,
+        lesson.module_id,
+        lesson.title,
+        lesson.content,
+        lesson.order_index,
+        lesson.estimated_minutes,
+        lesson.lesson_type,
+    ])
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+def lesson_html_body(lesson: Lesson, content_html: str, toc: List[Dict]) -> bytes:
+    """Serialized GET /lessons/{id}?format=html response"""
+    return LessonHtmlResponse(
+        id=lesson.id,
+        module_id=lesson.module_id,
+        title=lesson.title,
+        content_html=content_html,
+        toc=[LessonTocEntry(**entry) for entry in toc],
+        order_index=lesson.order_index,
+        estimated_minutes=lesson.estimated_minutes,
+        lesson_type=lesson.lesson_type,
+    ).model_dump_json().encode()
+
+
+def compress_body(body: bytes) -> Dict[str, bytes]:
+    """Pre-compressed variants of a body by content-coding, best first"""
+    variants = {}
+    if brotli is not None:
+        variants["br"] = brotli.compress(body, quality=11)
+    variants["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+    return variants
+
+
+def build_rendition(lesson: Lesson) -> LessonRendition:
+    """Render a lesson into a new (unsaved) rendition"""
+    content_html, toc = render_markdown(lesson.content)
+    variants = compress_body(lesson_html_body(lesson, content_html, toc))
+    return LessonRendition(
+        lesson_id=lesson.id,
+        source_hash=lesson_source_hash(lesson),
+        content_html=content_html,
+        toc=toc,
+        body_gzip=variants["gzip"],
+        body_br=variants.get("br"),
+        rendered_at=datetime.utcnow(),
+    )
+
+
+def rendition_variants(lesson: Lesson, rendition: LessonRendition) -> Tuple[bytes, Dict[str, bytes]]:
+    """Identity body and stored compressed variants of a rendition"""
+    body = lesson_html_body(lesson, rendition.content_html, rendition.toc)
+    variants = {}
+    if rendition.body_br is not None:
+        variants["br"] = rendition.body_br
+    variants["gzip"] = rendition.body_gzip
+    return body, variants
+
+
+async def get_lesson_html_variants(db: AsyncSession, lesson: Lesson) -> Tuple[bytes, Dict[str, bytes]]:
+    """
+    Rendered body and compressed variants for a lesson.
+
+    Uses the stored rendition when it matches the lesson; otherwise renders
+    in memory without saving (the session may be a read replica), so a
+    missing or stale build only costs render time.
+    """
+    result = await db.execute(select(LessonRendition).where(LessonRendition.lesson_id == lesson.id))
+    rendition = result.scalar_one_or_none()
+    if rendition is None or rendition.source_hash != lesson_source_hash(lesson):
+        rendition = build_rendition(lesson)
+    return rendition_variants(lesson, rendition)
+
+
+async def prerender_lessons(db: AsyncSession, force: bool = False, batch_size: int = 50) -> int:
+    """
+    Build or refresh stored renditions for every active lesson.
+
+    Lessons whose rendition already matches their source hash are skipped
+    unless `force` is set. Commits every `batch_size` renditions.
+
+    Returns:
+        Number of renditions written
+    """
+    result = await db.execute(select(Lesson).where(Lesson.is_active == True).order_by(Lesson.id))
+    lessons = result.scalars().all()
+    result = await db.execute(select(LessonRendition.lesson_id, LessonRendition.source_hash))
+    existing = {row.lesson_id: row.source_hash for row in result.all()}
+
+    written = 0
+    for lesson in lessons:
+        source_hash = lesson_source_hash(lesson)
+        if not force and existing.get(lesson.id) == source_hash:
+            continue
+        await db.merge(build_rendition(lesson))
+        written += 1
+        if written % batch_size == 0:
+            await db.commit()
+    await db.commit()
+    logger.info(f"Pre-rendered {written} of {len(lessons)} lessons")
+    return written
@@ -0,0 +1,323 @@
+"""Pluggable chat-completion providers for the AI assistant"""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import AsyncGenerator, Dict, List, Optional
+import asyncio
+import json
+import logging
+import time
+
+import httpx
+
+from app.backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# AI_CHAT_PROVIDER value for the OpenAI Assistants path in llm_service (threads and runs)
+ASSISTANTS_PROVIDER = "assistants"
+
+
+@dataclass
+class Message:
+    """Provider-neutral chat message"""
+    role: str  # 'system', 'user' or 'assistant'
+    content: str
+
+
+@dataclass
+class LLMResponse:
+    """Complete reply from a provider"""
+    content: str
+    provider: str
+    model: str
+    latency_ms: float = 0.0
+
+
+class LLMProviderError(Exception):
+    """Raised when a provider request fails"""
+
+
+class BaseLLMProvider(ABC):
+    """
+    Base class for chat-completion backends.
+
+    Subclasses implement _stream(); generate() and stream() add the
+    per-provider concurrency limit (LLM_MAX_CONCURRENCY requests in flight,
+    further callers wait for a slot) and request metrics.
+    """
+
+    name = ""
+
+    def __init__(
+        self,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        max_concurrency: int,
+    ):
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.max_concurrency = max(1, max_concurrency)
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.total_latency_ms = 0.0
+
+    @abstractmethod
+    def _stream(self, messages: List[Message]) -> AsyncGenerator[str, None]:
+        """Yield the reply text as it is generated"""
+
+    async def stream(self, messages: List[Message]) -> AsyncGenerator[str, None]:
+        """
+        Yield the reply text as it is generated.
+
+        The concurrency slot is held until the reply is complete.
+
+        Raises:
+            LLMProviderError: If the request fails
+        """
+        async with self._slots:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            started = time.monotonic()
+            try:
+                async for text in self._stream(messages):
+                    yield text
+            except LLMProviderError:
+                self.errors += 1
+                raise
+            except (httpx.HTTPError, ValueError) as e:
+                self.errors += 1
+                raise LLMProviderError(f"{self.name} request failed: {e}")
+            finally:
+                self.in_flight -= 1
+                self.requests += 1
+                self.total_latency_ms += (time.monotonic() - started) * 1000
+
+    async def generate(self, messages: List[Message]) -> LLMResponse:
+        """Return the complete reply"""
+        started = time.monotonic()
+        parts = [text async for text in self.stream(messages)]
+        return LLMResponse(
+            content="".join(parts),
+            provider=self.name,
+            model=self.model,
+            latency_ms=(time.monotonic() - started) * 1000,
+        )
+
+    async def aclose(self) -> None:
+        """Release pooled connections"""
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "requests": self.requests,
+            "errors": self.errors,
+            "avg_latency_ms": self.total_latency_ms / self.requests if self.requests else 0.0,
+        }
+
+
+class _HTTPProvider(BaseLLMProvider):
+    """Provider talking to a server through one pooled httpx.AsyncClient"""
+
+    def __init__(
+        self,
+        base_url: str,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        max_concurrency: int,
+        timeout_seconds: float,
+        headers: Optional[Dict[str, str]] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        super().__init__(model, temperature, max_tokens, max_concurrency)
+        # The semaphore bounds requests, so the pool never needs more connections than slots
+        self._client = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            headers=headers,
+            timeout=httpx.Timeout(timeout_seconds, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            ),
+            transport=transport,
+        )
+
+    async def _post_lines(self, path: str, payload: Dict) -> AsyncGenerator[str, None]:
+        async with self._client.stream("POST", path, json=payload) as response:
+            if response.status_code >= 400:
+                body = (await response.aread()).decode("utf-8", errors="replace")
+                raise LLMProviderError(f"{self.name} returned {response.status_code}: {body[:500]}")
+            async for line in response.aiter_lines():
+                line = line.strip()
+                if line:
+                    yield line
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+class ChatCompletionsProvider(_HTTPProvider):
+    """OpenAI-compatible /chat/completions endpoint (OpenAI, vLLM, LM Studio, ...)"""
+
+    name = "chat_completions"
+
+    def _payload(self, messages: List[Message]) -> Dict:
+        return {
+            "model": self.model,
+            "messages": [{"role": m.role, "content": m.content} for m in messages],
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "stream": True,
+        }
+
+    async def _stream(self, messages: List[Message]) -> AsyncGenerator[str, None]:
+        # Server-sent events: "data: {chunk}" lines ending with "data: [DONE]"
+        async for line in self._post_lines("/chat/completions", self._payload(messages)):
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                return
+            chunk = json.loads(data)
+            if chunk.get("error"):
+                raise LLMProviderError(f"{self.name} error: {chunk['error']}")
+            for choice in chunk.get("choices") or []:
+                text = (choice.get("delta") or {}).get("content")
+                if text:
+                    yield text
+
+
+class OllamaProvider(_HTTPProvider):
+    """Local models served by Ollama (/api/chat)"""
+
+    name = "ollama"
+
+    def _payload(self, messages: List[Message]) -> Dict:
+        return {
+            "model": self.model,
+            "messages": [{"role": m.role, "content": m.content} for m in messages],
+            "stream": True,
+            "options": {"temperature": self.temperature, "num_predict": self.max_tokens},
+        }
+
+    async def _stream(self, messages: List[Message]) -> AsyncGenerator[str, None]:
+        # One JSON object per line, the last with "done": true
+        async for line in self._post_lines("/api/chat", self._payload(messages)):
+            chunk = json.loads(line)
+            if chunk.get("error"):
+                raise LLMProviderError(f"{self.name} error: {chunk['error']}")
+            text = (chunk.get("message") or {}).get("content")
+            if text:
+                yield text
+            if chunk.get("done"):
+                return
+
+
+class MockProvider(BaseLLMProvider):
+    """
+    Deterministic replies without the network, for local development and load tests.
+
+    Echoes the last user message word by word, optionally sleeping
+    LLM_MOCK_CHUNK_DELAY_SECONDS per chunk to simulate generation latency.
+    """
+
+    name = "mock"
+
+    def __init__(
+        self,
+        model: str = "mock",
+        temperature: float = 0.0,
+        max_tokens: int = 0,
+        max_concurrency: int = 8,
+        chunk_delay_seconds: float = 0.0,
+    ):
+        super().__init__(model, temperature, max_tokens, max_concurrency)
+        self.chunk_delay_seconds = chunk_delay_seconds
+        self.last_messages: List[Message] = []
+
+    def reply_for(self, messages: List[Message]) -> str:
+        question = next((m.content for m in reversed(messages) if m.role == "user"), "")
+        return f"You asked: {question}"
+
+    async def _stream(self, messages: List[Message]) -> AsyncGenerator[str, None]:
+        self.last_messages = list(messages)
+        words = self.reply_for(messages).split(" ")
+        for index, word in enumerate(words):
+            if self.chunk_delay_seconds > 0:
+                await asyncio.sleep(self.chunk_delay_seconds)
+            yield word if index == len(words) - 1 else word + " "
+
+
+def create_provider(name: str) -> BaseLLMProvider:
+    """
+    Build a provider from settings.
+
+    Raises:
+        ValueError: If the provider name is unknown
+    """
+    common = {
+        "temperature": settings.LLM_TEMPERATURE,
+        "max_tokens": settings.LLM_MAX_TOKENS,
+        "max_concurrency": settings.LLM_MAX_CONCURRENCY,
+    }
+    if name == ChatCompletionsProvider.name:
+        api_key = settings.CHAT_COMPLETIONS_API_KEY or settings.OPENAI_API_KEY
+        return ChatCompletionsProvider(
+            base_url=settings.CHAT_COMPLETIONS_BASE_URL,
+            model=settings.CHAT_COMPLETIONS_MODEL,
+            timeout_seconds=settings.LLM_REQUEST_TIMEOUT_SECONDS,
+            headers={"Authorization": f"Bearer {api_key}"} if api_key else None,
+            **common,
+        )
+    if name == OllamaProvider.name:
+        return OllamaProvider(
+            base_url=settings.OLLAMA_BASE_URL,
+            model=settings.OLLAMA_MODEL,
+            timeout_seconds=settings.LLM_REQUEST_TIMEOUT_SECONDS,
+            **common,
+        )
+    if name == MockProvider.name:
+        return MockProvider(chunk_delay_seconds=settings.LLM_MOCK_CHUNK_DELAY_SECONDS, **common)
+    raise ValueError(
+        f"Unknown AI_CHAT_PROVIDER '{name}' "
+        f"(expected {ASSISTANTS_PROVIDER}, {ChatCompletionsProvider.name}, {OllamaProvider.name} or {MockProvider.name})"
+    )
+
+
+_providers: Dict[str, BaseLLMProvider] = {}
+
+
+def get_chat_provider() -> Optional[BaseLLMProvider]:
+    """
+    Process-wide provider for AI chat, or None when AI_CHAT_PROVIDER is "assistants".
+
+    Each provider instance (with its connection pool and concurrency limit)
+    is shared by all requests; close_chat_providers() releases them on
+    shutdown.
+    """
+    name = settings.AI_CHAT_PROVIDER
+    if name == ASSISTANTS_PROVIDER:
+        return None
+    provider = _providers.get(name)
+    if provider is None:
+        provider = _providers[name] = create_provider(name)
+        logger.info("AI chat provider: %s (%s)", provider.name, provider.model)
+    return provider
+
+
+async def close_chat_providers() -> None:
+    while _providers:
+        _, provider = _providers.popitem()
+        await provider.aclose()
+
+
+def provider_stats() -> Dict[str, float]:
+    """Metrics of the configured provider (empty for the Assistants path)"""
+    provider = _providers.get(settings.AI_CHAT_PROVIDER)
+    return provider.stats() if provider is not None else {}
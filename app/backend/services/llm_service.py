@@ -1,36 +1,49 @@
-"""LLM service for OpenAI Assistants API integration"""
+"""LLM service for the AI assistant (OpenAI Assistants API or a chat-completion provider)"""
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
-from typing import Optional, Dict, Any, AsyncGenerator
+from typing import Optional, Dict, Any, AsyncGenerator, List, Tuple
+import asyncio
 import logging
 from openai import AsyncOpenAI
 
+from app.backend.core.assistant_cache import assistant_handle_cache
+from app.backend.core.config import settings
+
 from app.backend.core.openai_utils import (
     get_openai_client,
     get_assistant_for_user,
+    is_not_found_error,
     cancel_active_run,
     list_active_runs,
-    update_vector_store,
 )
 from app.backend.core.chat_utils import (
-    format_system_prompt_with_context,
     sanitize_message,
-    format_citations_in_response
+    format_citations_in_response,
+    CitationStreamBuffer,
+    format_chat_history,
 )
-from app.backend.services.context_service import gather_user_context
+from app.backend.services.context_service import build_system_instructions
+from app.backend.services.event_queue import event_worker_pool
+from app.backend.services.llm_providers import Message, LLMProviderError, get_chat_provider
+from app.backend.services.vector_store_sync import enqueue_vector_store_sync
 from app.backend.models.user import User
 from app.backend.models.thread_map import ThreadMap
 from app.backend.models.query_log import QueryLog
 from app.backend.models.document import Document
+from app.backend.models.notification import ChatMessage
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Thread IDs of conversations held by a chat-completion provider (no OpenAI thread)
+LOCAL_THREAD_PREFIX = "local-"
+
 
 async def get_or_create_thread(
     db: AsyncSession,
     user: User,
-    conversation_id: int
+    conversation_id: int,
+    local: bool = False,
 ) -> str:
     """
     Get or create OpenAI thread for a conversation.
@@ -39,6 +52,8 @@ async def get_or_create_thread(
         db: Database session
         user: User object
         conversation_id: Frontend conversation ID
+        local: Only record the conversation (chat-completion providers keep
+            no remote thread); the thread ID is then a local placeholder
     
     Returns:
         OpenAI thread ID
@@ -51,28 +66,36 @@ async def get_or_create_thread(
     )
     thread_map = result.scalar_one_or_none()
     
-    if thread_map:
+    if thread_map and (local or not thread_map.thread_id.startswith(LOCAL_THREAD_PREFIX)):
         # Update last_used_at
         thread_map.last_used_at = func.now()
         await db.commit()
         return thread_map.thread_id
     
-    # Create new thread
-    client = get_openai_client()
-    thread = await client.beta.threads.create()
+    if local:
+        thread_id = f"{LOCAL_THREAD_PREFIX}{conversation_id}"
+    else:
+        # Create new thread
+        client = get_openai_client()
+        thread = await client.beta.threads.create()
+        thread_id = thread.id
     
-    # Create thread mapping
-    thread_map = ThreadMap(
-        conversation_id=conversation_id,
-        thread_id=thread.id,
-        user_id=user.id
-    )
-    db.add(thread_map)
+    if thread_map:
+        # Conversation started with a chat-completion provider
+        thread_map.thread_id = thread_id
+        thread_map.last_used_at = func.now()
+    else:
+        # Create thread mapping
+        thread_map = ThreadMap(
+            conversation_id=conversation_id,
+            thread_id=thread_id,
+            user_id=user.id
+        )
+        db.add(thread_map)
     await db.commit()
-    await db.refresh(thread_map)
     
-    logger.info(f"Created new thread {thread.id} for conversation {conversation_id}")
-    return thread.id
+    logger.info(f"Created new thread {thread_id} for conversation {conversation_id}")
+    return thread_id
 
 
 async def cancel_active_runs_for_thread(thread_id: str) -> None:
@@ -137,30 +160,35 @@ async def _get_image_file_ids(
     return file_ids
 
 
-async def send_message(
+class AssistantRunError(Exception):
+    """Raised when an Assistants run ends without completing"""
+
+
+class AssistantNotFoundError(AssistantRunError):
+    """Raised when a run cannot start because the assistant (or thread) no longer exists"""
+
+
+def _run_error_message(run: Any) -> str:
+    last_error = getattr(run, "last_error", None)
+    return f"Run {run.status}: {last_error.message if last_error else 'Unknown error'}"
+
+
+async def _prepare_run(
     db: AsyncSession,
     user: User,
     message: str,
     conversation_id: int,
     current_module_id: Optional[int] = None,
     current_lesson_id: Optional[int] = None,
-    ip_address: Optional[str] = None,
     context_payload: Optional[Dict[str, Any]] = None,
+    image_document_ids: Optional[list[int]] = None,
 ) -> Dict[str, Any]:
     """
-    Send a message to the AI assistant and get response.
-    
-    Args:
-        db: Database session
-        user: User object
-        message: User's message
-        conversation_id: Conversation ID
-        current_module_id: Optional current module ID for context
-        current_lesson_id: Optional current lesson ID for context
-        ip_address: Optional IP address for logging
+    Post the user's message to the conversation thread and collect what a run needs.
     
     Returns:
-        Dict with 'response' and 'conversation_id'
+        Dict with 'client', 'thread_id', 'assistant_id', 'instructions' and 'message'
+        (the sanitized user message)
     """
     try:
         client = get_openai_client()
@@ -180,28 +208,22 @@ async def send_message(
     # Cancel any active runs to prevent conflicts
     await cancel_active_runs_for_thread(thread_id)
     
-    # Gather user context
-    try:
-        context = await gather_user_context(
-            user,
-            db,
-            current_module_id=current_module_id,
-            current_lesson_id=current_lesson_id,
-            extra_context=context_payload,
-        )
-    except Exception as e:
-        logger.error(f"Error gathering context: {e}")
-        context = {}
-    
-    # Format system prompt with context
-    system_instructions = format_system_prompt_with_context(context)
+    # System prompt with the student's context (cached per conversation)
+    system_instructions = await build_system_instructions(
+        user,
+        db,
+        conversation_id,
+        current_module_id=current_module_id,
+        current_lesson_id=current_lesson_id,
+        extra_context=context_payload,
+    )
 
-    # Sync vector store
-    vector_store_id = None
-    try:
-        vector_store_id = await update_vector_store(db, user)
-    except Exception as e:
-        logger.warning(f"Vector store sync failed for user {user.id}: {e}")
+    # The vector store is kept in sync in the background (services/vector_store_sync.py);
+    # the first message only schedules the initial sync (once, until it has created the store)
+    vector_store_id = user.openai_vector_store_id
+    if not vector_store_id and await enqueue_vector_store_sync(db, user.id, skip_if_running=True):
+        await db.commit()
+        event_worker_pool.wake()
     
     # Get user's assistant (will attach vector store if available)
     try:
@@ -228,63 +250,243 @@ async def send_message(
         logger.error(f"Failed to add message to thread {thread_id}: {e}")
         raise Exception(f"Failed to send message to AI: {str(e)}")
     
-    # Create run with context in additional_instructions
+    return {
+        "client": client,
+        "thread_id": thread_id,
+        "assistant_id": assistant_id,
+        "vector_store_id": vector_store_id,
+        "instructions": system_instructions,
+        "message": sanitized_message,
+    }
+
+
+async def _stream_run_text(
+    client: AsyncOpenAI,
+    thread_id: str,
+    assistant_id: str,
+    instructions: str,
+) -> AsyncGenerator[str, None]:
+    """
+    Run the assistant on a thread and yield the reply text as it is generated.
+    
+    Uses the Assistants streaming API, relaying each message delta. Falls back
+    to polling the run when streaming is disabled or the stream cannot be
+    opened.
+    
+    Raises:
+        AssistantNotFoundError: If the run could not be created (404)
+        AssistantRunError: If the run fails, is cancelled, expires or needs tool output
+    """
+    if not settings.OPENAI_STREAMING_ENABLED:
+        async for text in _poll_run_text(client, thread_id, assistant_id, instructions):
+            yield text
+        return
+    
     # Note: tool_resources is set on the assistant, not on the run
+    try:
+        stream = await client.beta.threads.runs.create(
+            thread_id=thread_id,
+            assistant_id=assistant_id,
+            additional_instructions=instructions,
+            stream=True,
+        )
+    except Exception as e:
+        if is_not_found_error(e):
+            raise AssistantNotFoundError(str(e))
+        logger.warning(f"Streaming run unavailable for thread {thread_id}, polling instead: {e}")
+        async for text in _poll_run_text(client, thread_id, assistant_id, instructions):
+            yield text
+        return
+    
+    async for event in stream:
+        if event.event == "thread.message.delta":
+            for content in event.data.delta.content or []:
+                if content.type == "text" and content.text and content.text.value:
+                    yield content.text.value
+        elif event.event in ("thread.run.failed", "thread.run.cancelled", "thread.run.expired"):
+            raise AssistantRunError(_run_error_message(event.data))
+        elif event.event == "thread.run.requires_action":
+            # Tool calls are not implemented (future web search feature)
+            raise AssistantRunError("Run requires action - tool calls not yet implemented")
+        elif event.event == "error":
+            raise AssistantRunError(f"Run error: {getattr(event.data, 'message', event.data)}")
+
+
+async def _poll_run_text(
+    client: AsyncOpenAI,
+    thread_id: str,
+    assistant_id: str,
+    instructions: str,
+) -> AsyncGenerator[str, None]:
+    """
+    Create a run, poll it until it finishes and yield the complete reply once.
+    
+    Polls quickly at first and backs off to OPENAI_RUN_POLL_INTERVAL_SECONDS,
+    since short replies often complete within the first second.
+    """
     try:
         run = await client.beta.threads.runs.create(
             thread_id=thread_id,
             assistant_id=assistant_id,
-            additional_instructions=system_instructions,
+            additional_instructions=instructions,
         )
     except Exception as e:
+        if is_not_found_error(e):
+            raise AssistantNotFoundError(str(e))
         logger.error(f"Failed to create run for thread {thread_id}: {e}")
         raise Exception(f"Failed to start AI conversation: {str(e)}")
     
-    # Wait for completion
-    import asyncio
-    while True:
-        run_status = await client.beta.threads.runs.retrieve(thread_id=thread_id, run_id=run.id)
-        
-        if run_status.status == "completed":
-            break
-        elif run_status.status in ["failed", "cancelled", "expired"]:
-            error_msg = f"Run {run_status.status}: {run_status.last_error.message if run_status.last_error else 'Unknown error'}"
-            logger.error(error_msg)
-            raise Exception(error_msg)
-        
-        await asyncio.sleep(0.5)  # Poll every 500ms
+    interval = min(0.1, settings.OPENAI_RUN_POLL_INTERVAL_SECONDS)
+    while run.status not in ("completed", "failed", "cancelled", "expired", "requires_action"):
+        await asyncio.sleep(interval)
+        interval = min(interval * 2, settings.OPENAI_RUN_POLL_INTERVAL_SECONDS)
+        run = await client.beta.threads.runs.retrieve(thread_id=thread_id, run_id=run.id)
+    
+    if run.status == "requires_action":
+        raise AssistantRunError("Run requires action - tool calls not yet implemented")
+    if run.status != "completed":
+        raise AssistantRunError(_run_error_message(run))
     
     # Get response
     messages = await client.beta.threads.messages.list(thread_id=thread_id, limit=1)
-    response_text = ""
+    if messages.data and messages.data[0].content:
+        for content in messages.data[0].content:
+            if content.type == "text" and content.text.value:
+                yield content.text.value
+                return
+
+
+async def _run_reply(db: AsyncSession, user: User, run: Dict[str, Any]) -> AsyncGenerator[str, None]:
+    """
+    Yield the assistant's reply for a prepared run.
+    
+    Assistant ids are cached, so a 404 when starting the run means the cached
+    assistant was deleted remotely: the cached handles are dropped, the
+    assistant is verified or recreated and the run is retried once.
+    """
+    try:
+        async for text in _stream_run_text(run["client"], run["thread_id"], run["assistant_id"], run["instructions"]):
+            yield text
+        return
+    except AssistantNotFoundError as e:
+        logger.warning(f"Assistant {run['assistant_id']} not found for user {user.id}, re-verifying: {e}")
+    
+    assistant_handle_cache.invalidate("assistant", user.id)
+    assistant_handle_cache.invalidate("global_assistant", None)
+    run["assistant_id"] = await get_assistant_for_user(user, db, run["vector_store_id"])
+    async for text in _stream_run_text(run["client"], run["thread_id"], run["assistant_id"], run["instructions"]):
+        yield text
+
+
+async def _prepare_messages(
+    db: AsyncSession,
+    user: User,
+    message: str,
+    conversation_id: int,
+    current_module_id: Optional[int] = None,
+    current_lesson_id: Optional[int] = None,
+    context_payload: Optional[Dict[str, Any]] = None,
+    image_document_ids: Optional[list[int]] = None,
+) -> List[Message]:
+    """
+    Build the message list for a chat-completion provider.
     
-    if messages.data:
-        message = messages.data[0]
-        if hasattr(message, 'content') and message.content:
-            for content in message.content:
-                if hasattr(content, 'type') and content.type == "text":
-                    if hasattr(content, 'text') and hasattr(content.text, 'value'):
-                        response_text = content.text.value
-                        break
+    Providers keep no thread, so the system instructions and the last
+    LLM_HISTORY_MESSAGES exchanges of the conversation are sent with every
+    message. Documents (file_search) and image attachments are only
+    available through the Assistants API.
+    """
+    sanitized_message = sanitize_message(message)
+    if image_document_ids:
+        logger.info(f"Ignoring image attachments for conversation {conversation_id}: provider has no file support")
+    
+    await get_or_create_thread(db, user, conversation_id, local=True)
+    
+    system_instructions = await build_system_instructions(
+        user,
+        db,
+        conversation_id,
+        current_module_id=current_module_id,
+        current_lesson_id=current_lesson_id,
+        extra_context=context_payload,
+    )
     
-    if not response_text:
-        logger.warning(f"No response text found for thread {thread_id}, run {run.id}")
-        response_text = "I apologize, but I couldn't generate a response. Please try again."
+    history: List[Dict[str, Any]] = []
+    if settings.LLM_HISTORY_MESSAGES > 0:
+        result = await db.execute(
+            select(ChatMessage.message, ChatMessage.response)
+            .where(ChatMessage.user_id == user.id)
+            .where(ChatMessage.conversation_id == conversation_id)
+            .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+            .limit(settings.LLM_HISTORY_MESSAGES)
+        )
+        history = [{"message": row.message, "response": row.response} for row in reversed(result.all())]
     
-    # Format citations in response
+    return [
+        Message(role="system", content=system_instructions),
+        *(Message(**entry) for entry in format_chat_history(history, settings.LLM_HISTORY_MESSAGES)),
+        Message(role="user", content=sanitized_message),
+    ]
+
+
+async def _start_reply(
+    db: AsyncSession,
+    user: User,
+    message: str,
+    conversation_id: int,
+    current_module_id: Optional[int] = None,
+    current_lesson_id: Optional[int] = None,
+    context_payload: Optional[Dict[str, Any]] = None,
+    image_document_ids: Optional[list[int]] = None,
+) -> Tuple[str, AsyncGenerator[str, None]]:
+    """
+    Prepare a reply with the configured AI_CHAT_PROVIDER.
+    
+    Returns:
+        The sanitized user message and a generator of reply text, raising
+        AssistantRunError or LLMProviderError if generation fails
+    """
     try:
-        response_text = await format_citations_in_response(response_text, db)
-    except Exception as e:
-        logger.error(f"Error formatting citations: {e}", exc_info=True)
-        # Continue with unformatted response if citation formatting fails
+        provider = get_chat_provider()
+    except ValueError as e:
+        logger.error(f"AI provider initialization failed: {e}")
+        raise Exception(f"AI service configuration error: {str(e)}")
     
-    # Log query
+    if provider is None:
+        run = await _prepare_run(
+            db, user, message, conversation_id,
+            current_module_id=current_module_id,
+            current_lesson_id=current_lesson_id,
+            context_payload=context_payload,
+            image_document_ids=image_document_ids,
+        )
+        return run["message"], _run_reply(db, user, run)
+    
+    messages = await _prepare_messages(
+        db, user, message, conversation_id,
+        current_module_id=current_module_id,
+        current_lesson_id=current_lesson_id,
+        context_payload=context_payload,
+        image_document_ids=image_document_ids,
+    )
+    return messages[-1].content, provider.stream(messages)
+
+
+async def _log_query(
+    db: AsyncSession,
+    user: User,
+    query: str,
+    response: str,
+    operation_type: str,
+    conversation_id: int,
+    ip_address: Optional[str],
+) -> None:
     try:
         query_log = QueryLog(
             user_id=user.id,
-            query=sanitized_message,
-            response=response_text,
-            operation_type="chat",
+            query=query,
+            response=response,
+            operation_type=operation_type,
             conversation_id=conversation_id,
             ip_address=ip_address
         )
@@ -293,6 +495,65 @@ async def send_message(
     except Exception as e:
         logger.error(f"Error logging query: {e}")
         await db.rollback()
+
+
+async def send_message(
+    db: AsyncSession,
+    user: User,
+    message: str,
+    conversation_id: int,
+    current_module_id: Optional[int] = None,
+    current_lesson_id: Optional[int] = None,
+    ip_address: Optional[str] = None,
+    context_payload: Optional[Dict[str, Any]] = None,
+    image_document_ids: Optional[list[int]] = None,
+) -> Dict[str, Any]:
+    """
+    Send a message to the AI assistant and get response.
+    
+    Args:
+        db: Database session
+        user: User object
+        message: User's message
+        conversation_id: Conversation ID
+        current_module_id: Optional current module ID for context
+        current_lesson_id: Optional current lesson ID for context
+        ip_address: Optional IP address for logging
+        image_document_ids: Optional IDs of the user's uploaded images to attach
+    
+    Returns:
+        Dict with 'response' and 'conversation_id'
+    """
+    sanitized_message, reply = await _start_reply(
+        db, user, message, conversation_id,
+        current_module_id=current_module_id,
+        current_lesson_id=current_lesson_id,
+        context_payload=context_payload,
+        image_document_ids=image_document_ids,
+    )
+    
+    # Collect the streamed reply
+    parts = []
+    try:
+        async for text in reply:
+            parts.append(text)
+    except (AssistantRunError, LLMProviderError) as e:
+        logger.error(str(e))
+        raise Exception(str(e))
+    response_text = "".join(parts)
+    
+    if not response_text:
+        logger.warning(f"No response text found for conversation {conversation_id}")
+        response_text = "I apologize, but I couldn't generate a response. Please try again."
+    
+    # Format citations in response
+    try:
+        response_text = await format_citations_in_response(response_text, db)
+    except Exception as e:
+        logger.error(f"Error formatting citations: {e}", exc_info=True)
+        # Continue with unformatted response if citation formatting fails
+    
+    await _log_query(db, user, sanitized_message, response_text, "chat", conversation_id, ip_address)
     
     return {
         "response": response_text,
@@ -314,122 +575,34 @@ async def send_message_stream(
     """
     Send a message and stream the response.
     
+    Text is relayed as the assistant generates it, with citations formatted
+    on the fly (see CitationStreamBuffer).
+    
     Yields:
         Response text chunks
     """
-    client = get_openai_client()
-    
-    # Sanitize message
-    sanitized_message = sanitize_message(message)
-    
-    # Get image file IDs if provided
-    image_file_ids = await _get_image_file_ids(db, user, image_document_ids)
-    
-    # Get or create thread
-    thread_id = await get_or_create_thread(db, user, conversation_id)
-    
-    # Cancel any active runs
-    await cancel_active_runs_for_thread(thread_id)
-    
-    # Gather user context
-    try:
-        context = await gather_user_context(
-            user,
-            db,
-            current_module_id=current_module_id,
-            current_lesson_id=current_lesson_id,
-            extra_context=context_payload,
-        )
-    except Exception as e:
-        logger.error(f"Error gathering context: {e}")
-        context = {}
-    
-    # Format system prompt
-    system_instructions = format_system_prompt_with_context(context)
-
-    # Sync vector store
-    vector_store_id = None
-    try:
-        vector_store_id = await update_vector_store(db, user)
-    except Exception as e:
-        logger.warning(f"Vector store sync failed for user {user.id}: {e}")
-    
-    # Get assistant (will attach vector store if available)
-    assistant_id = await get_assistant_for_user(user, db, vector_store_id)
-    
-    # Build message content (text + images)
-    message_content: list[Dict[str, Any]] = [{"type": "text", "text": sanitized_message}]
-    
-    # Add image file attachments if any
-    for file_id in image_file_ids:
-        message_content.append({"type": "image_file", "image_file": {"file_id": file_id}})
-    
-    # Add message to thread
-    await client.beta.threads.messages.create(
-        thread_id=thread_id,
-        role="user",
-        content=message_content if image_file_ids else sanitized_message
-    )
-    
-    # Create run
-    # Note: tool_resources is set on the assistant, not on the run
-    run = await client.beta.threads.runs.create(
-        thread_id=thread_id,
-        assistant_id=assistant_id,
-        additional_instructions=system_instructions,
+    sanitized_message, reply = await _start_reply(
+        db, user, message, conversation_id,
+        current_module_id=current_module_id,
+        current_lesson_id=current_lesson_id,
+        context_payload=context_payload,
+        image_document_ids=image_document_ids,
     )
     
-    # Stream response
-    import asyncio
+    citations = CitationStreamBuffer(db)
     full_response = ""
-    
-    while True:
-        run_status = await client.beta.threads.runs.retrieve(thread_id=thread_id, run_id=run.id)
-        
-        if run_status.status == "completed":
-            # Get final response
-            messages = await client.beta.threads.messages.list(thread_id=thread_id, limit=1)
-            if messages.data:
-                message = messages.data[0]
-                if message.content:
-                    for content in message.content:
-                        if content.type == "text":
-                            raw_response = content.text.value
-                            # Format citations in the full response
-                            try:
-                                formatted_response = await format_citations_in_response(raw_response, db)
-                            except Exception as e:
-                                logger.error(f"Error formatting citations in stream: {e}", exc_info=True)
-                                formatted_response = raw_response
-                            # Yield the formatted response (since we're not actually streaming incrementally)
-                            if formatted_response and formatted_response != full_response:
-                                yield formatted_response
-                            full_response = formatted_response
-            break
-        elif run_status.status in ["failed", "cancelled", "expired"]:
-            error_msg = f"Run {run_status.status}: {run_status.last_error.message if run_status.last_error else 'Unknown error'}"
-            logger.error(error_msg)
-            yield f"\n\n[Error: {error_msg}]"
-            break
-        elif run_status.status == "requires_action":
-            # Handle tool calls if needed (for future web search feature)
-            logger.warning("Run requires action - tool calls not yet implemented")
-            await asyncio.sleep(0.5)
-        else:
-            await asyncio.sleep(0.5)
-    
-    # Log query
     try:
-        query_log = QueryLog(
-            user_id=user.id,
-            query=sanitized_message,
-            response=full_response,
-            operation_type="stream",
-            conversation_id=conversation_id,
-            ip_address=ip_address
-        )
-        db.add(query_log)
-        await db.commit()
-    except Exception as e:
-        logger.error(f"Error logging query: {e}")
-        await db.rollback()
+        async for text in reply:
+            chunk = await citations.feed(text)
+            if chunk:
+                full_response += chunk
+                yield chunk
+        chunk = await citations.flush()
+        if chunk:
+            full_response += chunk
+            yield chunk
+    except (AssistantRunError, LLMProviderError) as e:
+        logger.error(str(e))
+        yield f"\n\n[Error: {e}]"
+    
+    await _log_query(db, user, sanitized_message, full_response, "stream", conversation_id, ip_address)
@@ -0,0 +1,126 @@
+"""In-process pub/sub hub for live notifications and cached unread counts"""
+from typing import Any, Dict, Optional, Set, Tuple
+import asyncio
+import logging
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, and_
+
+from app.backend.core.config import settings
+from app.backend.models.notification import Notification
+
+logger = logging.getLogger(__name__)
+
+# Events buffered per connection before a slow client starts missing them
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class NotificationHub:
+    """
+    Fan notification events out to the SSE connections of each user.
+
+    The hub lives in the API process: a notification created in another
+    worker process reaches its own subscribers only. Unread counts are cached
+    per user for NOTIFICATION_UNREAD_CACHE_TTL_SECONDS, which bounds how long
+    a count changed by another process can be stale.
+    """
+
+    def __init__(self, unread_ttl_seconds: float):
+        self.unread_ttl_seconds = unread_ttl_seconds
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self._unread: Dict[int, Tuple[int, float]] = {}
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[user_id]
+
+    def subscriber_count(self, user_id: Optional[int] = None) -> int:
+        if user_id is not None:
+            return len(self._subscribers.get(user_id, ()))
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def publish(self, user_id: int, event: Dict[str, Any]) -> None:
+        """Queue an event for every connection of the user (no-op if none)"""
+        for queue in self._subscribers.get(user_id, ()):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                logger.warning(f"Dropping notification event for slow subscriber of user {user_id}")
+
+    def get_unread(self, user_id: int) -> Optional[int]:
+        """Cached unread count, or None if unknown or expired"""
+        entry = self._unread.get(user_id)
+        if entry is None:
+            return None
+        count, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._unread[user_id]
+            return None
+        return count
+
+    def set_unread(self, user_id: int, count: int) -> None:
+        self._unread[user_id] = (max(count, 0), time.monotonic() + self.unread_ttl_seconds)
+        self.publish(user_id, {"type": "unread_count", "unread_count": max(count, 0)})
+
+    def adjust_unread(self, user_id: int, delta: int) -> None:
+        """Apply a change to a cached count; uncached users are counted on next read"""
+        count = self.get_unread(user_id)
+        if count is None:
+            return
+        self._unread[user_id] = (max(count + delta, 0), self._unread[user_id][1])
+        self.publish(user_id, {"type": "unread_count", "unread_count": max(count + delta, 0)})
+
+    def notification_created(self, notification: Notification) -> None:
+        """Publish a newly committed notification and bump the owner's count"""
+        self.publish(notification.user_id, {
+            "type": "notification",
+            "notification": {
+                "id": notification.id,
+                "user_id": notification.user_id,
+                "type": notification.type,
+                "title": notification.title,
+                "message": notification.message,
+                "link": notification.link,
+                "is_read": notification.is_read,
+                "group_count": notification.group_count or 1,
+                "created_at": notification.created_at.isoformat() if notification.created_at else None,
+                "read_at": None,
+            },
+        })
+        if not notification.is_read:
+            self.adjust_unread(notification.user_id, 1)
+
+    def reset(self) -> None:
+        """Forget cached counts (subscribers are kept)"""
+        self._unread.clear()
+
+
+notification_hub = NotificationHub(settings.NOTIFICATION_UNREAD_CACHE_TTL_SECONDS)
+
+
+async def get_unread_count(db: AsyncSession, user_id: int) -> int:
+    """Unread notification count, served from the hub cache when possible"""
+    count = notification_hub.get_unread(user_id)
+    if count is not None:
+        return count
+    result = await db.execute(
+        select(func.count(Notification.id)).where(
+            and_(
+                Notification.user_id == user_id,
+                Notification.is_read == False
+            )
+        )
+    )
+    count = result.scalar() or 0
+    notification_hub.set_unread(user_id, count)
+    return count
@@ -0,0 +1,277 @@
+"""Notification retention: expiry, digest compaction and partition maintenance"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, delete, func, text
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+import logging
+
+from app.backend.core.config import settings
+from app.backend.core.database import AsyncSessionLocal
+from app.backend.core.scheduler import PeriodicJob
+from app.backend.models.notification import Notification
+from app.backend.services.notification_hub import notification_hub
+
+logger = logging.getLogger(__name__)
+
+# Notification types whose unread repeats (same user and link) collapse into one
+# digest row: type -> (title, message template)
+DIGEST_TEMPLATES = {
+    "forum_reply": ("New replies to your post", "{count} new replies to your forum post"),
+    "assessment_graded": ("Assessments graded", "{count} of your assessments in this module have been graded"),
+}
+
+# Monthly partitions are named notifications_pYYYY_MM (see the partitioning migration)
+PARTITION_PREFIX = "notifications_p"
+DEFAULT_PARTITION = "notifications_default"
+PARTITION_MONTHS_AHEAD = 2
+
+
+async def purge_expired_notifications(
+    db: AsyncSession,
+    older_than_days: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    unread_older_than_days: Optional[int] = None
+) -> int:
+    """
+    Delete read notifications older than the retention window.
+
+    Unread notifications are kept unless an unread retention window is set
+    (`unread_older_than_days` or NOTIFICATION_UNREAD_RETENTION_DAYS, off by
+    default), in which case those older than it are deleted too. Deletes in batches of `batch_size`, committing after each, so a large
+    backlog never holds locks for long.
+
+    Returns:
+        Number of notifications deleted
+    """
+    days = older_than_days if older_than_days is not None else settings.NOTIFICATION_RETENTION_DAYS
+    unread_days = (
+        unread_older_than_days if unread_older_than_days is not None
+        else settings.NOTIFICATION_UNREAD_RETENTION_DAYS
+    )
+    batch_size = batch_size or settings.NOTIFICATION_MAINTENANCE_BATCH_SIZE
+    now = datetime.utcnow()
+    passes = [(True, now - timedelta(days=days))]
+    if unread_days is not None:
+        passes.append((False, now - timedelta(days=unread_days)))
+
+    deleted = 0
+    for is_read, cutoff in passes:
+        while True:
+            batch = (
+                select(Notification.id)
+                .where(Notification.is_read == is_read, Notification.created_at < cutoff)
+                .limit(batch_size)
+            )
+            result = await db.execute(
+                delete(Notification)
+                .where(Notification.id.in_(batch))
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            deleted += result.rowcount
+            if not is_read and result.rowcount:
+                # Cached unread counts no longer match; recount on next read
+                notification_hub.reset()
+            if result.rowcount < batch_size:
+                break
+    return deleted
+
+
+async def compact_notifications(
+    db: AsyncSession,
+    min_count: Optional[int] = None,
+    batch_size: Optional[int] = None
+) -> int:
+    """
+    Collapse repeated unread notifications into digest rows.
+
+    Each group of at least `min_count` unread notifications with the same
+    user, type (see DIGEST_TEMPLATES) and link is reduced to its newest row,
+    retitled as a digest with group_count set to the total it represents.
+    Groups are processed `batch_size` at a time, one commit per batch.
+
+    Returns:
+        Number of notifications removed
+    """
+    # A group of one has nothing to collapse and would be matched again forever
+    min_count = max(2, min_count or settings.NOTIFICATION_DIGEST_MIN_COUNT)
+    batch_size = batch_size or settings.NOTIFICATION_MAINTENANCE_BATCH_SIZE
+
+    removed_total = 0
+    while True:
+        result = await db.execute(
+            select(
+                Notification.user_id,
+                Notification.type,
+                Notification.link,
+                func.max(Notification.id).label("keep_id"),
+                func.sum(Notification.group_count).label("total")
+            )
+            .where(
+                Notification.is_read == False,
+                Notification.type.in_(DIGEST_TEMPLATES),
+                Notification.link.isnot(None)
+            )
+            .group_by(Notification.user_id, Notification.type, Notification.link)
+            .having(func.count(Notification.id) >= min_count)
+            .limit(batch_size)
+        )
+        groups = result.all()
+        if not groups:
+            return removed_total
+
+        removed_by_user: Dict[int, int] = {}
+        for group in groups:
+            title, template = DIGEST_TEMPLATES[group.type]
+            await db.execute(
+                update(Notification)
+                .where(Notification.id == group.keep_id)
+                .values(title=title, message=template.format(count=group.total), group_count=group.total)
+                .execution_options(synchronize_session=False)
+            )
+            # Rows newer than keep_id arrived after the grouping query; leave them for the next run
+            deleted = await db.execute(
+                delete(Notification)
+                .where(
+                    Notification.user_id == group.user_id,
+                    Notification.type == group.type,
+                    Notification.link == group.link,
+                    Notification.is_read == False,
+                    Notification.id < group.keep_id
+                )
+                .execution_options(synchronize_session=False)
+            )
+            removed_by_user[group.user_id] = removed_by_user.get(group.user_id, 0) + deleted.rowcount
+        await db.commit()
+
+        for user_id, removed in removed_by_user.items():
+            notification_hub.adjust_unread(user_id, -removed)
+            removed_total += removed
+        if len(groups) < batch_size:
+            return removed_total
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _partition_name(month: date) -> str:
+    return f"{PARTITION_PREFIX}{month.year:04d}_{month.month:02d}"
+
+
+async def _notification_partitions(db: AsyncSession) -> List[str]:
+    result = await db.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = 'notifications'"
+    ))
+    return list(result.scalars().all())
+
+
+async def _create_partition(db: AsyncSession, name: str, start: date) -> None:
+    """
+    Create the partition for one month, moving matching rows out of the default partition.
+
+    CREATE TABLE ... PARTITION OF fails once the default partition holds rows
+    in the new range, so the table is created standalone, filled with those
+    rows and then attached (all in the caller's transaction).
+    """
+    end = _add_months(start, 1)
+    bounds = f"created_at >= '{start.isoformat()}' AND created_at < '{end.isoformat()}'"
+    await db.execute(text(f"CREATE TABLE {name} (LIKE notifications INCLUDING DEFAULTS)"))
+    await db.execute(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE {bounds} RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    ))
+    await db.execute(text(
+        f"ALTER TABLE notifications ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+
+
+async def maintain_notification_partitions(db: AsyncSession, months_ahead: int = PARTITION_MONTHS_AHEAD) -> Dict[str, List[str]]:
+    """
+    Create upcoming monthly partitions and drop expired ones (PostgreSQL only).
+
+    A partition is dropped once its whole month is older than the read
+    retention window. Its unread rows are first moved to the default
+    partition (the month's range is no longer covered once detached), unless
+    the month is also past the opt-in unread retention window. No-op if the
+    table isn't partitioned.
+
+    Returns:
+        {"created": [...], "dropped": [...]} partition names
+    """
+    changes: Dict[str, List[str]] = {"created": [], "dropped": []}
+    if db.get_bind().dialect.name != "postgresql":
+        return changes
+
+    existing = set(await _notification_partitions(db))
+    if not existing:
+        return changes
+
+    this_month = date.today().replace(day=1)
+    for offset in range(months_ahead + 1):
+        start = _add_months(this_month, offset)
+        name = _partition_name(start)
+        if name in existing:
+            continue
+        await _create_partition(db, name, start)
+        changes["created"].append(name)
+
+    today = datetime.utcnow().date()
+    cutoff = today - timedelta(days=settings.NOTIFICATION_RETENTION_DAYS)
+    unread_days = settings.NOTIFICATION_UNREAD_RETENTION_DAYS
+    unread_cutoff = today - timedelta(days=unread_days) if unread_days is not None else None
+    dropped_unread = False
+    for name in sorted(existing):
+        if not name.startswith(PARTITION_PREFIX):
+            continue
+        try:
+            year, month = (int(part) for part in name[len(PARTITION_PREFIX):].split("_"))
+        except ValueError:
+            continue
+        month_end = _add_months(date(year, month, 1), 1)
+        if month_end > cutoff:
+            continue
+        # Dropping a whole month is far cheaper than deleting its rows
+        await db.execute(text(f"ALTER TABLE notifications DETACH PARTITION {name}"))
+        if unread_cutoff is None or month_end > unread_cutoff:
+            await db.execute(text(f"INSERT INTO notifications SELECT * FROM {name} WHERE is_read = false"))
+        else:
+            has_unread = await db.execute(text(f"SELECT EXISTS (SELECT 1 FROM {name} WHERE is_read = false)"))
+            dropped_unread = dropped_unread or bool(has_unread.scalar())
+        await db.execute(text(f"DROP TABLE {name}"))
+        changes["dropped"].append(name)
+
+    await db.commit()
+    if dropped_unread:
+        # Cached unread counts no longer match; recount on next read
+        notification_hub.reset()
+    return changes
+
+
+async def run_notification_maintenance(db: AsyncSession) -> Dict:
+    """Run expiry, compaction and partition maintenance once"""
+    purged = await purge_expired_notifications(db)
+    compacted = await compact_notifications(db)
+    partitions = await maintain_notification_partitions(db)
+    return {"purged": purged, "compacted": compacted, "partitions": partitions}
+
+
+async def _notification_maintenance_job() -> None:
+    async with AsyncSessionLocal() as db:
+        summary = await run_notification_maintenance(db)
+        logger.info(
+            f"Notification maintenance: purged {summary['purged']}, compacted {summary['compacted']}, "
+            f"partitions created {summary['partitions']['created']} dropped {summary['partitions']['dropped']}"
+        )
+
+
+notification_maintenance_job = PeriodicJob(
+    "notification-maintenance",
+    settings.NOTIFICATION_MAINTENANCE_INTERVAL_SECONDS,
+    _notification_maintenance_job
+)
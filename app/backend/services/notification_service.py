@@ -1,15 +1,22 @@
 """Notification service for creating notifications"""
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert, union
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Iterable, List, Optional
 import logging
+import time
 
+from app.backend.core.config import settings
+from app.backend.models.cohort import CohortMember
 from app.backend.models.notification import Notification
-from app.backend.models.user import User
+from app.backend.models.user import User, UserRole
+from app.backend.services.notification_hub import notification_hub
 
 logger = logging.getLogger(__name__)
 
+# Session.info key for notifications awaiting their transaction's commit
+_PENDING_NOTIFICATIONS = "pending_notifications"
+
 
 async def create_notification(
     db: AsyncSession,
@@ -17,9 +24,16 @@ async def create_notification(
     notification_type: str,
     title: str,
     message: str,
-    link: Optional[str] = None
+    link: Optional[str] = None,
+    commit: bool = True
 ) -> Notification:
-    """Create a notification for a user"""
+    """
+    Create a notification for a user.
+
+    With commit=False the notification is only flushed, so it commits (or
+    rolls back) with the caller's transaction; the caller then calls
+    publish_pending_notifications() after its commit.
+    """
     notification = Notification(
         user_id=user_id,
         type=notification_type,
@@ -30,20 +44,147 @@ async def create_notification(
     )
     
     db.add(notification)
+    if not commit:
+        await db.flush()
+        await db.refresh(notification)
+        db.info.setdefault(_PENDING_NOTIFICATIONS, []).append(notification)
+        return notification
     await db.commit()
     await db.refresh(notification)
+    notification_hub.notification_created(notification)
     
     logger.info(f"Created notification {notification.id} for user {user_id}: {notification_type}")
     
     return notification
 
 
+async def resolve_audience(
+    db: AsyncSession,
+    cohort_id: Optional[int] = None,
+    role: Optional[UserRole] = None,
+    user_ids: Optional[Iterable[int]] = None
+) -> List[int]:
+    """
+    Resolve a broadcast audience to active user ids in one query.
+
+    The audience is the union of the given selectors: members of the cohort,
+    users with the role, and the listed users. Inactive accounts are skipped.
+    """
+    selectors = []
+    if cohort_id is not None:
+        selectors.append(select(CohortMember.user_id).where(CohortMember.cohort_id == cohort_id))
+    if role is not None:
+        selectors.append(select(User.id).where(User.role == role))
+    if user_ids:
+        selectors.append(select(User.id).where(User.id.in_(set(user_ids))))
+    if not selectors:
+        return []
+
+    audience = union(*selectors).subquery()
+    result = await db.execute(
+        select(User.id)
+        .where(User.id.in_(select(audience.c[0])), User.is_active == True)
+        .order_by(User.id)
+    )
+    return list(result.scalars().all())
+
+
+async def bulk_create_notifications(
+    db: AsyncSession,
+    user_ids: Iterable[int],
+    notification_type: str,
+    title: str,
+    message: str,
+    link: Optional[str] = None,
+    chunk_size: Optional[int] = None
+) -> Dict:
+    """
+    Create the same notification for many users.
+
+    Rows are written with one multi-row INSERT ... RETURNING per chunk of
+    `chunk_size` users, all in a single transaction, instead of one
+    add/commit/refresh round trip per user.
+
+    Returns:
+        Fan-out metrics: recipients, chunks, notification_ids, elapsed_ms
+        and rows_per_second
+    """
+    recipients = list(dict.fromkeys(user_ids))
+    chunk_size = chunk_size or settings.NOTIFICATION_FANOUT_CHUNK_SIZE
+    started = time.perf_counter()
+
+    created = []
+    chunks = 0
+    for start in range(0, len(recipients), chunk_size):
+        rows = [
+            {
+                "user_id": user_id,
+                "type": notification_type,
+                "title": title,
+                "message": message,
+                "link": link,
+                "is_read": False,
+            }
+            for user_id in recipients[start:start + chunk_size]
+        ]
+        result = await db.execute(
+            insert(Notification).values(rows).returning(
+                Notification.id, Notification.user_id, Notification.created_at
+            )
+        )
+        created.extend(result.all())
+        chunks += 1
+
+    if recipients:
+        await db.commit()
+
+    notification_ids = [row.id for row in created]
+    for row in created:
+        notification_hub.notification_created(Notification(
+            id=row.id,
+            user_id=row.user_id,
+            type=notification_type,
+            title=title,
+            message=message,
+            link=link,
+            is_read=False,
+            created_at=row.created_at
+        ))
+
+    elapsed = time.perf_counter() - started
+    rows_per_second = round(len(notification_ids) / elapsed, 1) if elapsed > 0 else 0.0
+    logger.info(
+        f"Fanned out {notification_type} notification to {len(notification_ids)} users "
+        f"in {chunks} chunk(s), {elapsed * 1000:.1f}ms ({rows_per_second} rows/s)"
+    )
+
+    return {
+        "recipients": len(notification_ids),
+        "chunks": chunks,
+        "notification_ids": notification_ids,
+        "elapsed_ms": round(elapsed * 1000, 2),
+        "rows_per_second": rows_per_second,
+    }
+
+
+def publish_pending_notifications(db: AsyncSession) -> None:
+    """Push notifications created with commit=False to subscribers once committed"""
+    for notification in db.info.pop(_PENDING_NOTIFICATIONS, []):
+        notification_hub.notification_created(notification)
+
+
+def discard_pending_notifications(db: AsyncSession) -> None:
+    """Forget notifications created with commit=False after a rollback"""
+    db.info.pop(_PENDING_NOTIFICATIONS, None)
+
+
 async def notify_forum_reply(
     db: AsyncSession,
     post_author_id: int,
     reply_author_username: str,
     post_id: int,
-    module_id: Optional[int] = None
+    module_id: Optional[int] = None,
+    commit: bool = True
 ):
     """Notify a user when someone replies to their forum post"""
     link = f"/modules/{module_id}/forums/posts/{post_id}" if module_id else f"/forums/posts/{post_id}"
@@ -54,7 +195,8 @@ async def notify_forum_reply(
         notification_type="forum_reply",
         title="New reply to your post",
         message=f"{reply_author_username} replied to your forum post",
-        link=link
+        link=link,
+        commit=commit
     )
 
 
@@ -94,15 +236,27 @@ async def notify_module_unlocked(
 
 async def notify_announcement(
     db: AsyncSession,
-    user_id: int,
     title: str,
     message: str,
-    link: Optional[str] = None
-):
-    """Notify a user of an announcement"""
-    await create_notification(
-        db=db,
-        user_id=user_id,
+    link: Optional[str] = None,
+    user_id: Optional[int] = None,
+    cohort_id: Optional[int] = None,
+    role: Optional[UserRole] = None,
+    user_ids: Optional[Iterable[int]] = None
+) -> Dict:
+    """
+    Notify an audience of an announcement.
+
+    Target a single user, a cohort, a role, a list of users, or any union of
+    these. Returns the fan-out metrics from bulk_create_notifications.
+    """
+    targets = list(user_ids or [])
+    if user_id is not None:
+        targets.append(user_id)
+    audience = await resolve_audience(db, cohort_id=cohort_id, role=role, user_ids=targets)
+    return await bulk_create_notifications(
+        db,
+        audience,
         notification_type="announcement",
         title=title,
         message=message,
@@ -0,0 +1,300 @@
+"""Per-student analytics rollup maintained on write"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from sqlalchemy.dialects import postgresql, sqlite
+from typing import Iterable, Optional, Tuple
+from datetime import date, datetime, timedelta
+import logging
+
+from app.backend.models.analytics import StudentStats, StudentActivityDay
+from app.backend.models.progress import UserProgress, QuizAttempt, ProgressStatus
+from app.backend.models.assessment import Assessment
+from app.backend.models.achievement import Achievement, UserAchievement
+from app.backend.services.analytics_service import attempt_score_percentage
+
+logger = logging.getLogger(__name__)
+
+_PROGRESS_COUNTERS = {
+    ProgressStatus.COMPLETED: "modules_completed",
+    ProgressStatus.IN_PROGRESS: "modules_in_progress",
+    ProgressStatus.NOT_STARTED: "modules_not_started",
+}
+
+
+def _streaks(activity_dates: Iterable[date]) -> Tuple[int, int, Optional[date]]:
+    """
+    Compute (current, longest, last) streaks from a set of activity dates.
+
+    The current streak is the run of consecutive days ending at the most
+    recent activity date; it is reported as 0 on read once it has lapsed.
+    """
+    days = sorted(set(activity_dates))
+    if not days:
+        return 0, 0, None
+
+    longest = run = 1
+    for previous, day in zip(days, days[1:]):
+        run = run + 1 if day - previous == timedelta(days=1) else 1
+        longest = max(longest, run)
+    return run, longest, days[-1]
+
+
+def score_percentage(points_earned: Optional[int], points: int) -> Optional[float]:
+    """Score of an attempt as a percentage (None until graded)"""
+    if points_earned is None or not points:
+        return None
+    return points_earned / points * 100
+
+
+def _insert_ignoring_conflicts(db: AsyncSession, model=StudentStats, index_elements=None):
+    """Dialect-specific INSERT ... ON CONFLICT DO NOTHING (student_stats by default)"""
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    return dialect.insert(model).on_conflict_do_nothing(
+        index_elements=index_elements or [StudentStats.user_id]
+    )
+
+
+async def _compute_student_stats(db: AsyncSession, user_id: int) -> dict:
+    """Aggregate a student's rollup values from the source tables"""
+    result = await db.execute(
+        select(
+            func.count(QuizAttempt.id),
+            func.count(attempt_score_percentage),
+            func.coalesce(func.sum(attempt_score_percentage), 0.0),
+        )
+        .join(Assessment, Assessment.id == QuizAttempt.assessment_id)
+        .where(QuizAttempt.user_id == user_id)
+    )
+    total_attempts, scored_attempts, score_sum = result.one()
+
+    # At most one row per module, so this stays small
+    result = await db.execute(
+        select(UserProgress.status, UserProgress.last_accessed_at)
+        .where(UserProgress.user_id == user_id)
+    )
+    progress_rows = result.all()
+
+    result = await db.execute(
+        select(
+            func.count(UserAchievement.achievement_id),
+            func.coalesce(func.sum(Achievement.points), 0),
+        )
+        .join(Achievement, Achievement.id == UserAchievement.achievement_id)
+        .where(UserAchievement.user_id == user_id)
+    )
+    total_achievements, total_points = result.one()
+
+    # Streaks come from the per-day activity ledger that _record_activity_day
+    # writes; latest module accesses cover days from before the ledger existed
+    result = await db.execute(
+        select(StudentActivityDay.activity_date).where(StudentActivityDay.user_id == user_id)
+    )
+    activity = [accessed for _, accessed in progress_rows if accessed]
+    current_streak, longest_streak, last_activity_date = _streaks(
+        [*result.scalars().all(), *(a.date() for a in activity)]
+    )
+
+    values = {
+        "user_id": user_id,
+        "total_attempts": total_attempts,
+        "scored_attempts": scored_attempts,
+        "score_sum": float(score_sum),
+        "total_achievements": total_achievements,
+        "total_points": total_points,
+        "current_streak_days": current_streak,
+        "longest_streak_days": longest_streak,
+        "last_activity_date": last_activity_date,
+        "last_activity_at": max(activity) if activity else None,
+    }
+    for status, column in _PROGRESS_COUNTERS.items():
+        values[column] = sum(1 for row_status, _ in progress_rows if row_status == status)
+    return values
+
+
+async def rebuild_student_stats(db: AsyncSession, user_id: int) -> StudentStats:
+    """
+    Recompute a student's rollup row from the source tables.
+
+    Used to seed the row the first time a student is touched and to repair
+    drift; the caller commits.
+    """
+    await db.flush()
+    values = await _compute_student_stats(db, user_id)
+    stats = await db.get(StudentStats, user_id)
+    if stats is None:
+        stats = StudentStats(**values)
+        db.add(stats)
+    else:
+        # Streak days from before the activity ledger existed cannot be recounted
+        values["longest_streak_days"] = max(values["longest_streak_days"], stats.longest_streak_days or 0)
+        for column, value in values.items():
+            setattr(stats, column, value)
+    await db.flush()
+    return stats
+
+
+async def _lock_student_stats(db: AsyncSession, user_id: int) -> Tuple[StudentStats, bool]:
+    """
+    Load a student's rollup row for update, seeding it if it does not exist.
+
+    Must be called after the change being recorded has been added to the
+    session. A freshly seeded row already reflects that change, so the
+    second element tells the caller whether to skip applying its delta.
+    """
+    await db.flush()
+    result = await db.execute(
+        select(StudentStats)
+        .where(StudentStats.user_id == user_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    stats = result.scalar_one_or_none()
+    if stats is not None:
+        return stats, False
+
+    values = await _compute_student_stats(db, user_id)
+    inserted = await db.execute(_insert_ignoring_conflicts(db).values(**values))
+    result = await db.execute(
+        select(StudentStats)
+        .where(StudentStats.user_id == user_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    # If a concurrent request seeded the row first, our change is not in it yet
+    return result.scalar_one(), inserted.rowcount == 1
+
+
+async def _record_activity_day(db: AsyncSession, user_id: int, when: datetime) -> None:
+    """Add the day of a module access to the student's activity ledger"""
+    await db.execute(
+        _insert_ignoring_conflicts(
+            db, StudentActivityDay, [StudentActivityDay.user_id, StudentActivityDay.activity_date]
+        ).values(user_id=user_id, activity_date=when.date())
+    )
+
+
+def _record_activity(stats: StudentStats, when: datetime) -> None:
+    """
+    Advance the activity streak for a module access at `when`.
+
+    Activity days are the days a student accessed module progress; each is
+    also written to student_activity_days, which the rebuild derives streaks
+    from, so both paths count the same days.
+    """
+    day = when.date()
+    last_day = stats.last_activity_date
+    if last_day is None or day > last_day:
+        if last_day is not None and day - last_day == timedelta(days=1):
+            stats.current_streak_days = (stats.current_streak_days or 0) + 1
+        else:
+            stats.current_streak_days = 1
+        stats.longest_streak_days = max(stats.longest_streak_days or 0, stats.current_streak_days)
+        stats.last_activity_date = day
+    if day >= stats.last_activity_date:
+        stats.last_activity_at = when
+
+
+async def record_attempt_submitted(
+    db: AsyncSession,
+    user_id: int,
+    score_percentage: Optional[float]
+) -> None:
+    """
+    Count a new quiz attempt (score is None until it has been graded).
+
+    Call after adding the attempt to the session; the caller commits.
+    """
+    stats, seeded = await _lock_student_stats(db, user_id)
+    if seeded:
+        return
+    stats.total_attempts += 1
+    if score_percentage is not None:
+        stats.scored_attempts += 1
+        stats.score_sum += score_percentage
+
+
+async def record_attempt_graded(db: AsyncSession, user_id: int, score_percentage: float) -> None:
+    """
+    Count the score of a manually graded attempt.
+
+    Call after setting points_earned on the attempt; the caller commits.
+    """
+    stats, seeded = await _lock_student_stats(db, user_id)
+    if seeded:
+        return
+    stats.scored_attempts += 1
+    stats.score_sum += score_percentage
+
+
+async def record_progress_change(
+    db: AsyncSession,
+    user_id: int,
+    old_status: Optional[ProgressStatus],
+    new_status: ProgressStatus,
+    accessed_at: Optional[datetime] = None
+) -> None:
+    """
+    Move a module between the progress counters and record the access.
+
+    old_status is None when the progress row was just created. Call after
+    updating the UserProgress row; the caller commits.
+    """
+    accessed_at = accessed_at or datetime.now()
+    # Before seeding, so a freshly seeded row counts this day too
+    await _record_activity_day(db, user_id, accessed_at)
+    stats, seeded = await _lock_student_stats(db, user_id)
+    if seeded:
+        return
+    if old_status != new_status:
+        if old_status is not None:
+            column = _PROGRESS_COUNTERS[old_status]
+            setattr(stats, column, getattr(stats, column) - 1)
+        column = _PROGRESS_COUNTERS[new_status]
+        setattr(stats, column, getattr(stats, column) + 1)
+    _record_activity(stats, accessed_at)
+
+
+async def record_achievement_earned(
+    db: AsyncSession,
+    user_id: int,
+    points: int,
+    count: int = 1
+) -> None:
+    """
+    Count newly unlocked achievements and their total points.
+
+    Call after adding the UserAchievement rows to the session; the caller
+    commits.
+    """
+    stats, seeded = await _lock_student_stats(db, user_id)
+    if seeded:
+        return
+    stats.total_achievements += count
+    stats.total_points += points or 0
+
+
+async def get_student_stats(db: AsyncSession, user_id: int) -> StudentStats:
+    """
+    Read a student's rollup row, seeding it on first access.
+
+    The seeded row is committed so later reads are a single primary-key lookup.
+    """
+    stats = await db.get(StudentStats, user_id)
+    if stats is None:
+        stats = await rebuild_student_stats(db, user_id)
+        await db.commit()
+    return stats
+
+
+def current_streak(stats: StudentStats, today: Optional[date] = None) -> int:
+    """Current streak as of today (0 once a day has been missed)"""
+    today = today or datetime.now().date()
+    if stats.last_activity_date is None or today - stats.last_activity_date > timedelta(days=1):
+        return 0
+    return stats.current_streak_days
+
+
+def average_score(stats: StudentStats) -> float:
+    """Average score percentage over graded attempts"""
+    return stats.score_sum / stats.scored_attempts if stats.scored_attempts else 0.0
+
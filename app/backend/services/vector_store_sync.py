@@ -0,0 +1,233 @@
+"""Background sync of users' documents to their OpenAI vector stores"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, or_
+from typing import Dict, Optional, Tuple
+from pathlib import Path
+import asyncio
+import hashlib
+import logging
+
+from app.backend.core.config import settings
+from app.backend.core.database import AsyncSessionLocal
+from app.backend.core.openai_utils import (
+    get_openai_client,
+    get_or_create_user_vector_store,
+    _is_image_file,
+    _is_text_document,
+    _upload_file_to_openai,
+)
+from app.backend.core.scheduler import PeriodicJob
+from app.backend.models.document import Document, VectorStoreFile, VectorSyncStatus
+from app.backend.models.outbox import OutboxEvent, OutboxStatus
+from app.backend.models.user import User
+
+logger = logging.getLogger(__name__)
+
+SYNC_EVENT = "vector_store_sync"
+
+
+class VectorStoreSyncError(Exception):
+    """Raised when some documents could not be synced (the job is retried)"""
+
+
+def _hash_file(file_path: Path) -> str:
+    digest = hashlib.sha256()
+    with file_path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+async def content_hash(file_path: Path) -> str:
+    """sha256 of a file, computed off the event loop"""
+    return await asyncio.to_thread(_hash_file, file_path)
+
+
+async def enqueue_vector_store_sync(db: AsyncSession, user_id: int, skip_if_running: bool = False) -> bool:
+    """
+    Schedule a sync of the user's vector store in the caller's transaction.
+
+    Nothing is added while a sync for the user is still pending, since it
+    will see the caller's changes anyway. A sync that is already running may
+    have read the documents before them, so it only counts when
+    `skip_if_running` is set (e.g. when all the caller needs is the store).
+    Call event_worker_pool.wake() after the commit for prompt processing.
+
+    Returns:
+        True if an event was added
+    """
+    statuses = [OutboxStatus.PENDING, OutboxStatus.PROCESSING] if skip_if_running else [OutboxStatus.PENDING]
+    scheduled = await db.execute(
+        select(OutboxEvent.id)
+        .where(OutboxEvent.event_type == SYNC_EVENT)
+        .where(OutboxEvent.user_id == user_id)
+        .where(OutboxEvent.status.in_(statuses))
+        .limit(1)
+    )
+    if scheduled.first() is not None:
+        return False
+    from app.backend.services.event_queue import enqueue_event
+    enqueue_event(db, SYNC_EVENT, user_id=user_id)
+    return True
+
+
+async def enqueue_vector_store_sync_for_all(db: AsyncSession) -> int:
+    """
+    Schedule a sync for every user who has a vector store.
+
+    For changes to standard documents, which are visible to all users.
+    Users with a sync already pending are skipped.
+
+    Returns:
+        Number of events added
+    """
+    pending = (
+        select(OutboxEvent.user_id)
+        .where(OutboxEvent.event_type == SYNC_EVENT)
+        .where(OutboxEvent.status == OutboxStatus.PENDING)
+        .where(OutboxEvent.user_id.isnot(None))
+    )
+    result = await db.execute(
+        select(User.id)
+        .where(User.openai_vector_store_id.isnot(None))
+        .where(User.id.not_in(pending))
+    )
+    user_ids = result.scalars().all()
+    from app.backend.services.event_queue import enqueue_event
+    for user_id in user_ids:
+        enqueue_event(db, SYNC_EVENT, user_id=user_id)
+    return len(user_ids)
+
+
+async def sync_vector_store(db: AsyncSession, user: User) -> Optional[str]:
+    """
+    Bring the user's vector store in line with their visible text documents.
+
+    The vector_store_files ledger records the content hash and OpenAI file
+    attached for each document, so unchanged documents cost no API calls and
+    the remote store is never listed. New or changed documents are uploaded
+    (an upload of the same content for another store is reused) and
+    attached; documents that were deleted or are no longer visible are
+    detached. Each document is committed as it is synced.
+
+    Returns:
+        The vector store ID, or None if OpenAI is not configured
+
+    Raises:
+        VectorStoreSyncError: If any document failed; its ledger row is marked
+            failed and the next sync retries it
+    """
+    vector_store_id = await get_or_create_user_vector_store(user, db)
+    if not vector_store_id:
+        return None
+    client = get_openai_client()
+
+    # Documents visible to the user (their uploads + shared/standard)
+    result = await db.execute(
+        select(Document)
+        .where(Document.is_deleted == False)  # noqa: E712
+        .where(or_(Document.uploader_id == user.id, Document.category == "standard"))
+    )
+    documents = result.scalars().all()
+
+    result = await db.execute(
+        select(VectorStoreFile).where(VectorStoreFile.vector_store_id == vector_store_id)
+    )
+    ledger: Dict[int, VectorStoreFile] = {row.document_id: row for row in result.scalars().all()}
+
+    # Files already uploaded for a given content, e.g. a standard document synced for another user
+    document_ids = [document.id for document in documents]
+    known_uploads: Dict[Tuple[int, str], str] = {}
+    tracked_documents = set()
+    if document_ids:
+        result = await db.execute(
+            select(VectorStoreFile.document_id, VectorStoreFile.content_hash, VectorStoreFile.openai_file_id)
+            .where(VectorStoreFile.document_id.in_(document_ids))
+        )
+        for document_id, file_hash, file_id in result.all():
+            tracked_documents.add(document_id)
+            if file_id:
+                known_uploads[(document_id, file_hash)] = file_id
+
+    failures = 0
+    for document in documents:
+        file_path = Path(document.storage_path)
+        if not file_path.exists():
+            logger.warning("Document %s missing on disk at %s", document.id, document.storage_path)
+            continue
+        # Images are attached directly to messages; only text goes to file_search
+        if _is_image_file(file_path) or not _is_text_document(file_path):
+            continue
+
+        file_hash = await content_hash(file_path)
+        row = ledger.pop(document.id, None)
+        if row and row.status == VectorSyncStatus.SYNCED and row.content_hash == file_hash:
+            continue
+
+        if row is None:
+            row = VectorStoreFile(user_id=user.id, vector_store_id=vector_store_id, document_id=document.id)
+            db.add(row)
+        elif row.openai_file_id and row.content_hash != file_hash:
+            await _detach(client, vector_store_id, row.openai_file_id)
+            row.openai_file_id = None
+
+        try:
+            file_id = known_uploads.get((document.id, file_hash))
+            if file_id is None and document.openai_file_id and document.id not in tracked_documents:
+                # Uploaded before the ledger existed; stored files are never rewritten
+                file_id = document.openai_file_id
+            if file_id is None:
+                file_id = await _upload_file_to_openai(client, file_path)
+                if file_id is None:
+                    raise VectorStoreSyncError(f"Upload of document {document.id} failed")
+                known_uploads[(document.id, file_hash)] = file_id
+            await client.beta.vector_stores.files.create(vector_store_id=vector_store_id, file_id=file_id)
+            document.openai_file_id = file_id
+            row.openai_file_id = file_id
+            row.status = VectorSyncStatus.SYNCED
+            row.last_error = None
+        except Exception as e:
+            logger.warning("Syncing document %s to vector store %s failed: %s", document.id, vector_store_id, e)
+            row.status = VectorSyncStatus.FAILED
+            row.last_error = str(e)[:2000]
+            failures += 1
+        row.content_hash = file_hash
+        await db.commit()
+
+    # Documents deleted or no longer visible
+    for row in ledger.values():
+        if row.openai_file_id:
+            await _detach(client, vector_store_id, row.openai_file_id)
+        await db.delete(row)
+    if ledger:
+        await db.commit()
+
+    if failures:
+        raise VectorStoreSyncError(f"{failures} document(s) failed to sync to vector store {vector_store_id}")
+    return vector_store_id
+
+
+async def _detach(client, vector_store_id: str, file_id: str) -> None:
+    try:
+        await client.beta.vector_stores.files.delete(vector_store_id=vector_store_id, file_id=file_id)
+    except Exception as e:
+        logger.warning("Failed to remove file %s from vector store %s: %s", file_id, vector_store_id, e)
+
+
+async def _vector_store_reconcile_job() -> None:
+    # Catches standard documents added or changed outside the API (e.g. seed scripts)
+    from app.backend.services.event_queue import event_worker_pool
+    async with AsyncSessionLocal() as db:
+        scheduled = await enqueue_vector_store_sync_for_all(db)
+        await db.commit()
+    if scheduled:
+        event_worker_pool.wake()
+        logger.info("Vector store reconcile: scheduled %s sync(s)", scheduled)
+
+
+vector_store_reconcile_job = PeriodicJob(
+    "vector-store-reconcile",
+    settings.VECTOR_STORE_RECONCILE_INTERVAL_SECONDS,
+    _vector_store_reconcile_job,
+    run_on_start=False
+)
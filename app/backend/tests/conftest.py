@@ -4,6 +4,7 @@ from pathlib import Path
 
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.pool import StaticPool
 
@@ -19,6 +20,12 @@ from app.backend.models.assessment import Assessment, QuestionType
 from app.backend.models.cohort import Cohort, CohortMember, CohortRole
 from app.backend.models.progress import QuizAttempt, ReviewStatus
 from app.backend.core.security import create_access_token
+from app.backend.services.achievement_rules import invalidate_achievement_index
+from app.backend.services.notification_hub import notification_hub
+from app.backend.core.auth_cache import user_principal_cache
+from app.backend.core.assistant_cache import assistant_handle_cache
+from app.backend.services.catalog_cache import catalog_cache
+from app.backend.services.context_cache import user_context_cache
 
 # Use in-memory SQLite for testing
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
@@ -37,6 +44,13 @@ TestingSessionLocal = async_sessionmaker(
 @pytest.fixture
 async def db_session():
     """Create a test database session"""
+    # Each test gets a fresh schema, so drop process-level caches keyed by ids
+    invalidate_achievement_index()
+    notification_hub.reset()
+    user_principal_cache.clear()
+    catalog_cache.clear()
+    user_context_cache.clear()
+    assistant_handle_cache.clear()
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     
@@ -155,6 +169,30 @@ async def test_instructor_token(test_instructor: User):
     return create_access_token(data={"sub": str(test_instructor.id)})
 
 
+@pytest.fixture
+async def test_admin(db_session: AsyncSession):
+    """Create a test admin user"""
+    admin = User(
+        email="admin@example.com",
+        hashed_password="hashed_password",
+        username="admin",
+        full_name="Test Admin",
+        role=UserRole.ADMIN,
+        is_active=True,
+        is_verified=True,
+    )
+    db_session.add(admin)
+    await db_session.commit()
+    await db_session.refresh(admin)
+    return admin
+
+
+@pytest.fixture
+async def test_admin_token(test_admin: User):
+    """Create a test JWT token for admin"""
+    return create_access_token(data={"sub": str(test_admin.id)})
+
+
 @pytest.fixture
 async def test_cohort(db_session: AsyncSession, test_instructor: User):
     """Create a test cohort"""
@@ -220,6 +258,19 @@ async def test_quiz_attempt_pending(
     return attempt
 
 
+@pytest.fixture
+def query_counter():
+    """Record SQL statements executed against the test engine"""
+    statements = []
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+
+
 @pytest.fixture
 async def async_client():
     """Create an async HTTP client for testing"""
@@ -0,0 +1,113 @@
+"""Tests for achievement checking"""
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.backend.main import app
+from app.backend.models.achievement import Achievement, UserAchievement
+from app.backend.models.module import Module, Track
+from app.backend.models.progress import UserProgress, ProgressStatus
+from app.backend.core.database import get_db
+from app.backend.services import achievement_rules
+from app.backend.services.achievement_service import check_achievements
+from app.backend.tests.conftest import override_get_db
+
+
+def _achievement(name: str, criteria: dict, points: int = 10) -> Achievement:
+    return Achievement(name=name, criteria=criteria, points=points, is_active=True)
+
+
+@pytest.mark.asyncio
+async def test_check_achievements_module_completed(
+    test_user,
+    test_module,
+    db_session: AsyncSession,
+    query_counter,
+):
+    """Test that completion rules share one fact fetch and unlock once"""
+    db_session.add_all([
+        _achievement("First Module", {"module_completion": {"module_id": test_module.id}}),
+        _achievement("Any Module", {"module_completion": {"any_module": True}}),
+        _achievement("Beginner Track", {"track_completion": {"track_name": "beginner"}}, points=100),
+        _achievement("Other Module", {"module_completion": {"module_id": test_module.id + 1}}),
+        _achievement("High Score", {"score_threshold": {"min_score": 90}}),
+        _achievement("Broken", "not json"),
+    ])
+    db_session.add(UserProgress(
+        user_id=test_user.id,
+        module_id=test_module.id,
+        status=ProgressStatus.COMPLETED,
+        completion_percentage=100.0,
+    ))
+    await db_session.commit()
+
+    # Warm the compiled index so only per-event queries are counted
+    await check_achievements(db_session, test_user.id, "streak")
+
+    query_counter.clear()
+    unlocked = await check_achievements(db_session, test_user.id, "module_completed")
+    first_write = next(
+        index for index, statement in enumerate(query_counter)
+        if statement.lstrip().upper().startswith("INSERT")
+    )
+
+    assert test_module.track == Track.USER
+    assert sorted(a.name for a in unlocked) == ["Any Module", "Beginner Track", "First Module"]
+    # Earned check + completed modules + track modules, however many rules share them
+    assert first_write == 3
+
+    result = await db_session.execute(
+        select(UserAchievement.achievement_id).where(UserAchievement.user_id == test_user.id)
+    )
+    assert len(result.scalars().all()) == 3
+
+    assert await check_achievements(db_session, test_user.id, "module_completed") == []
+
+
+@pytest.mark.asyncio
+async def test_achievement_index_invalidated_on_change(
+    async_client: AsyncClient,
+    test_user,
+    test_module,
+    override_get_db,
+    test_token,
+    db_session: AsyncSession,
+):
+    """Test that new and deactivated achievements are picked up without a restart"""
+    app.dependency_overrides[get_db] = override_get_db
+
+    db_session.add(UserProgress(
+        user_id=test_user.id,
+        module_id=test_module.id,
+        status=ProgressStatus.COMPLETED,
+        completion_percentage=100.0,
+    ))
+    retired = _achievement("Retired", {"module_completion": {"module_id": test_module.id + 1}})
+    db_session.add(retired)
+    db_session.add(_achievement("Existing", {"module_completion": {"any_module": True}}))
+    await db_session.commit()
+
+    unlocked = await check_achievements(db_session, test_user.id, "module_completed")
+    assert [a.name for a in unlocked] == ["Existing"]
+
+    retired.criteria = {"module_completion": {"module_id": test_module.id}}
+    retired.is_active = False
+    db_session.add(_achievement("Added Later", {"module_completion": {"module_id": test_module.id}}))
+    # Invalidated once the change commits, not when it is flushed
+    generation = achievement_rules._index_generation
+    await db_session.flush()
+    assert achievement_rules._index_generation == generation
+    await db_session.commit()
+    assert achievement_rules._index_generation == generation + 1
+
+    response = await async_client.post(
+        "/api/v1/achievements/check",
+        params={"event_type": "module_completed"},
+        headers={"Authorization": f"Bearer {test_token}"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [a["name"] for a in data["unlocked_achievements"]] == ["Added Later"]
+
+    app.dependency_overrides.clear()
@@ -0,0 +1,330 @@
+"""Tests for AI assistant chat endpoints"""
+import asyncio
+import json
+
+import httpx
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.backend.main import app
+from app.backend.core import openai_utils
+from app.backend.core.assistant_cache import assistant_handle_cache
+from app.backend.core.chat_utils import CitationStreamBuffer
+from app.backend.core.database import get_db
+from app.backend.core.fake_openai import FakeAsyncOpenAI, FakeOpenAIError
+from app.backend.core.config import settings
+from app.backend.models.notification import ChatMessage
+from app.backend.models.progress import ProgressStatus, UserProgress
+from app.backend.models.thread_map import ThreadMap
+from app.backend.models.user import User
+from app.backend.services import llm_providers
+from app.backend.services.context_cache import user_context_cache
+from app.backend.services.context_service import build_system_instructions
+from app.backend.services.llm_providers import (
+    ChatCompletionsProvider,
+    LLMProviderError,
+    Message,
+    MockProvider,
+    OllamaProvider,
+)
+
+
+def _events(body: str):
+    return [json.loads(line[len("data: "):]) for line in body.splitlines() if line.startswith("data: ")]
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_relays_deltas(
+    async_client: AsyncClient,
+    test_user,
+    override_get_db,
+    test_token,
+    db_session: AsyncSession,
+    monkeypatch,
+):
+    """Test that streamed replies are relayed delta by delta without polling the run"""
+    app.dependency_overrides[get_db] = override_get_db
+    fake = FakeAsyncOpenAI(reply=lambda question: "Blocks link by hash. Changing one breaks the chain.")
+    monkeypatch.setattr(openai_utils, "_client", fake)
+
+    response = await async_client.post(
+        "/api/v1/chat/stream",
+        json={"message": "How are blocks linked?", "conversation_id": 42},
+        headers={"Authorization": f"Bearer {test_token}"},
+    )
+    assert response.status_code == 200
+    events = _events(response.text)
+    assert events[0] == {"type": "conversation_id", "conversation_id": 42}
+    chunks = [event["content"] for event in events if event["type"] == "chunk"]
+    assert len(chunks) > 1
+    assert "".join(chunks) == "Blocks link by hash. Changing one breaks the chain."
+    assert events[-1] == {"type": "done"}
+    assert "runs.retrieve" not in fake.calls
+
+    saved = (await db_session.execute(
+        select(ChatMessage).where(ChatMessage.conversation_id == 42)
+    )).scalar_one()
+    assert saved.response == "".join(chunks)
+
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_chat_falls_back_to_polling(
+    async_client: AsyncClient,
+    test_user,
+    override_get_db,
+    test_token,
+    monkeypatch,
+):
+    """Test that replies still arrive by polling when streaming is unavailable"""
+    app.dependency_overrides[get_db] = override_get_db
+    fake = FakeAsyncOpenAI(streaming=False)
+    monkeypatch.setattr(openai_utils, "_client", fake)
+    headers = {"Authorization": f"Bearer {test_token}"}
+
+    response = await async_client.post(
+        "/api/v1/chat/stream", json={"message": "What is a nonce?", "conversation_id": 7}, headers=headers
+    )
+    chunks = [event["content"] for event in _events(response.text) if event["type"] == "chunk"]
+    assert chunks == ["You asked: What is a nonce?"]
+
+    response = await async_client.post(
+        "/api/v1/chat", json={"message": "What is gas?", "conversation_id": 7}, headers=headers
+    )
+    assert response.status_code == 201
+    assert response.json()["response"] == "You asked: What is gas?"
+
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_citation_buffer_holds_split_citations(db_session: AsyncSession):
+    """Test that a citation split across deltas is formatted once complete"""
+    buffer = CitationStreamBuffer(db_session)
+    assert await buffer.feed("See the notes 【4:0+") == "See the notes "
+    assert await buffer.feed("consensus.md") == ""
+    assert await buffer.feed("】 for more.") == '[Document: "consensus"] for more.'
+    assert await buffer.feed("Stray 【 bracket") == "Stray "
+    assert await buffer.flush() == "【 bracket"
+
+
+@pytest.mark.asyncio
+async def test_system_instructions_reuse_cached_context(
+    test_user,
+    test_instructor,
+    test_module,
+    db_session: AsyncSession,
+    query_counter,
+):
+    """Test that prompts are reused per conversation until the user's activity changes"""
+    first = await build_system_instructions(test_user, db_session, conversation_id=1)
+    assert "Total modules: 1" in first
+
+    # Same conversation: no context queries at all
+    query_counter.clear()
+    assert await build_system_instructions(test_user, db_session, conversation_id=1) == first
+    assert query_counter == []
+
+    # Another user shares the curriculum summary but gets their own snapshot
+    query_counter.clear()
+    await build_system_instructions(test_instructor, db_session, conversation_id=2)
+    assert not any("FROM modules" in statement for statement in query_counter)
+    assert any("FROM user_progress" in statement for statement in query_counter)
+
+    # New progress bumps the user's snapshot version
+    db_session.add(UserProgress(
+        user_id=test_user.id,
+        module_id=test_module.id,
+        status=ProgressStatus.IN_PROGRESS,
+        completion_percentage=40.0,
+    ))
+    version = user_context_cache.version(test_user.id)
+    await db_session.flush()
+    assert user_context_cache.version(test_user.id) == version
+    await db_session.commit()
+    assert user_context_cache.version(test_user.id) != version
+    updated = await build_system_instructions(test_user, db_session, conversation_id=1)
+    assert "Module 1: 40% complete" in updated
+
+    # The request's own context is part of the cache key
+    viewing = await build_system_instructions(test_user, db_session, conversation_id=1, current_module_id=1)
+    assert "Currently viewing: Module 1" in viewing
+    assert user_context_cache.stats()["locks"] == 0
+
+
+@pytest.mark.asyncio
+async def test_assistant_handles_cached_and_coalesced(
+    async_client: AsyncClient,
+    test_user,
+    override_get_db,
+    test_token,
+    monkeypatch,
+):
+    """Test that assistants are verified once, created once under concurrency and recreated after a 404"""
+    app.dependency_overrides[get_db] = override_get_db
+    fake = FakeAsyncOpenAI()
+    monkeypatch.setattr(openai_utils, "_client", fake)
+    create = fake.beta.assistants.create
+
+    async def slow_create(**config):
+        await asyncio.sleep(0.01)
+        return await create(**config)
+
+    fake.beta.assistants.create = slow_create
+
+    # A burst of first messages (separate request copies of the user) creates one assistant
+    copies = [User(id=test_user.id, email=test_user.email, username=test_user.username) for _ in range(5)]
+    ids = await asyncio.gather(*(openai_utils.get_assistant_for_user(user) for user in copies))
+    assert len(set(ids)) == 1
+    assert fake.calls["assistants.create"] == 1
+    assert assistant_handle_cache.stats()["locks"] == 0
+
+    headers = {"Authorization": f"Bearer {test_token}"}
+    for conversation_id in (1, 2):
+        response = await async_client.post(
+            "/api/v1/chat", json={"message": "Hi", "conversation_id": conversation_id}, headers=headers
+        )
+        assert response.status_code == 201
+    assert "assistants.retrieve" not in fake.calls
+
+    # Deleted remotely: the run's 404 drops the cached id and a new assistant is created
+    await fake.beta.assistants.delete(ids[0])
+    response = await async_client.post(
+        "/api/v1/chat", json={"message": "Still there?", "conversation_id": 1}, headers=headers
+    )
+    assert response.status_code == 201
+    assert response.json()["response"] == "You asked: Still there?"
+    assert fake.calls["assistants.create"] == 2
+
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_global_assistant_caches_only_not_found(monkeypatch):
+    """Test that a transient failure verifying the global assistant is retried, unlike a 404"""
+    fake = FakeAsyncOpenAI()
+    monkeypatch.setattr(openai_utils, "_client", fake)
+    assistant = await fake.beta.assistants.create(name="global")
+    monkeypatch.setattr(settings, "OPENAI_ASSISTANT_ID", assistant.id)
+    retrieve = fake.beta.assistants.retrieve
+
+    async def rate_limited(assistant_id):
+        raise FakeOpenAIError("Rate limit reached", status_code=429)
+
+    fake.beta.assistants.retrieve = rate_limited
+    assert await openai_utils.get_global_assistant_id() is None
+    fake.beta.assistants.retrieve = retrieve
+    assert await openai_utils.get_global_assistant_id() == assistant.id
+
+    # A missing assistant is remembered until the cache entry expires
+    assistant_handle_cache.clear()
+    await fake.beta.assistants.delete(assistant.id)
+    assert await openai_utils.get_global_assistant_id() is None
+    calls = fake.calls["assistants.retrieve"]
+    assert await openai_utils.get_global_assistant_id() is None
+    assert fake.calls["assistants.retrieve"] == calls
+
+
+@pytest.mark.asyncio
+async def test_mock_provider_answers_without_openai(
+    async_client: AsyncClient,
+    test_user,
+    override_get_db,
+    test_token,
+    db_session: AsyncSession,
+    monkeypatch,
+):
+    """Test that a chat-completion provider replaces threads and runs, sending the history itself"""
+    app.dependency_overrides[get_db] = override_get_db
+    fake = FakeAsyncOpenAI()
+    monkeypatch.setattr(openai_utils, "_client", fake)
+    monkeypatch.setattr(settings, "AI_CHAT_PROVIDER", "mock")
+    monkeypatch.setattr(llm_providers, "_providers", {})
+    headers = {"Authorization": f"Bearer {test_token}"}
+
+    response = await async_client.post(
+        "/api/v1/chat", json={"message": "What is a block?", "conversation_id": 5}, headers=headers
+    )
+    assert response.status_code == 201
+    assert response.json()["response"] == "You asked: What is a block?"
+
+    response = await async_client.post(
+        "/api/v1/chat/stream", json={"message": "And a chain?", "conversation_id": 5}, headers=headers
+    )
+    chunks = [event["content"] for event in _events(response.text) if event["type"] == "chunk"]
+    assert len(chunks) > 1
+    assert "".join(chunks) == "You asked: And a chain?"
+    assert fake.calls == {}
+
+    provider = llm_providers.get_chat_provider()
+    assert [(m.role, m.content) for m in provider.last_messages[1:]] == [
+        ("user", "What is a block?"),
+        ("assistant", "You asked: What is a block?"),
+        ("user", "And a chain?"),
+    ]
+    assert provider.last_messages[0].role == "system"
+
+    thread_map = (await db_session.execute(select(ThreadMap))).scalar_one()
+    assert thread_map.thread_id == "local-5"
+
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_http_providers_parse_streams():
+    """Test that chat-completions SSE and Ollama NDJSON streams are relayed and errors surfaced"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        assert body["messages"] == [{"role": "user", "content": "Hi"}]
+        if request.url.path == "/v1/chat/completions":
+            assert request.headers["Authorization"] == "Bearer sk-test"
+            lines = [
+                'data: {"choices": [{"delta": {"role": "assistant"}}]}',
+                'data: {"choices": [{"delta": {"content": "Hello"}}]}',
+                'data: {"choices": [{"delta": {"content": " there"}}]}',
+                "data: [DONE]",
+            ]
+            return httpx.Response(200, text="\n\n".join(lines))
+        if request.url.path == "/api/chat":
+            lines = [
+                json.dumps({"message": {"role": "assistant", "content": "Hello"}, "done": False}),
+                json.dumps({"message": {"role": "assistant", "content": " there"}, "done": True}),
+            ]
+            return httpx.Response(200, text="\n".join(lines))
+        return httpx.Response(500, text="boom")
+
+    transport = httpx.MockTransport(handler)
+    options = {"model": "m", "temperature": 0.0, "max_tokens": 100, "max_concurrency": 2, "timeout_seconds": 5}
+    messages = [Message(role="user", content="Hi")]
+
+    chat = ChatCompletionsProvider(
+        base_url="http://llm/v1", headers={"Authorization": "Bearer sk-test"}, transport=transport, **options
+    )
+    assert [text async for text in chat.stream(messages)] == ["Hello", " there"]
+
+    ollama = OllamaProvider(base_url="http://ollama/", transport=transport, **options)
+    assert (await ollama.generate(messages)).content == "Hello there"
+
+    broken = ChatCompletionsProvider(base_url="http://llm/broken", transport=transport, **options)
+    with pytest.raises(LLMProviderError, match="500"):
+        await broken.generate(messages)
+    assert broken.stats()["errors"] == 1
+
+    for provider in (chat, ollama, broken):
+        await provider.aclose()
+
+
+@pytest.mark.asyncio
+async def test_provider_concurrency_limit():
+    """Test that a provider never has more than max_concurrency requests in flight"""
+    provider = MockProvider(max_concurrency=2, chunk_delay_seconds=0.01)
+    replies = await asyncio.gather(*(
+        provider.generate([Message(role="user", content=f"Question {i}")]) for i in range(5)
+    ))
+    assert [reply.content for reply in replies] == [f"You asked: Question {i}" for i in range(5)]
+    assert provider.stats()["max_in_flight"] == 2
+    assert provider.stats()["requests"] == 5
+    assert provider.stats()["in_flight"] == 0
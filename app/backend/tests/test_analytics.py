@@ -0,0 +1,272 @@
+"""Tests for analytics endpoints"""
+import pytest
+from datetime import datetime, timedelta
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.backend.main import app
+from app.backend.models.cohort import CohortMember, CohortRole
+from app.backend.models.user import User, UserRole
+from app.backend.models.progress import UserProgress, QuizAttempt, ProgressStatus, ReviewStatus
+from app.backend.models.analytics import StudentStats
+from app.backend.services.student_stats_service import (
+    _compute_student_stats,
+    rebuild_student_stats,
+    record_progress_change,
+)
+from app.backend.core.auth_cache import user_principal_cache
+from app.backend.core.database import get_db
+from app.backend.tests.conftest import override_get_db
+
+
+@pytest.mark.asyncio
+async def test_get_cohort_analytics(
+    async_client: AsyncClient,
+    test_cohort,
+    test_user,
+    test_instructor,
+    test_module,
+    test_assessment,
+    override_get_db,
+    test_instructor_token,
+    db_session: AsyncSession,
+    query_counter,
+):
+    """Test cohort analytics aggregates, top performers and at-risk flags"""
+    app.dependency_overrides[get_db] = override_get_db
+
+    db_session.add(CohortMember(
+        cohort_id=test_cohort.id,
+        user_id=test_user.id,
+        role=CohortRole.STUDENT.value,
+    ))
+    db_session.add(UserProgress(
+        user_id=test_user.id,
+        module_id=test_module.id,
+        status=ProgressStatus.COMPLETED,
+        completion_percentage=100.0,
+        last_accessed_at=datetime.now(),
+    ))
+    db_session.add(UserProgress(
+        user_id=test_instructor.id,
+        module_id=test_module.id,
+        status=ProgressStatus.IN_PROGRESS,
+        last_accessed_at=datetime.now() - timedelta(days=30),
+    ))
+    for points_earned in (10, 5, None):
+        db_session.add(QuizAttempt(
+            user_id=test_user.id,
+            assessment_id=test_assessment.id,
+            points_earned=points_earned,
+            review_status=ReviewStatus.GRADED if points_earned is not None else ReviewStatus.PENDING,
+        ))
+    await db_session.commit()
+
+    query_counter.clear()
+    response = await async_client.get(
+        f"/api/v1/analytics/cohort/{test_cohort.id}",
+        headers={"Authorization": f"Bearer {test_instructor_token}"},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_students"] == 2
+    assert data["active_students"] == 1
+    assert data["average_score"] == 75.0
+    assert data["completion_rate"] == round(1 / (2 * 17) * 100, 2)
+    assert data["students_by_progress"] == {"completed": 1, "in_progress": 1, "not_started": 0}
+    assert data["top_performers"] == [{"user_id": test_user.id, "modules_completed": 1}]
+    assert data["at_risk_students"] == [{"user_id": test_instructor.id, "reason": "Inactive >7 days"}]
+
+    baseline_queries = len(query_counter)
+    for _ in range(5):
+        db_session.add(QuizAttempt(
+            user_id=test_user.id,
+            assessment_id=test_assessment.id,
+            points_earned=10,
+            review_status=ReviewStatus.GRADED,
+        ))
+    await db_session.commit()
+
+    # Authenticate from the database again, as the baseline request did
+    user_principal_cache.clear()
+    query_counter.clear()
+    response = await async_client.get(
+        f"/api/v1/analytics/cohort/{test_cohort.id}",
+        headers={"Authorization": f"Bearer {test_instructor_token}"},
+    )
+    assert response.status_code == 200
+    assert len(query_counter) == baseline_queries
+
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_student_stats_maintained_on_write(
+    async_client: AsyncClient,
+    test_user,
+    test_module,
+    test_assessment,
+    test_short_answer_assessment,
+    override_get_db,
+    test_token,
+    test_instructor_token,
+    db_session: AsyncSession,
+):
+    """Test that submissions, grading and progress keep the student rollup in sync"""
+    app.dependency_overrides[get_db] = override_get_db
+
+    response = await async_client.post(
+        f"/api/v1/assessments/{test_assessment.id}/submit",
+        headers={"Authorization": f"Bearer {test_token}"},
+        json={"user_answer": "B"},
+    )
+    assert response.status_code == 200
+
+    response = await async_client.post(
+        f"/api/v1/assessments/{test_short_answer_assessment.id}/submit",
+        headers={"Authorization": f"Bearer {test_token}"},
+        json={"user_answer": "My explanation"},
+    )
+    assert response.status_code == 200
+    short_answer_attempt_id = response.json()["attempt_id"]
+
+    response = await async_client.get(
+        f"/api/v1/analytics/student/{test_user.id}",
+        headers={"Authorization": f"Bearer {test_token}"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_attempts"] == 2
+    assert data["average_score"] == 100.0
+
+    response = await async_client.post(
+        f"/api/v1/grading/{short_answer_attempt_id}",
+        headers={"Authorization": f"Bearer {test_instructor_token}"},
+        json={"is_correct": True, "points_earned": 5, "partial_credit": True},
+    )
+    assert response.status_code == 200
+
+    response = await async_client.get(
+        f"/api/v1/assessments/results/{test_module.id}",
+        headers={"Authorization": f"Bearer {test_token}"},
+    )
+    assert response.status_code == 200
+
+    response = await async_client.get(
+        f"/api/v1/analytics/student/{test_user.id}",
+        headers={"Authorization": f"Bearer {test_token}"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_attempts"] == 2
+    assert data["average_score"] == 75.0
+    assert data["total_modules_completed"] == 1
+    assert data["modules_by_status"] == {"completed": 1, "in_progress": 0, "not_started": 0}
+    assert data["current_streak_days"] == 1
+    assert data["scores_by_module"][0]["best_score"] == 100.0
+    assert data["recent_activity"][0]["module_title"] == test_module.title
+
+    stats = await db_session.get(StudentStats, test_user.id)
+    await db_session.refresh(stats)
+    expected = await _compute_student_stats(db_session, test_user.id)
+    for column, value in expected.items():
+        assert getattr(stats, column) == value
+
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_get_platform_analytics_snapshot(
+    async_client: AsyncClient,
+    test_user,
+    test_module,
+    test_assessment,
+    override_get_db,
+    test_admin_token,
+    db_session: AsyncSession,
+):
+    """Test platform analytics are served from a snapshot until a fresh recompute"""
+    app.dependency_overrides[get_db] = override_get_db
+
+    db_session.add(QuizAttempt(
+        user_id=test_user.id,
+        assessment_id=test_assessment.id,
+        points_earned=5,
+        review_status=ReviewStatus.GRADED,
+    ))
+    await db_session.commit()
+
+    response = await async_client.get(
+        "/api/v1/analytics/platform",
+        headers={"Authorization": f"Bearer {test_admin_token}"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_users"] == 2
+    assert data["total_students"] == 1
+    assert data["total_attempts"] == 1
+    assert data["average_score"] == 50.0
+    assert data["modules_by_track"] == {test_module.track.value: 1}
+    computed_at = data["computed_at"]
+
+    db_session.add(User(
+        email="another@example.com",
+        hashed_password="hashed_password",
+        username="another",
+        role=UserRole.STUDENT,
+    ))
+    await db_session.commit()
+
+    response = await async_client.get(
+        "/api/v1/analytics/platform",
+        headers={"Authorization": f"Bearer {test_admin_token}"},
+    )
+    assert response.status_code == 200
+    assert response.json()["total_users"] == 2
+    assert response.json()["computed_at"] == computed_at
+
+    response = await async_client.get(
+        "/api/v1/analytics/platform",
+        params={"fresh": "true"},
+        headers={"Authorization": f"Bearer {test_admin_token}"},
+    )
+    assert response.status_code == 200
+    assert response.json()["total_users"] == 3
+
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_rebuild_keeps_incremental_streaks(
+    test_user,
+    test_module,
+    db_session: AsyncSession,
+):
+    """Test that a rebuild counts the same activity days as the incremental updates"""
+    start = datetime.now() - timedelta(days=2)
+    progress = UserProgress(
+        user_id=test_user.id,
+        module_id=test_module.id,
+        status=ProgressStatus.IN_PROGRESS,
+        last_accessed_at=start,
+    )
+    db_session.add(progress)
+    await record_progress_change(db_session, test_user.id, None, ProgressStatus.IN_PROGRESS, start)
+    await db_session.commit()
+
+    # Revisiting the same module on the next two days overwrites last_accessed_at
+    for offset in (1, 2):
+        progress.last_accessed_at = start + timedelta(days=offset)
+        await record_progress_change(
+            db_session, test_user.id, ProgressStatus.IN_PROGRESS, ProgressStatus.IN_PROGRESS,
+            progress.last_accessed_at,
+        )
+        await db_session.commit()
+
+    stats = await db_session.get(StudentStats, test_user.id)
+    assert (stats.current_streak_days, stats.longest_streak_days) == (3, 3)
+
+    stats = await rebuild_student_stats(db_session, test_user.id)
+    assert (stats.current_streak_days, stats.longest_streak_days) == (3, 3)
+    assert stats.last_activity_date == progress.last_accessed_at.date()
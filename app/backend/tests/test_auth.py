@@ -0,0 +1,113 @@
+"""Tests for authentication endpoints"""
+import pytest
+from httpx import AsyncClient
+from passlib.context import CryptContext
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.backend.main import app
+from app.backend.models.user import User
+from app.backend.core import security
+from app.backend.core.auth_cache import user_principal_cache
+from app.backend.core.database import get_db
+
+
+def user_lookups(statements):
+    return [s for s in statements if s.lstrip().startswith("SELECT users.")]
+
+
+@pytest.mark.asyncio
+async def test_repeat_requests_use_cached_principal(
+    async_client: AsyncClient,
+    test_user,
+    override_get_db,
+    test_token,
+    query_counter,
+):
+    """Test that only the first request with a token looks the user up"""
+    app.dependency_overrides[get_db] = override_get_db
+    headers = {"Authorization": f"Bearer {test_token}"}
+    
+    response = await async_client.get("/api/v1/auth/me", headers=headers)
+    assert response.status_code == 200
+    assert len(user_lookups(query_counter)) == 1
+    
+    hits = user_principal_cache.stats()["hits"]
+    query_counter.clear()
+    response = await async_client.get("/api/v1/auth/me", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["email"] == test_user.email
+    assert user_lookups(query_counter) == []
+    
+    stats = user_principal_cache.stats()
+    assert (stats["hits"] - hits, stats["size"]) == (1, 1)
+    
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_profile_update_through_cached_principal(
+    async_client: AsyncClient,
+    test_user,
+    override_get_db,
+    test_token,
+    db_session: AsyncSession,
+):
+    """Test that updates persist and invalidate the cache, including deactivation"""
+    app.dependency_overrides[get_db] = override_get_db
+    headers = {"Authorization": f"Bearer {test_token}"}
+    
+    await async_client.get("/api/v1/auth/me", headers=headers)
+    response = await async_client.put("/api/v1/auth/me", headers=headers, json={"full_name": "Renamed"})
+    assert response.status_code == 200
+    assert user_principal_cache.stats()["size"] == 0
+    
+    result = await db_session.execute(select(User.full_name).where(User.id == test_user.id))
+    assert result.scalar() == "Renamed"
+    response = await async_client.get("/api/v1/auth/me", headers=headers)
+    assert response.json()["full_name"] == "Renamed"
+    
+    response = await async_client.put("/api/v1/auth/me", headers=headers, json={"is_active": False})
+    assert response.status_code == 200
+    response = await async_client.get("/api/v1/auth/me", headers=headers)
+    assert response.status_code == 403
+    
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_login_upgrades_weak_password_hash(
+    async_client: AsyncClient,
+    override_get_db,
+    db_session: AsyncSession,
+    monkeypatch,
+):
+    """Test that logging in rehashes passwords stored below the target cost"""
+    app.dependency_overrides[get_db] = override_get_db
+    # Low costs keep the test fast; the target (5) is above the stored hash (4)
+    monkeypatch.setattr(security, "pwd_context", CryptContext(
+        schemes=["bcrypt"], deprecated="auto", bcrypt__default_rounds=5, bcrypt__min_rounds=5
+    ))
+    weak_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("s3cret-pass")
+    user = User(email="weak@example.com", hashed_password=weak_hash, username="weak", is_active=True)
+    db_session.add(user)
+    await db_session.commit()
+    
+    response = await async_client.post(
+        "/api/v1/auth/login/json",
+        json={"email": "weak@example.com", "password": "s3cret-pass"},
+    )
+    assert response.status_code == 200
+    
+    result = await db_session.execute(select(User.hashed_password).where(User.id == user.id))
+    upgraded = result.scalar()
+    assert upgraded.startswith("$2b$05$")
+    assert await security.verify_password("s3cret-pass", upgraded)
+    
+    response = await async_client.post(
+        "/api/v1/auth/login/json",
+        json={"email": "weak@example.com", "password": "wrong-pass"},
+    )
+    assert response.status_code == 401
+    
+    app.dependency_overrides.clear()
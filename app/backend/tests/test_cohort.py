@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.backend.main import app
 from app.backend.models.cohort import Cohort, CohortMember, CohortRole
 from app.backend.models.user import User, UserRole
+from app.backend.core.auth_cache import user_principal_cache
 from app.backend.core.database import get_db
 from app.backend.tests.conftest import override_get_db
 
@@ -351,3 +352,72 @@ async def test_unauthorized_cohort_access(
     
     assert response.status_code == 401
 
+
+
+@pytest.mark.asyncio
+async def test_list_cohorts_query_count_is_constant(
+    async_client: AsyncClient,
+    test_cohort,
+    test_instructor,
+    override_get_db,
+    test_instructor_token,
+    db_session: AsyncSession,
+    query_counter,
+):
+    """Test that listing cohorts does not issue one query per member"""
+    app.dependency_overrides[get_db] = override_get_db
+    
+    response = await async_client.get(
+        "/api/v1/cohorts",
+        headers={"Authorization": f"Bearer {test_instructor_token}"},
+    )
+    assert response.status_code == 200
+    baseline_queries = len(query_counter)
+    
+    # Add more cohorts, each with several students
+    for cohort_index in range(3):
+        cohort = Cohort(
+            name=f"Extra Cohort {cohort_index}",
+            is_active=True,
+            created_by=test_instructor.id,
+        )
+        db_session.add(cohort)
+        await db_session.flush()
+        db_session.add(CohortMember(
+            cohort_id=cohort.id,
+            user_id=test_instructor.id,
+            role=CohortRole.INSTRUCTOR.value,
+        ))
+        for student_index in range(4):
+            student = User(
+                email=f"student{cohort_index}_{student_index}@example.com",
+                hashed_password="hashed_password",
+                username=f"student{cohort_index}_{student_index}",
+                role=UserRole.STUDENT,
+                is_active=True,
+            )
+            db_session.add(student)
+            await db_session.flush()
+            db_session.add(CohortMember(
+                cohort_id=cohort.id,
+                user_id=student.id,
+                role=CohortRole.STUDENT.value,
+            ))
+    await db_session.commit()
+    
+    # Authenticate from the database again, as the baseline request did
+    user_principal_cache.clear()
+    query_counter.clear()
+    response = await async_client.get(
+        "/api/v1/cohorts",
+        headers={"Authorization": f"Bearer {test_instructor_token}"},
+    )
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 4
+    assert sum(c["member_count"] for c in data["cohorts"]) == 1 + 3 * 5
+    assert all(m["user"]["email"] for c in data["cohorts"] for m in c["members"])
+    assert len(query_counter) == baseline_queries
+    
+    app.dependency_overrides.clear()
@@ -0,0 +1,99 @@
+"""Tests for response compression"""
+import gzip
+
+import brotli
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from httpx import AsyncClient
+
+from app.backend.main import app as main_app
+from app.backend.core.compression import CompressionMiddleware, DefaultJSONResponse, _Compressor
+
+PAYLOAD = {"items": [{"id": index, "title": f"Lesson {index}"} for index in range(200)]}
+
+
+def _build_app() -> FastAPI:
+    app = FastAPI(default_response_class=DefaultJSONResponse)
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/large")
+    async def large():
+        return PAYLOAD
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/tagged")
+    async def tagged():
+        return Response(content=b"x" * 1000, media_type="text/plain", headers={"ETag": '"abc"'})
+
+    @app.get("/precompressed")
+    async def precompressed():
+        return Response(content=gzip.compress(b"y" * 1000), headers={"Content-Encoding": "gzip"})
+
+    @app.get("/events")
+    async def events():
+        async def generate():
+            yield "data: one\n\n" * 100
+        return StreamingResponse(generate(), media_type="text/event-stream")
+
+    @app.get("/stream")
+    async def stream():
+        async def generate():
+            for index in range(3):
+                yield f"chunk {index} " * 100
+        return StreamingResponse(generate(), media_type="text/plain")
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_compression_middleware():
+    """Test encoding negotiation, size threshold and pass-through cases"""
+    async with AsyncClient(app=_build_app(), base_url="http://test") as client:
+        response = await client.get("/large", headers={"Accept-Encoding": "gzip, br"})
+        assert response.headers["content-encoding"] == "br"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert int(response.headers["content-length"]) < len(response.content)
+        assert response.json() == PAYLOAD
+
+        response = await client.get("/large", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.json() == PAYLOAD
+
+        response = await client.get("/large", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+
+        response = await client.get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+        # A strong ETag no longer describes the encoded bytes
+        response = await client.get("/tagged", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["etag"] == 'W/"abc"'
+
+        response = await client.get("/precompressed", headers={"Accept-Encoding": "br"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.content == b"y" * 1000
+
+        response = await client.get("/events", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+        response = await client.get("/stream", headers={"Accept-Encoding": "br"})
+        assert response.headers["content-encoding"] == "br"
+        assert "content-length" not in response.headers
+        assert response.text == "".join(f"chunk {index} " * 100 for index in range(3))
+
+
+def test_streamed_chunks_are_flushed():
+    """Test that each streamed chunk is decodable as soon as it arrives"""
+    compressor = _Compressor("br", gzip_level=6, brotli_quality=4)
+    decompressor = brotli.Decompressor()
+    assert decompressor.process(compressor.compress(b"first", flush=True)) == b"first"
+
+
+def test_app_uses_fast_json_response():
+    """Test that the app-wide default response class is applied to API routes"""
+    route = next(r for r in main_app.routes if getattr(r, "path", "") == "/api/v1/cohorts")
+    assert route.response_class is DefaultJSONResponse
@@ -0,0 +1,139 @@
+"""Tests for document endpoints and vector store sync"""
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.backend.main import app
+from app.backend.core import openai_utils
+from app.backend.core.config import settings
+from app.backend.core.database import get_db
+from app.backend.core.fake_openai import FakeAsyncOpenAI
+from app.backend.models.document import Document, VectorStoreFile, VectorSyncStatus
+from app.backend.models.outbox import OutboxEvent
+from app.backend.services.event_queue import process_pending_events
+from app.backend.services.vector_store_sync import enqueue_vector_store_sync, sync_vector_store
+
+
+def worker_sessions(db_session: AsyncSession) -> async_sessionmaker:
+    """Session factory for the worker, bound to the test database"""
+    return async_sessionmaker(db_session.bind, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.mark.asyncio
+async def test_vector_store_sync_only_touches_changed_documents(
+    async_client: AsyncClient,
+    test_user,
+    override_get_db,
+    test_token,
+    db_session: AsyncSession,
+    monkeypatch,
+    tmp_path,
+):
+    """Test that uploads and deletions sync in the background and unchanged documents are skipped"""
+    app.dependency_overrides[get_db] = override_get_db
+    monkeypatch.setattr(settings, "DOCUMENT_STORAGE_PATH", str(tmp_path))
+    fake = FakeAsyncOpenAI()
+    monkeypatch.setattr(openai_utils, "_client", fake)
+    headers = {"Authorization": f"Bearer {test_token}"}
+
+    response = await async_client.post(
+        "/api/v1/documents/upload",
+        files={"file": ("notes.txt", b"Proof of work secures the chain.", "text/plain")},
+        headers=headers,
+    )
+    assert response.status_code == 201
+    document_id = response.json()["id"]
+    assert fake.calls == {}  # Nothing synced on the request path
+
+    events = (await db_session.execute(select(OutboxEvent.event_type))).scalars().all()
+    assert events == ["vector_store_sync"]
+    assert await process_pending_events(worker_sessions(db_session)) == 1
+
+    row = (await db_session.execute(select(VectorStoreFile))).scalar_one()
+    assert row.document_id == document_id
+    assert row.status == VectorSyncStatus.SYNCED
+    assert list(fake.vector_store_files[row.vector_store_id]) == [row.openai_file_id]
+    assert fake.calls["files.create"] == 1
+
+    # Unchanged: no API calls at all (the vector store id is cached too)
+    await db_session.refresh(test_user)
+    calls = dict(fake.calls)
+    await sync_vector_store(db_session, test_user)
+    assert fake.calls == calls
+
+    # Changed content is re-uploaded and the old file detached
+    document = await db_session.get(Document, document_id)
+    Path(document.storage_path).write_bytes(b"Proof of stake secures the chain.")
+    old_file_id = row.openai_file_id
+    await sync_vector_store(db_session, test_user)
+    await db_session.refresh(row)
+    assert fake.calls["files.create"] == 2
+    assert row.openai_file_id != old_file_id
+    assert list(fake.vector_store_files[row.vector_store_id]) == [row.openai_file_id]
+
+    response = await async_client.delete(f"/api/v1/documents/{document_id}", headers=headers)
+    assert response.status_code == 204
+    assert await process_pending_events(worker_sessions(db_session)) == 1
+    assert (await db_session.execute(select(VectorStoreFile))).scalars().all() == []
+    assert fake.vector_store_files[row.vector_store_id] == {}
+
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_standard_documents_sync_to_every_vector_store(
+    async_client: AsyncClient,
+    test_user,
+    test_instructor,
+    override_get_db,
+    test_token,
+    db_session: AsyncSession,
+    monkeypatch,
+    tmp_path,
+):
+    """Test that standard document changes reach all users and syncs are not scheduled twice"""
+    app.dependency_overrides[get_db] = override_get_db
+    fake = FakeAsyncOpenAI()
+    monkeypatch.setattr(openai_utils, "_client", fake)
+    path = tmp_path / "glossary.txt"
+    path.write_text("A block references its parent by hash.")
+    document = Document(
+        title="glossary",
+        filename="glossary.txt",
+        storage_path=str(path),
+        file_size=path.stat().st_size,
+        mime_type="text/plain",
+        category="standard",
+        uploader_id=test_user.id,
+    )
+    db_session.add(document)
+    await db_session.commit()
+
+    # Both users' stores pick up the standard document
+    for user in (test_user, test_instructor):
+        await sync_vector_store(db_session, user)
+    stores = {test_user.openai_vector_store_id, test_instructor.openai_vector_store_id}
+    assert all(fake.vector_store_files[store] for store in stores)
+
+    # A pending sync absorbs further requests for the same user
+    assert await enqueue_vector_store_sync(db_session, test_user.id) is True
+    assert await enqueue_vector_store_sync(db_session, test_user.id) is False
+    assert await enqueue_vector_store_sync(db_session, test_user.id, skip_if_running=True) is False
+    await db_session.commit()
+
+    response = await async_client.delete(
+        f"/api/v1/documents/{document.id}",
+        headers={"Authorization": f"Bearer {test_token}"},
+    )
+    assert response.status_code == 204
+    user_ids = (await db_session.execute(select(OutboxEvent.user_id))).scalars().all()
+    assert sorted(user_ids) == sorted([test_user.id, test_instructor.id])
+
+    assert await process_pending_events(worker_sessions(db_session)) == 2
+    assert (await db_session.execute(select(VectorStoreFile))).scalars().all() == []
+    assert all(fake.vector_store_files[store] == {} for store in stores)
+
+    app.dependency_overrides.clear()
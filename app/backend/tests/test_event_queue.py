@@ -0,0 +1,201 @@
+"""Tests for background event processing"""
+import pytest
+from datetime import datetime, timedelta
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.backend.main import app
+from app.backend.models.achievement import Achievement, UserAchievement
+from app.backend.models.forum import ForumPost
+from app.backend.models.notification import Notification
+from app.backend.models.outbox import OutboxEvent, OutboxStatus
+from app.backend.core.database import get_db
+from app.backend.services import event_queue
+from app.backend.services.event_queue import enqueue_event, process_pending_events
+
+
+def worker_sessions(db_session: AsyncSession) -> async_sessionmaker:
+    """Session factory for the worker, bound to the test database"""
+    return async_sessionmaker(db_session.bind, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.mark.asyncio
+async def test_submit_enqueues_achievement_check(
+    async_client: AsyncClient,
+    test_user,
+    test_assessment,
+    override_get_db,
+    test_token,
+    db_session: AsyncSession,
+):
+    """Test that submissions defer achievement checks to the outbox"""
+    app.dependency_overrides[get_db] = override_get_db
+
+    db_session.add(Achievement(
+        name="Perfect Score",
+        criteria={"perfect_score": {"any_assessment": True}},
+        points=50,
+        is_active=True,
+    ))
+    await db_session.commit()
+
+    response = await async_client.post(
+        f"/api/v1/assessments/{test_assessment.id}/submit",
+        headers={"Authorization": f"Bearer {test_token}"},
+        json={"user_answer": "B"},
+    )
+    assert response.status_code == 200
+
+    result = await db_session.execute(select(OutboxEvent))
+    events = result.scalars().all()
+    assert [e.event_type for e in events] == ["assessment_submitted"]
+    result = await db_session.execute(select(UserAchievement))
+    assert result.scalars().all() == []
+
+    assert await process_pending_events(worker_sessions(db_session)) == 1
+
+    result = await db_session.execute(select(UserAchievement.user_id))
+    assert result.scalars().all() == [test_user.id]
+    result = await db_session.execute(select(Notification.type).where(Notification.user_id == test_user.id))
+    assert result.scalars().all() == ["achievement_unlocked"]
+    result = await db_session.execute(select(OutboxEvent))
+    assert result.scalars().all() == []
+
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_forum_reply_notification_is_queued(
+    async_client: AsyncClient,
+    test_user,
+    test_instructor,
+    test_module,
+    override_get_db,
+    test_token,
+    db_session: AsyncSession,
+):
+    """Test that reply notifications are delivered by the worker"""
+    app.dependency_overrides[get_db] = override_get_db
+
+    parent = ForumPost(
+        module_id=test_module.id,
+        user_id=test_instructor.id,
+        title="Question",
+        content="Who can help?",
+    )
+    db_session.add(parent)
+    await db_session.commit()
+
+    response = await async_client.post(
+        "/api/v1/forums/posts",
+        headers={"Authorization": f"Bearer {test_token}"},
+        json={"parent_post_id": parent.id, "content": "Me"},
+    )
+    assert response.status_code == 201
+
+    assert await process_pending_events(worker_sessions(db_session)) == 2
+
+    result = await db_session.execute(
+        select(Notification.type).where(Notification.user_id == test_instructor.id)
+    )
+    assert result.scalars().all() == ["forum_reply"]
+
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_failed_event_is_retried_with_backoff(
+    db_session: AsyncSession,
+    test_user,
+    monkeypatch,
+):
+    """Test that handler failures keep the event for a later retry"""
+    async def failing_handler(db, event):
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(event_queue.EVENT_HANDLERS, "flaky", failing_handler)
+    event = enqueue_event(db_session, "flaky", user_id=test_user.id)
+    await db_session.commit()
+
+    assert await process_pending_events(worker_sessions(db_session)) == 1
+    # Not due again until the backoff has passed
+    assert await process_pending_events(worker_sessions(db_session)) == 0
+
+    await db_session.refresh(event)
+    assert event.status == OutboxStatus.PENDING
+    assert event.attempts == 1
+    assert event.last_error == "boom"
+
+
+@pytest.mark.asyncio
+async def test_event_effects_commit_with_the_outbox_row(
+    db_session: AsyncSession,
+    test_user,
+    test_instructor,
+    test_module,
+):
+    """Test that a worker whose claim was taken over leaves no notification behind"""
+    parent = ForumPost(module_id=test_module.id, user_id=test_instructor.id, content="Question")
+    db_session.add(parent)
+    await db_session.flush()
+    enqueue_event(
+        db_session, "forum_reply", user_id=test_instructor.id,
+        payload={"post_id": parent.id, "module_id": test_module.id, "reply_author_username": "student"},
+    )
+    await db_session.commit()
+
+    sessions = worker_sessions(db_session)
+    async with sessions() as db:
+        (event,) = await event_queue._claim_events(db, 10)
+
+    # Another worker reclaims the event (e.g. after the lease expired)
+    async with sessions() as db:
+        (stolen,) = (await db.execute(select(OutboxEvent))).scalars().all()
+        stolen.locked_at = datetime.utcnow() + timedelta(seconds=1)
+        await db.commit()
+
+    assert await event_queue._process_event(sessions, event) is False
+    result = await db_session.execute(select(Notification.id))
+    assert result.scalars().all() == []
+
+    # The event is still there for its current owner, which delivers it once
+    async with sessions() as db:
+        stolen = await db.get(OutboxEvent, event.id)
+    assert await event_queue._process_event(sessions, stolen) is True
+    result = await db_session.execute(select(Notification.type))
+    assert result.scalars().all() == ["forum_reply"]
+    result = await db_session.execute(select(OutboxEvent))
+    assert result.scalars().all() == []
+
+
+@pytest.mark.asyncio
+async def test_failure_after_reclaim_leaves_the_new_claim_alone(
+    db_session: AsyncSession,
+    test_user,
+    monkeypatch,
+):
+    """Test that a worker whose claim was taken over does not reschedule the event when it fails"""
+    async def failing_handler(db, event):
+        raise RuntimeError("handler failed")
+
+    monkeypatch.setitem(event_queue.EVENT_HANDLERS, "flaky", failing_handler)
+    enqueue_event(db_session, "flaky", user_id=test_user.id)
+    await db_session.commit()
+
+    sessions = worker_sessions(db_session)
+    async with sessions() as db:
+        (event,) = await event_queue._claim_events(db, 10)
+
+    reclaimed_at = datetime.utcnow() + timedelta(seconds=1)
+    async with sessions() as db:
+        stolen = await db.get(OutboxEvent, event.id)
+        stolen.locked_at = reclaimed_at
+        await db.commit()
+
+    assert await event_queue._process_event(sessions, event) is False
+    async with sessions() as db:
+        stolen = await db.get(OutboxEvent, event.id)
+    assert stolen.status == OutboxStatus.PROCESSING
+    assert stolen.attempts == 0
+    assert stolen.locked_at is not None
@@ -0,0 +1,331 @@
+"""Tests for forum endpoints"""
+import pytest
+from datetime import datetime
+from httpx import AsyncClient
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.backend.main import app
+from app.backend.api.v1.endpoints.forum import FORUM_SORT_KEYS
+from app.backend.core.pagination import apply_keyset
+from app.backend.models.forum import ForumPost, ForumVote
+from app.backend.models.user import User, UserRole
+from app.backend.core.auth_cache import user_principal_cache
+from app.backend.core.database import get_db
+from app.backend.services.forum_service import apply_vote_delta, backfill_post_counters
+from app.backend.tests.conftest import override_get_db
+
+
+async def _create_posts(db_session: AsyncSession, module_id: int, author: User, count: int):
+    """Create top-level posts, each with two replies"""
+    posts = []
+    for index in range(count):
+        post = ForumPost(
+            module_id=module_id,
+            user_id=author.id,
+            title=f"Question {index}",
+            content=f"How does consensus work? ({index})",
+        )
+        db_session.add(post)
+        await db_session.flush()
+        for reply_index in range(2):
+            db_session.add(ForumPost(
+                module_id=module_id,
+                user_id=author.id,
+                parent_post_id=post.id,
+                content=f"Reply {reply_index}",
+            ))
+        posts.append(post)
+    await backfill_post_counters(db_session)
+    await db_session.commit()
+    for post in posts:
+        await db_session.refresh(post)
+    return posts
+
+
+@pytest.mark.asyncio
+async def test_get_module_posts(
+    async_client: AsyncClient,
+    test_module,
+    test_user,
+    override_get_db,
+    test_token,
+    db_session: AsyncSession,
+):
+    """Test listing module posts with reply counts, authors and viewer votes"""
+    app.dependency_overrides[get_db] = override_get_db
+
+    posts = await _create_posts(db_session, test_module.id, test_user, 2)
+    db_session.add(ForumVote(post_id=posts[0].id, user_id=test_user.id, vote_type="upvote"))
+    await db_session.commit()
+
+    response = await async_client.get(
+        f"/api/v1/forums/modules/{test_module.id}/posts",
+        headers={"Authorization": f"Bearer {test_token}"},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 2
+    by_id = {p["id"]: p for p in data["posts"]}
+    assert by_id[posts[0].id]["reply_count"] == 2
+    assert by_id[posts[0].id]["user_vote"] == "upvote"
+    assert by_id[posts[1].id]["user_vote"] is None
+    assert by_id[posts[1].id]["author"]["username"] == test_user.username
+
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_get_module_posts_query_count_is_constant(
+    async_client: AsyncClient,
+    test_module,
+    test_user,
+    override_get_db,
+    test_token,
+    db_session: AsyncSession,
+    query_counter,
+):
+    """Test that listing posts does not issue queries per post"""
+    app.dependency_overrides[get_db] = override_get_db
+
+    await _create_posts(db_session, test_module.id, test_user, 1)
+    query_counter.clear()
+    response = await async_client.get(
+        f"/api/v1/forums/modules/{test_module.id}/posts",
+        headers={"Authorization": f"Bearer {test_token}"},
+    )
+    assert response.status_code == 200
+    baseline_queries = len(query_counter)
+
+    await _create_posts(db_session, test_module.id, test_user, 10)
+    # Authenticate from the database again, as the baseline request did
+    user_principal_cache.clear()
+    query_counter.clear()
+    response = await async_client.get(
+        f"/api/v1/forums/modules/{test_module.id}/posts",
+        headers={"Authorization": f"Bearer {test_token}"},
+    )
+
+    assert response.status_code == 200
+    assert len(response.json()["posts"]) == 11
+    assert len(query_counter) == baseline_queries
+
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_get_post_replies(
+    async_client: AsyncClient,
+    test_module,
+    test_user,
+    override_get_db,
+    test_token,
+    db_session: AsyncSession,
+):
+    """Test listing replies to a post"""
+    app.dependency_overrides[get_db] = override_get_db
+
+    posts = await _create_posts(db_session, test_module.id, test_user, 1)
+
+    response = await async_client.get(
+        f"/api/v1/forums/posts/{posts[0].id}/replies",
+        headers={"Authorization": f"Bearer {test_token}"},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [r["content"] for r in data] == ["Reply 0", "Reply 1"]
+    assert all(r["reply_count"] == 0 for r in data)
+
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_search_posts(
+    async_client: AsyncClient,
+    test_module,
+    test_user,
+    override_get_db,
+    test_token,
+    db_session: AsyncSession,
+):
+    """Test searching forum posts"""
+    app.dependency_overrides[get_db] = override_get_db
+
+    await _create_posts(db_session, test_module.id, test_user, 3)
+
+    response = await async_client.get(
+        "/api/v1/forums/search",
+        params={"q": "question 1"},
+        headers={"Authorization": f"Bearer {test_token}"},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 1
+    assert data["posts"][0]["title"] == "Question 1"
+    assert data["posts"][0]["reply_count"] == 2
+    assert data["posts"][0]["snippet"] is not None
+
+    response = await async_client.get(
+        "/api/v1/forums/search",
+        params={"q": "consensus"},
+        headers={"Authorization": f"Bearer {test_token}"},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 3
+    assert all("<mark>consensus</mark>" in p["snippet"] for p in data["posts"])
+
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_reply_counters_maintained_on_write(
+    async_client: AsyncClient,
+    test_module,
+    test_user,
+    override_get_db,
+    test_token,
+    db_session: AsyncSession,
+):
+    """Test that creating and deleting replies keeps parent counters in sync"""
+    app.dependency_overrides[get_db] = override_get_db
+
+    posts = await _create_posts(db_session, test_module.id, test_user, 1)
+    parent = posts[0]
+    assert parent.reply_count == 2
+    assert parent.score == 2
+
+    response = await async_client.post(
+        "/api/v1/forums/posts",
+        headers={"Authorization": f"Bearer {test_token}"},
+        json={"parent_post_id": parent.id, "content": "Another reply"},
+    )
+    assert response.status_code == 201
+    reply_id = response.json()["id"]
+
+    response = await async_client.get(
+        f"/api/v1/forums/posts/{parent.id}",
+        headers={"Authorization": f"Bearer {test_token}"},
+    )
+    assert response.json()["reply_count"] == 3
+
+    response = await async_client.post(
+        f"/api/v1/forums/posts/{parent.id}/vote",
+        headers={"Authorization": f"Bearer {test_token}"},
+        json={"vote_type": "upvote"},
+    )
+    assert response.status_code == 200
+    await db_session.refresh(parent)
+    assert parent.upvotes == 1
+    assert parent.score == 4
+    assert parent.last_reply_at is not None
+
+    response = await async_client.delete(
+        f"/api/v1/forums/posts/{reply_id}",
+        headers={"Authorization": f"Bearer {test_token}"},
+    )
+    assert response.status_code == 204
+    await db_session.refresh(parent)
+    assert parent.reply_count == 2
+    assert parent.score == 3
+
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_vote_delta_is_applied_in_the_database(
+    test_module,
+    test_user,
+    db_session: AsyncSession,
+):
+    """Test that vote deltas add to the stored counters instead of overwriting them"""
+    parent = (await _create_posts(db_session, test_module.id, test_user, 1))[0]
+
+    # Both deltas are computed from the same (soon stale) upvote count
+    await apply_vote_delta(db_session, parent.id, 1)
+    await apply_vote_delta(db_session, parent.id, 1)
+    await db_session.commit()
+    await db_session.refresh(parent)
+    assert parent.upvotes == 2
+    assert parent.score == 4
+
+
+@pytest.mark.asyncio
+async def test_get_module_posts_cursor_pagination(
+    async_client: AsyncClient,
+    test_module,
+    test_user,
+    override_get_db,
+    test_token,
+    db_session: AsyncSession,
+):
+    """Test walking module posts with cursors, including created_at ties"""
+    app.dependency_overrides[get_db] = override_get_db
+
+    same_time = datetime(2025, 1, 1, 12, 0, 0)
+    for index in range(5):
+        db_session.add(ForumPost(
+            module_id=test_module.id,
+            user_id=test_user.id,
+            title=f"Tied {index}",
+            content="Same timestamp",
+            created_at=same_time,
+        ))
+    await db_session.commit()
+
+    seen_ids = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = await async_client.get(
+            f"/api/v1/forums/modules/{test_module.id}/posts",
+            params=params,
+            headers={"Authorization": f"Bearer {test_token}"},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        if pages == 0:
+            assert data["total"] == 5
+        else:
+            assert data["total"] is None
+        seen_ids.extend(p["id"] for p in data["posts"])
+        pages += 1
+        cursor = data["next_cursor"]
+        if not cursor:
+            break
+
+    assert pages == 3
+    assert len(seen_ids) == 5
+    assert seen_ids == sorted(seen_ids, reverse=True)
+
+    response = await async_client.get(
+        f"/api/v1/forums/modules/{test_module.id}/posts",
+        params={"cursor": "not-a-cursor"},
+        headers={"Authorization": f"Bearer {test_token}"},
+    )
+    assert response.status_code == 400
+
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_module_listing_sorts_are_read_in_index_order(db_session: AsyncSession):
+    """Test that every listing sort is served by its index without a separate sort step"""
+    for sort, sort_keys in FORUM_SORT_KEYS.items():
+        query = apply_keyset(
+            select(ForumPost).where(ForumPost.module_id == 1, ForumPost.parent_post_id.is_(None)),
+            sort_keys,
+            None,
+        ).limit(21)
+        statement = query.compile(db_session.bind.sync_engine, compile_kwargs={"literal_binds": True})
+        result = await db_session.execute(text(f"EXPLAIN QUERY PLAN {statement}"))
+        plan = " | ".join(row[-1] for row in result.all())
+        assert f"ix_forum_posts_module_{sort}" in plan, plan
+        assert "TEMP B-TREE" not in plan, plan
@@ -92,6 +92,57 @@ async def test_get_grading_queue_empty(
     app.dependency_overrides.clear()
 
 
+@pytest.mark.asyncio
+async def test_get_grading_queue_cursor_pagination(
+    async_client: AsyncClient,
+    test_user,
+    test_short_answer_assessment,
+    override_get_db,
+    test_instructor_token,
+    db_session: AsyncSession,
+):
+    """Test paging through the grading queue with cursors (oldest first)"""
+    app.dependency_overrides[get_db] = override_get_db
+    
+    same_time = datetime(2025, 1, 1, 9, 0, 0)
+    for index in range(3):
+        db_session.add(QuizAttempt(
+            user_id=test_user.id,
+            assessment_id=test_short_answer_assessment.id,
+            user_answer=f"Answer {index}",
+            review_status=ReviewStatus.NEEDS_REVIEW,
+            attempted_at=same_time,
+        ))
+    await db_session.commit()
+    
+    response = await async_client.get(
+        "/api/v1/grading/queue",
+        params={"limit": 2},
+        headers={"Authorization": f"Bearer {test_instructor_token}"},
+    )
+    assert response.status_code == 200
+    first_page = response.json()
+    assert first_page["total"] == 3
+    assert len(first_page["items"]) == 2
+    assert first_page["next_cursor"]
+    
+    response = await async_client.get(
+        "/api/v1/grading/queue",
+        params={"limit": 2, "cursor": first_page["next_cursor"]},
+        headers={"Authorization": f"Bearer {test_instructor_token}"},
+    )
+    assert response.status_code == 200
+    second_page = response.json()
+    assert second_page["total"] is None
+    assert len(second_page["items"]) == 1
+    assert second_page["next_cursor"] is None
+    
+    attempt_ids = [i["attempt_id"] for i in first_page["items"] + second_page["items"]]
+    assert attempt_ids == sorted(set(attempt_ids))
+    
+    app.dependency_overrides.clear()
+
+
 @pytest.mark.asyncio
 async def test_grade_attempt(
     async_client: AsyncClient,
@@ -409,3 +460,52 @@ async def test_unauthorized_grading_access(
     
     assert response.status_code == 401
 
+
+
+@pytest.mark.asyncio
+async def test_grading_history_pages_through_auto_graded_attempts(
+    async_client: AsyncClient,
+    test_assessment,
+    test_user,
+    test_token,
+    test_instructor_token,
+    override_get_db,
+    db_session: AsyncSession,
+):
+    """Test that auto-graded attempts get graded_at and never end the history early"""
+    app.dependency_overrides[get_db] = override_get_db
+
+    attempt_ids = []
+    for answer in ("B", "A", "B"):
+        response = await async_client.post(
+            f"/api/v1/assessments/{test_assessment.id}/submit",
+            headers={"Authorization": f"Bearer {test_token}"},
+            json={"user_answer": answer},
+        )
+        assert response.status_code in (200, 201)
+        attempt_ids.append(response.json()["attempt_id"])
+
+    # A legacy graded row without graded_at is left out instead of breaking the cursor
+    db_session.add(QuizAttempt(
+        user_id=test_user.id,
+        assessment_id=test_assessment.id,
+        user_answer="B",
+        review_status=ReviewStatus.GRADED,
+    ))
+    await db_session.commit()
+
+    seen = []
+    cursor = None
+    for _ in range(10):
+        url = "/api/v1/grading/history?limit=1" + (f"&cursor={cursor}" if cursor else "")
+        response = await async_client.get(url, headers={"Authorization": f"Bearer {test_instructor_token}"})
+        assert response.status_code == 200
+        data = response.json()
+        assert all(item["graded_at"] is not None for item in data["items"])
+        seen.extend(item["id"] for item in data["items"])
+        cursor = data["next_cursor"]
+        if not cursor:
+            break
+    assert sorted(seen) == sorted(attempt_ids)
+
+    app.dependency_overrides.clear()
@@ -0,0 +1,153 @@
+"""Tests for request metrics"""
+import logging
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.backend.main import app
+from app.backend.core.config import settings
+from app.backend.core.database import InstrumentedQueuePool, PoolTelemetry, get_db, pool_stats
+from app.backend.core.metrics import MetricsMiddleware, instrument_engine, metrics_registry
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_route_statistics(
+    async_client: AsyncClient,
+    test_user,
+    override_get_db,
+    test_token,
+    db_session: AsyncSession,
+    monkeypatch,
+):
+    """Test that requests are recorded per route template with their SQL"""
+    app.dependency_overrides[get_db] = override_get_db
+    monkeypatch.setattr(settings, "METRICS_ENABLED", True)
+    instrument_engine(db_session.bind.sync_engine)
+    metrics_registry.reset()
+    
+    for _ in range(2):
+        response = await async_client.get(
+            "/api/v1/notifications",
+            headers={"Authorization": f"Bearer {test_token}"},
+        )
+        assert response.status_code == 200
+    
+    response = await async_client.get("/metrics")
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    labels = 'method="GET",route="/api/v1/notifications"'
+    assert f"http_request_duration_seconds_count{{{labels}}} 2" in lines
+    assert f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in lines
+    statements = next(l for l in lines if l.startswith(f"http_request_db_statements_total{{{labels}}}"))
+    assert int(statements.split()[-1]) >= 2
+    response_bytes = next(l for l in lines if l.startswith(f"http_response_bytes_total{{{labels}}}"))
+    assert int(response_bytes.split()[-1]) > 0
+    assert any(l.startswith("auth_user_cache_hits ") for l in lines)
+    
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_is_off_by_default_and_token_protected(async_client: AsyncClient, monkeypatch):
+    """Test that /metrics is only served when enabled, and with METRICS_TOKEN only to that bearer token"""
+    assert (await async_client.get("/metrics")).status_code == 404
+
+    monkeypatch.setattr(settings, "METRICS_ENABLED", True)
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    assert (await async_client.get("/metrics")).status_code == 401
+    response = await async_client.get("/metrics", headers={"Authorization": "Bearer wrong"})
+    assert response.status_code == 401
+    response = await async_client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_slow_requests_are_logged_with_statements(db_session: AsyncSession, caplog):
+    """Test that the slow-request log includes the SQL behind the request"""
+    instrument_engine(db_session.bind.sync_engine)
+    
+    async def endpoint(scope, receive, send):
+        await db_session.execute(text("SELECT 42"))
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+    
+    async def receive():
+        return {"type": "http.request", "body": b""}
+    
+    async def send(message):
+        pass
+    
+    middleware = MetricsMiddleware(endpoint, slow_request_threshold_ms=0.000001)
+    with caplog.at_level(logging.WARNING, logger="app.backend.core.metrics"):
+        await middleware({"type": "http", "method": "GET", "path": "/slow"}, receive, send)
+    
+    assert "Slow request GET <unmatched> (/slow) -> 200" in caplog.text
+    assert "1 statements" in caplog.text
+    assert "SELECT 42" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_failed_statements_are_timed_without_leaking_state(db_session: AsyncSession, caplog):
+    """Test that a statement that raises is still recorded and leaves nothing on the connection"""
+    instrument_engine(db_session.bind.sync_engine)
+    
+    async def endpoint(scope, receive, send):
+        with pytest.raises(Exception):
+            await db_session.execute(text("SELECT * FROM no_such_table"))
+        await db_session.rollback()
+        await db_session.execute(text("SELECT 42"))
+        connection = await db_session.connection()
+        assert "query_start" not in connection.info
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+    
+    async def receive():
+        return {"type": "http.request", "body": b""}
+    
+    async def send(message):
+        pass
+    
+    middleware = MetricsMiddleware(endpoint, slow_request_threshold_ms=0.000001)
+    with caplog.at_level(logging.WARNING, logger="app.backend.core.metrics"):
+        await middleware({"type": "http", "method": "GET", "path": "/failing"}, receive, send)
+    
+    assert "2 statements" in caplog.text
+    assert "no_such_table" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_record_checkouts_and_timeouts(tmp_path):
+    """Test that the instrumented pool reports saturation, waits and timeouts"""
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    engine.sync_engine.pool.telemetry = PoolTelemetry("test")
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            stats = pool_stats(engine)
+            assert stats["checked_out"] == 1
+            assert stats["saturation"] == 1.0
+            
+            with pytest.raises(PoolTimeoutError):
+                async with engine.connect():
+                    pass
+        
+        stats = pool_stats(engine)
+        assert stats["checked_out"] == 0
+        assert stats["checkouts_total"] == 1
+        assert stats["timeouts_total"] == 1
+        assert stats["wait_seconds_max"] >= 0.05
+        
+        # dispose() recreates the pool; telemetry carries over
+        await engine.dispose()
+        assert pool_stats(engine)["checkouts_total"] == 1
+    finally:
+        await engine.dispose()
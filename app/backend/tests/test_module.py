@@ -0,0 +1,193 @@
+"""Tests for module and lesson endpoints"""
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.backend.main import app
+from app.backend.models.module import Lesson, LessonRendition, Module
+from app.backend.core.compression import negotiate_encoding
+from app.backend.core.database import get_db
+from app.backend.services.catalog_cache import catalog_cache, etag_matches
+from app.backend.services.lesson_render import prerender_lessons, render_markdown
+
+
+async def _add_lessons(db_session: AsyncSession, module: Module, count: int):
+    lessons = [
+        Lesson(
+            module_id=module.id,
+            title=f"Lesson {index}",
+            content=f"# Lesson {index}\n\nSample content.",
+            order_index=index,
+            estimated_minutes=10,
+        )
+        for index in range(1, count + 1)
+    ]
+    db_session.add_all(lessons)
+    await db_session.commit()
+    return lessons
+
+
+@pytest.mark.asyncio
+async def test_catalog_responses_are_cached_with_etag(
+    async_client: AsyncClient,
+    test_user,
+    test_module: Module,
+    override_get_db,
+    test_token,
+    db_session: AsyncSession,
+    query_counter,
+):
+    """Test that catalog responses are served from cache and revalidate with 304"""
+    app.dependency_overrides[get_db] = override_get_db
+    await _add_lessons(db_session, test_module, 2)
+    headers = {"Authorization": f"Bearer {test_token}"}
+
+    response = await async_client.get(f"/api/v1/modules/{test_module.id}", headers=headers)
+    assert response.status_code == 200
+    assert [lesson["title"] for lesson in response.json()["lessons"]] == ["Lesson 1", "Lesson 2"]
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "private, no-cache"
+
+    # Served from the cache: only the (cached) principal lookup, no catalog queries
+    query_counter.clear()
+    response = await async_client.get(f"/api/v1/modules/{test_module.id}", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["etag"] == etag
+    assert not any("FROM modules" in statement for statement in query_counter)
+
+    response = await async_client.get(
+        f"/api/v1/modules/{test_module.id}",
+        headers={**headers, "If-None-Match": f"W/{etag}"},
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_catalog_cache_invalidated_by_content_change(
+    async_client: AsyncClient,
+    test_user,
+    test_module: Module,
+    override_get_db,
+    test_token,
+    db_session: AsyncSession,
+):
+    """Test that editing a lesson bumps the content version and changes the ETag"""
+    app.dependency_overrides[get_db] = override_get_db
+    lessons = await _add_lessons(db_session, test_module, 1)
+    headers = {"Authorization": f"Bearer {test_token}"}
+
+    response = await async_client.get(f"/api/v1/lessons/{lessons[0].id}", headers=headers)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    version = catalog_cache.version
+
+    lessons[0].content = "# Lesson 1\n\nRevised content."
+    # Flushed but uncommitted: a rebuild now would still read the old row
+    await db_session.flush()
+    assert catalog_cache.version == version
+    await db_session.commit()
+    assert catalog_cache.version > version
+
+    response = await async_client.get(
+        f"/api/v1/lessons/{lessons[0].id}",
+        headers={**headers, "If-None-Match": etag},
+    )
+    assert response.status_code == 200
+    assert response.json()["content"] == "# Lesson 1\n\nRevised content."
+    assert response.headers["etag"] != etag
+
+    # Errors are not cached
+    response = await async_client.get("/api/v1/lessons/999", headers=headers)
+    assert response.status_code == 404
+    assert "etag" not in response.headers
+    # ...and leave no build lock behind
+    assert catalog_cache.stats()["locks"] == 0
+
+    app.dependency_overrides.clear()
+
+
+def test_render_markdown_sanitizes_and_builds_toc():
+    """Test that rendered lesson HTML is sanitized and headings form the TOC"""
+    html, toc = render_markdown(
+        "# Wallets\n\nKeys & seeds.\n\n## Hot & cold wallets\n\n<script>alert(1)</script>\n\n"
+        "[bad](javascript:alert(1))\n\n```python\nprint('hi')\n```\n"
+    )
+    assert "<script" not in html
+    assert "javascript:" not in html
+    assert '<h1 id="wallets">Wallets</h1>' in html
+    assert '<code class="language-python">' in html
+    assert toc == [
+        {"level": 1, "id": "wallets", "title": "Wallets"},
+        {"level": 2, "id": "hot-cold-wallets", "title": "Hot & cold wallets"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_lesson_html_served_precompressed(
+    async_client: AsyncClient,
+    test_user,
+    test_module: Module,
+    override_get_db,
+    test_token,
+    db_session: AsyncSession,
+):
+    """Test that pre-rendered lessons are served in the negotiated encoding"""
+    app.dependency_overrides[get_db] = override_get_db
+    lessons = await _add_lessons(db_session, test_module, 2)
+    headers = {"Authorization": f"Bearer {test_token}"}
+
+    assert await prerender_lessons(db_session) == 2
+    assert await prerender_lessons(db_session) == 0  # Up to date
+    rendition = (await db_session.execute(
+        select(LessonRendition).where(LessonRendition.lesson_id == lessons[0].id)
+    )).scalar_one()
+    assert rendition.toc == [{"level": 1, "id": "lesson-1", "title": "Lesson 1"}]
+
+    url = f"/api/v1/lessons/{lessons[0].id}?format=html"
+    response = await async_client.get(url, headers={**headers, "Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    body = response.json()
+    assert body["content_html"] == rendition.content_html
+    assert body["toc"][0]["id"] == "lesson-1"
+    gzip_etag = response.headers["etag"]
+
+    response = await async_client.get(url, headers={**headers, "Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.json() == body
+    assert response.headers["etag"] != gzip_etag
+
+    response = await async_client.get(
+        url, headers={**headers, "Accept-Encoding": "gzip", "If-None-Match": gzip_etag}
+    )
+    assert response.status_code == 304
+
+    # The default format still returns markdown
+    response = await async_client.get(f"/api/v1/lessons/{lessons[0].id}", headers=headers)
+    assert response.json()["content"].startswith("# Lesson 1")
+
+    app.dependency_overrides.clear()
+
+
+def test_negotiate_encoding():
+    """Test Accept-Encoding negotiation"""
+    assert negotiate_encoding("gzip, deflate, br", ["br", "gzip"]) == "br"
+    assert negotiate_encoding("br;q=0.5, gzip", ["br", "gzip"]) == "gzip"
+    assert negotiate_encoding("br;q=0, *", ["br", "gzip"]) == "gzip"
+    assert negotiate_encoding("identity", ["br", "gzip"]) is None
+    assert negotiate_encoding(None, ["br", "gzip"]) is None
+
+
+def test_etag_matches():
+    """Test If-None-Match parsing"""
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('"x", W/"abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abcd"', '"abc"')
+    assert not etag_matches(None, '"abc"')
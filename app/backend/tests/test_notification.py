@@ -0,0 +1,273 @@
+"""Tests for notification endpoints"""
+import pytest
+from datetime import datetime, timedelta
+from httpx import AsyncClient
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.backend.main import app
+from app.backend.models.cohort import CohortMember, CohortRole
+from app.backend.models.notification import Notification
+from app.backend.models.user import User, UserRole
+from app.backend.core.database import get_db
+from app.backend.services.notification_service import (
+    bulk_create_notifications,
+    create_notification,
+    resolve_audience,
+)
+from app.backend.services.notification_hub import notification_hub
+from app.backend.services.notification_retention import (
+    compact_notifications,
+    purge_expired_notifications,
+    run_notification_maintenance,
+)
+
+
+async def add_students(db_session: AsyncSession, count: int, cohort_id=None):
+    students = [
+        User(
+            email=f"student{n}@example.com",
+            hashed_password="hashed_password",
+            username=f"student{n}",
+            role=UserRole.STUDENT,
+            is_active=True,
+        )
+        for n in range(count)
+    ]
+    db_session.add_all(students)
+    await db_session.flush()
+    if cohort_id is not None:
+        db_session.add_all([
+            CohortMember(cohort_id=cohort_id, user_id=s.id, role=CohortRole.STUDENT.value)
+            for s in students
+        ])
+    await db_session.commit()
+    return students
+
+
+@pytest.mark.asyncio
+async def test_broadcast_to_cohort(
+    async_client: AsyncClient,
+    test_cohort,
+    test_instructor,
+    override_get_db,
+    test_instructor_token,
+    db_session: AsyncSession,
+):
+    """Test that an instructor can notify every member of their cohort"""
+    app.dependency_overrides[get_db] = override_get_db
+    students = await add_students(db_session, 3, cohort_id=test_cohort.id)
+    
+    response = await async_client.post(
+        "/api/v1/notifications/broadcast",
+        headers={"Authorization": f"Bearer {test_instructor_token}"},
+        json={"title": "Class moved", "message": "We meet Thursday", "cohort_id": test_cohort.id},
+    )
+    
+    assert response.status_code == 201
+    data = response.json()
+    assert data["recipients"] == 4  # 3 students + the instructor
+    assert data["chunks"] == 1
+    
+    result = await db_session.execute(
+        select(Notification.user_id).where(Notification.type == "announcement").order_by(Notification.user_id)
+    )
+    assert result.scalars().all() == sorted([test_instructor.id] + [s.id for s in students])
+    
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_broadcast_by_role_requires_admin(
+    async_client: AsyncClient,
+    test_cohort,
+    override_get_db,
+    test_instructor_token,
+):
+    """Test that instructors cannot broadcast outside their cohorts"""
+    app.dependency_overrides[get_db] = override_get_db
+    
+    response = await async_client.post(
+        "/api/v1/notifications/broadcast",
+        headers={"Authorization": f"Bearer {test_instructor_token}"},
+        json={"title": "Hello", "message": "Everyone", "role": "student"},
+    )
+    
+    assert response.status_code == 403
+    
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_notifications_chunks_audience(
+    db_session: AsyncSession,
+    test_user,
+):
+    """Test that large audiences are written in chunks and deduplicated"""
+    students = await add_students(db_session, 4)
+    
+    audience = await resolve_audience(
+        db_session,
+        role=UserRole.STUDENT,
+        user_ids=[students[0].id],
+    )
+    assert audience == sorted([test_user.id] + [s.id for s in students])
+    
+    metrics = await bulk_create_notifications(
+        db_session,
+        audience + [test_user.id],
+        notification_type="announcement",
+        title="Maintenance",
+        message="Down at noon",
+        chunk_size=2,
+    )
+    
+    assert metrics["recipients"] == 5
+    assert metrics["chunks"] == 3
+    assert len(set(metrics["notification_ids"])) == 5
+    result = await db_session.execute(select(func.count(Notification.id)))
+    assert result.scalar() == 5
+
+
+@pytest.mark.asyncio
+async def test_unread_count_cache_tracks_changes(
+    async_client: AsyncClient,
+    test_user,
+    override_get_db,
+    test_token,
+    db_session: AsyncSession,
+):
+    """Test that read, delete and mark-all-read keep the cached count in step"""
+    app.dependency_overrides[get_db] = override_get_db
+    headers = {"Authorization": f"Bearer {test_token}"}
+    first = await create_notification(db_session, test_user.id, "announcement", "One", "First")
+    second = await create_notification(db_session, test_user.id, "announcement", "Two", "Second")
+    
+    response = await async_client.get("/api/v1/notifications", headers=headers)
+    assert response.json()["unread_count"] == 2
+    assert notification_hub.get_unread(test_user.id) == 2
+    
+    response = await async_client.patch(
+        f"/api/v1/notifications/{first.id}", headers=headers, json={"is_read": True}
+    )
+    assert response.status_code == 200
+    assert notification_hub.get_unread(test_user.id) == 1
+    
+    response = await async_client.delete(f"/api/v1/notifications/{second.id}", headers=headers)
+    assert response.status_code == 204
+    assert notification_hub.get_unread(test_user.id) == 0
+    
+    await create_notification(db_session, test_user.id, "announcement", "Three", "Third")
+    assert notification_hub.get_unread(test_user.id) == 1
+    
+    response = await async_client.patch("/api/v1/notifications/mark-all-read", headers=headers)
+    assert response.status_code == 204
+    notification_hub.reset()
+    response = await async_client.get("/api/v1/notifications", headers=headers)
+    assert response.json()["unread_count"] == 0
+    
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_subscribers_receive_new_notifications(
+    db_session: AsyncSession,
+    test_user,
+):
+    """Test that created notifications are published to the user's subscribers"""
+    queue = notification_hub.subscribe(test_user.id)
+    try:
+        notification = await create_notification(
+            db_session, test_user.id, "forum_reply", "New reply", "Someone replied"
+        )
+        await bulk_create_notifications(db_session, [test_user.id], "announcement", "Hi", "All")
+        
+        events = [queue.get_nowait(), queue.get_nowait()]
+        assert [e["type"] for e in events] == ["notification", "notification"]
+        assert events[0]["notification"]["id"] == notification.id
+        assert events[1]["notification"]["type"] == "announcement"
+        assert queue.empty()
+    finally:
+        notification_hub.unsubscribe(test_user.id, queue)
+    assert notification_hub.subscriber_count(test_user.id) == 0
+
+
+@pytest.mark.asyncio
+async def test_purge_deletes_only_old_read_notifications(
+    db_session: AsyncSession,
+    test_user,
+):
+    """Test that retention removes old read notifications in batches, and unread ones only when opted in"""
+    old = datetime.utcnow() - timedelta(days=120)
+    expired = datetime.utcnow() - timedelta(days=400)
+    db_session.add_all(
+        [Notification(user_id=test_user.id, type="announcement", title="Old", message="Read",
+                      is_read=True, created_at=old) for _ in range(5)]
+        + [
+            Notification(user_id=test_user.id, type="announcement", title="Old", message="Unread",
+                         is_read=False, created_at=old),
+            Notification(user_id=test_user.id, type="announcement", title="New", message="Read",
+                         is_read=True),
+            Notification(user_id=test_user.id, type="announcement", title="Expired", message="Unread",
+                         is_read=False, created_at=expired),
+        ]
+    )
+    await db_session.commit()
+    
+    assert await purge_expired_notifications(db_session, older_than_days=90, batch_size=2) == 5
+    result = await db_session.execute(select(Notification.title).order_by(Notification.id))
+    assert result.scalars().all() == ["Old", "New", "Expired"]
+
+    deleted = await purge_expired_notifications(
+        db_session, older_than_days=90, batch_size=2, unread_older_than_days=365
+    )
+    
+    assert deleted == 1
+    result = await db_session.execute(select(Notification.message).order_by(Notification.id))
+    assert result.scalars().all() == ["Unread", "Read"]
+
+
+@pytest.mark.asyncio
+async def test_compaction_collapses_repeated_replies(
+    db_session: AsyncSession,
+    test_user,
+):
+    """Test that repeated unread replies on one post become a single digest row"""
+    for n in range(4):
+        await create_notification(
+            db_session, test_user.id, "forum_reply", "New reply to your post",
+            f"user{n} replied to your forum post", link="/forums/posts/7"
+        )
+    await create_notification(
+        db_session, test_user.id, "forum_reply", "New reply to your post",
+        "user9 replied to your forum post", link="/forums/posts/8"
+    )
+    notification_hub.set_unread(test_user.id, 5)
+    
+    summary = await run_notification_maintenance(db_session)
+    
+    assert summary["compacted"] == 3
+    assert notification_hub.get_unread(test_user.id) == 2
+    result = await db_session.execute(
+        select(Notification.link, Notification.group_count, Notification.message)
+        .order_by(Notification.link)
+    )
+    assert result.all() == [
+        ("/forums/posts/7", 4, "4 new replies to your forum post"),
+        ("/forums/posts/8", 1, "user9 replied to your forum post"),
+    ]
+    
+    # A digest keeps absorbing later replies
+    for n in range(2):
+        await create_notification(
+            db_session, test_user.id, "forum_reply", "New reply to your post",
+            f"late{n} replied to your forum post", link="/forums/posts/7"
+        )
+    assert await compact_notifications(db_session) == 2
+    result = await db_session.execute(
+        select(Notification.group_count).where(Notification.link == "/forums/posts/7")
+    )
+    assert result.scalars().all() == [6]
+
+    # Single rows are never "collapsed" (and can't keep the batch loop going)
+    assert await compact_notifications(db_session, min_count=1) == 0
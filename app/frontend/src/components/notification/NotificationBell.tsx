@@ -23,12 +23,46 @@ export const NotificationBell: React.FC = () => {
   const queryClient = useQueryClient();
   const [anchorEl, setAnchorEl] = useState<HTMLElement | null>(null);
 
+  const [streamConnected, setStreamConnected] = useState(false);
+  const [liveUnreadCount, setLiveUnreadCount] = useState<number | null>(null);
+
   const { data: notificationsData } = useQuery({
     queryKey: ['notifications', 'unread'],
     queryFn: () => notificationService.getNotifications(true, 10, 0),
-    refetchInterval: 30000, // Refetch every 30 seconds
+    // Poll only while the live stream is unavailable
+    refetchInterval: streamConnected ? false : 30000,
   });
 
+  useEffect(() => {
+    const controller = new AbortController();
+    let retryTimer: ReturnType<typeof setTimeout> | undefined;
+
+    const connect = async () => {
+      try {
+        for await (const event of notificationService.streamNotifications(controller.signal)) {
+          setStreamConnected(true);
+          if (event.type === 'unread_count') {
+            setLiveUnreadCount(event.unread_count);
+          } else if (event.type === 'notification') {
+            queryClient.invalidateQueries({ queryKey: ['notifications'] });
+          }
+        }
+      } catch (error) {
+        if (controller.signal.aborted) return;
+      }
+      setStreamConnected(false);
+      if (!controller.signal.aborted) {
+        retryTimer = setTimeout(connect, 30000);
+      }
+    };
+
+    connect();
+    return () => {
+      controller.abort();
+      if (retryTimer) clearTimeout(retryTimer);
+    };
+  }, [queryClient]);
+
   const markAllReadMutation = useMutation({
     mutationFn: () => notificationService.markAllRead(),
     onSuccess: () => {
@@ -55,7 +89,7 @@ export const NotificationBell: React.FC = () => {
     markAllReadMutation.mutate();
   };
 
-  const unreadCount = notificationsData?.unread_count || 0;
+  const unreadCount = liveUnreadCount ?? notificationsData?.unread_count ?? 0;
   const open = Boolean(anchorEl);
 
   return (
@@ -1,6 +1,6 @@
 /** Module service */
 import apiClient from './api';
-import type { Module, ModuleDetail, Lesson } from '../types/module';
+import type { Module, ModuleDetail, Lesson, LessonHtml } from '../types/module';
 
 export const moduleService = {
   /**
@@ -34,6 +34,14 @@ export const moduleService = {
     const response = await apiClient.get<Lesson>(`/lessons/${lessonId}`);
     return response.data;
   },
+
+  /**
+   * Get a lesson pre-rendered to HTML with its table of contents
+   */
+  async getLessonHtml(lessonId: number): Promise<LessonHtml> {
+    const response = await apiClient.get<LessonHtml>(`/lessons/${lessonId}`, { params: { format: 'html' } });
+    return response.data;
+  },
 };
 
 
@@ -9,6 +9,7 @@ export interface Notification {
   message: string;
   link: string | null;
   is_read: boolean;
+  group_count: number;
   created_at: string;
   read_at: string | null;
 }
@@ -19,6 +20,10 @@ export interface NotificationListResponse {
   unread_count: number;
 }
 
+export type NotificationStreamEvent =
+  | { type: 'notification'; notification: Notification }
+  | { type: 'unread_count'; unread_count: number };
+
 export const notificationService = {
   /** Get user's notifications */
   getNotifications: async (
@@ -52,5 +57,57 @@ export const notificationService = {
   deleteNotification: async (notificationId: number): Promise<void> => {
     await apiClient.delete(`/notifications/${notificationId}`);
   },
+
+  /** Stream new notifications and unread-count changes (Server-Sent Events) */
+  streamNotifications: async function* (
+    signal?: AbortSignal
+  ): AsyncGenerator<NotificationStreamEvent, void, unknown> {
+    const token = localStorage.getItem('access_token');
+    const headers: HeadersInit = {};
+    if (token) {
+      headers['Authorization'] = `Bearer ${token}`;
+    }
+
+    const response = await fetch(`${apiClient.defaults.baseURL}/notifications/stream`, {
+      headers,
+      signal,
+    });
+
+    if (!response.ok) {
+      throw new Error(`Notification stream failed: ${response.statusText}`);
+    }
+
+    const reader = response.body?.getReader();
+    if (!reader) {
+      throw new Error('No response body reader available');
+    }
+
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    try {
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop() || '';
+
+        for (const line of lines) {
+          // Lines starting with ':' are keep-alive comments
+          if (line.startsWith('data: ')) {
+            try {
+              yield JSON.parse(line.slice(6));
+            } catch (e) {
+              console.error('Error parsing notification event:', e);
+            }
+          }
+        }
+      }
+    } finally {
+      reader.releaseLock();
+    }
+  },
 };
 
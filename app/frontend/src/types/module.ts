@@ -23,6 +23,23 @@ export interface Lesson {
   lesson_type: string;
 }
 
+export interface LessonTocEntry {
+  level: number;
+  id: string;
+  title: string;
+}
+
+export interface LessonHtml {
+  id: number;
+  module_id: number;
+  title: string;
+  content_html: string;  // Sanitized server-side
+  toc: LessonTocEntry[];
+  order_index: number;
+  estimated_minutes: number | null;
+  lesson_type: string;
+}
+
 export interface ModuleDetail extends Module {
   lessons: Lesson[];
   has_assessment: boolean;
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Backfill denormalized forum post counters.
+
+Recomputes reply_count, last_reply_at and score on every forum post from the
+existing replies and votes. Run once after applying the migration that adds
+the counter columns, or at any time to repair drift.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+# Load environment variables from .env file
+from dotenv import load_dotenv
+env_path = BASE_DIR / "app" / "backend" / ".env"
+if env_path.exists():
+    load_dotenv(env_path)
+else:
+    # Try alternative location
+    load_dotenv(BASE_DIR / ".env")
+
+import logging
+
+from app.backend.core.database import AsyncSessionLocal, close_db
+from app.backend.services.forum_service import backfill_post_counters
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    """Main entry point"""
+    logger.info("Backfilling forum post counters...")
+    
+    try:
+        async with AsyncSessionLocal() as db:
+            updated = await backfill_post_counters(db)
+            await db.commit()
+        logger.info(f"Updated counters for {updated} forum posts")
+    except Exception as e:
+        logger.error(f"Fatal error: {e}", exc_info=True)
+        sys.exit(1)
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
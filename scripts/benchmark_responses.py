@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Benchmark response serialization and compression.
+
+Serves representative large payloads (a cohort list with members, a module
+detail with full lesson bodies from the curriculum, a long AI conversation)
+through two FastAPI apps and reports bytes on the wire and server CPU time
+per request:
+
+- baseline: default JSONResponse, no compression
+- optimized: the app's response class (ORJSONResponse when orjson is
+  installed) behind CompressionMiddleware
+
+Requests are driven directly through ASGI, so client-side decoding is not
+counted.
+
+Usage:
+    python scripts/benchmark_responses.py [--requests 200]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from fastapi import FastAPI
+
+from app.backend.core.compression import CompressionMiddleware, DefaultJSONResponse, SUPPORTED_ENCODINGS
+from app.backend.models.module import Track
+from app.backend.schemas.cohort import CohortListResponse, CohortMemberResponse, CohortResponse
+from app.backend.schemas.module import LessonResponse, ModuleDetailResponse
+from app.backend.schemas.notification import ChatMessageResponse, ConversationDetailResponse
+
+CURRICULUM_FILE = BASE_DIR / "curriculum" / "blockchain curriculum part 1.md"
+
+
+def cohort_list_payload() -> CohortListResponse:
+    now = datetime(2026, 1, 1)
+    cohorts = []
+    for cohort_id in range(1, 21):
+        members = [
+            CohortMemberResponse(
+                id=cohort_id * 100 + index,
+                cohort_id=cohort_id,
+                user_id=cohort_id * 100 + index,
+                role="student",
+                joined_at=now + timedelta(minutes=index),
+                user={
+                    "id": cohort_id * 100 + index,
+                    "email": f"student{cohort_id}-{index}@example.com",
+                    "username": f"student{cohort_id}_{index}",
+                    "full_name": f"Student {cohort_id}-{index}",
+                },
+            )
+            for index in range(30)
+        ]
+        cohorts.append(CohortResponse(
+            id=cohort_id,
+            name=f"Cohort {cohort_id}",
+            description="Spring cohort covering the user and analyst tracks",
+            start_date=date(2026, 1, 1),
+            end_date=date(2026, 6, 1),
+            is_active=True,
+            created_by=1,
+            created_at=now,
+            updated_at=now,
+            members=members,
+            member_count=len(members),
+        ))
+    return CohortListResponse(cohorts=cohorts, total=len(cohorts))
+
+
+def module_detail_payload() -> ModuleDetailResponse:
+    text = CURRICULUM_FILE.read_text(encoding="utf-8") if CURRICULUM_FILE.exists() else "Lorem ipsum. " * 6000
+    chunk = max(len(text) // 5, 1)
+    lessons = [
+        LessonResponse(
+            id=index + 1,
+            module_id=1,
+            title=f"Lesson {index + 1}",
+            content=text[index * chunk:(index + 1) * chunk],
+            order_index=index + 1,
+            estimated_minutes=20,
+            lesson_type="reading",
+        )
+        for index in range(5)
+    ]
+    return ModuleDetailResponse(
+        id=1,
+        title="Blockchain Technology",
+        description="Introduction to blockchain fundamentals",
+        track=Track.USER,
+        order_index=1,
+        duration_hours=2.0,
+        prerequisites=[],
+        learning_objectives=["Explain distributed ledgers", "Describe consensus"],
+        lessons=lessons,
+        has_assessment=True,
+    )
+
+
+def conversation_payload() -> ConversationDetailResponse:
+    now = datetime(2026, 1, 1)
+    answer = (
+        "A blockchain is an append-only ledger replicated across many nodes. Each block "
+        "commits to the previous one by hash, so rewriting history means redoing the work "
+        "of every later block. "
+    ) * 5
+    messages = [
+        ChatMessageResponse(
+            id=index,
+            user_id=7,
+            message=f"Question {index}: how does consensus prevent double spending?",
+            response=answer,
+            context={"module_id": 1, "lesson_id": 3},
+            suggested_lessons=[3, 4],
+            escalated=False,
+            conversation_id=1,
+            created_at=now + timedelta(minutes=index),
+        )
+        for index in range(50)
+    ]
+    return ConversationDetailResponse(
+        conversation_id=1,
+        title="Consensus questions",
+        created_at=now,
+        last_message_at=messages[-1].created_at,
+        message_count=len(messages),
+        messages=messages,
+    )
+
+
+PAYLOADS = {
+    "cohort_list": (cohort_list_payload(), CohortListResponse),
+    "module_detail": (module_detail_payload(), ModuleDetailResponse),
+    "conversation_detail": (conversation_payload(), ConversationDetailResponse),
+}
+
+
+def build_app(optimized: bool) -> FastAPI:
+    app = FastAPI(default_response_class=DefaultJSONResponse) if optimized else FastAPI()
+    if optimized:
+        app.add_middleware(CompressionMiddleware)
+    for name, (payload, model) in PAYLOADS.items():
+        async def endpoint(payload=payload):
+            return payload
+        app.add_api_route(f"/{name}", endpoint, response_model=model, methods=["GET"])
+    return app
+
+
+async def request(app: FastAPI, path: str, accept_encoding: str) -> int:
+    """Send one GET through ASGI and return the response body size"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench"), (b"accept-encoding", accept_encoding.encode())],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+    size = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal size
+        if message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return size
+
+
+async def measure(app: FastAPI, path: str, accept_encoding: str, count: int):
+    await request(app, path, accept_encoding)  # warm up
+    started = time.process_time()
+    for _ in range(count):
+        size = await request(app, path, accept_encoding)
+    cpu_ms = (time.process_time() - started) * 1000 / count
+    return size, cpu_ms
+
+
+async def main(count: int) -> None:
+    baseline = build_app(optimized=False)
+    optimized = build_app(optimized=True)
+    variants = [("baseline", baseline, "gzip, br"), ("json only", optimized, "identity")]
+    variants += [(encoding, optimized, encoding) for encoding in SUPPORTED_ENCODINGS]
+
+    print(f"Response class: {DefaultJSONResponse.__name__}; {count} requests per row\n")
+    print(f"{'payload':<22}{'variant':<12}{'bytes':>10}{'ratio':>8}{'cpu ms/req':>12}")
+    for name in PAYLOADS:
+        baseline_size = None
+        for label, app, accept_encoding in variants:
+            size, cpu_ms = await measure(app, f"/{name}", accept_encoding, count)
+            baseline_size = baseline_size or size
+            print(f"{name:<22}{label:<12}{size:>10}{size / baseline_size:>8.2f}{cpu_ms:>12.3f}")
+        print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark response serialization and compression")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per payload and variant")
+    asyncio.run(main(parser.parse_args().requests))
@@ -1129,6 +1129,7 @@ def main(argv: List[str]) -> int:
         return 1
 
     logging.info("Database seed complete.")
+    logging.info("Run `python -m app.backend.prerender_lessons` to pre-render lesson HTML.")
     logging.info(
         "Seeded datasets -> users:%s modules:%s lessons:%s assessments:%s cohorts:%s attempts:%s notifications:%s",
         len(users_data),